@@ -243,7 +243,7 @@ class UniverseApplication(StructuredApp, GalaxyManagerApplication):
         # Genomes
         self.genomes = self._register_singleton(Genomes)
         # Data providers registry.
-        self.data_provider_registry = self._register_singleton(DataProviderRegistry)
+        self.data_provider_registry = self._register_singleton(DataProviderRegistry, DataProviderRegistry(self.config))
 
         # Initialize error report plugins.
         self.error_reports = self._register_singleton(ErrorReports, ErrorReports(self.config.error_report_file, app=self))
@@ -321,6 +321,15 @@ class UniverseApplication(StructuredApp, GalaxyManagerApplication):
                 time_execution=True)
             self.application_stack.register_postfork_function(self.prune_history_audit_task.start)
             self.haltables.append(("HistoryAuditTablePruneTask", self.prune_history_audit_task.shutdown))
+        if not self.config.enable_celery_tasks and self.config.job_summary_compaction_interval > 0 and self.is_job_handler:
+            self.job_summary_compaction_task = IntervalTask(
+                func=self._compact_job_daily_summaries,
+                name="JobDailySummaryCompactionTask",
+                interval=self.config.job_summary_compaction_interval,
+                immediate_start=False,
+                time_execution=True)
+            self.application_stack.register_postfork_function(self.job_summary_compaction_task.start)
+            self.haltables.append(("JobDailySummaryCompactionTask", self.job_summary_compaction_task.shutdown))
         # Start the job manager
         self.application_stack.register_postfork_function(self.job_manager.start)
         self.proxy_manager = ProxyManager(self.config)
@@ -378,6 +387,11 @@ class UniverseApplication(StructuredApp, GalaxyManagerApplication):
     def _shutdown_database_heartbeat(self):
         self.database_heartbeat.shutdown()
 
+    def _compact_job_daily_summaries(self):
+        session = self.model.session
+        with session.begin():
+            galaxy.model.JobDailySummary.compact(session)
+
     def _shutdown_scheduling_manager(self):
         self.workflow_scheduling_manager.shutdown()
 
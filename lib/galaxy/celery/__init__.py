@@ -60,16 +60,45 @@ def get_history_audit_table_prune_interval():
         return 3600
 
 
+def get_history_contents_aggregate_repair_interval():
+    config = get_config()
+    if config:
+        return config.history_contents_aggregate_repair_interval
+    else:
+        return 86400
+
+
+def get_job_summary_compaction_interval():
+    config = get_config()
+    if config:
+        return config.job_summary_compaction_interval
+    else:
+        return 3600
+
+
 broker = get_broker()
 celery_app = Celery('galaxy', broker=broker, include=['galaxy.celery.tasks'])
+beat_schedule = {}
 prune_interval = get_history_audit_table_prune_interval()
 if prune_interval > 0:
-    celery_app.conf.beat_schedule = {
-        'prune-history-audit-table': {
-            'task': 'galaxy.celery.tasks.prune_history_audit_table',
-            'schedule': prune_interval,
-        },
+    beat_schedule['prune-history-audit-table'] = {
+        'task': 'galaxy.celery.tasks.prune_history_audit_table',
+        'schedule': prune_interval,
+    }
+repair_interval = get_history_contents_aggregate_repair_interval()
+if repair_interval > 0:
+    beat_schedule['recalculate-history-contents-aggregates'] = {
+        'task': 'galaxy.celery.tasks.recalculate_history_contents_aggregates',
+        'schedule': repair_interval,
+    }
+compaction_interval = get_job_summary_compaction_interval()
+if compaction_interval > 0:
+    beat_schedule['compact-job-daily-summaries'] = {
+        'task': 'galaxy.celery.tasks.compact_job_daily_summaries',
+        'schedule': compaction_interval,
     }
+if beat_schedule:
+    celery_app.conf.beat_schedule = beat_schedule
 celery_app.conf.timezone = 'UTC'
 
 
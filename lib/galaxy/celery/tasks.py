@@ -68,7 +68,7 @@ def export_history(
         include_hidden=False,
         include_deleted=False):
     history = sa_session.query(model.History).get(history_id)
-    with model.store.DirectoryModelExportStore(store_directory, app=app, export_files="symlink") as export_store:
+    with model.store.DirectoryModelExportStore(store_directory, app=app, export_files="symlink", prefetch_threads=app.config.archive_prefetch_threads) as export_store:
         export_store.export_history(history, include_hidden=include_hidden, include_deleted=include_deleted)
     job = sa_session.query(model.Job).get(job_id)
     job.state = model.Job.states.NEW
@@ -83,3 +83,25 @@ def prune_history_audit_table(sa_session: scoped_session):
     timer = ExecutionTimer()
     model.HistoryAudit.prune(sa_session)
     log.debug(f"Successfully pruned history_audit table {timer}")
+
+
+@celery_app.task(ignore_result=True)
+@galaxy_task
+def recalculate_history_contents_aggregates(sa_session: scoped_session, history_id=None):
+    """Recalculate the persisted size and content counts of a history, or of all tracked histories."""
+    timer = ExecutionTimer()
+    history_ids = [history_id] if history_id else model.HistoryContentsAggregate.tracked_history_ids(sa_session)
+    for history_id in history_ids:
+        with sa_session.begin():
+            model.HistoryContentsAggregate.recalculate(sa_session, history_id)
+    log.debug(f"Successfully recalculated contents aggregates of {len(history_ids)} histories {timer}")
+
+
+@celery_app.task(ignore_result=True)
+@galaxy_task
+def compact_job_daily_summaries(sa_session: scoped_session, full=False):
+    """Roll up the jobs updated since the previous compaction into the job_daily_summary table."""
+    timer = ExecutionTimer()
+    with sa_session.begin():
+        days = model.JobDailySummary.compact(sa_session, full=full)
+    log.debug(f"Successfully compacted job daily summaries of {'all' if days is None else days} days {timer}")
@@ -1156,12 +1156,17 @@ class ConfiguresGalaxyMixin:
         from galaxy.managers.citations import CitationsManager
         from galaxy.tool_util.deps import containers
         from galaxy.tool_util.deps.dependencies import AppInfo
+        from galaxy.util.template import compiled_template_cache
         import galaxy.tools.search
 
         self.citations_manager = CitationsManager(self)
 
         from galaxy.managers.tools import DynamicToolManager
         self.dynamic_tools_manager = DynamicToolManager(self)
+        template_cache_dir = None
+        if self.config.enable_tool_document_cache:
+            template_cache_dir = os.path.join(self.config.tool_cache_data_dir, 'templates')
+        compiled_template_cache.configure(self.config.tool_template_cache_size, cache_dir=template_cache_dir)
         self._toolbox_lock = threading.RLock()
         self.toolbox = tools.ToolBox(self.config.tool_configs, self.config.tool_path, self)
         galaxy_root_dir = os.path.abspath(self.config.root)
@@ -3,6 +3,7 @@
 import binascii
 import gzip
 import io
+import itertools
 import json
 import logging
 import os
@@ -538,32 +539,59 @@ class Bam(BamNative):
             pass
         return index_flag
 
+    # Number of alignments inspected for a cheap sort order check before indexing.
+    sort_check_max_alignments = 100000
+
+    def _alignments_out_of_order(self, file_name):
+        """
+        Return True if one of the first ``sort_check_max_alignments`` alignments of
+        file_name is not in coordinate order, False if none is, None if the file can't
+        be read.
+        """
+        try:
+            with pysam.AlignmentFile(file_name, mode='rb', check_sq=False) as alignment_file:
+                previous = (-1, -1)
+                for alignment in itertools.islice(alignment_file.fetch(until_eof=True), self.sort_check_max_alignments):
+                    # Alignments without a reference come last.
+                    reference_id = alignment.reference_id if alignment.reference_id >= 0 else sys.maxsize
+                    current = (reference_id, alignment.reference_start)
+                    if current < previous:
+                        return True
+                    previous = current
+        except Exception:
+            return None
+        return False
+
     def dataset_content_needs_grooming(self, file_name):
         """
         Check if file_name is a coordinate-sorted BAM file
         """
+        # Unsorted files are usually out of order within the first alignments,
+        # which is much cheaper to detect than failing to index the whole file.
+        if self._alignments_out_of_order(file_name):
+            return True
         # The best way to ensure that BAM files are coordinate-sorted and indexable
-        # is to actually index them.
+        # is to actually index them. samtools treats an existing index path as another
+        # input, so the index goes to a file name inside a private directory.
         index_flag = self.get_index_flag(file_name)
-        index_name = tempfile.NamedTemporaryFile(prefix="bam_index").name
+        index_dir = tempfile.mkdtemp(prefix='bam_index_')
+        index_name = os.path.join(index_dir, 'index.bai' if index_flag == '-b' else 'index.csi')
         try:
             # If pysam fails to index a file it will write to stderr,
             # and this causes the set_meta script to fail. So instead
             # we start another process and discard stderr.
             if index_flag == '-b':
                 # IOError: No such file or directory: '-b' if index_flag is set to -b (pysam 0.15.4)
-                cmd = ['python', '-c', f"import pysam; pysam.set_verbosity(0); pysam.index('{file_name}', '{index_name}')"]
+                cmd = ['python', '-c', "import pysam, sys; pysam.set_verbosity(0); pysam.index(sys.argv[1], sys.argv[2])", file_name, index_name]
             else:
-                cmd = ['python', '-c', f"import pysam; pysam.set_verbosity(0); pysam.index('{index_flag}', '{file_name}', '{index_name}')"]
+                cmd = ['python', '-c', "import pysam, sys; pysam.set_verbosity(0); pysam.index(sys.argv[1], sys.argv[2], sys.argv[3])", index_flag, file_name, index_name]
             with open(os.devnull, 'w') as devnull:
                 subprocess.check_call(cmd, stderr=devnull, shell=False)
             needs_sorting = False
         except subprocess.CalledProcessError:
             needs_sorting = True
-        try:
-            os.unlink(index_name)
-        except Exception:
-            pass
+        finally:
+            shutil.rmtree(index_dir, ignore_errors=True)
         return needs_sorting
 
     def set_meta(self, dataset, overwrite=True, **kwd):
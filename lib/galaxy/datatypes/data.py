@@ -931,6 +931,9 @@ class Text(Data):
                     this_chunk_size = lines_per_file[chunk_idx]
                     chunk_idx += 1
                 lines_remaining = this_chunk_size
+                if part_file:
+                    # the part is complete before the next one is started
+                    part_file.close()
                 part_file = None
                 while lines_remaining > 0:
                     a_line = f.readline()
@@ -125,14 +125,14 @@ class Sequence(data.Text):
         if split_params['split_mode'] == 'number_of_parts':
             # legacy basic mode - split into a specified number of parts
             parts = int(split_params['split_size'])
-            sequences_per_file = [total_sequences / parts for i in range(parts)]
+            sequences_per_file = [total_sequences // parts for i in range(parts)]
             for i in range(total_sequences % parts):
                 sequences_per_file[i] += 1
         elif split_params['split_mode'] == 'to_size':
             # loop through the sections and calculate the number of sequences
             chunk_size = int(split_params['split_size'])
             rem = total_sequences % chunk_size
-            sequences_per_file = [chunk_size for i in range(total_sequences / chunk_size)]
+            sequences_per_file = [chunk_size for i in range(total_sequences // chunk_size)]
             # TODO: Should we invest the time in a better way to handle small remainders?
             if rem > 0:
                 sequences_per_file.append(rem)
@@ -149,7 +149,7 @@ class Sequence(data.Text):
         else:
             with compression_utils.get_fileobj(input_datasets[0].file_name) as in_file:
                 total_sequences = sum(1 for line in in_file)
-            total_sequences /= 4
+            total_sequences //= 4
 
         sequences_per_file = cls.get_sequences_per_file(total_sequences, split_params)
         return cls.write_split_files(input_datasets, None, subdir_generator_function, sequences_per_file)
@@ -12,11 +12,18 @@ GALAXY_MEMORY_MB_KEY = "galaxy_memory_mb"
 START_EPOCH_KEY = "start_epoch"
 END_EPOCH_KEY = "end_epoch"
 RUNTIME_SECONDS_KEY = "runtime_seconds"
+# recorded by Galaxy while preparing the job
+PREPARATION_SECONDS_KEY = "preparation_seconds"
+PREFETCH_SECONDS_KEY = "prefetch_seconds"
 
 
 class CorePluginFormatter(formatting.JobMetricFormatter):
 
     def format(self, key, value):
+        if key == PREPARATION_SECONDS_KEY:
+            return ("Job Preparation Time", "%.2f seconds" % float(value))
+        elif key == PREFETCH_SECONDS_KEY:
+            return ("Job Dataset Prefetch Time", "%.2f seconds" % float(value))
         value = int(value)
         if key == GALAXY_SLOTS_KEY:
             return ("Cores Allocated", "%d" % value)
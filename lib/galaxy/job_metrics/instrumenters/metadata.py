@@ -0,0 +1,59 @@
+"""The module describes the ``metadata`` job metrics plugin."""
+import json
+import logging
+import os
+
+from . import InstrumentPlugin
+from .. import formatting
+
+log = logging.getLogger(__name__)
+
+# Written by galaxy.metadata.set_metadata in the job directory.
+TIMINGS_PATH = os.path.join("metadata", "timings.json")
+OUTPUT_KEY_PREFIX = "output_"
+SECONDS_KEY_SUFFIX = "_seconds"
+
+
+class MetadataPluginFormatter(formatting.JobMetricFormatter):
+
+    def format(self, key, value):
+        if key == "processes":
+            return ("Metadata Processes", "%d" % int(value))
+        elif key == "discovered_datasets":
+            return ("Discovered Datasets with Metadata Set", "%d" % int(value))
+        elif key == "total_seconds":
+            return ("Metadata Setting Time", formatting.seconds_to_str(int(value)))
+        elif key == "discovered_seconds":
+            return ("Metadata Setting Time (Discovered Datasets)", formatting.seconds_to_str(int(value)))
+        elif key.startswith(OUTPUT_KEY_PREFIX) and key.endswith(SECONDS_KEY_SUFFIX):
+            output_name = key[len(OUTPUT_KEY_PREFIX):-len(SECONDS_KEY_SUFFIX)]
+            return (f"Metadata Setting Time ({output_name})", formatting.seconds_to_str(int(value)))
+        return (str(key), str(value))
+
+
+class MetadataPlugin(InstrumentPlugin):
+    """ Collect the number of processes used to set metadata in the job and the
+    time spent setting the metadata of each output.
+    """
+    plugin_type = "metadata"
+    formatter = MetadataPluginFormatter()
+
+    def __init__(self, **kwargs):
+        pass
+
+    def job_properties(self, job_id, job_directory):
+        properties = {}
+        try:
+            with open(os.path.join(job_directory, TIMINGS_PATH)) as f:
+                timings = json.load(f)
+        except (OSError, ValueError):
+            # metadata may have been set outside of the job
+            return properties
+        for key in ("processes", "total_seconds", "discovered_datasets", "discovered_seconds"):
+            properties[key] = timings.get(key)
+        for output_name, seconds in timings.get("outputs", {}).items():
+            properties[f"{OUTPUT_KEY_PREFIX}{output_name}{SECONDS_KEY_SUFFIX}"] = seconds
+        return properties
+
+
+__all__ = ('MetadataPlugin', )
@@ -17,12 +17,20 @@ from abc import (
     ABCMeta,
     abstractmethod,
 )
+from concurrent.futures import ThreadPoolExecutor
 from json import loads
 from typing import Any, Dict, List
 
 import packaging.version
 import yaml
 from pulsar.client.staging import COMMAND_VERSION_FILENAME
+from sqlalchemy import or_
+from sqlalchemy.orm import (
+    joinedload,
+    object_session,
+    selectinload,
+    undefer,
+)
 
 from galaxy import (
     model,
@@ -58,7 +66,10 @@ from galaxy.jobs.mapper import (
 from galaxy.jobs.runners import BaseJobRunner, JobState
 from galaxy.metadata import get_metadata_compute_strategy
 from galaxy.model import store
-from galaxy.objectstore import ObjectStorePopulator
+from galaxy.objectstore import (
+    object_store_caches_files,
+    ObjectStorePopulator,
+)
 from galaxy.structured_app import MinimalManagerApp
 from galaxy.tool_util.deps import requirements
 from galaxy.tool_util.output_checker import (
@@ -950,6 +961,8 @@ class JobWrapper(HasResourceParameters):
         self._dataset_path_rewriter = None
         self.output_paths = None
         self.output_hdas_and_paths = None
+        # file names of the job's datasets keyed by dataset id, see _dataset_file_name
+        self._dataset_file_names = {}
         self.tool_provided_job_metadata = None
         self.job_runner_mapper = JobRunnerMapper(self, queue.dispatcher.url_to_destination, self.app.job_config)
         self.params = None
@@ -1139,6 +1152,11 @@ class JobWrapper(HasResourceParameters):
             os.mkdir(self.working_directory)
 
         job = self._load_job()
+        self._dataset_file_names = {}
+        prefetch_timer = util.ExecutionTimer()
+        prefetched = self._prefetch_job_datasets(job)
+        log.debug(f"Prefetched {len(prefetched)} datasets for job [{job.id}] {prefetch_timer}")
+        job.add_metric("core", "prefetch_seconds", prefetch_timer.elapsed)
 
         def get_special():
             special = self.sa_session.query(model.JobExportHistoryArchive).filter_by(job=job).first()
@@ -1168,6 +1186,7 @@ class JobWrapper(HasResourceParameters):
         job.command_line = unicodify(self.command_line)
         job.dependencies = self.tool.dependencies
         self.interactivetools = getattr(tool_evaluator, 'interactivetools', None)
+        job.add_metric("core", "preparation_seconds", prepare_timer.elapsed)
         self.sa_session.add(job)
         self.sa_session.flush()
         # Return list of all extra files
@@ -1182,6 +1201,88 @@ class JobWrapper(HasResourceParameters):
         log.debug(f"Job wrapper for Job [{job.id}] prepared {prepare_timer}")
         return self.extra_filenames
 
+    def _prefetch_job_datasets(self, job):
+        """
+        Load the input and output datasets of ``job`` - dataset instances with their metadata,
+        datasets, metadata files and the elements of input collections - with a few queries
+        instead of one relationship at a time while the job is prepared. With object stores
+        fetching files into a cache, the files of the datasets are fetched ahead with
+        ``job_preparation_prefetch_threads`` threads, which only get the identifiers of the
+        datasets; their paths are then resolved once on this thread, see ``_dataset_file_name``.
+
+        Returns the loaded objects, which must be referenced while the job is prepared as
+        the session only holds weak references to them.
+        """
+        sa_session = object_session(job)
+        if sa_session is None:
+            return []
+        hda = model.HistoryDatasetAssociation
+        ldda = model.LibraryDatasetDatasetAssociation
+        sa_session.query(model.Job).options(
+            selectinload(model.Job.input_datasets).joinedload(model.JobToInputDatasetAssociation.dataset).options(
+                undefer(hda._metadata), joinedload(hda.dataset)),
+            selectinload(model.Job.output_datasets).joinedload(model.JobToOutputDatasetAssociation.dataset).options(
+                undefer(hda._metadata), joinedload(hda.dataset)),
+            selectinload(model.Job.input_library_datasets).joinedload(model.JobToInputLibraryDatasetAssociation.dataset).options(
+                undefer(ldda._metadata), joinedload(ldda.dataset)),
+            selectinload(model.Job.output_library_datasets).joinedload(model.JobToOutputLibraryDatasetAssociation.dataset).options(
+                undefer(ldda._metadata), joinedload(ldda.dataset)),
+            selectinload(model.Job.input_dataset_collections),
+            selectinload(model.Job.input_dataset_collection_elements),
+        ).filter(model.Job.id == job.id).one()
+
+        dataset_instances = [da.dataset for da in job.input_datasets + job.output_datasets + job.input_library_datasets + job.output_library_datasets if da.dataset]
+        prefetched = list(dataset_instances)
+        for dca in job.input_dataset_collections:
+            if dca.dataset_collection:
+                prefetched.extend(dca.dataset_collection.collection.prefetch_dataset_elements())
+        for dcea in job.input_dataset_collection_elements:
+            element = dcea.dataset_collection_element
+            if element and element.child_collection:
+                prefetched.extend(element.child_collection.prefetch_dataset_elements())
+        hda_ids = [instance.id for instance in dataset_instances if isinstance(instance, hda)]
+        ldda_ids = [instance.id for instance in dataset_instances if isinstance(instance, ldda)]
+        if hda_ids or ldda_ids:
+            # looked up by id from the metadata of the dataset instances
+            prefetched.extend(sa_session.query(model.MetadataFile).filter(or_(
+                model.MetadataFile.hda_id.in_(hda_ids),
+                model.MetadataFile.lda_id.in_(ldda_ids),
+            )))
+
+        datasets = {instance.dataset.id: instance.dataset for instance in dataset_instances if instance.dataset}
+        threads = min(self.app.config.job_preparation_prefetch_threads, len(datasets))
+        object_store = self.app.object_store
+        if threads > 1 and object_store_caches_files(object_store):
+            keys = [
+                Bunch(id=dataset.id, uuid=dataset.uuid, object_store_id=dataset.object_store_id)
+                for dataset in datasets.values() if not (dataset.purged or dataset.external_filename)
+            ]
+
+            def fetch(key):
+                try:
+                    object_store.get_filename(key)
+                except ObjectNotFound:
+                    pass
+
+            with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='job-prefetch') as executor:
+                list(executor.map(fetch, keys))
+        for instance in dataset_instances:
+            if instance.dataset:
+                self._dataset_file_name(instance)
+        return prefetched
+
+    def _dataset_file_name(self, dataset_instance):
+        """
+        Return the file name of ``dataset_instance``, resolved through the object store once
+        per dataset (and prepare) instead of each time the job's paths are computed.
+        """
+        dataset_id = dataset_instance.dataset.id
+        if dataset_id is None:
+            return dataset_instance.file_name
+        if dataset_id not in self._dataset_file_names:
+            self._dataset_file_names[dataset_id] = dataset_instance.file_name
+        return self._dataset_file_names[dataset_id]
+
     def _setup_working_directory(self, job=None):
         if job is None:
             job = self.get_job()
@@ -1934,8 +2035,7 @@ class JobWrapper(HasResourceParameters):
         return f'[ -f "{self.app.config.environment_setup_file}" ] && . {self.app.config.environment_setup_file}'
 
     def get_input_dataset_fnames(self, ds):
-        filenames = []
-        filenames = [ds.file_name]
+        filenames = [self._dataset_file_name(ds)]
         # we will need to stage in metadata file names also
         # TODO: would be better to only stage in metadata files that are actually needed (found in command line, referenced in config files, etc.)
         for value in ds.metadata.values():
@@ -1961,7 +2061,7 @@ class JobWrapper(HasResourceParameters):
         return paths
 
     def get_input_path(self, dataset):
-        real_path = dataset.file_name
+        real_path = self._dataset_file_name(dataset)
         false_path = self.dataset_path_rewriter.rewrite_dataset_path(dataset, 'input')
         return DatasetPath(
             dataset.dataset.id,
@@ -2013,7 +2113,7 @@ class JobWrapper(HasResourceParameters):
         for da in job.output_datasets + job.output_library_datasets:
             da_false_path = dataset_path_rewriter.rewrite_dataset_path(da.dataset, 'output')
             mutable = da.dataset.dataset.external_filename is None
-            dataset_path = DatasetPath(da.dataset.dataset.id, da.dataset.file_name, false_path=da_false_path, mutable=mutable)
+            dataset_path = DatasetPath(da.dataset.dataset.id, self._dataset_file_name(da.dataset), false_path=da_false_path, mutable=mutable)
             results.append((da.name, da.dataset, dataset_path))
 
         self.output_paths = [t[2] for t in results]
@@ -2340,6 +2440,8 @@ class TaskWrapper(JobWrapper):
         else:
             self.prepare_input_files_cmds = None
         self.status = task.states.NEW
+        # called without arguments whenever the state of the task may have changed
+        self.state_listener = None
 
     @property
     def dataset_path_rewriter(self):
@@ -2402,6 +2504,7 @@ class TaskWrapper(JobWrapper):
         log.error(f"TaskWrapper Failure {message}")
         self.status = 'error'
         # How do we want to handle task failure?  Fail the job and let it clean up?
+        self._notify_state_listener()
 
     def change_state(self, state, info=False, flush=True, job=None):
         task = self.get_task()
@@ -2411,6 +2514,11 @@ class TaskWrapper(JobWrapper):
         task.state = state
         self.sa_session.add(task)
         self.sa_session.flush()
+        self._notify_state_listener()
+
+    def _notify_state_listener(self):
+        if self.state_listener is not None:
+            self.state_listener()
 
     def get_state(self):
         task = self.get_task()
@@ -2471,6 +2579,7 @@ class TaskWrapper(JobWrapper):
         task.exit_code = tool_exit_code
         task.command_line = self.command_line
         self.sa_session.flush()
+        self._notify_state_listener()
 
     def cleanup(self, delete_files=True):
         # There is no task cleanup.  The job cleans up for all tasks.
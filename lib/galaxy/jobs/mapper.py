@@ -1,5 +1,9 @@
+import bisect
+import copy
 import importlib
 import logging
+import threading
+from collections import OrderedDict
 
 import galaxy.jobs.rules
 from galaxy.jobs import stock_rules
@@ -17,6 +21,10 @@ ERROR_MESSAGE_NO_RULE_FUNCTION = "Galaxy misconfigured - cannot find dynamic rul
 ERROR_MESSAGE_RULE_FUNCTION_NOT_FOUND = "Galaxy misconfigured - no rule function named %s found in dynamic rule modules."
 ERROR_MESSAGE_RULE_EXCEPTION = "Encountered an unhandled exception while caching job destination dynamic rule."
 
+# job attributes dynamic rules can declare to depend on with memoize_destination
+MEMOIZE_DESTINATION_ATTRIBUTES = ("tool_id", "tool_version", "user", "user_email", "resource_params", "input_size")
+MAX_MEMOIZED_DESTINATIONS = 10000
+
 
 class JobMappingConfigurationException(Exception):
     pass
@@ -35,6 +43,119 @@ class JobNotReadyException(Exception):
         self.message = message
 
 
+class MemoizedRule:
+    """
+    Job attributes a dynamic rule function depends on, see :func:`memoize_destination`.
+    """
+
+    def __init__(self, depends_on, input_size_thresholds=None):
+        unknown = set(depends_on) - set(MEMOIZE_DESTINATION_ATTRIBUTES)
+        if unknown:
+            raise ValueError(f"Cannot memoize job destinations on {sorted(unknown)}, must be one of {MEMOIZE_DESTINATION_ATTRIBUTES}")
+        if "input_size" in depends_on and not input_size_thresholds:
+            raise ValueError("Memoizing job destinations on input_size requires input_size_thresholds")
+        self.depends_on = tuple(depends_on)
+        self.input_size_thresholds = sorted(input_size_thresholds or [])
+
+    def key(self, rule_function, destination, job_wrapper):
+        tool = job_wrapper.tool
+        values = []
+        job = None
+        for attribute in self.depends_on:
+            if attribute == "tool_id":
+                values.append(tool.id)
+            elif attribute == "tool_version":
+                values.append(getattr(tool, "version", None))
+            else:
+                job = job or job_wrapper.get_job()
+                if attribute == "user":
+                    values.append(job.user and job.user.id)
+                elif attribute == "user_email":
+                    values.append(job.user and str(job.user.email))
+                elif attribute == "resource_params":
+                    values.append(sorted((str(k), str(v)) for k, v in job_wrapper.get_resource_parameters(job).items()))
+                elif attribute == "input_size":
+                    values.append(bisect.bisect_right(self.input_size_thresholds, self._input_size(job)))
+        return (
+            rule_function.__module__,
+            rule_function.__qualname__,
+            destination.id,
+            repr(sorted(destination.params.items())),
+            repr(values),
+        )
+
+    @staticmethod
+    def _input_size(job):
+        return sum(assoc.dataset.get_size() for assoc in job.input_datasets if assoc.dataset)
+
+
+def memoize_destination(*depends_on, input_size_thresholds=None):
+    """
+    Decorate a dynamic rule function to declare the job attributes (from
+    ``MEMOIZE_DESTINATION_ATTRIBUTES``) it depends on. The destination it maps a job
+    to is then reused, without calling the rule, for the following jobs of the same
+    job handler with the same attributes and dynamic destination parameters, e.g. the
+    jobs of a collection mapped over.
+
+    Jobs are distinguished by the total size of their input datasets with respect to
+    ``input_size_thresholds`` (in bytes), e.g. ``[10 * 1024 ** 3]`` for a rule
+    treating inputs over 10 GB differently.
+
+    Rules depending on anything else, such as the job counts of the rule_helper,
+    should not be memoized.
+    """
+    memoized_rule = MemoizedRule(depends_on, input_size_thresholds=input_size_thresholds)
+
+    def decorator(rule_function):
+        rule_function.memoized_rule = memoized_rule
+        return rule_function
+    return decorator
+
+
+class RuleCache:
+    """
+    Rule functions found for dynamic destinations and destinations of memoized
+    rules, cleared when the job rules are reloaded.
+    """
+
+    def __init__(self, max_destinations=MAX_MEMOIZED_DESTINATIONS):
+        self.max_destinations = max_destinations
+        self._functions = {}
+        self._destinations = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_function(self, key):
+        return self._functions.get(key)
+
+    def set_function(self, key, rule_function):
+        self._functions[key] = rule_function
+
+    def get_destination(self, key):
+        with self._lock:
+            job_destination = self._destinations.get(key)
+            if job_destination is None:
+                return None
+            self._destinations.move_to_end(key)
+        # destinations are updated by runners, every job gets its own copy
+        return copy.deepcopy(job_destination)
+
+    def set_destination(self, key, job_destination):
+        job_destination = copy.deepcopy(job_destination)
+        with self._lock:
+            self._destinations[key] = job_destination
+            self._destinations.move_to_end(key)
+            while len(self._destinations) > self.max_destinations:
+                self._destinations.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._functions.clear()
+            self._destinations.clear()
+
+
+rule_cache = RuleCache()
+
+
 STOCK_RULES = dict(
     choose_one=stock_rules.choose_one,
     burst=stock_rules.burst,
@@ -154,6 +275,14 @@ class JobRunnerMapper:
         top level rules_module.
         """
         rules_module_name = destination.params.get('rules_module')
+        cache_key = (rules_module_name or self.rules_module.__name__, destination.params.get('function') or tuple(self.job_wrapper.tool.all_ids))
+        expand_function = rule_cache.get_function(cache_key)
+        if expand_function is None:
+            expand_function = self.__find_expand_function(destination, rules_module_name)
+            rule_cache.set_function(cache_key, expand_function)
+        return expand_function
+
+    def __find_expand_function(self, destination, rules_module_name):
         rule_modules = self.__get_rule_modules_or_defaults(rules_module_name)
         expand_function = None
         expand_function_name = destination.params.get('function')
@@ -202,7 +331,16 @@ class JobRunnerMapper:
         return self.__handle_rule(expand_function, destination)
 
     def __handle_rule(self, rule_function, destination):
-        job_destination = self.__invoke_expand_function(rule_function, destination)
+        memoized_rule = getattr(rule_function, "memoized_rule", None)
+        if memoized_rule is not None:
+            key = memoized_rule.key(rule_function, destination, self.job_wrapper)
+            job_destination = rule_cache.get_destination(key)
+            if job_destination is None:
+                job_destination = self.__invoke_expand_function(rule_function, destination)
+                if job_destination is not None:
+                    rule_cache.set_destination(key, job_destination)
+        else:
+            job_destination = self.__invoke_expand_function(rule_function, destination)
         if not isinstance(job_destination, galaxy.jobs.JobDestination):
             job_destination_rep = str(job_destination)  # Should be either id or url
             if '://' in job_destination_rep:
@@ -1,6 +1,10 @@
 import hashlib
 import logging
 import random
+import threading
+import time
+import weakref
+from collections import OrderedDict
 from datetime import datetime
 
 from sqlalchemy import func
@@ -14,6 +18,84 @@ from galaxy.tool_util.deps.dependencies import ToolInfo
 log = logging.getLogger(__name__)
 
 VALID_JOB_HASH_STRATEGIES = ["job", "user", "history", "workflow_invocation"]
+# seconds the destination load snapshot read by should_burst is reused for by default
+DEFAULT_DESTINATION_LOAD_MAX_AGE = 5
+# job states counted by the destination load snapshot
+DESTINATION_LOAD_JOB_STATES = tuple(model.Job.non_ready_states)
+
+
+class DestinationLoad:
+    """
+    Snapshot of the number of jobs of each destination in the states of
+    ``DESTINATION_LOAD_JOB_STATES``.
+    """
+
+    def __init__(self, counts):
+        # {(destination_id, state): job count}
+        self.counts = counts
+        self.created = time.monotonic()
+
+    @property
+    def age(self):
+        return time.monotonic() - self.created
+
+    def job_count(self, destination_ids=None, job_states=None):
+        return sum(
+            count for (destination_id, state), count in self.counts.items()
+            if (destination_ids is None or destination_id in destination_ids) and (job_states is None or state in job_states)
+        )
+
+
+class JobAggregateCache:
+    """
+    Job aggregates and destination load snapshot computed for dynamic rules, shared
+    by the threads of a job handler so a burst of job submissions does not issue the
+    same aggregate queries for every job.
+    """
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self._aggregates = OrderedDict()
+        self._lock = threading.Lock()
+        self._destination_load = None
+        self._destination_load_lock = threading.Lock()
+
+    def get(self, key, max_age, compute):
+        """Return the aggregate cached for ``key`` if computed less than ``max_age`` seconds ago."""
+        with self._lock:
+            cached = self._aggregates.get(key)
+            if cached is not None and time.monotonic() - cached[0] <= max_age:
+                self._aggregates.move_to_end(key)
+                return cached[1]
+        computed = time.monotonic()
+        value = compute()
+        with self._lock:
+            self._aggregates[key] = (computed, value)
+            self._aggregates.move_to_end(key)
+            while len(self._aggregates) > self.max_entries:
+                self._aggregates.popitem(last=False)
+        return value
+
+    def destination_load(self, max_age, compute):
+        """Return the destination load snapshot, computing a new one (once) if older than ``max_age`` seconds."""
+        load = self._destination_load
+        if load is None or load.age > max_age:
+            with self._destination_load_lock:
+                load = self._destination_load
+                if load is None or load.age > max_age:
+                    load = self._destination_load = compute()
+        return load
+
+
+_job_aggregate_caches = weakref.WeakKeyDictionary()
+_job_aggregate_caches_lock = threading.Lock()
+
+
+def job_aggregate_cache(app):
+    with _job_aggregate_caches_lock:
+        if app not in _job_aggregate_caches:
+            _job_aggregate_caches[app] = JobAggregateCache()
+        return _job_aggregate_caches[app]
 
 
 class RuleHelper:
@@ -26,6 +108,13 @@ class RuleHelper:
 
     def __init__(self, app):
         self.app = app
+        self._aggregate_cache = None
+
+    @property
+    def aggregate_cache(self):
+        if self._aggregate_cache is None:
+            self._aggregate_cache = job_aggregate_cache(self.app)
+        return self._aggregate_cache
 
     def supports_container(self, job_or_tool, container_type):
         """
@@ -73,24 +162,89 @@ class RuleHelper:
 
     def job_count(
         self,
+        max_age=None,
         **kwds
     ):
-        query = self.query(model.Job)
-        return self._filter_job_query(query, **kwds).count()
+        """
+        Count jobs matching the filters of ``_filter_job_query``, reusing a count
+        computed less than ``max_age`` seconds ago by this job handler if set.
+        """
+        def count():
+            query = self.query(model.Job)
+            return self._filter_job_query(query, **kwds).count()
+        return self._cached_aggregate("job_count", max_age, kwds, count)
 
     def sum_job_runtime(
         self,
+        max_age=None,
         **kwds
     ):
+        """
+        Sum the runtime of jobs matching the filters of ``_filter_job_query``, reusing
+        a sum computed less than ``max_age`` seconds ago by this job handler if set.
+        """
         # TODO: Consider sum_core_hours or something that scales runtime by
         # by calculated cores per job.
-        query = self.metric_query(
-            select=func.sum(model.JobMetricNumeric.table.c.metric_value),
-            metric_name="runtime_seconds",
-            plugin="core",
+        def sum_runtime():
+            query = self.metric_query(
+                select=func.sum(model.JobMetricNumeric.table.c.metric_value),
+                metric_name="runtime_seconds",
+                plugin="core",
+            )
+            query = query.join(model.Job)
+            return float(self._filter_job_query(query, **kwds).first()[0])
+        return self._cached_aggregate("sum_job_runtime", max_age, kwds, sum_runtime)
+
+    def destination_load(self, max_age=DEFAULT_DESTINATION_LOAD_MAX_AGE):
+        """
+        Return a :class:`DestinationLoad` snapshot of the number of new, queued and
+        running jobs of each destination, computed at most ``max_age`` seconds ago
+        and shared by all rules evaluated by this job handler.
+        """
+        def compute():
+            job_table = model.Job.table
+            query = self.app.model.context.query(job_table.c.destination_id, job_table.c.state, func.count(job_table.c.id))
+            # jobs without users are not counted, as by job_count
+            query = query.filter(job_table.c.user_id.isnot(None))
+            query = query.filter(job_table.c.state.in_(DESTINATION_LOAD_JOB_STATES))
+            query = query.group_by(job_table.c.destination_id, job_table.c.state)
+            return DestinationLoad({(destination_id, state): count for destination_id, state, count in query})
+        return self.aggregate_cache.destination_load(float(max_age), compute)
+
+    def resource_usage(
+        self,
+        tool_id=None,
+        for_destination=None,
+        created_in_last=None,
+        percentiles=(50, 95),
+    ):
+        """
+        Summarize the runtime, slots and memory usage of past jobs, e.g. to
+        pick a destination or size its resources from the p95 peak memory of
+        a tool.
+
+        :param tool_id: only summarize jobs of this tool.
+        :param for_destination: only summarize jobs run on this destination.
+        :param created_in_last: a ``timedelta``, only summarize jobs created since.
+        :param percentiles: percentiles (0-100) to calculate for each metric.
+        :return: see :meth:`galaxy.model.JobResourceUsage.summarize`.
+        """
+        since = None
+        if created_in_last is not None:
+            since = datetime.utcnow() - created_in_last
+        return model.JobResourceUsage.summarize(
+            self.app.model.context,
+            tool_id=tool_id,
+            destination_id=for_destination,
+            since=since,
+            percentiles=percentiles,
         )
-        query = query.join(model.Job)
-        return float(self._filter_job_query(query, **kwds).first()[0])
+
+    def _cached_aggregate(self, name, max_age, kwds, compute):
+        if max_age is None:
+            return compute()
+        key = (name, tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in kwds.items())))
+        return self.aggregate_cache.get(key, float(max_age), compute)
 
     def metric_query(self, select, metric_name, plugin, numeric=True):
         metric_class = model.JobMetricNumeric if numeric else model.JobMetricText
@@ -146,11 +300,14 @@ class RuleHelper:
 
         return query
 
-    def should_burst(self, destination_ids, num_jobs, job_states=None):
+    def should_burst(self, destination_ids, num_jobs, job_states=None, max_age=DEFAULT_DESTINATION_LOAD_MAX_AGE):
         """ Check if the specified destinations ``destination_ids`` have at
         least ``num_jobs`` assigned to it - send in ``job_state`` as ``queued``
         to limit this check to number of jobs queued.
 
+        Jobs are counted from a destination load snapshot at most ``max_age``
+        seconds old, set ``max_age`` to 0 to count jobs for every call.
+
         See stock_rules for an simple example of using this function - but to
         get the most out of it - it should probably be used with custom job
         rules that can respond to the bursting by allocating resources,
@@ -158,10 +315,16 @@ class RuleHelper:
         """
         if job_states is None:
             job_states = "queued,running"
-        from_destination_job_count = self.job_count(
-            for_destinations=destination_ids,
-            for_job_states=util.listify(job_states)
-        )
+        job_states = util.listify(job_states)
+        destination_ids = util.listify(destination_ids)
+        if all(state in DESTINATION_LOAD_JOB_STATES for state in job_states):
+            from_destination_job_count = self.destination_load(max_age=max_age).job_count(destination_ids, job_states)
+        else:
+            from_destination_job_count = self.job_count(
+                max_age=float(max_age),
+                for_destinations=destination_ids,
+                for_job_states=job_states
+            )
         # Would this job push us over maximum job count before requiring
         # bursting (roughly... very roughly given many handler threads may be
         # scheduling jobs).
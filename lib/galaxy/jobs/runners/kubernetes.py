@@ -6,6 +6,7 @@ import logging
 import math
 import os
 import re
+import time
 from datetime import datetime
 
 import yaml
@@ -33,6 +34,7 @@ from galaxy.jobs.runners.util.pykube_util import (
     is_pod_unschedulable,
     Job,
     job_object_dict,
+    JobWatcher,
     Pod,
     produce_k8s_job_prefix,
     pull_policy,
@@ -40,6 +42,7 @@ from galaxy.jobs.runners.util.pykube_util import (
     Service,
     service_object_dict
 )
+from galaxy.util import asbool
 from galaxy.util.bytesize import ByteSize
 
 log = logging.getLogger(__name__)
@@ -85,7 +88,9 @@ class KubernetesJobRunner(AsynchronousJobRunner):
             k8s_walltime_limit=dict(map=int, valid=lambda x: int(x) >= 0, default=172800),
             k8s_unschedulable_walltime_limit=dict(map=int, valid=lambda x: not x or int(x) >= 0, default=None),
             k8s_interactivetools_use_ssl=dict(map=bool, default=False),
-            k8s_interactivetools_ingress_annotations=dict(map=str),)
+            k8s_interactivetools_ingress_annotations=dict(map=str),
+            k8s_use_watch=dict(map=asbool, default=False),
+            k8s_watch_reconcile_interval=dict(map=int, valid=lambda x: int(x) > 0, default=300),)
 
         if 'runner_param_specs' not in kwargs:
             kwargs['runner_param_specs'] = dict()
@@ -103,6 +108,13 @@ class KubernetesJobRunner(AsynchronousJobRunner):
         self._fs_group = self.__get_fs_group()
         self._default_pull_policy = self.__get_pull_policy()
 
+        self._watcher = None
+        self._use_watch_cache = False
+        self._last_reconcile = time.time()
+        if self.runner_params['k8s_use_watch']:
+            self._watcher = JobWatcher(self._pykube_api, self.runner_params['k8s_namespace'], self.__get_watch_selector())
+            self._watcher.start()
+
         self._init_monitor_thread()
         self._init_worker_threads()
         self.setup_volumes()
@@ -167,6 +179,8 @@ class KubernetesJobRunner(AsynchronousJobRunner):
             k8s_job_prefix,
             self.__get_k8s_job_spec(ajs)
         )
+        # label the job like its pods, so it is seen by the job watchers
+        k8s_job_obj["metadata"]["labels"] = dict(k8s_job_obj["spec"]["template"]["metadata"]["labels"])
 
         job = Job(self._pykube_api, k8s_job_obj)
         try:
@@ -284,6 +298,14 @@ class KubernetesJobRunner(AsynchronousJobRunner):
         instance_id = self._galaxy_instance_id or ''
         return produce_k8s_job_prefix(app_prefix='gxy', instance_id=instance_id)
 
+    def __get_watch_selector(self):
+        """Label selector matching the k8s jobs and pods submitted by this handler."""
+        return ",".join([
+            "app.kubernetes.io/managed-by=galaxy",
+            f"app.kubernetes.io/instance={self.__produce_k8s_job_prefix()}",
+            f"app.galaxyproject.org/handler={self.__force_label_conformity(self.app.config.server_name)}",
+        ])
+
     def __get_k8s_job_spec(self, ajs):
         """Creates the k8s Job spec. For a Job spec, the only requirement is to have a .spec.template.
         If the job hangs around unlimited it will be ended after k8s wall time limit, which sets activeDeadlineSeconds"""
@@ -634,12 +656,60 @@ class KubernetesJobRunner(AsynchronousJobRunner):
                 new_params[each_param] = job_destination.params[each_param]
         return new_params
 
+    def check_watched_items(self):
+        """
+        With ``k8s_use_watch`` only check the jobs whose k8s job or pods changed since their
+        last check, reading them from the watcher's cache. All watched jobs are polled from the
+        k8s API every ``k8s_watch_reconcile_interval`` seconds and while the watcher is not synced.
+        """
+        if self._watcher is None:
+            return super().check_watched_items()
+        now = time.time()
+        reconcile = now - self._last_reconcile >= self.runner_params['k8s_watch_reconcile_interval']
+        if reconcile:
+            self._last_reconcile = now
+        self._use_watch_cache = not reconcile and self._watcher.synced
+        new_watched = []
+        for async_job_state in self.watched:
+            version = self._watcher.version(async_job_state.job_id)
+            if (self._use_watch_cache and version == getattr(async_job_state, 'k8s_watch_version', None)
+                    and not self.__waiting_for_unschedulable_walltime(async_job_state)):
+                new_watched.append(async_job_state)
+                continue
+            async_job_state.k8s_watch_version = version
+            new_async_job_state = self.check_watched_item(async_job_state)
+            if new_async_job_state:
+                new_watched.append(new_async_job_state)
+            else:
+                self._watcher.forget(async_job_state.job_id)
+        self.watched = new_watched
+
+    def __waiting_for_unschedulable_walltime(self, job_state):
+        # there is no event when the unschedulable walltime limit is reached
+        return not job_state.running and bool(self.runner_params.get('k8s_unschedulable_walltime_limit'))
+
+    def __find_k8s_jobs(self, job_state):
+        """Return the k8s job object dicts named after ``job_state``, from the watcher's cache if possible."""
+        if self._use_watch_cache:
+            obj = self._watcher.job(job_state.job_id)
+            if obj is not None:
+                return [obj]
+        jobs = find_job_object_by_name(self._pykube_api, job_state.job_id, self.runner_params['k8s_namespace'])
+        return jobs.response['items']
+
+    def __find_k8s_pods(self, job_state):
+        """Return the pod object dicts of the k8s job of ``job_state``, from the watcher's cache if possible."""
+        if self._use_watch_cache and self._watcher.job(job_state.job_id) is not None:
+            return self._watcher.pods(job_state.job_id)
+        pods = find_pod_object_by_name(self._pykube_api, job_state.job_id, self.runner_params['k8s_namespace'])
+        return pods.response['items']
+
     def check_watched_item(self, job_state):
         """Checks the state of a job already submitted on k8s. Job state is an AsynchronousJobState"""
-        jobs = find_job_object_by_name(self._pykube_api, job_state.job_id, self.runner_params['k8s_namespace'])
+        jobs = self.__find_k8s_jobs(job_state)
 
-        if len(jobs.response['items']) == 1:
-            job = Job(self._pykube_api, jobs.response['items'][0])
+        if len(jobs) == 1:
+            job = Job(self._pykube_api, jobs[0])
             job_destination = job_state.job_wrapper.job_destination
             succeeded = 0
             active = 0
@@ -699,7 +769,7 @@ class KubernetesJobRunner(AsynchronousJobRunner):
             else:
                 return self._handle_job_failure(job, job_state)
 
-        elif len(jobs.response['items']) == 0:
+        elif len(jobs) == 0:
             if job_state.job_wrapper.get_job().state == model.Job.states.DELETED:
                 # Job has been deleted via stop_job and job has been deleted,
                 # cleanup and remove from watched_jobs by returning `None`
@@ -787,11 +857,11 @@ class KubernetesJobRunner(AsynchronousJobRunner):
         for being out of memory (pod status OOMKilled). If that is the case
         marks the job for resubmission (resubmit logic is part of destinations).
         """
-        pods = find_pod_object_by_name(self._pykube_api, job_state.job_id, self.runner_params['k8s_namespace'])
-        if not pods.response['items']:
+        pods = self.__find_k8s_pods(job_state)
+        if not pods:
             return False
 
-        pod = self._get_pod_for_job(job_state)
+        pod = Pod(self._pykube_api, pods[0]) if self._use_watch_cache else self._get_pod_for_job(job_state)
         if pod and pod.obj['status']['phase'] == "Failed" and \
                 pod.obj['status']['containerStatuses'][0]['state']['terminated']['reason'] == "OOMKilled":
             return True
@@ -802,11 +872,11 @@ class KubernetesJobRunner(AsynchronousJobRunner):
         """
         checks the state of the pod to see if it is unschedulable.
         """
-        pods = find_pod_object_by_name(self._pykube_api, job_state.job_id, self.runner_params['k8s_namespace'])
-        if not pods.response['items']:
+        pods = self.__find_k8s_pods(job_state)
+        if not pods:
             return False
 
-        pod = Pod(self._pykube_api, pods.response['items'][0])
+        pod = Pod(self._pykube_api, pods[0])
         return is_pod_unschedulable(self._pykube_api, pod, self.runner_params['k8s_namespace'])
 
     def __cleanup_k8s_interactivetools(self, job_wrapper, k8s_job):
@@ -842,6 +912,11 @@ class KubernetesJobRunner(AsynchronousJobRunner):
             log.exception("({}/{}) User killed running job, but error encountered during termination: {}".format(
                 job.id, job.get_job_runner_external_id(), e))
 
+    def shutdown(self):
+        if self._watcher is not None:
+            self._watcher.stop()
+        super().shutdown()
+
     def recover(self, job, job_wrapper):
         """Recovers jobs stuck in the queued/running state when Galaxy started"""
         job_id = job.get_job_runner_external_id()
@@ -18,6 +18,14 @@ from . import (
     BaseJobRunner,
     JobState
 )
+from .util.local_resources import (
+    JobCgroup,
+    ProcessWaiter,
+    ResourcePool,
+    ResourcePoolClosed,
+    total_memory_mb,
+    total_slots,
+)
 from .util.process_groups import (
     check_pg,
     kill_pg
@@ -27,20 +35,44 @@ log = logging.getLogger(__name__)
 
 __all__ = ('LocalJobRunner', )
 
-DEFAULT_POOL_SLEEP_TIME = 1
+# Seconds between checks of the walltime and output size limits of a job
+LIMIT_CHECK_INTERVAL = 20
 # TODO: Set to false and just get rid of this option. It would simplify this
 # class nicely. -John
 DEFAULT_EMBED_METADATA_IN_JOB = True
 
 
+def _slots_param(value):
+    return total_slots() if value == "auto" else int(value)
+
+
+def _memory_mb_param(value):
+    return total_memory_mb() if value == "auto" else int(value)
+
+
 class LocalJobRunner(BaseJobRunner):
     """
     Job runner backed by a finite pool of worker threads. FIFO scheduling
+
+    If the ``slots`` and/or ``memory_mb`` runner parameters are set (``auto`` for the
+    cores and physical memory of the machine) jobs are only started once the slots
+    (``local_slots``) and memory (``local_memory_mb``) of their destination are free.
+    If ``cgroup_parent`` is set to a cgroup v2 directory the Galaxy user may manage,
+    each job runs in its own cgroup limited to these resources, whose peak memory and
+    CPU time are recorded as cgroup job metrics.
     """
     runner_name = "LocalRunner"
 
-    def __init__(self, app, nworkers):
+    def __init__(self, app, nworkers, **kwargs):
         """Start the job runner """
+        runner_param_specs = dict(
+            slots=dict(map=_slots_param, valid=lambda x: x == "auto" or int(x) >= 0, default=0),
+            memory_mb=dict(map=_memory_mb_param, valid=lambda x: x == "auto" or int(x) >= 0, default=0),
+            cgroup_parent=dict(map=str, default=''),
+        )
+        if 'runner_param_specs' not in kwargs:
+            kwargs['runner_param_specs'] = {}
+        kwargs['runner_param_specs'].update(runner_param_specs)
 
         # create a local copy of os.environ to use as env for subprocess.Popen
         self._environ = os.environ.copy()
@@ -51,21 +83,35 @@ class LocalJobRunner(BaseJobRunner):
         if not ('TMPDIR' in self._environ or 'TEMP' in self._environ or 'TMP' in self._environ):
             self._environ['TEMP'] = os.path.abspath(tempfile.gettempdir())
 
-        super().__init__(app, nworkers)
+        super().__init__(app, nworkers, **kwargs)
+        self._resource_pool = ResourcePool(slots=self.runner_params.slots, memory_mb=self.runner_params.memory_mb)
+        if self._resource_pool.enabled:
+            log.debug("Limiting local jobs to %s slots and %s MB of memory", self._resource_pool.slots or "unlimited", self._resource_pool.memory_mb or "unlimited")
         self._init_worker_threads()
 
+    def _job_slots(self, job_wrapper):
+        # slots would be cleaner name, but don't want deployers to see examples and think it
+        # is going to work with other job runners.
+        slots = job_wrapper.job_destination.params.get("local_slots", None) or os.environ.get("GALAXY_SLOTS", None)
+        return int(slots) if slots else None
+
+    def _job_memory_mb(self, job_wrapper):
+        memory_mb = job_wrapper.job_destination.params.get("local_memory_mb", None)
+        return int(memory_mb) if memory_mb else None
+
     def __command_line(self, job_wrapper):
         """
         """
         command_line = job_wrapper.runner_command_line
 
-        # slots would be cleaner name, but don't want deployers to see examples and think it
-        # is going to work with other job runners.
-        slots = job_wrapper.job_destination.params.get("local_slots", None) or os.environ.get("GALAXY_SLOTS", None)
+        slots = self._job_slots(job_wrapper)
         if slots:
-            slots_statement = 'GALAXY_SLOTS="%d"; export GALAXY_SLOTS; GALAXY_SLOTS_CONFIGURED="1"; export GALAXY_SLOTS_CONFIGURED;' % (int(slots))
+            slots_statement = 'GALAXY_SLOTS="%d"; export GALAXY_SLOTS; GALAXY_SLOTS_CONFIGURED="1"; export GALAXY_SLOTS_CONFIGURED;' % slots
         else:
             slots_statement = 'GALAXY_SLOTS="1"; export GALAXY_SLOTS;'
+        memory_mb = self._job_memory_mb(job_wrapper)
+        if memory_mb:
+            slots_statement += ' GALAXY_MEMORY_MB="%d"; export GALAXY_MEMORY_MB;' % memory_mb
 
         job_id = job_wrapper.get_id_tag()
         job_file = JobState.default_job_file(job_wrapper.working_directory, job_id)
@@ -90,42 +136,60 @@ class LocalJobRunner(BaseJobRunner):
         # command line has been added to the wrapper by prepare_job()
         job_file, exit_code_path = self.__command_line(job_wrapper)
         job_id = job_wrapper.get_id_tag()
+        slots = self._job_slots(job_wrapper) or 1
+        memory_mb = self._job_memory_mb(job_wrapper) or 0
 
         try:
             stdout_file = tempfile.NamedTemporaryFile(mode='wb+', suffix='_stdout', dir=job_wrapper.working_directory)
             stderr_file = tempfile.NamedTemporaryFile(mode='wb+', suffix='_stderr', dir=job_wrapper.working_directory)
-            log.debug(f'({job_id}) executing job script: {job_file}')
-            # The preexec_fn argument of Popen() is used to call os.setpgrp() in
-            # the child process just before the child is executed. This will set
-            # the PGID of the child process to its PID (i.e. ensures that it is
-            # the root of its own process group instead of Galaxy's one).
-            proc = subprocess.Popen(args=[job_file],
-                                    cwd=job_wrapper.working_directory,
-                                    stdout=stdout_file,
-                                    stderr=stderr_file,
-                                    env=self._environ,
-                                    preexec_fn=os.setpgrp)
-
-            proc.terminated_by_shutdown = False
-            with self._proc_lock:
-                self._procs.append(proc)
-
             try:
-                job = job_wrapper.get_job()
-                # Flush job with change_state.
-                job_wrapper.set_external_id(proc.pid, job=job, flush=False)
-                job_wrapper.change_state(model.Job.states.RUNNING, job=job)
-                self._handle_container(job_wrapper, proc)
-
-                terminated = self.__poll_if_needed(proc, job_wrapper, job_id)
-                proc.wait()  # reap
-                if terminated:
-                    return
-                elif check_pg(proc.pid):
-                    kill_pg(proc.pid)
-            finally:
+                resources = self._resource_pool.acquire(slots, memory_mb)
+            except ResourcePoolClosed:
+                self._fail_job_local(job_wrapper, "job terminated by Galaxy shutdown")
+                return
+            try:
+                cgroup = self.__create_cgroup(job_wrapper, *resources)
+                log.debug(f'({job_id}) executing job script: {job_file}')
+                # The preexec_fn argument of Popen() is used to call os.setpgrp() in
+                # the child process just before the child is executed. This will set
+                # the PGID of the child process to its PID (i.e. ensures that it is
+                # the root of its own process group instead of Galaxy's one).
+
+                def preexec_fn():
+                    os.setpgrp()
+                    if cgroup:
+                        cgroup.add_current_process()
+
+                proc = subprocess.Popen(args=[job_file],
+                                        cwd=job_wrapper.working_directory,
+                                        stdout=stdout_file,
+                                        stderr=stderr_file,
+                                        env=self._environ,
+                                        preexec_fn=preexec_fn)
+
+                proc.terminated_by_shutdown = False
                 with self._proc_lock:
-                    self._procs.remove(proc)
+                    self._procs.append(proc)
+
+                try:
+                    job = job_wrapper.get_job()
+                    # Flush job with change_state.
+                    job_wrapper.set_external_id(proc.pid, job=job, flush=False)
+                    job_wrapper.change_state(model.Job.states.RUNNING, job=job)
+                    self._handle_container(job_wrapper, proc)
+
+                    terminated = self.__wait_for_exit(proc, job_wrapper, job_id)
+                    if not terminated and check_pg(proc.pid):
+                        kill_pg(proc.pid)
+                finally:
+                    with self._proc_lock:
+                        self._procs.remove(proc)
+                    if cgroup:
+                        self.__collect_cgroup_usage(job_wrapper, cgroup)
+            finally:
+                self._resource_pool.release(*resources)
+            if terminated:
+                return
 
             if proc.terminated_by_shutdown:
                 self._fail_job_local(job_wrapper, "job terminated by Galaxy shutdown")
@@ -176,6 +240,7 @@ class LocalJobRunner(BaseJobRunner):
         job_wrapper.change_state(model.Job.states.ERROR, info="This job was killed when Galaxy was restarted.  Please retry the job.")
 
     def shutdown(self):
+        self._resource_pool.close()
         super().shutdown()
         with self._proc_lock:
             for proc in self._procs:
@@ -212,23 +277,48 @@ class LocalJobRunner(BaseJobRunner):
 
             sleep(0.5)
 
-    def __poll_if_needed(self, proc, job_wrapper, job_id):
-        # Only poll if needed (i.e. job limits are set)
-        if not job_wrapper.has_limits():
-            return
-
-        job_start = datetime.datetime.now()
-        i = 0
-        pgid = proc.pid
-        # Iterate until the process exits, periodically checking its limits
-        while check_pg(pgid):
-            i += 1
-            if (i % 20) == 0:
+    def __wait_for_exit(self, proc, job_wrapper, job_id):
+        """
+        Wait for the job script to exit and reap it, return True if it was terminated for
+        exceeding the job's limits.
+        """
+        waiter = ProcessWaiter(proc)
+        try:
+            # Only wake up periodically if needed (i.e. job limits are set)
+            if not job_wrapper.has_limits():
+                waiter.wait()
+                return False
+
+            job_start = datetime.datetime.now()
+            pgid = proc.pid
+            while not waiter.wait(LIMIT_CHECK_INTERVAL):
                 limit_state = job_wrapper.check_limits(runtime=datetime.datetime.now() - job_start)
                 if limit_state is not None:
                     job_wrapper.fail(limit_state[1])
                     log.debug('(%s) Terminating process group %d', job_id, pgid)
                     kill_pg(pgid)
+                    proc.wait()  # reap
                     return True
-            else:
-                sleep(DEFAULT_POOL_SLEEP_TIME)
+            return False
+        finally:
+            waiter.close()
+
+    def __create_cgroup(self, job_wrapper, slots, memory_mb):
+        cgroup_parent = self.runner_params.cgroup_parent
+        if not cgroup_parent:
+            return None
+        try:
+            return JobCgroup(cgroup_parent, f"galaxy_job_{job_wrapper.get_id_tag()}", slots=slots, memory_mb=memory_mb)
+        except OSError as e:
+            log.warning("(%s) Failed to create job cgroup below %s, running job without it: %s", job_wrapper.get_id_tag(), cgroup_parent, e)
+            return None
+
+    def __collect_cgroup_usage(self, job_wrapper, cgroup):
+        try:
+            job = job_wrapper.get_job()
+            for metric_name, metric_value in cgroup.usage().items():
+                job.add_metric("cgroup", metric_name, metric_value)
+        except Exception:
+            log.exception("(%s) Failed to collect job cgroup usage", job_wrapper.get_id_tag())
+        finally:
+            cgroup.remove()
@@ -1,6 +1,7 @@
 import errno
 import logging
 import os
+import threading
 from time import sleep
 
 from galaxy import model
@@ -11,6 +12,8 @@ log = logging.getLogger(__name__)
 
 __all__ = ('TaskedJobRunner', )
 
+TASK_STATE_CHECK_INTERVAL = 10
+
 
 class TaskedJobRunner(BaseJobRunner):
     """
@@ -56,25 +59,27 @@ class TaskedJobRunner(BaseJobRunner):
                 job_wrapper.change_state(model.Job.states.ERROR)
                 job_wrapper.fail(f"Job Splitting Failed, no match for '{parallelism}'")
                 return
-            tasks = splitter.do_split(job_wrapper)
-            # Not an option for now.  Task objects don't *do* anything
-            # useful yet, but we'll want them tracked outside this thread
-            # to do anything.
-            # if track_tasks_in_database:
             task_wrappers = []
-            for task in tasks:
+            # Set whenever the state of one of the tasks may have changed.
+            tasks_changed = threading.Event()
+
+            def queue_task(task):
+                # Tasks are queued as soon as the splitter has written their part of the inputs.
                 self.sa_session.add(task)
-            self.sa_session.flush()
-            # Must flush prior to the creation and queueing of task wrappers.
-            for task in tasks:
+                self.sa_session.flush()
                 tw = TaskWrapper(task, job_wrapper.queue)
+                tw.state_listener = tasks_changed.set
                 task_wrappers.append(tw)
                 self.app.job_manager.job_handler.dispatcher.put(tw)
-            tasks_complete = False
-            count_complete = 0
-            sleep_time = 1
-            # sleep/loop until no more progress can be made. That is when
-            # all tasks are one of { OK, ERROR, DELETED }. If a task
+
+            try:
+                splitter.do_split(job_wrapper, task_callback=queue_task)
+            except Exception:
+                if task_wrappers:
+                    self._cancel_job(job_wrapper, task_wrappers)
+                raise
+            # wait until no more progress can be made. That is when
+            # all tasks are one of { OK, ERROR, DELETED }.
             completed_states = [model.Task.states.OK,
                                 model.Task.states.ERROR,
                                 model.Task.states.DELETED]
@@ -89,27 +94,34 @@ class TaskedJobRunner(BaseJobRunner):
             # ignore tasks that are not in the QUEUED state.
             # Deleted tasks are not included right now.
             #
-            while tasks_complete is False:
-                count_complete = 0
-                tasks_complete = True
-                for tw in task_wrappers:
+            # Task wrappers notify state changes, the states are still checked
+            # every TASK_STATE_CHECK_INTERVAL seconds in case a change is not
+            # notified (e.g. tasks stopped by another process).
+            exit_codes = {}
+            failed = False
+            pending = list(task_wrappers)
+            while pending:
+                tasks_changed.clear()
+                still_pending = []
+                for tw in pending:
                     task_state = tw.get_state()
                     if (model.Task.states.ERROR == task_state):
                         job_exit_code = tw.get_exit_code()
                         log.debug("Canceling job %d: Task %s returned an error"
                                   % (tw.job_id, tw.task_id))
                         self._cancel_job(job_wrapper, task_wrappers)
-                        tasks_complete = True
+                        failed = True
+                        still_pending = []
                         break
                     elif task_state not in completed_states:
-                        tasks_complete = False
+                        still_pending.append(tw)
                     else:
-                        job_exit_code = tw.get_exit_code()
-                        count_complete = count_complete + 1
-                if tasks_complete is False:
-                    sleep(sleep_time)
-                    if sleep_time < 8:
-                        sleep_time *= 2
+                        exit_codes[tw.task_id] = tw.get_exit_code()
+                pending = still_pending
+                if pending:
+                    tasks_changed.wait(TASK_STATE_CHECK_INTERVAL)
+            if not failed and task_wrappers:
+                job_exit_code = exit_codes[task_wrappers[-1].task_id]
             job_wrapper.reclaim_ownership()      # if running as the actual user, change ownership before merging.
             log.debug(f'execution finished - beginning merge: {command_line}')
             stdout, stderr = splitter.do_merge(job_wrapper, task_wrappers)
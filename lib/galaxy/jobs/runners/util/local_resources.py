@@ -0,0 +1,189 @@
+"""
+Resource accounting and process supervision for jobs run on the local machine.
+"""
+import errno
+import logging
+import os
+import select
+import subprocess
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+log = logging.getLogger(__name__)
+
+CGROUP_CPU_PERIOD = 100000
+
+
+def total_slots():
+    return os.cpu_count() or 1
+
+
+def total_memory_mb():
+    return int(os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') / 1024 ** 2)
+
+
+class ResourcePoolClosed(Exception):
+    """Raised to jobs waiting for resources when the pool is closed."""
+
+
+class ResourcePool:
+    """
+    Slots and memory (in MB) of the local machine shared by the jobs of a runner.
+
+    Jobs are granted their resources first come first served, a job waits until every job
+    queued before it has been granted its own resources, so large jobs are not starved by
+    a stream of small ones. A limit of 0 is not enforced, a job asking for more than a
+    limit is granted the whole of it.
+    """
+
+    def __init__(self, slots=0, memory_mb=0):
+        self.slots = slots
+        self.memory_mb = memory_mb
+        self.used_slots = 0
+        self.used_memory_mb = 0
+        self._waiting = deque()
+        self._closed = False
+        self._condition = threading.Condition()
+
+    @property
+    def enabled(self):
+        return bool(self.slots or self.memory_mb)
+
+    @contextmanager
+    def reserve(self, slots, memory_mb):
+        """Hold ``slots`` and ``memory_mb`` for the duration of the context, blocking until available."""
+        granted = self.acquire(slots, memory_mb)
+        try:
+            yield granted
+        finally:
+            self.release(*granted)
+
+    def acquire(self, slots, memory_mb):
+        slots = min(slots, self.slots) if self.slots else slots
+        memory_mb = min(memory_mb, self.memory_mb) if self.memory_mb else memory_mb
+        ticket = object()
+        with self._condition:
+            self._waiting.append(ticket)
+            try:
+                while not self._closed and not (self._waiting[0] is ticket and self._fits(slots, memory_mb)):
+                    self._condition.wait()
+                if self._closed:
+                    raise ResourcePoolClosed()
+                self.used_slots += slots
+                self.used_memory_mb += memory_mb
+            finally:
+                self._waiting.remove(ticket)
+                self._condition.notify_all()
+        return slots, memory_mb
+
+    def release(self, slots, memory_mb):
+        with self._condition:
+            self.used_slots -= slots
+            self.used_memory_mb -= memory_mb
+            self._condition.notify_all()
+
+    def close(self):
+        """Wake up and fail all jobs waiting for resources."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def _fits(self, slots, memory_mb):
+        return ((not self.slots or self.used_slots + slots <= self.slots)
+                and (not self.memory_mb or self.used_memory_mb + memory_mb <= self.memory_mb))
+
+
+class ProcessWaiter:
+    """
+    Wait for a child process to exit without sleep polling, using a pidfd where the
+    platform provides them (Linux 5.3+, Python 3.9+) and ``Popen.wait`` otherwise.
+    """
+
+    def __init__(self, proc):
+        self.proc = proc
+        self._pidfd = None
+        pidfd_open = getattr(os, 'pidfd_open', None)
+        if pidfd_open is not None:
+            try:
+                self._pidfd = pidfd_open(proc.pid)
+            except OSError as e:
+                log.debug("Falling back to waitpid for process %d: %s", proc.pid, e)
+
+    def wait(self, timeout=None):
+        """Return True if the process exited within ``timeout`` seconds, reaping it."""
+        if self._pidfd is not None:
+            try:
+                readable, _, _ = select.select([self._pidfd], [], [], timeout)
+            except OSError as e:
+                if e.errno != errno.EINTR:
+                    raise
+                return False
+            if not readable:
+                return False
+            self.proc.wait()
+            return True
+        try:
+            self.proc.wait(timeout=timeout)
+            return True
+        except subprocess.TimeoutExpired:
+            return False
+
+    def close(self):
+        if self._pidfd is not None:
+            os.close(self._pidfd)
+            self._pidfd = None
+
+
+class JobCgroup:
+    """
+    A cgroup v2 group isolating a local job, created below ``parent`` (a cgroup the Galaxy
+    user may manage, e.g. one delegated by systemd) and limited to the job's slots and memory.
+    """
+
+    def __init__(self, parent, name, slots=None, memory_mb=None):
+        self.path = os.path.join(parent, name)
+        os.makedirs(self.path, exist_ok=True)
+        if slots:
+            self._write("cpu.max", f"{int(slots) * CGROUP_CPU_PERIOD} {CGROUP_CPU_PERIOD}")
+        if memory_mb:
+            self._write("memory.max", str(int(memory_mb) * 1024 ** 2))
+
+    def add_current_process(self):
+        """Move the calling process in the cgroup, called in the job process before it executes the job script."""
+        self._write("cgroup.procs", str(os.getpid()))
+
+    def usage(self):
+        """Return the peak memory use (in bytes) and CPU time (in nanoseconds) of the job as cgroup job metrics."""
+        usage = {}
+        peak = self._read("memory.peak")
+        if peak is not None:
+            usage["memory.max_usage_in_bytes"] = int(peak)
+        cpu_stat = self._read("cpu.stat")
+        for line in (cpu_stat or "").splitlines():
+            key, _, value = line.partition(" ")
+            if key == "usage_usec":
+                usage["cpuacct.usage"] = int(value) * 1000
+        memory_events = self._read("memory.events")
+        for line in (memory_events or "").splitlines():
+            key, _, value = line.partition(" ")
+            if key == "oom_kill":
+                usage["memory.oom_control.under_oom"] = 1 if int(value) else 0
+        return usage
+
+    def remove(self):
+        try:
+            os.rmdir(self.path)
+        except OSError as e:
+            log.warning("Failed to remove job cgroup %s: %s", self.path, e)
+
+    def _write(self, name, value):
+        with open(os.path.join(self.path, name), "w") as fh:
+            fh.write(value)
+
+    def _read(self, name):
+        try:
+            with open(os.path.join(self.path, name)) as fh:
+                return fh.read().strip()
+        except OSError:
+            return None
@@ -2,6 +2,7 @@
 import logging
 import os
 import re
+import threading
 
 try:
     from pykube.config import KubeConfig
@@ -30,6 +31,7 @@ DEFAULT_JOB_API_VERSION = "batch/v1"
 DEFAULT_SERVICE_API_VERSION = "v1"
 DEFAULT_INGRESS_API_VERSION = "extensions/v1beta1"
 DEFAULT_NAMESPACE = "default"
+WATCH_RETRY_INTERVAL = 5
 INSTANCE_ID_INVALID_MESSAGE = ("Galaxy instance [%s] is either too long "
                                "(>20 characters) or it includes non DNS "
                                "acceptable characters, ignoring it.")
@@ -205,6 +207,111 @@ def galaxy_instance_id(params):
     return None
 
 
+class JobWatcher:
+    """
+    Informer style cache of the Jobs and Pods matching a label selector in a namespace.
+
+    One thread per kind lists the matching objects and then follows a watch stream starting
+    at the list's resourceVersion, relisting whenever the stream ends or fails. Every change
+    to a Job or to one of its Pods bumps the version of the Job, so consumers can tell which
+    Jobs need to be looked at again without a request per Job.
+    """
+
+    def __init__(self, pykube_api, namespace, selector, retry_interval=WATCH_RETRY_INTERVAL):
+        self.pykube_api = pykube_api
+        self.namespace = namespace
+        self.selector = selector
+        self.retry_interval = retry_interval
+        self._objects = {Job: {}, Pod: {}}
+        self._synced = {Job: False, Pod: False}
+        self._versions = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def start(self):
+        for kind in (Job, Pod):
+            thread = threading.Thread(target=self._follow, args=(kind,),
+                                      name=f"k8s-{kind.kind.lower()}-watcher-{self.namespace}")
+            thread.daemon = True
+            thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def synced(self):
+        """True once both kinds have been listed and their watch streams are followed."""
+        with self._lock:
+            return all(self._synced.values())
+
+    def version(self, job_name):
+        with self._lock:
+            return self._versions.get(job_name, 0)
+
+    def forget(self, job_name):
+        """Drop the version of a Job that is no longer tracked."""
+        with self._lock:
+            self._versions.pop(job_name, None)
+
+    def job(self, job_name):
+        """Return the cached Job object dict named ``job_name`` or None."""
+        with self._lock:
+            return self._objects[Job].get(job_name)
+
+    def pods(self, job_name):
+        """Return the cached Pod object dicts of the Job named ``job_name``."""
+        with self._lock:
+            return [obj for obj in self._objects[Pod].values() if self._job_name(Pod, obj) == job_name]
+
+    def _follow(self, kind):
+        while not self._stop.is_set():
+            try:
+                query = kind.objects(self.pykube_api).filter(namespace=self.namespace, selector=self.selector)
+                self._replace(kind, query.response["items"])
+                for event in query.watch(since=query.response["metadata"]["resourceVersion"]):
+                    if self._stop.is_set():
+                        return
+                    if event.type == "ERROR":
+                        # Most likely the resourceVersion expired (410 Gone), relist.
+                        log.debug("Kubernetes %s watch returned an error, relisting: %s", kind.kind, event.object.obj)
+                        break
+                    self._apply(kind, event.type, event.object.obj)
+            except Exception:
+                log.exception("Watching Kubernetes %s objects in namespace %s failed, retrying", kind.kind, self.namespace)
+                with self._lock:
+                    self._synced[kind] = False
+                self._stop.wait(self.retry_interval)
+
+    def _replace(self, kind, items):
+        objects = {obj["metadata"]["name"]: obj for obj in items}
+        with self._lock:
+            previous = self._objects[kind]
+            job_names = {self._job_name(kind, obj) for obj in list(previous.values()) + list(objects.values())}
+            self._objects[kind] = objects
+            self._synced[kind] = True
+            for job_name in job_names:
+                self._bump(job_name)
+
+    def _apply(self, kind, event_type, obj):
+        obj_name = obj["metadata"]["name"]
+        with self._lock:
+            if event_type == "DELETED":
+                self._objects[kind].pop(obj_name, None)
+            else:
+                self._objects[kind][obj_name] = obj
+            self._bump(self._job_name(kind, obj))
+
+    def _bump(self, job_name):
+        if job_name:
+            self._versions[job_name] = self._versions.get(job_name, 0) + 1
+
+    @staticmethod
+    def _job_name(kind, obj):
+        if kind is Job:
+            return obj["metadata"]["name"]
+        return (obj["metadata"].get("labels") or {}).get("job-name")
+
+
 __all__ = (
     "DEFAULT_JOB_API_VERSION",
     "DEFAULT_SERVICE_API_VERSION",
@@ -218,6 +325,7 @@ __all__ = (
     "HTTPError",
     "is_pod_unschedulable",
     "Job",
+    "JobWatcher",
     "Service",
     "Ingress",
     "job_object_dict",
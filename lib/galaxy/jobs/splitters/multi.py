@@ -1,6 +1,7 @@
 import logging
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 
 from galaxy import model, util
 from galaxy.util.getargspec import getfullargspec
@@ -8,8 +9,18 @@ from galaxy.util.getargspec import getfullargspec
 
 log = logging.getLogger(__name__)
 
+MAX_MERGE_THREADS = 8
 
-def do_split(job_wrapper):
+
+def do_split(job_wrapper, task_callback=None):
+    """
+    Split the inputs of the job into task directories and return a task per directory.
+
+    Datatypes write their parts one after the other, a part is complete once the next
+    directory is requested. If ``task_callback`` is set, it is called with each task as
+    soon as its part is complete, so that tasks can start while the input is still being
+    split.
+    """
     parent_job = job_wrapper.get_job()
     working_directory = os.path.abspath(job_wrapper.working_directory)
 
@@ -33,12 +44,26 @@ def do_split(job_wrapper):
     if len(illegal_inputs) > 0:
         raise Exception(f"Inputs have conflicting parallelism attributes: {str(illegal_inputs)}")
 
-    subdir_index = [0]  # use a list to get around Python 2.x lame closure support
     task_dirs = []
+    tasks = []
+    prepare_files = f"'{os.path.join(util.galaxy_directory(), 'extract_dataset_parts.sh')}' %s"
+
+    def complete_task_dir(dir):
+        # add the shared inputs via soft links
+        for input in parent_job.input_datasets:
+            if input and input.name in shared_inputs:
+                names = job_wrapper.get_input_dataset_fnames(input.dataset)
+                for file in names:
+                    os.symlink(file, os.path.join(dir, os.path.basename(file)))
+        task = model.Task(parent_job, dir, prepare_files % dir)
+        tasks.append(task)
+        if task_callback is not None:
+            task_callback(task)
 
     def get_new_working_directory_name():
-        dir = os.path.join(working_directory, 'task_%d' % subdir_index[0])
-        subdir_index[0] = subdir_index[0] + 1
+        if task_dirs:
+            complete_task_dir(task_dirs[-1])
+        dir = os.path.join(working_directory, 'task_%d' % len(task_dirs))
         if not os.path.exists(dir):
             os.makedirs(dir)
         task_dirs.append(dir)
@@ -92,19 +117,9 @@ def do_split(job_wrapper):
         log_error = f"The type '{str(input_type)}' does not define a method for splitting files"
         log.error(log_error)
         raise
+    if task_dirs:
+        complete_task_dir(task_dirs[-1])
     log.debug('do_split created %d parts' % len(task_dirs))
-    # next, after we know how many divisions there are, add the shared inputs via soft links
-    for input in parent_job.input_datasets:
-        if input and input.name in shared_inputs:
-            names = job_wrapper.get_input_dataset_fnames(input.dataset)
-            for dir in task_dirs:
-                for file in names:
-                    os.symlink(file, os.path.join(dir, os.path.basename(file)))
-    tasks = []
-    prepare_files = f"'{os.path.join(util.galaxy_directory(), 'extract_dataset_parts.sh')}' %s"
-    for dir in task_dirs:
-        task = model.Task(parent_job, dir, prepare_files % dir)
-        tasks.append(task)
     return tasks
 
 
@@ -138,6 +153,7 @@ def do_merge(job_wrapper, task_wrappers):
         outputs = job_wrapper.get_output_hdas_and_fnames()
         output_paths = job_wrapper.get_output_fnames()
         pickone_done = []
+        merges = []
         task_dirs = [os.path.join(working_directory, x) for x in os.listdir(working_directory) if x.startswith('task_')]
         task_dirs.sort(key=lambda x: int(x.split('task_')[-1]))
         for index, output in enumerate(outputs):
@@ -161,8 +177,7 @@ def do_merge(job_wrapper, task_wrappers):
                     extra_merge_args = {}
                     if "output_dataset" in extra_merge_arg_names:
                         extra_merge_args["output_dataset"] = output_dataset
-                    output_type.merge(output_files, output_file_name, **extra_merge_args)
-                    log.debug(f'merge finished: {output_file_name}')
+                    merges.append((output_type.merge, output_files, output_file_name, extra_merge_args))
                 else:
                     msg = 'nothing to merge for %s (expected %i files)' \
                           % (output_file_name, len(task_dirs))
@@ -178,6 +193,7 @@ def do_merge(job_wrapper, task_wrappers):
                 log_error = f"The output '{output}' does not define a method for implementing parallelism"
                 log.exception(log_error)
                 raise Exception(log_error)
+        _run_merges(merges)
     except Exception as e:
         stdout = 'Error merging files'
         log.exception(stdout)
@@ -193,3 +209,19 @@ def do_merge(job_wrapper, task_wrappers):
         if len(err) > 0:
             stderr += f"\n{tw.working_directory}:\n{err}"
     return (stdout, stderr)
+
+
+def _run_merges(merges):
+    """Merge the task outputs of each output dataset, the outputs concurrently."""
+    def run_merge(merge, output_files, output_file_name, extra_merge_args):
+        merge(output_files, output_file_name, **extra_merge_args)
+        log.debug(f'merge finished: {output_file_name}')
+
+    if len(merges) <= 1:
+        for args in merges:
+            run_merge(*args)
+        return
+    with ThreadPoolExecutor(max_workers=min(len(merges), MAX_MERGE_THREADS)) as executor:
+        futures = [executor.submit(run_merge, *args) for args in merges]
+        for future in futures:
+            future.result()
@@ -5,6 +5,7 @@ rules.
 """
 
 from galaxy import util
+from galaxy.jobs.rule_helper import DEFAULT_DESTINATION_LOAD_MAX_AGE
 
 
 def choose_one(rule_helper, job, destination_ids, hash_by="job"):
@@ -13,9 +14,9 @@ def choose_one(rule_helper, job, destination_ids, hash_by="job"):
     return rule_helper.choose_one(destination_id_list, hash_value=job_hash)
 
 
-def burst(rule_helper, job, from_destination_ids, to_destination_id, num_jobs, job_states=None):
+def burst(rule_helper, job, from_destination_ids, to_destination_id, num_jobs, job_states=None, max_age=DEFAULT_DESTINATION_LOAD_MAX_AGE):
     from_destination_ids = util.listify(from_destination_ids)
-    if rule_helper.should_burst(from_destination_ids, num_jobs=num_jobs, job_states=job_states):
+    if rule_helper.should_burst(from_destination_ids, num_jobs=num_jobs, job_states=job_states, max_age=max_age):
         return to_destination_id
     else:
         return from_destination_ids[0]
@@ -1,11 +1,18 @@
 import logging
 
+from sqlalchemy import (
+    and_,
+    select,
+    update,
+)
 from sqlalchemy.orm import joinedload, Query
+from sqlalchemy.orm.util import identity_key
 
 from galaxy import model
 from galaxy.exceptions import (
     ItemAccessibilityException,
     MessageException,
+    ObjectNotFound,
     RequestParameterInvalidException
 )
 from galaxy.managers.collections_util import validate_input_element_identifiers
@@ -287,6 +294,44 @@ class DatasetCollectionManager:
         changed = self._set_from_dict(trans, dataset_collection_instance, payload)
         return changed
 
+    def bulk_update(self, trans, history, hdca_ids, visible=None, deleted=None, tags=None):
+        """
+        Apply `visible`, `deleted` and `tags` changes to the HDCAs of `history` with ids in
+        `hdca_ids` using set-based statements. Returns the number of HDCAs updated.
+
+        Raises `ObjectNotFound` (and changes nothing) if any id is not one of an HDCA of `history`.
+
+        PRECONDITION: `history` is owned by the current user.
+        """
+        HDCA = model.HistoryDatasetCollectionAssociation
+        session = trans.sa_session
+        session.flush()
+        ids = session.execute(select(HDCA.id).where(and_(HDCA.id.in_(hdca_ids), HDCA.history_id == history.id))).scalars().all()
+        if len(ids) != len(set(hdca_ids)):
+            raise ObjectNotFound("Some of the dataset collections to update were not found in the history.")
+        if not ids:
+            return 0
+        if tags is not None:
+            tags = validation.validate_and_sanitize_basestring_list('tags', tags)
+        values = {}
+        if visible is not None:
+            values['visible'] = visible
+        if deleted is not None:
+            values['deleted'] = deleted
+        if values:
+            session.execute(update(HDCA.table).where(HDCA.table.c.id.in_(ids)).values(**values))
+            # the statement above bypasses the flush hooks maintaining the history's counts
+            model.HistoryContentsAggregate.invalidate(session, [history.id])
+        if tags is not None and trans.user:
+            self.tag_handler.bulk_set_tags_from_list(trans.user, HDCA, ids, tags)
+        # expire any of the updated HDCAs already loaded in this session
+        for id in ids:
+            instance = session.identity_map.get(identity_key(HDCA, id))
+            if instance is not None:
+                session.expire(instance)
+        session.flush()
+        return len(ids)
+
     def copy(self, trans, parent, source, encoded_source_id, copy_elements=False, dataset_instance_attributes=None):
         """
         PRECONDITION: security checks on ability to add to parent occurred
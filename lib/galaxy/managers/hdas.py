@@ -8,6 +8,16 @@ import gettext
 import logging
 import os
 
+from sqlalchemy import (
+    and_,
+    exists,
+    false,
+    select,
+    update,
+)
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.util import identity_key
+
 from galaxy import (
     datatypes,
     exceptions,
@@ -21,6 +31,7 @@ from galaxy.managers import (
     users,
 )
 from galaxy.structured_app import MinimalManagerApp
+from galaxy.util import validation
 
 log = logging.getLogger(__name__)
 
@@ -154,6 +165,100 @@ class HDAManager(datasets.DatasetAssociationManager,
         if quota_amount_reduction:
             user.adjust_total_disk_usage(-quota_amount_reduction)
 
+    def bulk_update(self, history, hda_ids, user=None, visible=None, deleted=None, purged=None, tags=None):
+        """
+        Apply `visible`, `deleted`, `purged` and `tags` changes to the HDAs of `history`
+        with ids in `hda_ids` using set-based statements instead of per-item updates.
+
+        Changes left as `None` are not applied. Returns the number of HDAs updated.
+        Raises `ObjectNotFound` (and changes nothing) if any id is not one of an HDA of `history`.
+        """
+        HDA = self.model_class
+        session = self.session()
+        # make pending changes visible to the statements below
+        session.flush()
+        ids = session.execute(select(HDA.id).where(and_(HDA.id.in_(hda_ids), HDA.history_id == history.id))).scalars().all()
+        if len(ids) != len(set(hda_ids)):
+            raise exceptions.ObjectNotFound("Some of the datasets to update were not found in the history.")
+        if not ids:
+            return 0
+        if tags is not None:
+            tags = validation.validate_and_sanitize_basestring_list('tags', tags)
+        if purged:
+            self.dataset_manager.error_unless_dataset_purge_allowed()
+            deleted = True
+        # only check the uploading state if not deleting, otherwise cannot delete uploading files
+        elif not deleted:
+            uploading = (session.query(HDA.id)
+                         .join(model.Dataset, HDA.dataset_id == model.Dataset.id)
+                         .filter(HDA.id.in_(ids), model.Dataset.state == model.Dataset.states.UPLOAD))
+            if session.query(uploading.exists()).scalar():
+                raise exceptions.Conflict("Please wait until this dataset finishes uploading")
+
+        values = {}
+        if visible is not None:
+            values['visible'] = visible
+        if deleted is not None:
+            values['deleted'] = deleted
+        if values:
+            session.execute(update(HDA.table).where(HDA.table.c.id.in_(ids)).values(**values))
+        if purged:
+            self._bulk_purge(history, ids)
+        if tags is not None and user:
+            self.app.tag_handler.bulk_set_tags_from_list(user, HDA, ids, tags)
+        if values or purged:
+            # the statements above bypass the flush hooks maintaining the history's counts and size
+            model.HistoryContentsAggregate.invalidate(session, [history.id])
+
+        # expire any of the updated HDAs already loaded in this session
+        for id in ids:
+            instance = session.identity_map.get(identity_key(HDA, id))
+            if instance is not None:
+                session.expire(instance)
+        if deleted:
+            # as in stop_creating_job, datasets in a terminal state have no job left to stop
+            running = (session.query(HDA)
+                       .join(model.Dataset, HDA.dataset_id == model.Dataset.id)
+                       .filter(HDA.id.in_(ids), model.Dataset.state.notin_(model.Dataset.terminal_states)))
+            for hda in running:
+                self.stop_creating_job(hda)
+        session.flush()
+        return len(ids)
+
+    def _bulk_purge(self, history, ids):
+        """
+        Mark the not yet purged HDAs in `ids` as purged, reduce the owner's disk usage once
+        by the aggregate quota amount and purge the datasets no longer referenced.
+        """
+        HDA = self.model_class
+        Dataset = model.Dataset
+        session = self.session()
+        ids = session.execute(select(HDA.id).where(and_(HDA.id.in_(ids), HDA.purged == false()))).scalars().all()
+        if not ids:
+            return
+        # datasets of the purged HDAs that are not purged and not in a library
+        other_hda = aliased(HDA)
+        purge_candidates = (session.query(Dataset)
+                            .join(HDA, HDA.dataset_id == Dataset.id)
+                            .filter(HDA.id.in_(ids), Dataset.purged == false())
+                            .filter(~exists().where(model.LibraryDatasetDatasetAssociation.dataset_id == Dataset.id))
+                            .distinct())
+        live_hda = and_(other_hda.dataset_id == Dataset.id, other_hda.purged == false(), other_hda.id.notin_(ids))
+        user = history.user
+        if user:
+            # same semantics as HDA.quota_amount: only count datasets the user has no other instance of
+            users_live_hda = exists().where(and_(
+                live_hda,
+                other_hda.history_id == model.History.id,
+                model.History.user_id == user.id,
+            ))
+            quota_amount_reduction = sum(dataset.get_total_size() for dataset in purge_candidates.filter(~users_live_hda))
+            if quota_amount_reduction:
+                user.adjust_total_disk_usage(-quota_amount_reduction)
+        session.execute(update(HDA.table).where(HDA.table.c.id.in_(ids)).values(deleted=True, purged=True))
+        for dataset in purge_candidates.filter(~exists().where(live_hda)):
+            self.dataset_manager.purge(dataset, flush=False)
+
     # .... states
     def error_if_uploading(self, hda):
         """
@@ -4,9 +4,11 @@ Manager and Serializer for HDCAs.
 HistoryDatasetCollectionAssociations (HDCAs) are datasets contained or created in a
 history.
 """
+import functools
 import logging
 
 from galaxy import model
+from galaxy.exceptions import ObjectNotFound
 from galaxy.managers import (
     annotatable,
     base,
@@ -16,26 +18,55 @@ from galaxy.managers import (
     taggable
 )
 from galaxy.managers.collections_util import get_hda_and_element_identifiers
+from galaxy.objectstore import object_store_caches_files
 from galaxy.structured_app import MinimalManagerApp
-from galaxy.util.zipstream import ZipstreamWrapper
+from galaxy.util.bunch import Bunch
+from galaxy.util.zipstream import (
+    resolve_ahead,
+    ZipstreamWrapper,
+)
 
 
 log = logging.getLogger(__name__)
 
 
-def stream_dataset_collection(dataset_collection_instance, upstream_mod_zip=False, upstream_gzip=False):
+def stream_dataset_collection(dataset_collection_instance, upstream_mod_zip=False, upstream_gzip=False, prefetch_threads=1):
     archive_name = f"{dataset_collection_instance.hid}: {dataset_collection_instance.name}"
     archive = ZipstreamWrapper(
         archive_name=archive_name,
         upstream_mod_zip=upstream_mod_zip,
         upstream_gzip=upstream_gzip,
     )
-    names, hdas = get_hda_and_element_identifiers(dataset_collection_instance)
-    for name, hda in zip(names, hdas):
-        if hda.state != hda.states.OK:
-            continue
-        for file_path, relpath in hda.datatype.to_archive(dataset=hda, name=name):
-            archive.write(file_path, relpath)
+    object_store = model.Dataset.object_store
+    caches_files = object_store_caches_files(object_store)
+
+    def fetch(file_key):
+        # fetches the file into the object store cache
+        if file_key is None:
+            return
+        try:
+            object_store.get_filename(file_key)
+        except ObjectNotFound:
+            pass
+
+    def fetchers(hdas):
+        for hda in hdas:
+            dataset = hda.dataset
+            if not caches_files or dataset.purged or dataset.external_filename:
+                yield functools.partial(fetch, None)
+            else:
+                yield functools.partial(fetch, Bunch(id=dataset.id, uuid=dataset.uuid, object_store_id=dataset.object_store_id))
+
+    def archive_resolvers():
+        names, hdas = get_hda_and_element_identifiers(dataset_collection_instance)
+        elements = [(name, hda) for name, hda in zip(names, hdas) if hda.state == hda.states.OK]
+        # the files of the next elements are fetched from their identifiers on prefetch threads,
+        # datatypes resolve the paths from the HDA (and its metadata), so that stays on the request thread
+        fetched = resolve_ahead(fetchers(hda for _, hda in elements), max_workers=prefetch_threads if caches_files else 1)
+        for _, (name, hda) in zip(fetched, elements):
+            yield functools.partial(list, hda.datatype.to_archive(dataset=hda, name=name))
+
+    archive.write_lazy(archive_resolvers())
     return archive
 
 
@@ -63,19 +94,22 @@ class HDCAManager(
 
         Uses the same kwargs as `contents` above.
         """
-        returned = []
+        return [fn(dataset_instance, *dataset_parents) for dataset_instance, dataset_parents in self.iter_datasets(content, *parents)]
+
+    def iter_datasets(self, content, *parents):
+        """
+        Lazily yield a ``(dataset_instance, parents)`` tuple for each dataset of a given
+        collection, recursing into collections. ``parents`` starts with the innermost DCE.
+        """
         # lots of nesting going on within the nesting
         collection = content.collection if hasattr(content, 'collection') else content
         this_parents = (content, ) + parents
         for element in collection.elements:
             next_parents = (element, ) + this_parents
             if element.is_collection:
-                processed_list = self.map_datasets(element.child_collection, fn, *next_parents)
-                returned.extend(processed_list)
+                yield from self.iter_datasets(element.child_collection, *next_parents)
             else:
-                processed = fn(element.dataset_instance, *next_parents)
-                returned.append(processed)
-        return returned
+                yield element.dataset_instance, next_parents
 
     # TODO: un-stub
 
@@ -450,12 +450,15 @@ class HistorySerializer(sharable.SharableModelSerializer, deletable.PurgableSeri
             state_counts[state] = 0
 
         # TODO:?? collections and coll. states?
-        for hda in history.datasets:
-            if exclude_deleted and hda.deleted:
+        counts, _ = history.contents_aggregate
+        for (content_type, state, deleted, visible), count in counts.items():
+            if content_type != 'dataset' or state not in state_counts:
+                continue
+            if exclude_deleted and deleted:
                 continue
-            if exclude_hidden and not hda.visible:
+            if exclude_hidden and not visible:
                 continue
-            state_counts[hda.state] = state_counts[hda.state] + 1
+            state_counts[state] += count
         return state_counts
 
     # TODO: remove this (is state used/useful?)
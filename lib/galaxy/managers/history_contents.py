@@ -3,15 +3,15 @@ Heterogenous lists/contents are difficult to query properly since unions are
 not easily made.
 """
 import logging
+from collections import defaultdict
+from typing import Dict
 
 from sqlalchemy import (
     asc,
     desc,
-    false,
     func,
     literal,
     sql,
-    true
 )
 from sqlalchemy.orm import (
     eagerload,
@@ -113,6 +113,15 @@ class HistoryContentsManager(containers.ContainerManagerMixin, base.SortableMana
         return self.contents_query(container,
             filters=filters, limit=limit, offset=offset, order_by=order_by, **kwargs).count()
 
+    def contents_extrema(self, container, column_name='hid', filters=None, **kwargs):
+        """
+        Returns the minimum and maximum of `column_name` over both/all types of contents,
+        based on the given filters, with a single aggregate query.
+        """
+        contents = self._union_of_contents_query(container, filters=filters, order_by=(), **kwargs).subquery()
+        column = contents.c[column_name]
+        return tuple(self._session().query(func.min(column), func.max(column)).one())
+
     def contents_query(self, container, filters=None, limit=None, offset=None, order_by=None, **kwargs):
         """
         Returns the contents union query for subqueries, etc.
@@ -144,16 +153,12 @@ class HistoryContentsManager(containers.ContainerManagerMixin, base.SortableMana
 
         Note: does not include deleted/hidden contents.
         """
-        filters = [
-            base.ModelFilterParser.parsed_filter("orm", sql.column('deleted') == false()),
-            base.ModelFilterParser.parsed_filter("orm", sql.column('visible') == true())
-        ]
-        contents_subquery = self._union_of_contents_query(history, filters=filters).subquery()
-        statement = (sql.select([sql.column('state'), func.count('*')])
-            .select_from(contents_subquery)
-            .group_by(sql.column('state')))
-        counts = self.app.model.context.execute(statement).fetchall()
-        return dict(counts)
+        counts, _ = history.contents_aggregate
+        state_counts: Dict[str, int] = defaultdict(int)
+        for (_, state, deleted, visible), count in counts.items():
+            if not deleted and visible:
+                state_counts[state] += count
+        return dict(state_counts)
 
     def active_counts(self, history):
         """
@@ -164,17 +169,8 @@ class HistoryContentsManager(containers.ContainerManagerMixin, base.SortableMana
         both deleted and hidden will be added to both totals.
         """
         returned = dict(deleted=0, hidden=0, active=0)
-        contents_subquery = self._union_of_contents_query(history).subquery()
-        columns = [
-            sql.column('deleted'),
-            sql.column('visible'),
-            func.count('*')
-        ]
-        statement = (sql.select(columns)
-            .select_from(contents_subquery)
-            .group_by(sql.column('deleted'), sql.column('visible')))
-        groups = self.app.model.context.execute(statement).fetchall()
-        for deleted, visible, count in groups:
+        counts, _ = history.contents_aggregate
+        for (_, _, deleted, visible), count in counts.items():
             if deleted:
                 returned['deleted'] += count
             if not visible:
@@ -190,16 +186,21 @@ class HistoryContentsManager(containers.ContainerManagerMixin, base.SortableMana
 
         Uses the same kwargs as `contents` above.
         """
-        returned = []
+        return [fn(content, *parents) for content, parents in self.iter_datasets(history, **kwargs)]
+
+    def iter_datasets(self, history, **kwargs):
+        """
+        Lazily yield a ``(dataset_instance, parents)`` tuple for each dataset of a given
+        history, recursing into collections. ``parents`` is empty for HDAs.
+
+        Uses the same kwargs as `contents` above.
+        """
         contents = self.contents(history, **kwargs)
         for content in contents:
             if isinstance(content, self.subcontainer_class):
-                processed_list = self.subcontainer_manager.map_datasets(content, fn)
-                returned.extend(processed_list)
+                yield from self.subcontainer_manager.iter_datasets(content)
             else:
-                processed = fn(content)
-                returned.append(processed)
-        return returned
+                yield content, ()
 
     # ---- private
     def _session(self):
@@ -300,6 +301,14 @@ class HistoryContentsManager(containers.ContainerManagerMixin, base.SortableMana
                 contained_query = self._apply_orm_filter(contained_query, orm_filter.filter)
                 subcontainer_query = self._apply_orm_filter(subcontainer_query, orm_filter.filter)
 
+        if limit is not None:
+            # keyset pagination: neither branch can contribute more than limit + offset rows to the page,
+            # so cut each one down first - with a hid filter this is an index range scan on (history_id, hid)
+            # instead of sorting the union of all matching contents
+            branch_limit = limit + (offset or 0)
+            contained_query = self._limited_branch(contained_query, order_by, branch_limit)
+            subcontainer_query = self._limited_branch(subcontainer_query, order_by, branch_limit)
+
         contents_query = contained_query.union_all(subcontainer_query)
         contents_query = contents_query.order_by(*order_by)
 
@@ -309,6 +318,11 @@ class HistoryContentsManager(containers.ContainerManagerMixin, base.SortableMana
             contents_query = contents_query.offset(offset)
         return contents_query
 
+    def _limited_branch(self, qry, order_by, limit):
+        limited = qry.order_by(*order_by).limit(limit).subquery()
+        # re-label the columns so the union can still be ordered by the common column names
+        return self._session().query(*(column.label(column.name) for column in limited.c))
+
     def _apply_orm_filter(self, qry, orm_filter):
         if isinstance(orm_filter, sql.elements.BinaryExpression):
             for match in filter(lambda col: col['name'] == orm_filter.left.name, qry.column_descriptions):
@@ -1,3 +1,4 @@
+import datetime
 import json
 import logging
 import typing
@@ -93,6 +94,29 @@ class JobManager:
         else:
             return False
 
+    def resource_usage(self, tool_id=None, destination_id=None, days=None, percentiles=(50, 95)):
+        """
+        Summarize the runtime and resource usage of the jobs of a tool and/or destination
+        created over the last ``days``, see :meth:`galaxy.model.JobResourceUsage.summarize`.
+        """
+        for percentile in percentiles:
+            if not 0 <= percentile <= 100:
+                raise RequestParameterInvalidException(f"Percentile {percentile} is not between 0 and 100.")
+        since = None
+        if days is not None:
+            if days <= 0:
+                raise RequestParameterInvalidException("days must be a positive number.")
+            since = datetime.datetime.utcnow() - datetime.timedelta(days=days)
+        summary = model.JobResourceUsage.summarize(
+            self.app.model.session,
+            tool_id=tool_id,
+            destination_id=destination_id,
+            since=since,
+            percentiles=percentiles,
+        )
+        summary.update(tool_id=tool_id, destination_id=destination_id, days=days)
+        return summary
+
 
 class JobSearch:
     """Search for jobs using tool inputs or other jobs"""
@@ -14,6 +14,7 @@ import json
 import logging
 import os
 import sys
+import time
 import traceback
 
 try:
@@ -44,7 +45,10 @@ from galaxy.model import (
     store,
 )
 from galaxy.model.custom_types import total_size
-from galaxy.model.metadata import MetadataTempFile
+from galaxy.model.metadata import (
+    MetadataTempFile,
+    set_meta_in_processes,
+)
 from galaxy.objectstore import build_object_store_from_config
 from galaxy.tool_util.output_checker import (
     check_output,
@@ -61,6 +65,8 @@ from galaxy.util.expressions import ExpressionContext
 logging.basicConfig()
 log = logging.getLogger(__name__)
 
+METADATA_TIMINGS_PATH = os.path.join("metadata", "timings.json")
+
 
 def set_validated_state(dataset_instance):
     datatype_validation = validate(dataset_instance)
@@ -109,7 +115,16 @@ def set_metadata():
     set_metadata_portable()
 
 
+def get_metadata_processes():
+    """Return the number of processes setting metadata, the number of slots of the job."""
+    try:
+        return max(1, int(os.environ.get("GALAXY_SLOTS", 1)))
+    except ValueError:
+        return 1
+
+
 def set_metadata_portable():
+    set_metadata_start = time.time()
     tool_job_working_directory = os.path.abspath(os.getcwd())
     metadata_tmp_files_dir = os.path.join(tool_job_working_directory, "metadata")
     MetadataTempFile.tmp_dir = metadata_tmp_files_dir
@@ -125,6 +140,7 @@ def set_metadata_portable():
     provided_metadata_style = metadata_params.get("provided_metadata_style")
     max_metadata_value_size = metadata_params.get("max_metadata_value_size") or 0
     outputs = metadata_params["outputs"]
+    metadata_processes = get_metadata_processes()
 
     datatypes_registry = validate_and_load_datatypes_config(datatypes_config)
     tool_provided_metadata = load_job_metadata(job_metadata, provided_metadata_style)
@@ -218,6 +234,7 @@ def set_metadata_portable():
         os.path.join(tool_job_working_directory, "working"),
         final_job_state=final_job_state,
     )
+    job_context.metadata_processes = metadata_processes
 
     unnamed_id_to_path = {}
     for unnamed_output_dict in job_context.tool_provided_metadata.get_unnamed_outputs():
@@ -230,7 +247,12 @@ def set_metadata_portable():
                 if filename:
                     unnamed_id_to_path[element['object_id']] = os.path.join(job_context.job_working_directory, filename)
 
+    # Datasets are prepared and finalized one after the other, set_meta (the costly part) is
+    # called for all of them at once, in as many processes as the job has slots.
+    prepared_outputs = []
+    output_seconds = {}
     for output_name, output_dict in outputs.items():
+        start = time.time()
         dataset_instance_id = output_dict["id"]
         klass = getattr(galaxy.model, output_dict.get('model_class', 'HistoryDatasetAssociation'))
         dataset = None
@@ -270,11 +292,32 @@ def set_metadata_portable():
                 setattr(dataset.metadata, metadata_name, metadata_file_override)
             if output_dict.get("validate", False):
                 set_validated_state(dataset)
-            if dataset_instance_id not in unnamed_id_to_path:
-                # We're going to run through set_metadata in collect_dynamic_outputs with more contextual metadata,
-                # so skip set_meta here.
-                set_meta(dataset, file_dict)
-
+            prepared_outputs.append((output_name, dataset, file_dict, set_meta_kwds, dataset_filename_override, filename_out, filename_results_code))
+        except Exception:
+            json.dump((False, traceback.format_exc()), open(filename_results_code, 'wt+'))  # setting metadata has failed somehow
+        output_seconds[output_name] = time.time() - start
+
+    # We're going to run through set_metadata in collect_dynamic_outputs with more contextual metadata,
+    # so skip set_meta for unnamed outputs here.
+    set_meta_outputs = {id(prepared[1]): prepared for prepared in prepared_outputs if outputs[prepared[0]]["id"] not in unnamed_id_to_path}
+
+    def set_output_meta(dataset):
+        _, _, file_dict, output_set_meta_kwds, *_ = set_meta_outputs[id(dataset)]
+        set_meta_with_tool_provided(dataset, file_dict, output_set_meta_kwds, datatypes_registry, max_metadata_value_size)
+
+    set_meta_datasets = [prepared[1] for prepared in set_meta_outputs.values()]
+    set_meta_errors = {}
+    for (output_name, *_), (error, seconds) in zip(set_meta_outputs.values(), set_meta_in_processes(set_meta_datasets, set_output_meta, processes=metadata_processes)):
+        output_seconds[output_name] += seconds
+        if error is not None:
+            set_meta_errors[output_name] = error
+
+    for output_name, dataset, _, _, dataset_filename_override, filename_out, filename_results_code in prepared_outputs:
+        start = time.time()
+        if output_name in set_meta_errors:
+            json.dump((False, set_meta_errors[output_name]), open(filename_results_code, 'wt+'))  # setting metadata has failed somehow
+            continue
+        try:
             if extended_metadata_collection:
                 meta = tool_provided_metadata.get_dataset_meta(output_name, dataset.dataset.id, dataset.dataset.uuid)
                 if meta:
@@ -336,6 +379,7 @@ def set_metadata_portable():
             json.dump((True, 'Metadata has been set successfully'), open(filename_results_code, 'wt+'))  # setting metadata has succeeded
         except Exception:
             json.dump((False, traceback.format_exc()), open(filename_results_code, 'wt+'))  # setting metadata has failed somehow
+        output_seconds[output_name] += time.time() - start
 
     if extended_metadata_collection:
         # discover extra outputs...
@@ -358,6 +402,7 @@ def set_metadata_portable():
     if export_store:
         export_store._finalize()
     write_job_metadata(tool_job_working_directory, job_metadata, set_meta, tool_provided_metadata)
+    write_metadata_timings(metadata_processes, output_seconds, job_context, time.time() - set_metadata_start)
 
 
 def validate_and_load_datatypes_config(datatypes_config):
@@ -380,6 +425,22 @@ def load_job_metadata(job_metadata, provided_metadata_style):
     return parse_tool_provided_metadata(job_metadata, provided_metadata_style=provided_metadata_style)
 
 
+def write_metadata_timings(metadata_processes, output_seconds, job_context, total_seconds):
+    """Record how long setting metadata took, collected by the ``metadata`` job metrics plugin."""
+    timings = {
+        "processes": metadata_processes,
+        "total_seconds": total_seconds,
+        "outputs": output_seconds,
+        "discovered_datasets": job_context.metadata_datasets,
+        "discovered_seconds": job_context.metadata_seconds,
+    }
+    try:
+        with open(METADATA_TIMINGS_PATH, "w") as f:
+            json.dump(timings, f)
+    except OSError:
+        log.exception("Failed to write metadata timings")
+
+
 def write_job_metadata(tool_job_working_directory, job_metadata, set_meta, tool_provided_metadata):
     for i, file_dict in enumerate(tool_provided_metadata.get_new_datasets_for_metadata_collection(), start=1):
         filename = file_dict["filename"]
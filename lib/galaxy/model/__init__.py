@@ -6,6 +6,7 @@ the relationship cardinalities are obvious (e.g. prefer Dataset to Data)
 """
 import base64
 import errno
+import itertools
 import json
 import logging
 import numbers
@@ -20,6 +21,7 @@ from datetime import datetime, timedelta
 from enum import Enum
 from string import Template
 from typing import (
+    Dict,
     Iterable,
     List,
     Optional,
@@ -36,11 +38,13 @@ from sqlalchemy import (
     BigInteger,
     Boolean,
     Column,
+    Date,
     DateTime,
     func,
     inspect,
     Integer,
     join,
+    literal,
     not_,
     or_,
     select,
@@ -54,7 +58,15 @@ from sqlalchemy import (
     UniqueConstraint,
     VARCHAR,
 )
-from sqlalchemy.exc import OperationalError
+from sqlalchemy.dialects import (
+    mysql,
+    postgresql,
+    sqlite,
+)
+from sqlalchemy.exc import (
+    IntegrityError,
+    OperationalError,
+)
 from sqlalchemy.ext import hybrid
 from sqlalchemy.orm import (
     aliased,
@@ -63,6 +75,7 @@ from sqlalchemy.orm import (
     Query,
     reconstructor,
     registry,
+    scoped_session,
 )
 from sqlalchemy.orm.decl_api import DeclarativeMeta
 
@@ -727,6 +740,96 @@ class TaskMetricNumeric(BaseJobMetric, RepresentById):
     pass
 
 
+class JobResourceUsage(_HasTable):
+    """
+    The numeric job metrics needed to size destinations, as typed columns of a single row per job.
+
+    The job_metric_numeric table stores one row per metric and job, finding the runtime and
+    peak memory of the jobs of a tool means joining and filtering millions of those rows.
+    Rows of this table are filled in by ``Job.add_metric`` as the metrics are collected and
+    are indexed by tool, destination and creation time for ``summarize``.
+    """
+    # (plugin, metric_name) of the collected metrics to the columns storing them
+    METRIC_COLUMNS = {
+        ("core", "runtime_seconds"): "runtime_seconds",
+        ("core", "galaxy_slots"): "galaxy_slots",
+        ("core", "galaxy_memory_mb"): "galaxy_memory_mb",
+        ("cgroup", "memory.max_usage_in_bytes"): "memory_max_usage",
+        ("cgroup", "cpuacct.usage"): "cpuacct_usage",
+    }
+
+    def __init__(self, job=None, tool_id=None, destination_id=None):
+        self.job = job
+        self.tool_id = tool_id
+        self.destination_id = destination_id
+
+    @classmethod
+    def summarize(cls, sa_session, tool_id=None, destination_id=None, since=None, percentiles=(50, 95)):
+        """
+        Aggregate the resource usage of the jobs of ``tool_id`` on ``destination_id`` created
+        at or after ``since``, any of them if not set.
+
+        Returns a dictionary with the number of jobs (``count``) and for each metric column
+        (``metrics``) the number of jobs having a value, its minimum, maximum, mean and the
+        requested percentiles (``p50`` ... ), interpolated as PostgreSQL's ``percentile_cont``.
+        """
+        table = cls.table
+        columns = [table.c[name] for name in cls.METRIC_COLUMNS.values()]
+        filters = []
+        if tool_id is not None:
+            filters.append(table.c.tool_id == tool_id)
+        if destination_id is not None:
+            filters.append(table.c.destination_id == destination_id)
+        if since is not None:
+            filters.append(table.c.create_time >= since)
+        percentiles = sorted(set(percentiles))
+        if sa_session.bind.dialect.name == 'postgresql':
+            aggregates = [func.count()]
+            for column in columns:
+                aggregates.extend([func.count(column), func.min(column), func.max(column), func.avg(column)])
+                aggregates.extend(func.percentile_cont(p / 100.0).within_group(column) for p in percentiles)
+            row = iter(sa_session.execute(select(*aggregates).where(and_(true(), *filters))).one())
+            count = next(row)
+            metrics = {}
+            for column in columns:
+                values = [next(row) for _ in range(4 + len(percentiles))]
+                metrics[column.name] = dict(
+                    count=values[0],
+                    min=_float_or_none(values[1]),
+                    max=_float_or_none(values[2]),
+                    mean=_float_or_none(values[3]),
+                    **{f"p{p:g}": _float_or_none(value) for p, value in zip(percentiles, values[4:])}
+                )
+        else:
+            rows = sa_session.execute(select(*columns).where(and_(true(), *filters))).all()
+            count = len(rows)
+            metrics = {}
+            for i, column in enumerate(columns):
+                values = sorted(float(row[i]) for row in rows if row[i] is not None)
+                metrics[column.name] = dict(
+                    count=len(values),
+                    min=values[0] if values else None,
+                    max=values[-1] if values else None,
+                    mean=sum(values) / len(values) if values else None,
+                    **{f"p{p:g}": _percentile(values, p / 100.0) for p in percentiles}
+                )
+        return dict(count=count, metrics=metrics)
+
+
+def _float_or_none(value):
+    return None if value is None else float(value)
+
+
+def _percentile(values, fraction):
+    """Linearly interpolated percentile of sorted ``values``, like PostgreSQL's ``percentile_cont``."""
+    if not values:
+        return None
+    position = fraction * (len(values) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
 class Job(JobLike, UsesCreateAndUpdateTime, Dictifiable, RepresentById):
     dict_collection_visible_keys = ['id', 'state', 'exit_code', 'update_time', 'create_time', 'galaxy_version']
     dict_element_visible_keys = ['id', 'state', 'exit_code', 'update_time', 'create_time', 'galaxy_version', 'command_version']
@@ -837,6 +940,14 @@ class Job(JobLike, UsesCreateAndUpdateTime, Dictifiable, RepresentById):
         out_collections.update([(obj.name, obj.dataset_collection) for obj in self.output_dataset_collections])
         return inp_data, out_data, out_collections
 
+    def add_metric(self, plugin, metric_name, metric_value):
+        super().add_metric(plugin, metric_name, metric_value)
+        column = JobResourceUsage.METRIC_COLUMNS.get((plugin, metric_name))
+        if column and isinstance(metric_value, numbers.Number) and int(metric_value) <= JobLike.MAX_NUMERIC:
+            if self.resource_usage is None:
+                self.resource_usage = JobResourceUsage(tool_id=self.tool_id, destination_id=self.destination_id)
+            setattr(self.resource_usage, column, metric_value)
+
     # TODO: Add accessors for members defined in SQL Alchemy for the Job table and
     # for the mapper defined to the Job table.
     def get_external_output_metadata(self):
@@ -1589,6 +1700,83 @@ class JobStateHistory(RepresentById):
         self.info = job.info
 
 
+class JobDailySummary(_HasTable):
+    """
+    Number of jobs created on a day by a tool and a user, in a state and on a destination.
+
+    Rolled up from the job table by ``compact`` so that the reports app does not have to
+    aggregate over every job on each page view. Each compaction recalculates the days of
+    the jobs updated since the previous one, so the counts lag behind the job table by at
+    most the compaction interval.
+    """
+    # Jobs updated while a compaction runs are only visible to it once committed,
+    # rescan a little before the previous compaction started.
+    compaction_overlap = timedelta(minutes=5)
+    # Key of the PostgreSQL advisory lock serializing compactions.
+    compaction_lock_key = 7186521
+
+    def __init__(self, day=None, tool_id=None, user_id=None, state=None, destination_id=None, job_count=0):
+        self.day = day
+        self.tool_id = tool_id
+        self.user_id = user_id
+        self.state = state
+        self.destination_id = destination_id
+        self.job_count = job_count
+
+    @classmethod
+    def compact(cls, sa_session, full=False):
+        """
+        Recalculate the summaries of the days with jobs updated since the previous compaction,
+        or of all days if ``full`` is set or nothing has been summarized yet. Returns the number
+        of days recalculated, None for a full recalculation.
+        """
+        job = Job.table
+        summary = cls.table
+        if sa_session.bind.dialect.name == 'postgresql':
+            # Concurrent compactions would both reinsert the summaries of a day.
+            sa_session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": cls.compaction_lock_key})
+        compaction_time = now()
+        watermark = None
+        if not full:
+            watermark = sa_session.execute(select(func.max(summary.c.update_time))).scalar()
+        day = func.date(job.c.create_time, type_=Date)
+        job_filter = None
+        days = None
+        if watermark is not None:
+            days = sa_session.execute(
+                select(day).distinct().where(job.c.update_time >= watermark - cls.compaction_overlap)
+            ).scalars().all()
+            if not days:
+                return 0
+            job_filter = or_(*(
+                and_(job.c.create_time >= datetime.combine(first, datetime.min.time()),
+                     job.c.create_time < datetime.combine(last + timedelta(days=1), datetime.min.time()))
+                for first, last in _date_ranges(days)
+            ))
+            sa_session.execute(summary.delete().where(summary.c.day.in_(days)))
+        else:
+            sa_session.execute(summary.delete())
+        group_by = (day, job.c.tool_id, job.c.user_id, job.c.state, job.c.destination_id)
+        rollup = select(*group_by, func.count(job.c.id), literal(compaction_time, DateTime)).group_by(*group_by)
+        if job_filter is not None:
+            rollup = rollup.where(job_filter)
+        sa_session.execute(summary.insert().from_select(
+            ['day', 'tool_id', 'user_id', 'state', 'destination_id', 'job_count', 'update_time'], rollup
+        ))
+        return len(days) if days is not None else None
+
+
+def _date_ranges(days):
+    """Collapse dates into sorted ``(first, last)`` ranges of consecutive days."""
+    ranges = []
+    for day in sorted(days):
+        if ranges and day - ranges[-1][1] == timedelta(days=1):
+            ranges[-1][1] = day
+        else:
+            ranges.append([day, day])
+    return [tuple(r) for r in ranges]
+
+
 class ImplicitlyCreatedDatasetCollectionInput(RepresentById):
     def __init__(self, name, input_dataset_collection):
         self.name = name
@@ -1915,6 +2103,340 @@ class HistoryAudit(RepresentById):
         sa_session.execute(d.where(tuple_(history_audit_table.c.history_id, history_audit_table.c.update_time).in_(not_latest_query)))
 
 
+class HistoryContentsAggregate(_HasTable):
+    """
+    Size of a history and counts of its contents by content type, state, deleted and
+    visible flags, see ``read``.
+
+    Rows are created by ``recalculate`` the first time a history's aggregates are read
+    and from then on kept up to date by ``track_history_contents_before_flush`` and
+    ``track_history_contents_after_flush`` in the transaction of each flush changing
+    them. Changes made with Core statements bypass these hooks, code doing so should
+    ``invalidate`` the affected histories; ``recalculate`` also repairs any drift.
+    """
+
+    def __init__(self, history_id=None, disk_size=0):
+        self.history_id = history_id
+        self.disk_size = disk_size
+
+    @classmethod
+    def read(cls, sa_session, history_id):
+        """
+        Return ``(counts, disk_size)`` of the history, ``counts`` being a dictionary keyed by
+        ``(history_content_type, state, deleted, visible)``. Recalculated if not tracked yet.
+        """
+        aggregate = cls.table
+        disk_size = sa_session.execute(
+            select(aggregate.c.disk_size).where(aggregate.c.history_id == history_id)
+        ).scalar()
+        if disk_size is None:
+            return cls.recalculate(sa_session, history_id)
+        return cls._read_counts(sa_session, history_id), disk_size
+
+    @classmethod
+    def _read_counts(cls, sa_session, history_id):
+        counts = HistoryContentsCount.table
+        rows = sa_session.execute(
+            select(counts.c.history_content_type, counts.c.state, counts.c.deleted, counts.c.visible, counts.c.count)
+            .where(and_(counts.c.history_id == history_id, counts.c.count != 0))
+        )
+        return {(content_type, state or None, deleted, visible): count for content_type, state, deleted, visible, count in rows}
+
+    @classmethod
+    def recalculate(cls, sa_session, history_id):
+        """
+        Recalculate and store the aggregates of the history from its contents, return them as ``read`` does.
+
+        The stored rows are replaced and the contents counted in a single transaction (the
+        caller's, if one is in progress), so readers never see an aggregate row without its
+        counts and flushes committed before the rows are replaced are part of the counts.
+        ``read`` calls this for untracked histories, so concurrent requests may race to
+        store the aggregates of the same history; the losers keep the rows stored by the
+        winner and return what it stored.
+        """
+        session = sa_session() if isinstance(sa_session, scoped_session) else sa_session
+        if session.in_transaction():
+            return cls._recalculate(sa_session, history_id)
+        with sa_session.begin():
+            return cls._recalculate(sa_session, history_id)
+
+    @classmethod
+    def _recalculate(cls, sa_session, history_id):
+        # Deleting the rows first makes concurrent flushes of the history wait for this transaction
+        # to commit before they apply their changes on top of the stored counts.
+        cls.invalidate(sa_session, [history_id])
+        hda = HistoryDatasetAssociation.table
+        hdca = HistoryDatasetCollectionAssociation.table
+        counts = _history_contents_counts(sa_session, hda.c.history_id == history_id, hdca.c.history_id == history_id)
+        disk_size = _history_contents_sizes(sa_session, hda.c.history_id == history_id).get(history_id, 0)
+        if not _insert_history_contents_aggregate(sa_session, dict(history_id=history_id, disk_size=disk_size, update_time=now())):
+            stored_disk_size = sa_session.execute(
+                select(cls.table.c.disk_size).where(cls.table.c.history_id == history_id)
+            ).scalar()
+            if stored_disk_size is not None:
+                return cls._read_counts(sa_session, history_id), stored_disk_size
+            return {(content_type, state or None, deleted, visible): count for (_, content_type, state, deleted, visible), count in counts.items()}, disk_size
+        if counts:
+            sa_session.execute(HistoryContentsCount.table.insert(), [
+                dict(history_id=history_id, history_content_type=content_type, state=state, deleted=deleted, visible=visible, count=count)
+                for (_, content_type, state, deleted, visible), count in counts.items()
+            ])
+        return {(content_type, state or None, deleted, visible): count for (_, content_type, state, deleted, visible), count in counts.items()}, disk_size
+
+    @classmethod
+    def invalidate(cls, sa_session, history_ids):
+        """Stop tracking the aggregates of the histories, they are recalculated on the next ``read``."""
+        counts = HistoryContentsCount.table
+        sa_session.execute(counts.delete().where(counts.c.history_id.in_(history_ids)))
+        sa_session.execute(cls.table.delete().where(cls.table.c.history_id.in_(history_ids)))
+
+    @classmethod
+    def tracked_history_ids(cls, sa_session):
+        return sa_session.execute(select(cls.table.c.history_id)).scalars().all()
+
+
+class HistoryContentsCount(_HasTable):
+    """Count of a history's contents with a content type, state, deleted and visible flag, see ``HistoryContentsAggregate``."""
+
+    def __init__(self, history_id=None, history_content_type=None, state=None, deleted=False, visible=True, count=0):
+        self.history_id = history_id
+        self.history_content_type = history_content_type
+        self.state = state
+        self.deleted = deleted
+        self.visible = visible
+        self.count = count
+
+
+def _history_contents_counts(sa_session, hda_filter=None, hdca_filter=None):
+    """
+    Return counts of the HDAs and HDCAs matching the filters keyed by
+    ``(history_id, history_content_type, state, deleted, visible)``.
+    """
+    hda = HistoryDatasetAssociation.table
+    dataset = Dataset.table
+    hdca = HistoryDatasetCollectionAssociation.table
+    collection = DatasetCollection.table
+    queries = []
+    if hda_filter is not None:
+        queries.append(('dataset', hda, dataset.c.state, hda.join(dataset, hda.c.dataset_id == dataset.c.id), hda_filter))
+    if hdca_filter is not None:
+        queries.append(('dataset_collection', hdca, collection.c.populated_state, hdca.join(collection, hdca.c.collection_id == collection.c.id), hdca_filter))
+    counts: Dict[tuple, int] = defaultdict(int)
+    for content_type, table, state, from_obj, where in queries:
+        group_by = (table.c.history_id, state, table.c.deleted, table.c.visible)
+        statement = select(*group_by, func.count()).select_from(from_obj).where(and_(where, table.c.history_id.isnot(None))).group_by(*group_by)
+        for history_id, state, deleted, visible, count in sa_session.execute(statement):
+            # state is part of the primary key of history_contents_count
+            counts[(history_id, content_type, state or '', bool(deleted), bool(visible))] += count
+    return counts
+
+
+def _history_contents_sizes(sa_session, hda_filter):
+    """
+    Return the sum of the total sizes of the distinct, non-purged datasets of the
+    non-purged HDAs matching ``hda_filter`` keyed by history id (as ``History.disk_size``).
+    """
+    hda = HistoryDatasetAssociation.table
+    dataset = Dataset.table
+    distinct_datasets = (
+        select(hda.c.history_id, dataset.c.id, dataset.c.total_size)
+        .select_from(hda.join(dataset, hda.c.dataset_id == dataset.c.id))
+        .where(and_(hda_filter, hda.c.history_id.isnot(None), hda.c.purged != true(), dataset.c.purged != true()))
+        .distinct()
+        .subquery()
+    )
+    statement = (
+        select(distinct_datasets.c.history_id, func.coalesce(func.sum(distinct_datasets.c.total_size), 0))
+        .group_by(distinct_datasets.c.history_id)
+    )
+    return dict(sa_session.execute(statement).fetchall())
+
+
+def _insert_history_contents_aggregate(sa_session, values):
+    """
+    Insert a ``HistoryContentsAggregate`` row unless one already exists for the history
+    (stored by a concurrent transaction), return whether the row was inserted.
+    """
+    aggregate = HistoryContentsAggregate.table
+    dialect_name = sa_session.bind.dialect.name
+    if dialect_name in ('postgresql', 'sqlite'):
+        insert = postgresql.insert if dialect_name == 'postgresql' else sqlite.insert
+        stmt = insert(aggregate).values(**values).on_conflict_do_nothing(index_elements=[aggregate.c.history_id])
+        return bool(sa_session.execute(stmt).rowcount)
+    elif dialect_name == 'mysql':
+        return bool(sa_session.execute(aggregate.insert().prefix_with('IGNORE').values(**values)).rowcount)
+    try:
+        with sa_session.begin_nested():
+            sa_session.execute(aggregate.insert().values(**values))
+    except IntegrityError:
+        return False
+    return True
+
+
+def _increment_history_contents_count(sa_session, key, delta):
+    history_id, content_type, state, deleted, visible = key
+    counts = HistoryContentsCount.table
+    values = dict(history_id=history_id, history_content_type=content_type, state=state, deleted=deleted, visible=visible, count=delta)
+    dialect_name = sa_session.bind.dialect.name
+    if dialect_name in ('postgresql', 'sqlite'):
+        insert = postgresql.insert if dialect_name == 'postgresql' else sqlite.insert
+        stmt = insert(counts).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[counts.c.history_id, counts.c.history_content_type, counts.c.state, counts.c.deleted, counts.c.visible],
+            set_=dict(count=counts.c.count + stmt.excluded['count']),
+        )
+        sa_session.execute(stmt)
+    elif dialect_name == 'mysql':
+        stmt = mysql.insert(counts).values(**values)
+        sa_session.execute(stmt.on_duplicate_key_update(count=counts.c.count + stmt.inserted['count']))
+    else:
+        key_filter = and_(*(counts.c[name] == value for name, value in values.items() if name != 'count'))
+        if not sa_session.execute(counts.update().where(key_filter).values(count=counts.c.count + delta)).rowcount:
+            sa_session.execute(counts.insert().values(**values))
+
+
+def _history_contents_changes(session):
+    """
+    Return the HDAs, HDCAs and ids of datasets and collections in ``session`` with pending
+    changes that may affect ``HistoryContentsAggregate`` rows.
+    """
+    hdas, hdcas, dataset_ids, collection_ids = [], [], set(), set()
+
+    def changed(obj, *keys):
+        attrs = inspect(obj).attrs
+        return any(attrs[key].history.has_changes() for key in keys)
+
+    for obj in session.dirty:
+        if isinstance(obj, Dataset):
+            if changed(obj, 'state', 'purged', 'total_size'):
+                dataset_ids.add(obj.id)
+        elif isinstance(obj, DatasetCollection):
+            if changed(obj, 'populated_state'):
+                collection_ids.add(obj.id)
+        elif isinstance(obj, HistoryDatasetAssociation):
+            if changed(obj, 'history_id', 'history', 'deleted', 'visible', 'purged', 'dataset_id', 'dataset'):
+                hdas.append(obj)
+        elif isinstance(obj, HistoryDatasetCollectionAssociation):
+            if changed(obj, 'history_id', 'history', 'deleted', 'visible', 'collection_id', 'collection'):
+                hdcas.append(obj)
+    for obj in itertools.chain(session.new, session.deleted):
+        if isinstance(obj, HistoryDatasetAssociation):
+            hdas.append(obj)
+        elif isinstance(obj, HistoryDatasetCollectionAssociation):
+            hdcas.append(obj)
+    return hdas, hdcas, dataset_ids, collection_ids
+
+
+def _history_contents_snapshot(sa_session, hda_ids, hdca_ids, dataset_ids, collection_ids):
+    hda = HistoryDatasetAssociation.table
+    hdca = HistoryDatasetCollectionAssociation.table
+    counts = _history_contents_counts(
+        sa_session,
+        or_(hda.c.id.in_(hda_ids), hda.c.dataset_id.in_(dataset_ids)) if hda_ids or dataset_ids else None,
+        or_(hdca.c.id.in_(hdca_ids), hdca.c.collection_id.in_(collection_ids)) if hdca_ids or collection_ids else None,
+    )
+    sizes = _history_contents_sizes(sa_session, hda.c.dataset_id.in_(dataset_ids)) if dataset_ids else {}
+    return counts, sizes
+
+
+def _history_contents_ids(hdas, hdcas, dataset_ids):
+    hda_ids = {hda.id for hda in hdas}
+    hdca_ids = {hdca.id for hdca in hdcas}
+    dataset_ids = set(dataset_ids)
+    for hda in hdas:
+        dataset_ids.add(hda.dataset_id)
+        dataset = hda.__dict__.get('dataset')
+        if dataset is not None:
+            dataset_ids.add(dataset.id)
+    for ids in (hda_ids, hdca_ids, dataset_ids):
+        ids.discard(None)
+    return hda_ids, hdca_ids, dataset_ids
+
+
+def _history_contents_tracked(session, hdas, hdcas, hda_ids, hdca_ids, dataset_ids, collection_ids):
+    """
+    Return whether any history the pending changes to contents may affect, before or
+    after the flush, has a ``HistoryContentsAggregate`` row.
+    """
+    history_ids = set()
+    for obj in itertools.chain(hdas, hdcas):
+        history_ids.add(obj.history_id)
+        history = obj.__dict__.get('history')
+        if history is not None:
+            history_ids.add(history.id)
+    history_ids.discard(None)
+    hda = HistoryDatasetAssociation.table
+    hdca = HistoryDatasetCollectionAssociation.table
+    aggregate = HistoryContentsAggregate.table
+    conditions = []
+    if history_ids:
+        conditions.append(aggregate.c.history_id.in_(history_ids))
+    if hda_ids or dataset_ids:
+        conditions.append(aggregate.c.history_id.in_(
+            select(hda.c.history_id).where(or_(hda.c.id.in_(hda_ids), hda.c.dataset_id.in_(dataset_ids)))
+        ))
+    if hdca_ids or collection_ids:
+        conditions.append(aggregate.c.history_id.in_(
+            select(hdca.c.history_id).where(or_(hdca.c.id.in_(hdca_ids), hdca.c.collection_id.in_(collection_ids)))
+        ))
+    if not conditions:
+        return False
+    return session.execute(select(aggregate.c.history_id).where(or_(*conditions)).limit(1)).first() is not None
+
+
+def track_history_contents_before_flush(session, flush_context, instances):
+    """
+    ``before_flush`` hook taking a snapshot of the ``HistoryContentsAggregate`` counts
+    and sizes that may be changed by the flush, see ``track_history_contents_after_flush``.
+    """
+    hdas, hdcas, dataset_ids, collection_ids = _history_contents_changes(session)
+    if not (hdas or hdcas or dataset_ids or collection_ids):
+        return
+    hda_ids, hdca_ids, dataset_ids = _history_contents_ids(hdas, hdcas, dataset_ids)
+    if not _history_contents_tracked(session, hdas, hdcas, hda_ids, hdca_ids, dataset_ids, collection_ids):
+        # no aggregates to keep up to date, skip the snapshots
+        return
+    if hda_ids:
+        # datasets the HDAs are moved away from
+        hda = HistoryDatasetAssociation.table
+        dataset_ids.update(session.execute(select(hda.c.dataset_id).where(hda.c.id.in_(hda_ids))).scalars())
+        dataset_ids.discard(None)
+    before = _history_contents_snapshot(session, hda_ids, hdca_ids, dataset_ids, collection_ids)
+    flush_context.attributes['history_contents_aggregate'] = (hdas, hdcas, dataset_ids, collection_ids, before)
+
+
+def track_history_contents_after_flush(session, flush_context):
+    """
+    ``after_flush`` hook applying the difference between the counts and sizes after the
+    flush and the snapshot taken before it to the tracked ``HistoryContentsAggregate`` rows.
+    """
+    tracked = flush_context.attributes.pop('history_contents_aggregate', None)
+    if tracked is None:
+        return
+    hdas, hdcas, dataset_ids, collection_ids, (counts_before, sizes_before) = tracked
+    # ids of new contents (and their datasets) are only known now
+    hda_ids, hdca_ids, dataset_ids = _history_contents_ids(hdas, hdcas, dataset_ids)
+    counts_after, sizes_after = _history_contents_snapshot(session, hda_ids, hdca_ids, dataset_ids, collection_ids)
+    counts_delta = {key: counts_after.get(key, 0) - counts_before.get(key, 0) for key in set(counts_before) | set(counts_after)}
+    counts_delta = {key: delta for key, delta in counts_delta.items() if delta}
+    sizes_delta = {key: sizes_after.get(key, 0) - sizes_before.get(key, 0) for key in set(sizes_before) | set(sizes_after)}
+    sizes_delta = {key: delta for key, delta in sizes_delta.items() if delta}
+    history_ids = {key[0] for key in counts_delta} | set(sizes_delta)
+    if not history_ids:
+        return
+    aggregate = HistoryContentsAggregate.table
+    tracked_history_ids = set(session.execute(
+        select(aggregate.c.history_id).where(aggregate.c.history_id.in_(history_ids))
+    ).scalars())
+    for key, delta in counts_delta.items():
+        if key[0] in tracked_history_ids:
+            _increment_history_contents_count(session, key, delta)
+    for history_id, delta in sizes_delta.items():
+        if history_id in tracked_history_ids:
+            session.execute(aggregate.update().where(aggregate.c.history_id == history_id).values(
+                disk_size=aggregate.c.disk_size + delta, update_time=now()))
+
+
 class History(HasTags, Dictifiable, UsesAnnotations, HasName, RepresentById):
 
     dict_collection_visible_keys = ['id', 'name', 'published', 'deleted']
@@ -2173,17 +2695,16 @@ class History(HasTags, Dictifiable, UsesAnnotations, HasName, RepresentById):
         all non-purged, unique datasets within it.
         """
         # non-.expression part of hybrid.hybrid_property: called when an instance is the namespace (not the class)
-        db_session = object_session(self)
-        rval = db_session.query(
-            func.sum(db_session.query(HistoryDatasetAssociation.dataset_id, Dataset.total_size).join(Dataset)
-                    .filter(HistoryDatasetAssociation.table.c.history_id == self.id)
-                    .filter(HistoryDatasetAssociation.purged != true())
-                    .filter(Dataset.purged != true())
-                    # unique datasets only
-                    .distinct().subquery().c.total_size)).first()[0]
-        if rval is None:
-            rval = 0
-        return rval
+        return self.contents_aggregate[1]
+
+    @property
+    def contents_aggregate(self):
+        """
+        Return ``(counts, disk_size)`` of this history as ``HistoryContentsAggregate.read``,
+        ``counts`` being a dictionary of content counts keyed by
+        ``(history_content_type, state, deleted, visible)``.
+        """
+        return HistoryContentsAggregate.read(object_session(self), self.id)
 
     @disk_size.expression  # type: ignore
     def disk_size(cls):
@@ -4270,7 +4791,7 @@ class DatasetCollection(Dictifiable, UsesAnnotations, RepresentById):
             nesting_level += 1
             inner_dc = alias(DatasetCollection)
             inner_dce = alias(DatasetCollectionElement)
-            order_by_columns.append(dce.c.element_index)
+            order_by_columns.append(inner_dce.c.element_index)
             q = q.join(
                 inner_dc, inner_dc.c.id == dce.c.child_collection_id
             ).join(
@@ -4302,37 +4823,83 @@ class DatasetCollection(Dictifiable, UsesAnnotations, RepresentById):
         return q.distinct(*order_by_columns).order_by(*order_by_columns)
 
     @property
-    def dataset_states_and_extensions_summary(self):
-        if not hasattr(self, '_dataset_states_and_extensions_summary'):
+    def state_summary(self):
+        """
+        Element counts by dataset state, the set of element extensions and whether this
+        collection and all of its subcollections are populated.
+
+        Read from the persisted ``DatasetCollectionStateSummary`` rollup when there is one,
+        otherwise computed with one nested query (plus one query per nesting level for the
+        populated flag) and persisted if the summary is final.
+        """
+        if not hasattr(self, '_state_summary'):
+            db_session = object_session(self)
+            summary = None
+            if db_session and self.id:
+                summary = db_session.query(DatasetCollectionStateSummary).get(self.id)
+            if summary is None:
+                summary = self._compute_state_summary()
+                if db_session and self.id and summary.final:
+                    summary.persist(db_session)
+            self._state_summary = summary
+
+        return self._state_summary
+
+    def _compute_state_summary(self):
+        element_states: Dict[str, int] = defaultdict(int)
+        extensions = set()
+        db_session = object_session(self)
+        if db_session and self.id:
+            # element ids keep rows of identical state and extension distinct where DISTINCT ON is not available
             q = self._get_nested_collection_attributes(
+                element_attributes=('id',),
                 hda_attributes=('extension',),
-                dataset_attributes=('state',)
-            )
-            extensions = set()
-            states = set()
-            for extension, state in q:
-                states.add(state)
+                dataset_attributes=('state',),
+            ).subquery()
+            for state, extension, count in db_session.query(q.c.state, q.c.extension, func.count()).group_by(q.c.state, q.c.extension):
+                element_states[state] += count
                 extensions.add(extension)
+            populated = self._nested_populated()
+        else:
+            # Sessionless context
+            for instance in self.dataset_instances:
+                element_states[instance.state] += 1
+                extensions.add(instance.extension)
+            populated = self.populated
+        return DatasetCollectionStateSummary(
+            dataset_collection_id=self.id,
+            element_states=dict(element_states),
+            extensions=sorted(extensions),
+            populated=populated,
+        )
 
-            self._dataset_states_and_extensions_summary = (states, extensions)
+    def _nested_populated(self):
+        if self.populated_state != DatasetCollection.populated_states.OK:
+            return False
+        db_session = object_session(self)
+        dc = DatasetCollection.table
+        dce = DatasetCollectionElement.table
+        collection_ids = select(dc.c.id).where(dc.c.id == self.id)
+        depth_collection_type = self.collection_type
+        while ':' in depth_collection_type:
+            collection_ids = select(dce.c.child_collection_id).where(dce.c.dataset_collection_id.in_(collection_ids))
+            unpopulated = db_session.query(dc.c.id).filter(
+                dc.c.id.in_(collection_ids),
+                dc.c.populated_state != DatasetCollection.populated_states.OK,
+            ).first()
+            if unpopulated:
+                return False
+            depth_collection_type = depth_collection_type.split(":", 1)[1]
+        return True
 
-        return self._dataset_states_and_extensions_summary
+    @property
+    def dataset_states_and_extensions_summary(self):
+        summary = self.state_summary
+        return set(summary.element_states), set(summary.extensions)
 
     @property
     def populated_optimized(self):
-        if not hasattr(self, '_populated_optimized'):
-            _populated_optimized = True
-            if ":" not in self.collection_type:
-                _populated_optimized = self.populated_state == DatasetCollection.populated_states.OK
-            else:
-                q = self._get_nested_collection_attributes(
-                    collection_attributes=('populated_state',),
-                )
-                _populated_optimized = any(state != DatasetCollection.populated_states.OK for state in q)
-
-            self._populated_optimized = _populated_optimized
-
-        return self._populated_optimized
+        return self.state_summary.populated
 
     @property
     def populated(self):
@@ -4432,6 +4999,32 @@ class DatasetCollection(Dictifiable, UsesAnnotations, RepresentById):
                 elements.append(element)
         return elements
 
+    def prefetch_dataset_elements(self):
+        """
+        Return the dataset elements of this collection (and its subcollections), loaded
+        along with their dataset instances (HDAs or LDDAs) and datasets with one query per
+        kind of instance, so that walking the collection afterwards does not issue one
+        query per element.
+        """
+        db_session = object_session(self)
+        if not (db_session and self.id):
+            return self.dataset_elements
+        if not hasattr(self, '_prefetched_dataset_elements'):
+            elements = self._get_nested_collection_attributes(return_entities=(DatasetCollectionElement,)).all()
+            instances = []
+            for instance_class, ids in (
+                (HistoryDatasetAssociation, {element.hda_id for element in elements if element.hda_id}),
+                (LibraryDatasetDatasetAssociation, {element.ldda_id for element in elements if element.ldda_id}),
+            ):
+                if ids:
+                    instances.extend(db_session.query(instance_class).options(
+                        joinedload(instance_class.dataset)
+                    ).filter(instance_class.id.in_(ids)).all())
+            # keep references, the session only holds weak references to loaded objects
+            self._prefetched_dataset_elements = elements
+            self._prefetched_dataset_instances = instances
+        return list(self._prefetched_dataset_elements)
+
     @property
     def first_dataset_element(self):
         for element in self.elements:
@@ -4512,6 +5105,103 @@ class DatasetCollection(Dictifiable, UsesAnnotations, RepresentById):
         return rval
 
 
+class DatasetCollectionStateSummary(_HasTable):
+    """
+    Persisted rollup of the element states, extensions and populated flag of a
+    ``DatasetCollection``, see ``DatasetCollection.state_summary``.
+
+    A rollup is only stored once it is final (populated and all elements in terminal
+    states), it is deleted by ``invalidate_collection_state_summaries`` as soon as
+    anything it was derived from changes.
+    """
+
+    def __init__(self, dataset_collection_id=None, element_states=None, extensions=None, populated=False):
+        self.dataset_collection_id = dataset_collection_id
+        self.element_states = element_states or {}
+        self.extensions = extensions or []
+        self.populated = populated
+
+    @property
+    def element_count(self):
+        return sum(self.element_states.values())
+
+    @property
+    def final(self):
+        return self.populated and all(state in Dataset.terminal_states for state in self.element_states)
+
+    def persist(self, sa_session):
+        values = dict(
+            dataset_collection_id=self.dataset_collection_id,
+            element_states=self.element_states,
+            extensions=self.extensions,
+            populated=self.populated,
+            update_time=now(),
+        )
+        dialect_name = sa_session.bind.dialect.name
+        if dialect_name == 'postgresql':
+            stmt = postgresql.insert(self.table).values(**values).on_conflict_do_nothing()
+        elif dialect_name == 'mysql':
+            stmt = self.table.insert().values(**values).prefix_with('IGNORE')
+        else:
+            # sqlite ignores conflicting rows through the table's primary key constraint
+            stmt = self.table.insert().values(**values)
+        sa_session.execute(stmt)
+
+
+def invalidate_collection_state_summaries(session, flush_context):
+    """
+    ``after_flush`` hook deleting the persisted ``DatasetCollectionStateSummary`` of every
+    collection, and of all collections containing it, affected by the flushed changes.
+    """
+    dataset_ids = set()
+    hda_ids = set()
+    collection_ids = set()
+
+    def changed(obj, *keys):
+        attrs = inspect(obj).attrs
+        return any(attrs[key].history.has_changes() for key in keys)
+
+    for obj in session.dirty:
+        if isinstance(obj, Dataset):
+            if changed(obj, 'state'):
+                dataset_ids.add(obj.id)
+        elif isinstance(obj, HistoryDatasetAssociation):
+            if changed(obj, 'extension', 'dataset'):
+                hda_ids.add(obj.id)
+        elif isinstance(obj, DatasetCollection):
+            if changed(obj, 'populated_state'):
+                collection_ids.add(obj.id)
+        elif isinstance(obj, DatasetCollectionElement):
+            if changed(obj, 'hda', 'child_collection'):
+                collection_ids.add(obj.dataset_collection_id)
+    for obj in session.new:
+        if isinstance(obj, DatasetCollectionElement) and obj.collection is not None:
+            collection_ids.add(obj.collection.id)
+    collection_ids.discard(None)
+    if not (dataset_ids or hda_ids or collection_ids):
+        return
+
+    dce = DatasetCollectionElement.table
+    hda = HistoryDatasetAssociation.table
+    summary = DatasetCollectionStateSummary.table
+    element_filters = []
+    if hda_ids:
+        element_filters.append(dce.c.hda_id.in_(hda_ids))
+    if dataset_ids:
+        element_filters.append(dce.c.hda_id.in_(select(hda.c.id).where(hda.c.dataset_id.in_(dataset_ids))))
+    if collection_ids:
+        element_filters.append(dce.c.dataset_collection_id.in_(collection_ids))
+        element_filters.append(dce.c.child_collection_id.in_(collection_ids))
+    affected = select(dce.c.dataset_collection_id.label('id')).where(or_(*element_filters)).cte('affected', recursive=True)
+    affected = affected.union(
+        select(dce.c.dataset_collection_id).where(dce.c.child_collection_id == affected.c.id)
+    )
+    session.execute(summary.delete().where(or_(
+        summary.c.dataset_collection_id.in_(select(affected.c.id)),
+        summary.c.dataset_collection_id.in_(collection_ids),
+    )))
+
+
 class DatasetCollectionInstance(HasName):
     """
     """
@@ -12,8 +12,10 @@ from sqlalchemy import (
     asc,
     Boolean,
     Column,
+    Date,
     DateTime,
     desc,
+    event,
     false,
     ForeignKey,
     func,
@@ -181,6 +183,21 @@ model.HistoryAudit.table = Table(
     PrimaryKeyConstraint(sqlite_on_conflict='IGNORE')
 )
 
+model.HistoryContentsAggregate.table = Table(
+    "history_contents_aggregate", metadata,
+    Column("history_id", Integer, ForeignKey("history.id"), primary_key=True, nullable=False),
+    Column("disk_size", Numeric(15, 0), default=0, nullable=False),
+    Column("update_time", DateTime, default=now, onupdate=now))
+
+model.HistoryContentsCount.table = Table(
+    "history_contents_count", metadata,
+    Column("history_id", Integer, ForeignKey("history.id"), primary_key=True, nullable=False),
+    Column("history_content_type", TrimmedString(32), primary_key=True, nullable=False),
+    Column("state", TrimmedString(64), primary_key=True, nullable=False),
+    Column("deleted", Boolean, primary_key=True, nullable=False),
+    Column("visible", Boolean, primary_key=True, nullable=False),
+    Column("count", Integer, default=0, nullable=False))
+
 model.HistoryUserShareAssociation.table = Table(
     "history_user_share_association", metadata,
     Column("id", Integer, primary_key=True),
@@ -217,7 +234,9 @@ model.HistoryDatasetAssociation.table = Table(
     Column("validated_state", TrimmedString(64), default='unvalidated', nullable=False),
     Column("validated_state_message", TEXT),
     Column("hidden_beneath_collection_instance_id",
-           ForeignKey("history_dataset_collection_association.id"), nullable=True))
+           ForeignKey("history_dataset_collection_association.id"), nullable=True),
+    Index('ix_history_dataset_association_history_id_hid', 'history_id', 'hid'),
+    Index('ix_history_dataset_association_history_id_update_time', 'history_id', 'update_time'))
 
 
 model.HistoryDatasetAssociationHistory.table = Table(
@@ -539,7 +558,7 @@ model.LibraryDatasetDatasetInfoAssociation.table = Table(
 model.Job.table = Table(
     "job", metadata,
     Column("id", Integer, primary_key=True),
-    Column("create_time", DateTime, default=now),
+    Column("create_time", DateTime, default=now, index=True),
     Column("update_time", DateTime, default=now, onupdate=now, index=True),
     Column("history_id", Integer, ForeignKey("history.id"), index=True),
     Column("library_folder_id", Integer, ForeignKey("library_folder.id"), index=True),
@@ -581,6 +600,17 @@ model.JobStateHistory.table = Table(
     Column("state", String(64), index=True),
     Column("info", TrimmedString(255)))
 
+model.JobDailySummary.table = Table(
+    "job_daily_summary", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("day", Date, index=True, nullable=False),
+    Column("tool_id", String(255), index=True),
+    Column("user_id", Integer, ForeignKey("galaxy_user.id"), index=True, nullable=True),
+    Column("state", String(64)),
+    Column("destination_id", String(255)),
+    Column("job_count", Integer, default=0, nullable=False),
+    Column("update_time", DateTime, default=now, onupdate=now, index=True))
+
 model.JobParameter.table = Table(
     "job_parameter", metadata,
     Column("id", Integer, primary_key=True),
@@ -724,6 +754,20 @@ model.JobMetricNumeric.table = Table(
     Column("metric_name", Unicode(255)),
     Column("metric_value", Numeric(model.JOB_METRIC_PRECISION, model.JOB_METRIC_SCALE)))
 
+model.JobResourceUsage.table = Table(
+    "job_resource_usage", metadata,
+    Column("job_id", Integer, ForeignKey("job.id"), primary_key=True),
+    Column("create_time", DateTime, default=now),
+    Column("tool_id", String(255)),
+    Column("destination_id", String(255)),
+    Column("runtime_seconds", Numeric(model.JOB_METRIC_PRECISION, model.JOB_METRIC_SCALE)),
+    Column("galaxy_slots", Numeric(model.JOB_METRIC_PRECISION, model.JOB_METRIC_SCALE)),
+    Column("galaxy_memory_mb", Numeric(model.JOB_METRIC_PRECISION, model.JOB_METRIC_SCALE)),
+    Column("memory_max_usage", Numeric(model.JOB_METRIC_PRECISION, model.JOB_METRIC_SCALE)),
+    Column("cpuacct_usage", Numeric(model.JOB_METRIC_PRECISION, model.JOB_METRIC_SCALE)),
+    Index("ix_job_resource_usage_tool_id_destination_id_create_time", "tool_id", "destination_id", "create_time"),
+    Index("ix_job_resource_usage_destination_id_create_time", "destination_id", "create_time"))
+
 model.TaskMetricNumeric.table = Table(
     "task_metric_numeric", metadata,
     Column("id", Integer, primary_key=True),
@@ -843,6 +887,15 @@ model.DatasetCollection.table = Table(
     Column("create_time", DateTime, default=now),
     Column("update_time", DateTime, default=now, onupdate=now))
 
+model.DatasetCollectionStateSummary.table = Table(
+    "dataset_collection_state_summary", metadata,
+    Column("dataset_collection_id", Integer, ForeignKey("dataset_collection.id"), primary_key=True, nullable=False),
+    Column("element_states", JSONType),
+    Column("extensions", JSONType),
+    Column("populated", Boolean),
+    Column("update_time", DateTime, default=now, onupdate=now),
+    PrimaryKeyConstraint(sqlite_on_conflict='IGNORE'))
+
 model.HistoryDatasetCollectionAssociation.table = Table(
     "history_dataset_collection_association", metadata,
     Column("id", Integer, primary_key=True),
@@ -858,7 +911,9 @@ model.HistoryDatasetCollectionAssociation.table = Table(
     Column("job_id", ForeignKey("job.id"), index=True, nullable=True),
     Column("implicit_collection_jobs_id", ForeignKey("implicit_collection_jobs.id"), index=True, nullable=True),
     Column("create_time", DateTime, default=now),
-    Column("update_time", DateTime, default=now, onupdate=now, index=True))
+    Column("update_time", DateTime, default=now, onupdate=now, index=True),
+    Index('ix_history_dataset_collection_association_history_id_hid', 'history_id', 'hid'),
+    Index('ix_history_dataset_collection_association_history_id_update_time', 'history_id', 'update_time'))
 
 model.LibraryDatasetCollectionAssociation.table = Table(
     "library_dataset_collection_association", metadata,
@@ -2115,6 +2170,8 @@ mapper_registry.map_imperatively(model.JobToOutputLibraryDatasetAssociation, mod
 simple_mapping(model.JobStateHistory,
     job=relation(model.Job, backref="state_history"))
 
+mapper_registry.map_imperatively(model.JobDailySummary, model.JobDailySummary.table)
+
 simple_mapping(model.JobMetricText,
     job=relation(model.Job, backref="text_metrics"))
 
@@ -2124,6 +2181,9 @@ simple_mapping(model.TaskMetricText,
 simple_mapping(model.JobMetricNumeric,
     job=relation(model.Job, backref="numeric_metrics"))
 
+simple_mapping(model.JobResourceUsage,
+    job=relation(model.Job, backref=backref("resource_usage", uselist=False)))
+
 simple_mapping(model.TaskMetricNumeric,
     task=relation(model.Task, backref="numeric_metrics"))
 
@@ -2218,6 +2278,10 @@ simple_mapping(model.DatasetCollection,
         order_by=model.DatasetCollectionElement.table.c.element_index)
 )
 
+mapper_registry.map_imperatively(model.DatasetCollectionStateSummary, model.DatasetCollectionStateSummary.table)
+mapper_registry.map_imperatively(model.HistoryContentsAggregate, model.HistoryContentsAggregate.table)
+mapper_registry.map_imperatively(model.HistoryContentsCount, model.HistoryContentsCount.table)
+
 simple_mapping(model.HistoryDatasetCollectionAssociation,
     collection=relation(model.DatasetCollection),
     history=relation(model.History,
@@ -2778,6 +2842,9 @@ def init(file_path, url, engine_options=None, create_tables=False, map_install_m
         model_modules.append(tool_shed_install)
 
     result = GalaxyModelMapping(model_modules, engine=engine)
+    event.listen(result._SessionLocal, 'after_flush', model.invalidate_collection_state_summaries)
+    event.listen(result._SessionLocal, 'before_flush', model.track_history_contents_before_flush)
+    event.listen(result._SessionLocal, 'after_flush', model.track_history_contents_after_flush)
 
     # Create tables if needed
     if create_tables:
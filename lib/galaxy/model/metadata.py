@@ -5,13 +5,18 @@ Galaxy Metadata
 import copy
 import json
 import logging
+import multiprocessing
 import os
+import pickle
 import shutil
 import sys
 import tempfile
+import time
+import traceback
 import weakref
 from collections import OrderedDict
 from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
 from os.path import abspath
 
 from sqlalchemy.orm import object_session
@@ -688,6 +693,117 @@ class MetadataTempFile:
             log.debug('Failed to cleanup MetadataTempFile temp files from %s: %s', filename, unicodify(e))
 
 
+class MetadataFileReference:
+    """Picklable stand-in for a MetadataFile created while setting metadata in a forked process."""
+
+    def __init__(self, metadata_file):
+        self.name = metadata_file.name
+        self.uuid = metadata_file.uuid
+        self.object_store_id = metadata_file.object_store_id
+
+    def restore(self, dataset_instance, metadata_files):
+        metadata_file = metadata_files.get(self.uuid)
+        if metadata_file is None:
+            metadata_file = galaxy.model.MetadataFile(dataset=dataset_instance, name=self.name, uuid=self.uuid)
+            metadata_file.object_store_id = self.object_store_id
+        return metadata_file
+
+
+# (set_meta, dataset_instances) inherited by the processes forked by set_meta_in_processes
+_forked_set_meta = None
+# dataset instance attributes besides the metadata that set_meta may change
+# (e.g. the info of velvet datasets), sent back from the forked processes
+FORKED_SET_META_ATTRIBUTES = ('extension', 'info', 'blurb', 'peek')
+
+
+def set_meta_in_processes(dataset_instances, set_meta, processes=1):
+    """
+    Call ``set_meta(dataset_instance)`` for each of ``dataset_instances`` in up to ``processes``
+    forked processes and load the metadata (and ``FORKED_SET_META_ATTRIBUTES``) set by each
+    process back into the dataset instances.
+
+    This is meant for the metadata step of jobs, where dataset instances are not bound to a
+    database session. Returns an ``(error, seconds)`` tuple for each dataset instance, where
+    ``error`` is the formatted traceback of a failed ``set_meta`` call or None.
+    """
+    global _forked_set_meta
+    dataset_instances = list(dataset_instances)
+    processes = min(processes, len(dataset_instances))
+    if processes <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        return [_timed_set_meta(set_meta, dataset_instance) for dataset_instance in dataset_instances]
+
+    _forked_set_meta = (set_meta, dataset_instances)
+    try:
+        with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('fork')) as executor:
+            results = list(executor.map(_set_meta_in_forked_process, range(len(dataset_instances))))
+    except Exception:
+        log.exception("Setting metadata in %d processes failed, setting it sequentially", processes)
+        return [_timed_set_meta(set_meta, dataset_instance) for dataset_instance in dataset_instances]
+    finally:
+        _forked_set_meta = None
+
+    rval = []
+    for dataset_instance, (exported, error, seconds) in zip(dataset_instances, results):
+        if exported is not None:
+            _load_exported_metadata(dataset_instance, exported)
+        elif error is None:
+            # metadata could not be sent back to this process
+            error, retry_seconds = _timed_set_meta(set_meta, dataset_instance)
+            seconds += retry_seconds
+        rval.append((error, seconds))
+    return rval
+
+
+def _timed_set_meta(set_meta, dataset_instance):
+    start = time.time()
+    error = None
+    try:
+        set_meta(dataset_instance)
+    except Exception:
+        error = traceback.format_exc()
+    return error, time.time() - start
+
+
+def _set_meta_attributes(dataset_instance):
+    return {name: getattr(dataset_instance, name) for name in FORKED_SET_META_ATTRIBUTES if hasattr(dataset_instance, name)}
+
+
+def _set_meta_in_forked_process(index):
+    set_meta, dataset_instances = _forked_set_meta
+    dataset_instance = dataset_instances[index]
+    attributes_before = _set_meta_attributes(dataset_instance)
+    error, seconds = _timed_set_meta(set_meta, dataset_instance)
+    if error is not None:
+        return None, error, seconds
+    metadata = {}
+    for name, value in (dataset_instance._metadata or {}).items():
+        if isinstance(value, galaxy.model.MetadataFile):
+            value = MetadataFileReference(value)
+        metadata[name] = value
+    # only send back what set_meta changed, the parent still holds the other values
+    attributes = {name: value for name, value in _set_meta_attributes(dataset_instance).items()
+                  if name not in attributes_before or attributes_before[name] != value}
+    exported = (attributes, metadata)
+    try:
+        pickle.dumps(exported)
+    except Exception:
+        log.debug("Metadata of %s cannot be pickled, setting it in the parent process", dataset_instance)
+        return None, None, seconds
+    return exported, None, seconds
+
+
+def _load_exported_metadata(dataset_instance, exported):
+    attributes, metadata = exported
+    metadata_files = {value.uuid: value for value in (dataset_instance._metadata or {}).values()
+                      if isinstance(value, galaxy.model.MetadataFile)}
+    for name, value in attributes.items():
+        setattr(dataset_instance, name, value)
+    dataset_instance._metadata = {
+        name: value.restore(dataset_instance, metadata_files) if isinstance(value, MetadataFileReference) else value
+        for name, value in metadata.items()
+    }
+
+
 __all__ = (
     "Statement",
     "MetadataElement",
@@ -705,4 +821,5 @@ __all__ = (
     "PythonObjectParameter",
     "FileParameter",
     "MetadataTempFile",
+    "set_meta_in_processes",
 )
@@ -0,0 +1,44 @@
+"""
+Add dataset_collection_state_summary table holding persisted rollups of collection
+element states, extensions and populated flag.
+"""
+
+import datetime
+import logging
+
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, MetaData, PrimaryKeyConstraint, Table
+
+from galaxy.model.custom_types import JSONType
+from galaxy.model.migrate.versions.util import (
+    create_table,
+    drop_table
+)
+
+log = logging.getLogger(__name__)
+now = datetime.datetime.utcnow
+metadata = MetaData()
+
+DatasetCollectionStateSummary_table = Table(
+    "dataset_collection_state_summary", metadata,
+    Column("dataset_collection_id", Integer, ForeignKey("dataset_collection.id"), primary_key=True, nullable=False),
+    Column("element_states", JSONType),
+    Column("extensions", JSONType),
+    Column("populated", Boolean),
+    Column("update_time", DateTime, default=now, onupdate=now),
+    PrimaryKeyConstraint(sqlite_on_conflict='IGNORE')
+)
+
+
+def upgrade(migrate_engine):
+    print(__doc__)
+    metadata.bind = migrate_engine
+    metadata.reflect()
+
+    create_table(DatasetCollectionStateSummary_table)
+
+
+def downgrade(migrate_engine):
+    metadata.bind = migrate_engine
+    metadata.reflect()
+
+    drop_table(DatasetCollectionStateSummary_table)
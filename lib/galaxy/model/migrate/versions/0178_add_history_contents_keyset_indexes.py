@@ -0,0 +1,62 @@
+"""
+Migration script to add composite indexes on (history_id, hid) and (history_id, update_time)
+of history contents, used for keyset pagination and for polling changed contents.
+"""
+
+import logging
+
+from sqlalchemy import (
+    Index,
+    MetaData,
+    Table,
+)
+
+from galaxy.model.migrate.versions.util import drop_index
+
+log = logging.getLogger(__name__)
+metadata = MetaData()
+
+indexes = [
+    [
+        "ix_history_dataset_association_history_id_hid",
+        "history_dataset_association",
+        ("history_id", "hid"),
+    ],
+    [
+        "ix_history_dataset_association_history_id_update_time",
+        "history_dataset_association",
+        ("history_id", "update_time"),
+    ],
+    [
+        "ix_history_dataset_collection_association_history_id_hid",
+        "history_dataset_collection_association",
+        ("history_id", "hid"),
+    ],
+    [
+        "ix_history_dataset_collection_association_history_id_update_time",
+        "history_dataset_collection_association",
+        ("history_id", "update_time"),
+    ],
+]
+
+
+def upgrade(migrate_engine):
+    print(__doc__)
+    metadata.bind = migrate_engine
+    metadata.reflect()
+
+    for ix, table_name, columns in indexes:
+        table = Table(table_name, metadata, autoload=True)
+        try:
+            Index(ix, *(table.c[column] for column in columns)).create()
+        except Exception:
+            log.exception("Adding index '%s' to table '%s' failed.", ix, table_name)
+
+
+def downgrade(migrate_engine):
+    metadata.bind = migrate_engine
+    metadata.reflect()
+
+    for ix, table_name, columns in indexes:
+        table = Table(table_name, metadata, autoload=True)
+        drop_index(Index(ix, *(table.c[column] for column in columns)), table)
@@ -0,0 +1,54 @@
+"""
+Add history_contents_aggregate and history_contents_count tables holding the size of
+histories and the counts of their contents by type, state, deleted and visible flags.
+"""
+
+import datetime
+import logging
+
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, MetaData, Numeric, Table
+
+from galaxy.model.custom_types import TrimmedString
+from galaxy.model.migrate.versions.util import (
+    create_table,
+    drop_table
+)
+
+log = logging.getLogger(__name__)
+now = datetime.datetime.utcnow
+metadata = MetaData()
+
+HistoryContentsAggregate_table = Table(
+    "history_contents_aggregate", metadata,
+    Column("history_id", Integer, ForeignKey("history.id"), primary_key=True, nullable=False),
+    Column("disk_size", Numeric(15, 0), default=0, nullable=False),
+    Column("update_time", DateTime, default=now, onupdate=now),
+)
+
+HistoryContentsCount_table = Table(
+    "history_contents_count", metadata,
+    Column("history_id", Integer, ForeignKey("history.id"), primary_key=True, nullable=False),
+    Column("history_content_type", TrimmedString(32), primary_key=True, nullable=False),
+    Column("state", TrimmedString(64), primary_key=True, nullable=False),
+    Column("deleted", Boolean, primary_key=True, nullable=False),
+    Column("visible", Boolean, primary_key=True, nullable=False),
+    Column("count", Integer, default=0, nullable=False),
+)
+
+
+def upgrade(migrate_engine):
+    print(__doc__)
+    metadata.bind = migrate_engine
+    metadata.reflect()
+
+    # aggregates are calculated when first read
+    create_table(HistoryContentsAggregate_table)
+    create_table(HistoryContentsCount_table)
+
+
+def downgrade(migrate_engine):
+    metadata.bind = migrate_engine
+    metadata.reflect()
+
+    drop_table(HistoryContentsCount_table)
+    drop_table(HistoryContentsAggregate_table)
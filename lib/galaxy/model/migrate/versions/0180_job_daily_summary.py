@@ -0,0 +1,50 @@
+"""
+Add the job_daily_summary table, rolling up the number of jobs per day, tool, user, state
+and destination for the reports app, and an index on job.create_time.
+"""
+
+import datetime
+import logging
+
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, MetaData, String, Table
+
+from galaxy.model.migrate.versions.util import (
+    add_index,
+    create_table,
+    drop_index,
+    drop_table
+)
+
+log = logging.getLogger(__name__)
+now = datetime.datetime.utcnow
+metadata = MetaData()
+
+JobDailySummary_table = Table(
+    "job_daily_summary", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("day", Date, index=True, nullable=False),
+    Column("tool_id", String(255), index=True),
+    Column("user_id", Integer, ForeignKey("galaxy_user.id"), index=True, nullable=True),
+    Column("state", String(64)),
+    Column("destination_id", String(255)),
+    Column("job_count", Integer, default=0, nullable=False),
+    Column("update_time", DateTime, default=now, onupdate=now, index=True),
+)
+
+
+def upgrade(migrate_engine):
+    print(__doc__)
+    metadata.bind = migrate_engine
+    metadata.reflect()
+
+    add_index("ix_job_create_time", "job", "create_time", metadata)
+    # summaries are calculated by the first compaction
+    create_table(JobDailySummary_table)
+
+
+def downgrade(migrate_engine):
+    metadata.bind = migrate_engine
+    metadata.reflect()
+
+    drop_table(JobDailySummary_table)
+    drop_index("ix_job_create_time", "job", "create_time", metadata)
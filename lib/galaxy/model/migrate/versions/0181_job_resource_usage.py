@@ -0,0 +1,77 @@
+"""
+Add the job_resource_usage table holding the numeric job metrics used to size destinations
+as typed columns, one row per job, and fill it from the job_metric_numeric table.
+"""
+
+import datetime
+import logging
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, MetaData, Numeric, String, Table
+
+from galaxy.model.migrate.versions.util import (
+    create_table,
+    drop_table
+)
+
+log = logging.getLogger(__name__)
+now = datetime.datetime.utcnow
+metadata = MetaData()
+
+JOB_METRIC_PRECISION = 26
+JOB_METRIC_SCALE = 7
+
+# (plugin, metric_name) of the job metrics to the columns storing them
+METRIC_COLUMNS = {
+    ("core", "runtime_seconds"): "runtime_seconds",
+    ("core", "galaxy_slots"): "galaxy_slots",
+    ("core", "galaxy_memory_mb"): "galaxy_memory_mb",
+    ("cgroup", "memory.max_usage_in_bytes"): "memory_max_usage",
+    ("cgroup", "cpuacct.usage"): "cpuacct_usage",
+}
+
+JobResourceUsage_table = Table(
+    "job_resource_usage", metadata,
+    Column("job_id", Integer, ForeignKey("job.id"), primary_key=True),
+    Column("create_time", DateTime, default=now),
+    Column("tool_id", String(255)),
+    Column("destination_id", String(255)),
+    *(Column(column, Numeric(JOB_METRIC_PRECISION, JOB_METRIC_SCALE)) for column in METRIC_COLUMNS.values()),
+    Index("ix_job_resource_usage_tool_id_destination_id_create_time", "tool_id", "destination_id", "create_time"),
+    Index("ix_job_resource_usage_destination_id_create_time", "destination_id", "create_time"),
+)
+
+
+def upgrade(migrate_engine):
+    print(__doc__)
+    metadata.bind = migrate_engine
+    metadata.reflect()
+
+    create_table(JobResourceUsage_table)
+    pivots = ", ".join(
+        f"MAX(CASE WHEN m.plugin = '{plugin}' AND m.metric_name = '{metric_name}' THEN m.metric_value END)"
+        for plugin, metric_name in METRIC_COLUMNS
+    )
+    metric_filter = " OR ".join(
+        f"(m.plugin = '{plugin}' AND m.metric_name = '{metric_name}')"
+        for plugin, metric_name in METRIC_COLUMNS
+    )
+    cmd = f"""
+        INSERT INTO job_resource_usage
+                    (job_id, create_time, tool_id, destination_id, {', '.join(METRIC_COLUMNS.values())})
+             SELECT job.id, job.update_time, job.tool_id, job.destination_id, {pivots}
+               FROM job
+                    JOIN job_metric_numeric m ON m.job_id = job.id
+              WHERE {metric_filter}
+           GROUP BY job.id, job.update_time, job.tool_id, job.destination_id
+    """
+    try:
+        migrate_engine.execute(cmd)
+    except Exception:
+        log.exception("Filling the job_resource_usage table failed.")
+
+
+def downgrade(migrate_engine):
+    metadata.bind = migrate_engine
+    metadata.reflect()
+
+    drop_table(JobResourceUsage_table)
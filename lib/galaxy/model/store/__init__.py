@@ -3,8 +3,10 @@ import contextlib
 import datetime
 import os
 import shutil
+import subprocess
 import tarfile
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from json import (
     dump,
     dumps,
@@ -14,13 +16,15 @@ from uuid import uuid4
 
 from bdbag import bdbag_api as bdb
 from boltons.iterutils import remap
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy.sql import expression
 
 from galaxy.exceptions import MalformedContents, ObjectNotFound
+from galaxy.objectstore import object_store_caches_files
 from galaxy.security.idencoding import IdEncodingHelper
 from galaxy.util import FILENAME_VALID_CHARS
 from galaxy.util import in_directory
+from galaxy.util import which
 from galaxy.util.bunch import Bunch
 from galaxy.util.path import safe_walk
 from ..custom_types import json_encoder
@@ -35,6 +39,8 @@ ATTRS_FILENAME_COLLECTIONS = 'collections_attrs.txt'
 ATTRS_FILENAME_EXPORT = 'export_attrs.txt'
 ATTRS_FILENAME_LIBRARIES = 'libraries_attrs.txt'
 GALAXY_EXPORT_VERSION = "2"
+# Maximum number of ids per IN clause of the bulk queries run while exporting.
+EXPORT_QUERY_CHUNK_SIZE = 500
 
 
 class ImportOptions:
@@ -1015,7 +1021,7 @@ class ModelExportStore(metaclass=abc.ABCMeta):
 
 class DirectoryModelExportStore(ModelExportStore):
 
-    def __init__(self, export_directory, app=None, for_edit=False, serialize_dataset_objects=None, export_files=None, strip_metadata_files=True, serialize_jobs=True):
+    def __init__(self, export_directory, app=None, for_edit=False, serialize_dataset_objects=None, export_files=None, strip_metadata_files=True, serialize_jobs=True, prefetch_threads=1):
         """
         :param export_directory: path to export directory. Will be created if it does not exist.
         :param app: Galaxy App or app-like object. Must be provided if `for_edit` and/or `serialize_dataset_objects` are True
@@ -1024,6 +1030,8 @@ class DirectoryModelExportStore(ModelExportStore):
         :param export_files: How files should be exported, can be 'symlink', 'copy' or None, in which case files
                              will not be serialized.
         :param serialize_jobs: Include job data in model export. Not needed for set_metadata script.
+        :param prefetch_threads: Number of threads fetching dataset files into the object store
+                                 cache before they are exported.
         """
         if not os.path.exists(export_directory):
             os.makedirs(export_directory)
@@ -1055,63 +1063,66 @@ class DirectoryModelExportStore(ModelExportStore):
         self.collection_datasets = {}
         self.collections_attrs = []
         self.dataset_id_to_path = {}
+        self.prefetch_threads = prefetch_threads
+        # File names of datasets, resolved through the object store once per dataset.
+        self.dataset_id_to_file_name = {}
+        # Datasets with the same recorded hash are exported once, see _prefetch_files.
+        self.dataset_id_to_content_key = {}
+        self.content_key_to_path = {}
 
         self.job_output_dataset_associations = {}
 
+    def _add_file(self, src, arcname):
+        """
+        Add the file or directory src to the export as arcname.
+        """
+        dest = os.path.join(self.export_directory, arcname)
+        dest_dir = os.path.dirname(dest)
+        if not os.path.exists(dest_dir):
+            os.makedirs(dest_dir)
+        if self.export_files == "symlink":
+            os.symlink(src, dest)
+        elif os.path.isdir(src):
+            shutil.copytree(src, dest)
+        else:
+            shutil.copyfile(src, dest)
+
     def serialize_files(self, dataset, as_dict):
         if self.export_files is None:
             return None
-        elif self.export_files == "symlink":
-            add = os.symlink
-        elif self.export_files == "copy":
-            def add(src, dest):
-                if os.path.isdir(src):
-                    shutil.copytree(src, dest)
-                else:
-                    shutil.copyfile(src, dest)
-
-        export_directory = self.export_directory
 
         _, include_files = self.included_datasets[dataset.id]
         if not include_files:
             return
 
-        file_name, extra_files_path = None, None
-        try:
-            _file_name = dataset.file_name
-            if os.path.exists(_file_name):
-                file_name = _file_name
-        except ObjectNotFound:
-            pass
-
-        if dataset.extra_files_path_exists():
-            extra_files_path = dataset.extra_files_path
-        else:
-            pass
-
         dir_name = 'datasets'
-        dir_path = os.path.join(export_directory, dir_name)
         dataset_hid = as_dict['hid']
         assert dataset_hid, as_dict
 
-        if dataset.dataset.id in self.dataset_id_to_path:
-            file_name, extra_files_path = self.dataset_id_to_path[dataset.dataset.id]
+        content_key = self.dataset_id_to_content_key.get(dataset.dataset.id)
+        exported_path = self.dataset_id_to_path.get(dataset.dataset.id) or self.content_key_to_path.get(content_key)
+        if exported_path:
+            file_name, extra_files_path = exported_path
             if file_name is not None:
                 as_dict['file_name'] = file_name
             if extra_files_path is not None:
                 as_dict['extra_files_path'] = extra_files_path
             return
 
-        if file_name:
-            if not os.path.exists(dir_path):
-                os.makedirs(dir_path)
+        file_name, extra_files_path = None, None
+        _file_name = self._dataset_file_name(dataset)
+        if _file_name and os.path.exists(_file_name):
+            file_name = _file_name
 
+        if dataset.extra_files_path_exists():
+            extra_files_path = dataset.extra_files_path
+        else:
+            pass
+
+        if file_name:
             target_filename = get_export_dataset_filename(as_dict['name'], as_dict['extension'], dataset_hid)
             arcname = os.path.join(dir_name, target_filename)
-
-            src = file_name
-            dest = os.path.join(export_directory, arcname)
-            add(src, dest)
+            self._add_file(file_name, arcname)
             as_dict['file_name'] = arcname
 
         if extra_files_path:
@@ -1122,12 +1133,86 @@ class DirectoryModelExportStore(ModelExportStore):
 
             if len(file_list):
                 arcname = os.path.join(dir_name, f'extra_files_path_{dataset_hid}')
-                add(extra_files_path, os.path.join(export_directory, arcname))
+                self._add_file(extra_files_path, arcname)
                 as_dict['extra_files_path'] = arcname
             else:
                 as_dict['extra_files_path'] = ''
 
         self.dataset_id_to_path[dataset.dataset.id] = (as_dict.get("file_name"), as_dict.get("extra_files_path"))
+        if content_key is not None:
+            self.content_key_to_path[content_key] = self.dataset_id_to_path[dataset.dataset.id]
+
+    def _dataset_file_name(self, dataset_instance):
+        """
+        Return the file name of ``dataset_instance`` (or None if the object store can't
+        find it), resolved through the object store once per dataset.
+        """
+        dataset_id = dataset_instance.dataset.id
+        if dataset_id in self.dataset_id_to_file_name:
+            return self.dataset_id_to_file_name[dataset_id]
+        try:
+            file_name = dataset_instance.file_name
+        except ObjectNotFound:
+            file_name = None
+        if dataset_id is not None:
+            self.dataset_id_to_file_name[dataset_id] = file_name
+        return file_name
+
+    def _prefetch_files(self, dataset_instances):
+        """
+        Fetch the files of dataset_instances into the object store cache ahead of
+        serialization, using ``prefetch_threads`` threads, if the object store has one.
+        The threads only get the identifiers of the datasets, never the database objects.
+        Also look up recorded hashes of the datasets in bulk, datasets sharing a hash of
+        their primary file (and without extra files) are then exported only once.
+        """
+        datasets = {}
+        for dataset_instance in dataset_instances:
+            dataset = dataset_instance.dataset
+            if dataset.id is not None:
+                datasets[dataset.id] = dataset
+        if not datasets:
+            return
+
+        if not self.sessionless:
+            sa_session = self.app.model.session
+            dataset_ids = list(datasets)
+            for i in range(0, len(dataset_ids), EXPORT_QUERY_CHUNK_SIZE):
+                chunk = dataset_ids[i:i + EXPORT_QUERY_CHUNK_SIZE]
+                rows = (sa_session.query(model.DatasetHash.dataset_id, model.DatasetHash.hash_function, model.DatasetHash.hash_value)
+                        .filter(model.DatasetHash.dataset_id.in_(chunk))
+                        .filter(model.DatasetHash.extra_files_path.is_(None)))
+                for dataset_id, hash_function, hash_value in rows:
+                    self.dataset_id_to_content_key.setdefault(dataset_id, (hash_function, hash_value))
+
+        # Datasets with extra files are not deduplicated by the hash of their primary file.
+        for dataset_id in list(self.dataset_id_to_content_key):
+            if datasets[dataset_id].extra_files_path_exists():
+                del self.dataset_id_to_content_key[dataset_id]
+
+        # Deduplicated datasets are not exported, so their files are not needed.
+        keys = []
+        seen_content_keys = set()
+        for dataset in datasets.values():
+            content_key = self.dataset_id_to_content_key.get(dataset.id)
+            if content_key is not None:
+                if content_key in seen_content_keys:
+                    continue
+                seen_content_keys.add(content_key)
+            if not (dataset.purged or dataset.external_filename):
+                keys.append(Bunch(id=dataset.id, uuid=dataset.uuid, object_store_id=dataset.object_store_id))
+
+        threads = min(self.prefetch_threads, len(keys))
+        object_store = model.Dataset.object_store
+        if threads > 1 and object_store_caches_files(object_store):
+            def fetch(key):
+                try:
+                    object_store.get_filename(key)
+                except ObjectNotFound:
+                    pass
+
+            with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='export-prefetch') as executor:
+                list(executor.map(fetch, keys))
 
     def exported_key(self, obj):
         return self.serialization_options.get_identifier(self.security, obj)
@@ -1236,6 +1321,9 @@ class DirectoryModelExportStore(ModelExportStore):
             else:
                 provenance_attrs.append(dataset)
 
+        if self.export_files is not None:
+            self._prefetch_files(datasets_attrs)
+
         def to_json(attributes):
             return json_encoder.encode([a.serialize(self.security, self.serialization_options) for a in attributes])
 
@@ -1273,6 +1361,13 @@ class DirectoryModelExportStore(ModelExportStore):
             jobs_dict = {}
             implicit_collection_jobs_dict = {}
 
+            def record_job(job):
+                jobs_dict[job.id] = job
+                icja = job.implicit_collection_jobs_association
+                if icja:
+                    implicit_collection_jobs = icja.implicit_collection_jobs
+                    implicit_collection_jobs_dict[implicit_collection_jobs.id] = implicit_collection_jobs
+
             def record_associated_jobs(obj):
                 # Get the job object.
                 job = None
@@ -1284,23 +1379,10 @@ class DirectoryModelExportStore(ModelExportStore):
                     # No viable job.
                     return
 
-                jobs_dict[job.id] = job
-                icja = job.implicit_collection_jobs_association
-                if icja:
-                    implicit_collection_jobs = icja.implicit_collection_jobs
-                    implicit_collection_jobs_dict[implicit_collection_jobs.id] = implicit_collection_jobs
+                record_job(job)
 
-            for hda, _include_files in self.included_datasets.values():
-                # Get the associated job, if any. If this hda was copied from another,
-                # we need to find the job that created the origial hda
-                job_hda = hda
-                while job_hda.copied_from_history_dataset_association:  # should this check library datasets as well?
-                    job_hda = job_hda.copied_from_history_dataset_association
-                if not job_hda.creating_job_associations:
-                    # No viable HDA found.
-                    continue
-
-                record_associated_jobs(job_hda)
+            for job in self._creating_jobs([hda for hda, _include_files in self.included_datasets.values()]):
+                record_job(job)
 
             for hdca in self.included_collections:
                 record_associated_jobs(hdca)
@@ -1399,6 +1481,75 @@ class DirectoryModelExportStore(ModelExportStore):
         with open(jobs_attrs_filename, 'w') as jobs_attrs_out:
             jobs_attrs_out.write(json_encoder.encode(jobs_attrs))
 
+    def _creating_jobs(self, dataset_instances):
+        """
+        Return the jobs that created dataset_instances. If a dataset instance was copied from
+        another HDA, the job that created the original HDA is returned.
+
+        Copy chains of persisted HDAs are followed with one query per copy generation and
+        their jobs are loaded, along with everything serialized for them, in bulk.
+        """
+        jobs = {}
+        hda_ids = []
+        for dataset_instance in dataset_instances:
+            if not self.sessionless and isinstance(dataset_instance, model.HistoryDatasetAssociation) and dataset_instance.id is not None:
+                hda_ids.append(dataset_instance.id)
+                continue
+            job_hda = dataset_instance
+            while job_hda.copied_from_history_dataset_association:  # should this check library datasets as well?
+                job_hda = job_hda.copied_from_history_dataset_association
+            for assoc in job_hda.creating_job_associations:
+                jobs[assoc.job.id] = assoc.job
+                break
+        if not hda_ids:
+            return list(jobs.values())
+
+        sa_session = self.app.model.session
+        HDA = model.HistoryDatasetAssociation
+        copied_from = {}
+        pending = set(hda_ids)
+        while pending:
+            for chunk in _chunks(list(pending)):
+                query = sa_session.query(HDA.id, HDA.copied_from_history_dataset_association_id).filter(HDA.id.in_(chunk))
+                for hda_id, copied_from_id in query:
+                    copied_from[hda_id] = copied_from_id
+            pending = {copied_from_id for copied_from_id in copied_from.values() if copied_from_id is not None} - set(copied_from)
+
+        def original_hda_id(hda_id):
+            seen = set()
+            while copied_from.get(hda_id) is not None and hda_id not in seen:
+                seen.add(hda_id)
+                hda_id = copied_from[hda_id]
+            return hda_id
+
+        original_hda_ids = [original_hda_id(hda_id) for hda_id in hda_ids]
+        job_id_by_hda_id = {}
+        for chunk in _chunks(list(set(original_hda_ids))):
+            query = (sa_session.query(model.JobToOutputDatasetAssociation.dataset_id, model.JobToOutputDatasetAssociation.job_id)
+                     .filter(model.JobToOutputDatasetAssociation.dataset_id.in_(chunk))
+                     .order_by(model.JobToOutputDatasetAssociation.id))
+            for hda_id, job_id in query:
+                job_id_by_hda_id.setdefault(hda_id, job_id)
+
+        job_ids = list({job_id_by_hda_id[hda_id]: None for hda_id in original_hda_ids if hda_id in job_id_by_hda_id})
+        loaded_jobs = {}
+        for chunk in _chunks(job_ids):
+            query = (sa_session.query(model.Job)
+                     .filter(model.Job.id.in_(chunk))
+                     .options(selectinload(model.Job.parameters),
+                              selectinload(model.Job.input_datasets).joinedload(model.JobToInputDatasetAssociation.dataset),
+                              selectinload(model.Job.output_datasets).joinedload(model.JobToOutputDatasetAssociation.dataset),
+                              selectinload(model.Job.input_dataset_collections),
+                              selectinload(model.Job.input_dataset_collection_elements),
+                              selectinload(model.Job.output_dataset_collection_instances),
+                              selectinload(model.Job.output_dataset_collections),
+                              selectinload(model.Job.implicit_collection_jobs_association)))
+            for job in query:
+                loaded_jobs[job.id] = job
+        for job_id in job_ids:
+            jobs[job_id] = loaded_jobs[job_id]
+        return list(jobs.values())
+
     def __exit__(self, exc_type, exc_val, exc_tb):
         if exc_type is None:
             self._finalize()
@@ -1408,16 +1559,27 @@ class DirectoryModelExportStore(ModelExportStore):
 
 
 class TarModelExportStore(DirectoryModelExportStore):
+    """
+    Export into a (gzipped) tar archive. Dataset files are not copied into the export
+    directory first but streamed into the archive from where they are stored.
+    """
 
     def __init__(self, out_file, gzip=True, **kwds):
         self.gzip = gzip
         self.out_file = out_file
+        self.archive_files = []
         temp_output_dir = tempfile.mkdtemp()
         super().__init__(temp_output_dir, **kwds)
 
+    def _add_file(self, src, arcname):
+        self.archive_files.append((src, arcname))
+
     def _finalize(self):
         super()._finalize()
-        tar_export_directory(self.export_directory, self.out_file, self.gzip)
+        with open_export_tarfile(self.out_file, self.gzip) as history_archive:
+            _add_export_directory(history_archive, self.export_directory)
+            for src, arcname in self.archive_files:
+                history_archive.add(src, arcname=arcname)
         shutil.rmtree(self.export_directory)
 
 
@@ -1448,14 +1610,49 @@ class BagArchiveModelExportStore(BagDirectoryModelExportStore):
         shutil.rmtree(self.export_directory)
 
 
-def tar_export_directory(export_directory, out_file, gzip):
-    tarfile_mode = "w"
-    if gzip:
-        tarfile_mode += ":gz"
+def _chunks(ids, size=EXPORT_QUERY_CHUNK_SIZE):
+    for i in range(0, len(ids), size):
+        yield ids[i:i + size]
+
 
-    with tarfile.open(out_file, tarfile_mode, dereference=True) as history_archive:
-        for export_path in os.listdir(export_directory):
-            history_archive.add(os.path.join(export_directory, export_path), arcname=export_path)
+@contextlib.contextmanager
+def open_export_tarfile(out_file, gzip):
+    """
+    Open out_file as a tar archive for writing, following symlinks. If gzip is set and
+    ``pigz`` is available, the archive is compressed by pigz using ``$GALAXY_SLOTS``
+    threads instead of by Python on a single core.
+    """
+    pigz = which("pigz") if gzip else None
+    if not pigz:
+        tarfile_mode = "w:gz" if gzip else "w"
+        with tarfile.open(out_file, tarfile_mode, dereference=True) as archive:
+            yield archive
+        return
+
+    pigz_cmd = [pigz, "-c"]
+    slots = os.environ.get("GALAXY_SLOTS")
+    if slots:
+        pigz_cmd.extend(["-p", slots])
+    with open(out_file, "wb") as out:
+        pigz_process = subprocess.Popen(pigz_cmd, stdin=subprocess.PIPE, stdout=out)
+        try:
+            with tarfile.open(fileobj=pigz_process.stdin, mode="w|", dereference=True) as archive:
+                yield archive
+        finally:
+            pigz_process.stdin.close()
+            returncode = pigz_process.wait()
+    if returncode != 0:
+        raise Exception(f"Compressing history archive with pigz failed with exit code {returncode}")
+
+
+def _add_export_directory(archive, export_directory):
+    for export_path in os.listdir(export_directory):
+        archive.add(os.path.join(export_directory, export_path), arcname=export_path)
+
+
+def tar_export_directory(export_directory, out_file, gzip):
+    with open_export_tarfile(out_file, gzip) as history_archive:
+        _add_export_directory(history_archive, export_directory)
 
 
 def get_export_dataset_filename(name, ext, hid):
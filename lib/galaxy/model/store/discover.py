@@ -19,6 +19,7 @@ from galaxy.exceptions import (
     RequestParameterInvalidException
 )
 from galaxy.model.dataset_collections import builder
+from galaxy.model.metadata import set_meta_in_processes
 from galaxy.util import (
     chunk_iterable,
     ExecutionTimer
@@ -37,6 +38,12 @@ class ModelPersistenceContext(metaclass=abc.ABCMeta):
     This class implement the create_dataset method that takes care of populating metadata
     required for datasets and other potential model objects.
     """
+    # Processes setting the metadata of discovered datasets, only contexts without a database
+    # session (i.e. the metadata step of jobs) may use more than one.
+    metadata_processes = 1
+    metadata_datasets = 0
+    metadata_seconds = 0.0
+
     def create_dataset(
         self,
         ext,
@@ -180,9 +187,9 @@ class ModelPersistenceContext(metaclass=abc.ABCMeta):
 
         return primary_data
 
-    @staticmethod
-    def set_datasets_metadata(datasets, datasets_attributes=None):
+    def set_datasets_metadata(self, datasets, datasets_attributes=None):
         datasets_attributes = datasets_attributes or [{} for _ in datasets]
+        set_meta_datasets = []
         for primary_data, dataset_attributes in zip(datasets, datasets_attributes):
             # add tool/metadata provided information
             if dataset_attributes:
@@ -202,12 +209,22 @@ class ModelPersistenceContext(metaclass=abc.ABCMeta):
                     # branch tested with tool_provided_metadata_3 / tool_provided_metadata_10
                     primary_data.metadata.from_JSON_dict(json_dict=metadata_dict)
                 else:
-                    primary_data.set_meta()
+                    set_meta_datasets.append(primary_data)
             except Exception:
                 if primary_data.state == galaxy.model.HistoryDatasetAssociation.states.OK:
                     primary_data.state = galaxy.model.HistoryDatasetAssociation.states.FAILED_METADATA
                 log.exception("Exception occured while setting metdata")
 
+        results = set_meta_in_processes(set_meta_datasets, lambda primary_data: primary_data.set_meta(), processes=self.metadata_processes)
+        for primary_data, (error, seconds) in zip(set_meta_datasets, results):
+            self.metadata_datasets += 1
+            self.metadata_seconds += seconds
+            if error is not None:
+                if primary_data.state == galaxy.model.HistoryDatasetAssociation.states.OK:
+                    primary_data.state = galaxy.model.HistoryDatasetAssociation.states.FAILED_METADATA
+                log.error("Exception occured while setting metdata: %s", error)
+
+        for primary_data in datasets:
             try:
                 primary_data.set_peek()
             except Exception:
@@ -64,12 +64,56 @@ class TagHandler:
         # precondition: item is already security checked against user
         # precondition: incoming tags is a list of sanitized/formatted strings
         self.delete_item_tags(user, item)
-        new_tags_str = ','.join(new_tags_list)
-        self.apply_item_tags(user, item, unicodify(new_tags_str, 'utf-8'), flush=flush)
+        for name, value in self._parse_tags_from_list(new_tags_list):
+            self.apply_item_tag(user, item, name, value, flush=flush)
         if flush:
             self.sa_session.flush()
         return item.tags
 
+    def bulk_set_tags_from_list(self, user, item_class, item_ids, new_tags_list):
+        """
+        Replace the tags of all ``item_class`` items with ``item_ids`` with ``new_tags_list``
+        using one DELETE and one multi-row INSERT, without loading the items. Tags are
+        parsed and scrubbed as ``set_tags_from_list`` does.
+        """
+        # precondition: items are already security checked against user
+        # precondition: incoming tags is a list of sanitized/formatted strings
+        item_tag_assoc_table = self.get_tag_assoc_class(item_class).table
+        item_id_col = self.get_id_col_in_item_tag_assoc_table(item_class)
+        self.sa_session.execute(item_tag_assoc_table.delete().where(item_id_col.in_(item_ids)))
+        tags = []
+        tags_by_name = {}
+        # as apply_item_tag, a tag applied again with the same name and value is applied once
+        for name, value in dict.fromkeys(self._parse_tags_from_list(new_tags_list)):
+            lc_name = name.lower()
+            if lc_name not in tags_by_name:
+                tags_by_name[lc_name] = self._get_or_create_tag(lc_name)
+            tag = tags_by_name[lc_name]
+            if not tag:
+                log.warning(f"Failed to create tag with name {lc_name}")
+                continue
+            tags.append((tag, name, value))
+        if not tags or not item_ids:
+            return
+        # persist newly created tags to get their ids
+        self.sa_session.flush()
+        rows = []
+        for item_id in item_ids:
+            for tag, name, value in tags:
+                rows.append({
+                    item_id_col.key: item_id,
+                    'tag_id': tag.id,
+                    'user_id': user.id if user else None,
+                    'user_tname': name,
+                    'user_value': value,
+                    'value': value.lower() if value else None,
+                })
+        self.sa_session.execute(item_tag_assoc_table.insert(), rows)
+
+    def _parse_tags_from_list(self, new_tags_list):
+        """Return the ``(name, value)`` pairs of the tags in a list of tag strings."""
+        return self.parse_tags(unicodify(','.join(new_tags_list), 'utf-8'))
+
     def get_tag_assoc_class(self, item_class):
         """Returns tag association class for item class."""
         return self.item_tag_assoc_info[item_class.__name__].tag_assoc_class
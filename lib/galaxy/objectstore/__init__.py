@@ -124,6 +124,20 @@ class ObjectStore(metaclass=abc.ABCMeta):
         """
         raise NotImplementedError()
 
+    @abc.abstractmethod
+    def delete_many(self, requests):
+        """
+        Delete several objects, possibly with fewer requests to the backend than
+        calling `delete` for each of them.
+
+        :type requests: list of (obj, kwargs) tuples
+        :param requests: The objects to delete, kwargs are the keyword arguments
+            `delete` would be called with for obj.
+
+        Return a list with the result `delete` would have returned for each request.
+        """
+        raise NotImplementedError()
+
     @abc.abstractmethod
     def get_data(self, obj, start=0, count=-1, base_dir=None, extra_dir=None, extra_dir_at_root=False, alt_name=None, obj_dir=False):
         """
@@ -167,6 +181,17 @@ class ObjectStore(metaclass=abc.ABCMeta):
         """
         raise NotImplementedError()
 
+    @abc.abstractmethod
+    def get_object_identifier(self, obj, base_dir=None, dir_only=False, extra_dir=None, extra_dir_at_root=False, alt_name=None, obj_dir=False):
+        """
+        Return the identifier of the object's location in the backend, e.g. a path
+        for disk based stores or a key for cloud stores, or None if unknown.
+
+        Unlike `get_filename` this never fetches the object into a cache, so it can
+        be used for logging purposes.
+        """
+        raise NotImplementedError()
+
     @abc.abstractmethod
     def get_object_url(self, obj, extra_dir=None, extra_dir_at_root=False, alt_name=None, obj_dir=False):
         """
@@ -305,6 +330,9 @@ class BaseObjectStore(ObjectStore):
     def delete(self, obj, **kwargs):
         return self._invoke('delete', obj, **kwargs)
 
+    def delete_many(self, requests):
+        return [self.delete(obj, **kwargs) for obj, kwargs in requests]
+
     def get_data(self, obj, **kwargs):
         return self._invoke('get_data', obj, **kwargs)
 
@@ -314,6 +342,9 @@ class BaseObjectStore(ObjectStore):
     def update_from_file(self, obj, **kwargs):
         return self._invoke('update_from_file', obj, **kwargs)
 
+    def get_object_identifier(self, obj, **kwargs):
+        return self._invoke('get_object_identifier', obj, **kwargs)
+
     def get_object_url(self, obj, **kwargs):
         return self._invoke('get_object_url', obj, **kwargs)
 
@@ -373,6 +404,9 @@ class ConcreteObjectStore(BaseObjectStore):
     def _get_store_by(self, obj):
         return self.store_by
 
+    def _get_object_identifier(self, obj, **kwargs):
+        return self._construct_path(obj, **kwargs)
+
 
 class DiskObjectStore(ConcreteObjectStore):
     """
@@ -629,6 +663,14 @@ class DiskObjectStore(ConcreteObjectStore):
                 log.critical(f'Error copying {file_name} to {self.__get_filename(obj, **kwargs)}: {ex}')
                 raise ex
 
+    def _get_object_identifier(self, obj, **kwargs):
+        """Override `ObjectStore`'s stub; the path, without checking the file exists."""
+        if self.check_old_style:
+            path = self._construct_path(obj, old_style=True, **kwargs)
+            if os.path.exists(path):
+                return path
+        return self._construct_path(obj, **kwargs)
+
     def _get_object_url(self, obj, **kwargs):
         """
         Override `ObjectStore`'s stub.
@@ -701,6 +743,10 @@ class NestedObjectStore(BaseObjectStore):
             kwargs['create'] = False
         return self._call_method('_update_from_file', obj, ObjectNotFound, True, **kwargs)
 
+    def _get_object_identifier(self, obj, **kwargs):
+        """For the first backend that has this `obj`, get its identifier."""
+        return self._call_method('_get_object_identifier', obj, None, False, **kwargs)
+
     def _get_object_url(self, obj, **kwargs):
         """For the first backend that has this `obj`, get its URL."""
         return self._call_method('_get_object_url', obj, None, False, **kwargs)
@@ -894,6 +940,21 @@ class DistributedObjectStore(NestedObjectStore):
                           % (obj.object_store_id, obj.__class__.__name__, obj.id))
             self.backends[obj.object_store_id].create(obj, **kwargs)
 
+    def delete_many(self, requests):
+        """Hand the requests for each backend to that backend's `delete_many`."""
+        results = [False] * len(requests)
+        indexes_by_store_id = {}
+        for index, (obj, kwargs) in enumerate(requests):
+            lookup_kwargs = {k: v for k, v in kwargs.items() if k != 'entire_dir'}
+            object_store_id = self.__get_store_id_for(obj, **lookup_kwargs)
+            if object_store_id is not None:
+                indexes_by_store_id.setdefault(object_store_id, []).append(index)
+        for object_store_id, indexes in indexes_by_store_id.items():
+            store_results = self.backends[object_store_id].delete_many([requests[index] for index in indexes])
+            for index, result in zip(indexes, store_results):
+                results[index] = result
+        return results
+
     def _call_method(self, method, obj, default, default_is_exception, **kwargs):
         object_store_id = self.__get_store_id_for(obj, **kwargs)
         if object_store_id is not None:
@@ -1080,6 +1141,13 @@ def local_extra_dirs(func):
     return wraps
 
 
+def object_store_caches_files(object_store):
+    """Return whether resolving paths through ``object_store`` may fetch files into a cache."""
+    if getattr(object_store, 'staging_path', None):
+        return True
+    return any(object_store_caches_files(backend) for backend in getattr(object_store, 'backends', {}).values())
+
+
 def convert_bytes(bytes):
     """A helper function used for pretty printing disk usage."""
     if bytes is None:
@@ -55,6 +55,9 @@ class PulsarObjectStore(BaseObjectStore):
     def _get_store_usage_percent(self):
         return self.pulsar_client.get_store_usage_percent()
 
+    def _get_object_identifier(self, obj, **kwds):
+        return None
+
     def _get_object_url(self, obj, extra_dir=None, extra_dir_at_root=False, alt_name=None):
         return None
 
@@ -34,6 +34,9 @@ from ..objectstore import ConcreteObjectStore, convert_bytes
 NO_BOTO_ERROR_MESSAGE = ("S3/Swift object store configured, but no boto dependency available."
                          "Please install and properly configure boto or modify object store configuration.")
 
+# Maximum number of keys S3 accepts in a single multi-object delete request.
+MULTI_DELETE_MAX_KEYS = 1000
+
 log = logging.getLogger(__name__)
 logging.getLogger('boto').setLevel(logging.INFO)  # Otherwise boto is quite noisy
 
@@ -614,9 +617,8 @@ class S3ObjectStore(ConcreteObjectStore, CloudConfigMixin):
             if entire_dir and extra_dir:
                 shutil.rmtree(self._get_cache_path(rel_path))
                 results = self._bucket.get_all_keys(prefix=rel_path)
-                for key in results:
-                    log.debug("Deleting key %s", key.name)
-                    key.delete()
+                log.debug("Deleting %d keys with prefix %s", len(results), rel_path)
+                self._bucket.delete_keys(results, quiet=True)
                 return True
             else:
                 # Delete from cache first
@@ -633,6 +635,41 @@ class S3ObjectStore(ConcreteObjectStore, CloudConfigMixin):
             log.exception('%s delete error', self._get_filename(obj, **kwargs))
         return False
 
+    def delete_many(self, requests):
+        """
+        Delete objects using S3 multi-object deletes of up to 1000 keys each. Entire
+        directories and job working directory contents are deleted as by `delete`.
+        """
+        results = [False] * len(requests)
+        indexes_by_rel_path = {}
+        for index, (obj, kwargs) in enumerate(requests):
+            if kwargs.get('entire_dir') or kwargs.get('base_dir'):
+                results[index] = self.delete(obj, **kwargs)
+                continue
+            rel_path = self._construct_path(obj, **kwargs)
+            try:
+                os.unlink(self._get_cache_path(rel_path))
+            except FileNotFoundError:
+                pass
+            except OSError:
+                log.exception("Could not delete %s from the cache", rel_path)
+            indexes_by_rel_path.setdefault(rel_path, []).append(index)
+        rel_paths = list(indexes_by_rel_path)
+        for i in range(0, len(rel_paths), MULTI_DELETE_MAX_KEYS):
+            chunk = rel_paths[i:i + MULTI_DELETE_MAX_KEYS]
+            try:
+                result = self._bucket.delete_keys(chunk, quiet=True)
+                failed = {error.key for error in result.errors}
+            except S3ResponseError:
+                log.exception("Could not delete %d keys from S3", len(chunk))
+                failed = set(chunk)
+            for rel_path in chunk:
+                if rel_path in failed:
+                    log.error("Could not delete key '%s' from S3", rel_path)
+                for index in indexes_by_rel_path[rel_path]:
+                    results[index] = rel_path not in failed
+        return results
+
     def _get_data(self, obj, start=0, count=-1, **kwargs):
         rel_path = self._construct_path(obj, **kwargs)
         # Check cache first and get file if not there
@@ -255,6 +255,7 @@ def rebuild_toolbox_search_index(app, **kwargs):
 
 
 def reload_job_rules(app, **kwargs):
+    from galaxy.jobs.mapper import rule_cache
     reload_timer = util.ExecutionTimer()
     for module in job_rule_modules(app):
         rules_module_name = module.__name__
@@ -263,6 +264,7 @@ def reload_job_rules(app, **kwargs):
                     and ismodule(module)):
                 log.debug("Reloading job rules module: %s", name)
                 importlib.reload(module)
+    rule_cache.clear()
     log.debug("Job rules reloaded %s", reload_timer)
 
 
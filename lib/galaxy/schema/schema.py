@@ -632,6 +632,43 @@ class UpdateHistoryContentsBatchPayload(Model):
             "otherwise cannot delete uploading files, so it will raise an error."
         ),
     )
+    visible: Optional[bool] = Field(
+        default=None,
+        title="Visible",
+        description="Whether the items should be visible in the history. Only used with `bulk`.",
+    )
+    purged: Optional[bool] = Field(
+        default=None,
+        title="Purged",
+        description="Whether to purge the datasets (collections are only deleted). Only used with `bulk`.",
+    )
+    tags: Optional[List[str]] = Field(
+        default=None,
+        title="Tags",
+        description="A list of tags replacing the current tags of the items. Only used with `bulk`.",
+    )
+    bulk: Optional[bool] = Field(
+        default=False,
+        title="Bulk",
+        description=(
+            "Apply the changes to all items at once with set-based updates and "
+            "return a summary with the number of updated items instead of the item views."
+        ),
+    )
+
+
+class UpdateHistoryContentsBulkResult(Model):
+    """Summary of a bulk update of history contents."""
+    dataset_count: int = Field(
+        ...,
+        title="Dataset Count",
+        description="The number of datasets updated.",
+    )
+    dataset_collection_count: int = Field(
+        ...,
+        title="Dataset Collection Count",
+        description="The number of dataset collections updated.",
+    )
 
 
 class HistoryBase(BaseModel):
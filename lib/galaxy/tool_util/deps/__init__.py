@@ -6,6 +6,7 @@ import json
 import logging
 import os.path
 import shutil
+import threading
 
 from galaxy.util import (
     hash_util,
@@ -20,6 +21,7 @@ from .requirements import (
     ToolRequirement,
     ToolRequirements
 )
+from .resolution_cache import ResolutionCache
 from .resolvers import (
     ContainerDependency,
     NullDependency,
@@ -29,6 +31,8 @@ from .resolvers.tool_shed_packages import ToolShedPackageDependencyResolver
 log = logging.getLogger(__name__)
 
 CONFIG_VAL_NOT_FOUND = object()
+# keyword arguments of a resolution not affecting which resolvers resolve the requirements
+RESOLUTION_CACHE_IGNORED_KWDS = {'job_directory', 'tool_instance', 'installed_tool_dependencies', 'install'}
 
 
 def build_dependency_manager(app_config_dict=None, resolution_config_dict=None, conf_file=None, default_tool_dependency_dir=None):
@@ -105,6 +109,7 @@ class DependencyManager:
     dependency available in the current shell environment.
     """
     cached = False
+    resolution_cache = None
 
     def __init__(self, default_base_path, conf_file=None, app_config=None):
         """
@@ -130,6 +135,13 @@ class DependencyManager:
         self.dependency_resolvers = self.__parse_resolver_conf_plugins(plugin_source)
         self._enabled_container_types = []
         self._destination_for_container_type = {}
+        resolution_cache_max_age = int(self.get_app_option("dependency_resolution_cache_max_age", 3600) or 0)
+        if resolution_cache_max_age > 0:
+            resolution_cache_dir = self.get_app_option("dependency_resolution_cache_dir") or os.path.join(self.default_base_path, "_resolution_cache")
+            self.resolution_cache = ResolutionCache(cache_dir=resolution_cache_dir, max_age=resolution_cache_max_age)
+            self._resolvers_hash = ResolutionCache.key(*(self.__resolver_description(resolver) for resolver in self.dependency_resolvers))
+            self._refreshing = set()
+            self._refreshing_lock = threading.Lock()
 
     def set_enabled_container_types(self, container_types_to_destinations):
         """Set the union of all enabled container types."""
@@ -200,17 +212,102 @@ class DependencyManager:
 
     def _requirements_to_dependencies_dict(self, requirements, search=False, **kwds):
         """Build simple requirements to dependencies dict for resolution."""
-        requirement_to_dependency = {}
-        index = kwds.get('index')
-        install = kwds.get('install', False)
-        resolver_type = kwds.get('resolver_type')
-        include_containers = kwds.get('include_containers', False)
-        container_type = kwds.get('container_type')
-        require_exact = kwds.get('exact', False)
-        return_null_dependencies = kwds.get('return_null', False)
+        if self.resolution_cache is None:
+            return self._resolve_requirements(requirements, search=search, **kwds)[0]
+        if kwds.get('install', False):
+            try:
+                return self._resolve_requirements(requirements, search=search, **kwds)[0]
+            finally:
+                self.invalidate_resolution_cache()
+
+        key = self._resolution_cache_key(requirements, search, kwds)
+        plan, stale = self.resolution_cache.get(key)
+        if plan is not None:
+            requirement_to_dependency = self._replay_resolution_plan(plan, requirements, kwds)
+            if requirement_to_dependency is not None:
+                if stale:
+                    self._refresh_resolution_plan(key, requirements, search, kwds)
+                return requirement_to_dependency
+        requirement_to_dependency, plan = self._resolve_requirements(requirements, search=search, **kwds)
+        self._cache_resolution_plan(key, requirements, plan)
+        return requirement_to_dependency
+
+    def invalidate_resolution_cache(self):
+        """Forget which resolvers resolved requirements, called when dependencies are (un)installed."""
+        if self.resolution_cache is not None:
+            self.resolution_cache.invalidate()
 
+    def _resolution_cache_key(self, requirements, search, kwds):
+        tool_key = None
+        if 'tool_instance' in kwds:
+            tool = kwds['tool_instance']
+            tool_key = (tool.id, tool.version)
+        installed_tool_dependencies = [
+            (dependency.name, dependency.version, dependency.type, getattr(dependency, 'status', None))
+            for dependency in kwds.get('installed_tool_dependencies') or []
+        ]
+        resolution_kwds = {k: v for k, v in kwds.items() if k not in RESOLUTION_CACHE_IGNORED_KWDS}
+        return ResolutionCache.key(
+            requirements.resolvable.to_dict(),
+            self._resolvers_hash,
+            self.enabled_container_types,
+            tool_key,
+            installed_tool_dependencies,
+            search,
+            resolution_kwds,
+        )
+
+    def _cache_resolution_plan(self, key, requirements, plan):
+        resolved, resolved_all = plan
+        # Only complete resolutions are cached, requirements that could not be resolved are looked up again
+        if resolved_all is not None or len(resolved) == len(requirements.resolvable):
+            self.resolution_cache.set(key, resolved, resolved_all)
+
+    def _replay_resolution_plan(self, plan, requirements, kwds):
+        """
+        Resolve requirements with the resolvers recorded in ``plan`` only, return None if
+        these do not resolve them anymore.
+        """
         resolvable_requirements = requirements.resolvable
+        try:
+            if plan["all"] is not None:
+                resolver = self.dependency_resolvers[plan["all"]]
+                dependencies = self._resolve_all(resolver, resolvable_requirements, self._tool_info(resolvable_requirements, kwds), kwds)
+                if not dependencies:
+                    return None
+                return dict(zip(resolvable_requirements, dependencies))
+            requirement_to_dependency = {}
+            for position, requirement in enumerate(resolvable_requirements):
+                resolver = self.dependency_resolvers[plan["resolved"][str(position)]]
+                dependency = resolver.resolve(requirement, **kwds)
+                if isinstance(dependency, NullDependency) or (kwds.get('exact', False) and not dependency.exact):
+                    return None
+                log.debug(dependency.resolver_msg)
+                requirement_to_dependency[requirement] = dependency
+            return requirement_to_dependency
+        except (IndexError, KeyError):
+            return None
+
+    def _refresh_resolution_plan(self, key, requirements, search, kwds):
+        """Walk all resolvers again in the background to update a stale resolution plan."""
+        with self._refreshing_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
 
+        def refresh():
+            try:
+                plan = self._resolve_requirements(requirements, search=search, **kwds)[1]
+                self._cache_resolution_plan(key, requirements, plan)
+            except Exception:
+                log.exception("Failed to refresh dependency resolution plan")
+            finally:
+                with self._refreshing_lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name="dependency-resolution-refresh", daemon=True).start()
+
+    def _tool_info(self, resolvable_requirements, kwds):
         tool_info_kwds = dict(requirements=resolvable_requirements)
         if 'tool_instance' in kwds:
             tool = kwds['tool_instance']
@@ -218,8 +315,39 @@ class DependencyManager:
             tool_info_kwds['tool_version'] = tool.version
             tool_info_kwds['container_descriptions'] = tool.containers
             tool_info_kwds['requires_galaxy_python_environment'] = tool.requires_galaxy_python_environment
+        return ToolInfo(**tool_info_kwds)
+
+    def _resolve_all(self, resolver, resolvable_requirements, tool_info, kwds):
+        resolve = resolver.resolve_all if hasattr(resolver, "resolve_all") else resolver.resolve
+        # TODO: Handle specs.
+        dependencies = resolve(requirements=resolvable_requirements,
+                               enabled_container_types=self.enabled_container_types,
+                               destination_for_container_type=self.get_destination_info_for_container_type,
+                               tool_info=tool_info,
+                               **kwds)
+        if dependencies and isinstance(dependencies, ContainerDescription):
+            dependencies = [ContainerDependency(dependencies, name=r.name, version=r.version, container_resolver=resolver) for r in resolvable_requirements]
+        return dependencies
+
+    def _resolve_requirements(self, requirements, search=False, **kwds):
+        """
+        Walk the dependency resolvers, return the requirements to dependencies dict and the
+        resolution plan, i.e. the index of the resolvers that resolved each requirement
+        (by position) or all requirements at once.
+        """
+        requirement_to_dependency = {}
+        resolved = {}
+        resolved_all = None
+        index = kwds.get('index')
+        install = kwds.get('install', False)
+        resolver_type = kwds.get('resolver_type')
+        include_containers = kwds.get('include_containers', False)
+        container_type = kwds.get('container_type')
+        require_exact = kwds.get('exact', False)
+        return_null_dependencies = kwds.get('return_null', False)
 
-        tool_info = ToolInfo(**tool_info_kwds)
+        resolvable_requirements = requirements.resolvable
+        tool_info = self._tool_info(resolvable_requirements, kwds)
 
         for i, resolver in enumerate(self.dependency_resolvers):
 
@@ -241,7 +369,7 @@ class DependencyManager:
             # Check requirements all at once
             all_unmet = len(_requirement_to_dependency) == 0
             if hasattr(resolver, "resolve_all"):
-                resolve = resolver.resolve_all
+                resolve_all = True
             elif isinstance(resolver, ContainerResolver):
                 if not include_containers:
                     continue
@@ -252,23 +380,17 @@ class DependencyManager:
                     # These would look up available containers using the quay API,
                     # we only want to do this if we search for containers
                     continue
-                resolve = resolver.resolve
+                resolve_all = True
             else:
-                resolve = None
-            if all_unmet and resolve is not None:
-                # TODO: Handle specs.
-                dependencies = resolve(requirements=resolvable_requirements,
-                                       enabled_container_types=self.enabled_container_types,
-                                       destination_for_container_type=self.get_destination_info_for_container_type,
-                                       tool_info=tool_info,
-                                       **kwds)
+                resolve_all = False
+            if all_unmet and resolve_all:
+                dependencies = self._resolve_all(resolver, resolvable_requirements, tool_info, kwds)
                 if dependencies:
-                    if isinstance(dependencies, ContainerDescription):
-                        dependencies = [ContainerDependency(dependencies, name=r.name, version=r.version, container_resolver=resolver) for r in resolvable_requirements]
                     assert len(dependencies) == len(resolvable_requirements)
                     for requirement, dependency in zip(resolvable_requirements, dependencies):
                         log.debug(dependency.resolver_msg)
                         requirement_to_dependency[requirement] = dependency
+                    resolved_all = i
 
                     # Shortcut - resolution complete.
                     break
@@ -276,7 +398,7 @@ class DependencyManager:
             if not isinstance(resolver, ContainerResolver):
 
                 # Check individual requirements
-                for requirement in resolvable_requirements:
+                for position, requirement in enumerate(resolvable_requirements):
                     if requirement in _requirement_to_dependency:
                         continue
 
@@ -287,12 +409,13 @@ class DependencyManager:
                     if not isinstance(dependency, NullDependency):
                         log.debug(dependency.resolver_msg)
                         requirement_to_dependency[requirement] = dependency
+                        resolved[position] = i
                     elif return_null_dependencies:
                         log.debug(dependency.resolver_msg)
                         dependency.version = requirement.version
                         requirement_to_dependency[requirement] = dependency
 
-        return requirement_to_dependency
+        return requirement_to_dependency, (resolved, resolved_all)
 
     def uses_tool_shed_dependencies(self):
         return any(map(lambda r: isinstance(r, ToolShedPackageDependencyResolver), self.dependency_resolvers))
@@ -331,6 +454,11 @@ class DependencyManager:
         # Use either 'type' from YAML definition or 'resolver_type' from to_dict definition.
         return plugin_config.load_plugins(self.resolver_classes, plugin_source, extra_kwds, plugin_type_keys=['type', 'resolver_type'])
 
+    @staticmethod
+    def __resolver_description(resolver):
+        options = {k: v for k, v in vars(resolver).items() if isinstance(v, (str, int, float, bool, type(None)))}
+        return type(resolver).__name__, options
+
     def __resolvers_dict(self):
         import galaxy.tool_util.deps.resolvers
         return plugin_config.plugins_dict(galaxy.tool_util.deps.resolvers, 'resolver_type')
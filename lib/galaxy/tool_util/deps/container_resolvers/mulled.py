@@ -3,6 +3,8 @@
 import logging
 import os
 import subprocess
+import threading
+import time
 from typing import NamedTuple, Optional
 
 from galaxy.util import (
@@ -38,6 +40,13 @@ from ..requirements import (
 
 log = logging.getLogger(__name__)
 
+# directories modified less than this many nanoseconds ago are listed again at the next
+# lookup, images may be added within the mtime resolution of the (network) file system
+RECENTLY_MODIFIED_NS = 2 * 10 ** 9
+
+_cached_images_indexes = {}
+_cached_images_indexes_lock = threading.Lock()
+
 
 class CachedMulledImageSingleTarget(NamedTuple):
     package_name: str
@@ -160,61 +169,96 @@ def get_filter(namespace):
     return lambda name: name.startswith(prefix) and name.count("/") == 2
 
 
-def find_best_matching_cached_image(targets, cached_images, hash_func):
-    if len(targets) == 0:
-        return None
+class CachedMulledImageIndex:
+    """
+    Cached mulled images indexed by package name and version (single target images),
+    package hash and version hash (v2 multi target images) or hash (v1 multi target images).
 
-    image = None
-    if len(targets) == 1:
-        target = targets[0]
-        for cached_image in cached_images:
-            if cached_image.multi_target:
-                continue
-            if not cached_image.package_name == target.package_name:
-                continue
-            if not target.version or target.version == cached_image.version:
-                image = cached_image
-                break
-    elif hash_func == "v2":
-        name = v2_image_name(targets)
-        if ":" in name:
-            package_hash, version_hash = name.split(":", 2)
-        else:
-            package_hash, version_hash = name, None
+    ``cached_images`` are expected from newest to oldest (as listed by
+    :func:`list_cached_mulled_images_from_path`), the newest matching image is found.
+    """
 
+    def __init__(self, cached_images):
+        self.single_target = {}
+        self.v1_multi_target = {}
+        self.v2_multi_target = {}
         for cached_image in cached_images:
-            if cached_image.multi_target != "v2":
-                continue
+            if not cached_image.multi_target:
+                self.single_target.setdefault((cached_image.package_name, None), cached_image)
+                self.single_target.setdefault((cached_image.package_name, cached_image.version), cached_image)
+            elif cached_image.multi_target == "v2":
+                self.v2_multi_target.setdefault((cached_image.package_hash, None), cached_image)
+                self.v2_multi_target.setdefault((cached_image.package_hash, cached_image.version_hash), cached_image)
+            elif cached_image.multi_target == "v1":
+                self.v1_multi_target.setdefault(cached_image.hash, cached_image)
+
+    def find_best_match(self, targets, hash_func):
+        if len(targets) == 0:
+            return None
 
-            if version_hash is None:
-                # Just match on package hash...
-                if package_hash == cached_image.package_hash:
-                    image = cached_image
-                    break
+        if len(targets) == 1:
+            target = targets[0]
+            return self.single_target.get((target.package_name, target.version or None))
+        elif hash_func == "v2":
+            name = v2_image_name(targets)
+            if ":" in name:
+                package_hash, version_hash = name.split(":", 2)
             else:
-                # Match on package and version hash...
-                if package_hash == cached_image.package_hash and version_hash == cached_image.version_hash:
-                    image = cached_image
-                    break
+                package_hash, version_hash = name, None
+            return self.v2_multi_target.get((package_hash, version_hash))
+        elif hash_func == "v1":
+            return self.v1_multi_target.get(v1_image_name(targets))
+        return None
 
-    elif hash_func == "v1":
-        name = v1_image_name(targets)
-        for cached_image in cached_images:
-            if cached_image.multi_target != "v1":
-                continue
 
-            if name == cached_image.hash:
-                image = cached_image
-                break
-    return image
+def cached_mulled_images_index_from_path(directory, hash_func="v2"):
+    """
+    Return the :class:`CachedMulledImageIndex` of the images in ``directory`` (or None if
+    it does not exist), the directory is only listed again once it has been modified.
+    """
+    try:
+        mtime = os.stat(directory).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    key = (os.path.abspath(directory), hash_func)
+    with _cached_images_indexes_lock:
+        indexed_mtime, index = _cached_images_indexes.get(key, (None, None))
+    if index is not None and indexed_mtime == mtime:
+        return index
+    index = CachedMulledImageIndex(list_cached_mulled_images_from_path(directory, hash_func=hash_func))
+    if time.time_ns() - mtime < RECENTLY_MODIFIED_NS:
+        mtime = None
+    with _cached_images_indexes_lock:
+        _cached_images_indexes[key] = (mtime, index)
+    return index
+
+
+def refresh_cached_mulled_images_index(directory):
+    """List ``directory`` again at the next lookup, called once images have been added to it."""
+    directory = os.path.abspath(directory)
+    with _cached_images_indexes_lock:
+        for key in [key for key in _cached_images_indexes if key[0] == directory]:
+            del _cached_images_indexes[key]
+
+
+def find_best_matching_cached_image(targets, cached_images, hash_func):
+    if not isinstance(cached_images, CachedMulledImageIndex):
+        cached_images = CachedMulledImageIndex(cached_images)
+    return cached_images.find_best_match(targets, hash_func)
 
 
 def docker_cached_container_description(targets, namespace, hash_func="v2", shell=DEFAULT_CONTAINER_SHELL, resolution_cache=None):
     if len(targets) == 0:
         return None
 
-    cached_images = list_docker_cached_mulled_images(namespace, hash_func=hash_func, resolution_cache=resolution_cache)
-    image = find_best_matching_cached_image(targets, cached_images, hash_func)
+    index_cache_key = f"galaxy.tool_util.deps.container_resolvers.mulled:cached_images_index:{namespace}:{hash_func}"
+    if resolution_cache is not None and index_cache_key in resolution_cache:
+        cached_images = resolution_cache.get(index_cache_key)
+    else:
+        cached_images = CachedMulledImageIndex(list_docker_cached_mulled_images(namespace, hash_func=hash_func, resolution_cache=resolution_cache))
+        if resolution_cache is not None:
+            resolution_cache[index_cache_key] = cached_images
+    image = cached_images.find_best_match(targets, hash_func)
 
     container = None
     if image:
@@ -231,11 +275,10 @@ def singularity_cached_container_description(targets, cache_directory, hash_func
     if len(targets) == 0:
         return None
 
-    if not os.path.exists(cache_directory):
+    cached_images = cached_mulled_images_index_from_path(cache_directory, hash_func=hash_func)
+    if cached_images is None:
         return None
-
-    cached_images = list_cached_mulled_images_from_path(cache_directory, hash_func=hash_func)
-    image = find_best_matching_cached_image(targets, cached_images, hash_func)
+    image = cached_images.find_best_match(targets, hash_func)
 
     container = None
     if image:
@@ -515,6 +558,7 @@ class MulledSingularityContainerResolver(SingularityCliContainerResolver, Mulled
         if self.cli_available:
             cmds = container.build_mulled_singularity_pull_command(cache_directory=self.cache_directory, namespace=self.namespace)
             shell(cmds=cmds)
+            refresh_cached_mulled_images_index(self.cache_directory)
 
     def __str__(self):
         return f"MulledSingularityContainerResolver[namespace={self.namespace}]"
@@ -604,6 +648,7 @@ class BuildMulledSingularityContainerResolver(SingularityCliContainerResolver):
                 involucro_context=self._get_involucro_context(),
                 **self._mulled_kwds
             )
+            refresh_cached_mulled_images_index(self.cache_directory)
         return singularity_cached_container_description(targets, self.cache_directory, hash_func=self.hash_func, shell=self.shell)
 
     def _get_involucro_context(self):
@@ -0,0 +1,122 @@
+"""
+Cache of the dependency resolvers requirements have been resolved with.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+log = logging.getLogger(__name__)
+
+GENERATION_FILE = "generation"
+
+
+class ResolutionCache:
+    """
+    Records, for a set of requirements resolved in a given context, which of the configured
+    dependency resolvers resolved each requirement (or all of them at once), so that only
+    these resolvers are consulted again instead of walking every resolver.
+
+    Resolution plans are kept in memory and, if ``cache_dir`` is set, as JSON files below
+    ``cache_dir`` shared by all Galaxy processes using the same directory. Plans older than
+    ``max_age`` seconds are reported as stale, ``invalidate`` drops the plans of all processes.
+    """
+
+    def __init__(self, cache_dir=None, max_age=3600):
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self._plans = {}
+        self._lock = threading.Lock()
+        self._generation = None
+        self._generation_mtime = None
+
+    @staticmethod
+    def key(*parts):
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Return the plan cached for ``key`` (or None) and whether it is stale."""
+        generation = self._current_generation()
+        with self._lock:
+            plan = self._plans.get(key)
+        if plan is None or plan["generation"] != generation:
+            plan = self._read(key)
+            if plan is None or plan["generation"] != generation:
+                return None, False
+            with self._lock:
+                self._plans[key] = plan
+        return plan, time.time() - plan["time"] > self.max_age
+
+    def set(self, key, resolved, resolved_all=None):
+        """
+        Cache the plan for ``key``, ``resolved`` maps the position of requirements to
+        the index of the resolver that resolved them, ``resolved_all`` is the index of
+        the resolver that resolved all requirements at once.
+        """
+        plan = {
+            "generation": self._current_generation(),
+            "time": time.time(),
+            "resolved": {str(position): index for position, index in resolved.items()},
+            "all": resolved_all,
+        }
+        with self._lock:
+            self._plans[key] = plan
+        self._write(self._path(key), json.dumps(plan))
+
+    def invalidate(self):
+        """Drop all plans, called when dependencies are installed or uninstalled."""
+        generation = uuid.uuid4().hex
+        with self._lock:
+            self._plans.clear()
+            self._generation = generation
+        if self.cache_dir:
+            self._write(os.path.join(self.cache_dir, GENERATION_FILE), generation)
+
+    def _current_generation(self):
+        if not self.cache_dir:
+            return self._generation
+        path = os.path.join(self.cache_dir, GENERATION_FILE)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return self._generation
+        if mtime != self._generation_mtime:
+            try:
+                with open(path) as fh:
+                    self._generation = fh.read().strip()
+                self._generation_mtime = mtime
+            except OSError:
+                pass
+        return self._generation
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json") if self.cache_dir else None
+
+    def _read(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path) as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            log.warning("Ignoring unreadable dependency resolution plan %s", path)
+            return None
+
+    def _write(self, path, content):
+        if not path:
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'w') as fh:
+                fh.write(content)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            log.debug("Failed to write dependency resolution cache file %s: %s", path, e)
@@ -68,6 +68,12 @@ class DependencyResolversView:
         requirements = payload.get('requirements')
         if not requirements:
             return None
+        try:
+            return self._uninstall_dependencies(requirements, index=index, resolver_type=resolver_type, container_type=container_type)
+        finally:
+            self._dependency_manager.invalidate_resolution_cache()
+
+    def _uninstall_dependencies(self, requirements, index=None, resolver_type=None, container_type=None):
         if index:
             resolver = self._dependency_resolvers[index]
             if resolver.can_uninstall_dependencies:
@@ -114,6 +120,8 @@ class DependencyResolversView:
                 if exit_code == 0:
                     removed_environments = removed_environments.union(can_remove)
                     envs_to_remove = envs_to_remove.difference(can_remove)
+        if removed_environments:
+            self._dependency_manager.invalidate_resolution_cache()
         return list(removed_environments)
 
     def install_dependencies(self, requirements, **kwds):
@@ -150,12 +158,15 @@ class DependencyResolversView:
             raise exceptions.RequestParameterInvalidException("Attempted to install on a disabled dependency resolver.")
 
         name, version, type, extra_kwds = self._parse_dependency_info(payload)
-        return resolver.install_dependency(
-            name=name,
-            version=version,
-            type=type,
-            **extra_kwds
-        )
+        try:
+            return resolver.install_dependency(
+                name=name,
+                version=version,
+                type=type,
+                **extra_kwds
+            )
+        finally:
+            self._dependency_manager.invalidate_resolution_cache()
 
     def _dependency(self, index=None, **kwds):
         if index is not None:
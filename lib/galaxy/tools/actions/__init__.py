@@ -15,6 +15,7 @@ from galaxy.tools.parameters import update_dataset_ids
 from galaxy.tools.parameters.basic import DataCollectionToolParameter, DataToolParameter, RuntimeValue
 from galaxy.tools.parameters.wrapped import WrappedParameters
 from galaxy.util import ExecutionTimer
+from galaxy.util.expressions import evaluate_expression
 from galaxy.util.template import fill_template
 from galaxy.web import url_for
 
@@ -949,7 +950,7 @@ def on_text_for_names(input_names):
 def filter_output(tool, output, incoming):
     for filter in output.filters:
         try:
-            if not eval(filter.text.strip(), globals(), incoming):
+            if not evaluate_expression(filter.text.strip(), incoming, globals()):
                 return True  # do not create this dataset
         except Exception as e:
             log.debug(f'Tool {tool.id} output {output.name}: dataset output filter ({filter.text}) failed: {e}')
@@ -13,6 +13,7 @@ import os
 import os.path
 import re
 import string
+import sys
 import time
 from glob import glob
 from tempfile import NamedTemporaryFile
@@ -42,6 +43,7 @@ class ToolDataPathFiles:
     def __init__(self, tool_data_path):
         self.tool_data_path = os.path.abspath(tool_data_path)
         self.update_time = 0
+        self._parsed_files = {}
 
     @property
     def tool_data_path_files(self):
@@ -65,6 +67,24 @@ class ToolDataPathFiles:
         else:
             return os.path.exists(path)
 
+    def parsed_file(self, filename, parse_key, parse):
+        """
+        Return the result of ``parse()`` for ``filename``, only parsing the file again if it
+        was modified, or is parsed with a different ``parse_key``, since it was last parsed.
+        Reloading a data table spread over many files then only re-parses the files that changed.
+        """
+        try:
+            st = os.stat(filename)
+        except OSError:
+            return parse()
+        key = (st.st_ino, st.st_size, st.st_mtime_ns, parse_key)
+        cached = self._parsed_files.get(filename)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        rval = parse()
+        self._parsed_files[filename] = (key, rval)
+        return rval
+
 
 class ToolDataTableManager:
     """Manages a collection of tool data tables"""
@@ -328,11 +348,14 @@ class TabularToolDataTable(ToolDataTable, Dictifiable):
     dict_collection_visible_keys = ['name']
 
     type_key = 'tabular'
+    # whether the rows parsed from a file may be reused as long as the file is not modified
+    cache_parsed_files = True
 
     def __init__(self, config_element, tool_data_path, from_shed_config=False, filename=None, tool_data_path_files=None, other_config_dict=None):
         super().__init__(config_element, tool_data_path, from_shed_config, filename, tool_data_path_files, other_config_dict=other_config_dict)
         self.config_element = config_element
         self.data = []
+        self._reset_indexes()
         self.configure_and_load(config_element, tool_data_path, from_shed_config)
 
     def configure_and_load(self, config_element, tool_data_path, from_shed_config=False, url_timeout=10):
@@ -412,7 +435,7 @@ class TabularToolDataTable(ToolDataTable, Dictifiable):
 
             errors = []
             if found:
-                self.extend_data_with(filename, errors=errors)
+                self.extend_data_with(filename, errors=errors, cache=tmp_file is None)
                 self._update_version()
             else:
                 self.missing_index_file = filename
@@ -457,26 +480,26 @@ class TabularToolDataTable(ToolDataTable, Dictifiable):
         return self.data
 
     def get_field(self, value):
-        rval = None
-        for i in self.get_named_fields_list():
-            if i['value'] == value:
-                rval = TabularToolDataField(i)
-        return rval
+        rows = self._column_index(self.columns['value']).get(value)
+        if not rows:
+            return None
+        # the last entry with this value wins
+        return TabularToolDataField(self._named_fields(rows[-1], self.get_column_name_list()))
 
     def get_named_fields_list(self):
-        rval = []
         named_columns = self.get_column_name_list()
-        for fields in self.get_fields():
-            field_dict = {}
-            for i, field in enumerate(fields):
-                if i == len(named_columns):
-                    break
-                field_name = named_columns[i]
-                if field_name is None:
-                    field_name = i  # check that this is supposed to be 0 based.
-                field_dict[field_name] = field
-            rval.append(field_dict)
-        return rval
+        return [self._named_fields(fields, named_columns) for fields in self.get_fields()]
+
+    def _named_fields(self, fields, named_columns):
+        field_dict = {}
+        for i, field in enumerate(fields):
+            if i == len(named_columns):
+                break
+            field_name = named_columns[i]
+            if field_name is None:
+                field_name = i  # check that this is supposed to be 0 based.
+            field_dict[field_name] = field
+        return field_dict
 
     def get_version_fields(self):
         return (self._loaded_content_version, self.get_fields())
@@ -515,9 +538,22 @@ class TabularToolDataTable(ToolDataTable, Dictifiable):
         if 'name' not in self.columns:
             self.columns['name'] = self.columns['value']
 
-    def extend_data_with(self, filename, errors=None):
+    def extend_data_with(self, filename, errors=None, cache=True):
         here = os.path.dirname(os.path.abspath(filename))
-        self.data.extend(self.parse_file_fields(filename, errors=errors, here=here))
+
+        def parse():
+            file_errors = []
+            return self.parse_file_fields(filename, errors=file_errors, here=here), file_errors
+
+        if cache and self.cache_parsed_files and self.tool_data_path_files is not None:
+            parse_key = (self.separator, self.comment_char, self.largest_index, here)
+            fields, file_errors = self.tool_data_path_files.parsed_file(filename, parse_key, parse)
+        else:
+            fields, file_errors = parse()
+        if errors is not None:
+            errors.extend(file_errors)
+        self.data.extend(fields)
+        self._reset_indexes()
         if not self.allow_duplicate_entries:
             self._deduplicate_data()
 
@@ -536,7 +572,8 @@ class TabularToolDataTable(ToolDataTable, Dictifiable):
                 line = line.rstrip("\n\r")
                 if line:
                     line = expand_here_template(line, here=here)
-                    fields = line.split(self.separator)
+                    # dbkeys, names and paths are repeated across rows, tables and files
+                    fields = [sys.intern(field) for field in line.split(self.separator)]
                     if self.largest_index < len(fields):
                         rval.append(fields)
                     else:
@@ -585,17 +622,16 @@ class TabularToolDataTable(ToolDataTable, Dictifiable):
                 return default
         rval = []
         # Look for table entry.
-        for fields in self.get_fields():
-            if fields[query_col] == query_val:
-                if return_attr is None:
-                    field_dict = {}
-                    for i, col_name in enumerate(self.get_column_name_list()):
-                        field_dict[col_name or i] = fields[i]
-                    rval.append(field_dict)
-                else:
-                    rval.append(fields[return_col])
-                if limit is not None and len(rval) == limit:
-                    break
+        for fields in self._column_index(query_col).get(query_val, ()):
+            if return_attr is None:
+                field_dict = {}
+                for i, col_name in enumerate(self.get_column_name_list()):
+                    field_dict[col_name or i] = fields[i]
+                rval.append(field_dict)
+            else:
+                rval.append(fields[return_col])
+            if limit is not None and len(rval) == limit:
+                break
         return rval or default
 
     def get_filename_for_source(self, source, default=None):
@@ -631,8 +667,9 @@ class TabularToolDataTable(ToolDataTable, Dictifiable):
         is_error = False
         if self.largest_index < len(fields):
             fields = self._replace_field_separators(fields)
-            if (allow_duplicates and self.allow_duplicate_entries) or fields not in self.get_fields():
+            if (allow_duplicates and self.allow_duplicate_entries) or tuple(fields) not in self._rows():
                 self.data.append(fields)
+                self._index_row(fields)
             else:
                 log.debug("Attempted to add fields (%s) to data table '%s', but this entry already exists and allow_duplicates is False.", fields, self.name)
                 is_error = True
@@ -720,17 +757,45 @@ class TabularToolDataTable(ToolDataTable, Dictifiable):
 
     def _deduplicate_data(self):
         # Remove duplicate entries, without recreating self.data object
-        dup_lines = []
-        hash_set = set()
-        for i, fields in enumerate(self.data):
-            fields_hash = hash(self.separator.join(fields))
-            if fields_hash in hash_set:
-                dup_lines.append(i)
+        unique = []
+        rows = set()
+        for fields in self.data:
+            row = tuple(fields)
+            if row in rows:
                 log.debug('Found duplicate entry in tool data table "%s", but duplicates are not allowed, removing additional entry for: "%s"', self.name, fields)
             else:
-                hash_set.add(fields_hash)
-        for i in reversed(dup_lines):
-            self.data.pop(i)
+                rows.add(row)
+                unique.append(fields)
+        if len(unique) != len(self.data):
+            self.data[:] = unique
+            self._reset_indexes()
+        self._row_set = rows
+
+    def _reset_indexes(self):
+        # Indexes are built on first use and dropped whenever rows are removed or reordered.
+        self._column_indexes = {}
+        self._row_set = None
+
+    def _column_index(self, column):
+        """Return a dictionary mapping each value of ``column`` to the rows holding it, in table order."""
+        index = self._column_indexes.get(column)
+        if index is None:
+            index = {}
+            for fields in self.data:
+                index.setdefault(fields[column], []).append(fields)
+            self._column_indexes[column] = index
+        return index
+
+    def _rows(self):
+        if self._row_set is None:
+            self._row_set = {tuple(fields) for fields in self.data}
+        return self._row_set
+
+    def _index_row(self, fields):
+        for column, index in self._column_indexes.items():
+            index.setdefault(fields[column], []).append(fields)
+        if self._row_set is not None:
+            self._row_set.add(tuple(fields))
 
     @property
     def xml_string(self):
@@ -813,11 +878,14 @@ class RefgenieToolDataTable(TabularToolDataTable):
     dict_collection_visible_keys = ['name']
 
     type_key = 'refgenie'
+    # assets are resolved from the refgenie configuration, not only read from the file
+    cache_parsed_files = False
 
     def __init__(self, config_element, tool_data_path, from_shed_config=False, filename=None, tool_data_path_files=None, other_config_dict=None):
         super().__init__(config_element, tool_data_path, from_shed_config, filename, tool_data_path_files, other_config_dict=other_config_dict)
         self.config_element = config_element
         self.data = []
+        self._reset_indexes()
         self.configure_and_load(config_element, tool_data_path, from_shed_config)
 
     def configure_and_load(self, config_element, tool_data_path, from_shed_config=False, url_timeout=10):
@@ -6,7 +6,8 @@ import copy
 import logging
 import os
 import re
-from io import StringIO
+import threading
+from collections import OrderedDict
 
 from galaxy.model import (
     HistoryDatasetAssociation,
@@ -23,11 +24,75 @@ from . import validation
 
 log = logging.getLogger(__name__)
 
+# Only options from the first MAX_OPTIONS_FILE_SIZE bytes of a dataset or metadata file are
+# loaded, and options parsed from files are cached until MAX_CACHED_OPTIONS_SIZE bytes worth
+# of files are cached, least recently used files first out.
+MAX_OPTIONS_FILE_SIZE = 8 * 1048576
+MAX_CACHED_OPTIONS_SIZE = 32 * 1048576
+
+
+class OptionsFileCache:
+    """
+    Cache of the option fields parsed from datasets and metadata files, keyed by the path,
+    size and modification time of the file and by how it is parsed.
+    """
+
+    def __init__(self, max_size=MAX_CACHED_OPTIONS_SIZE):
+        self.max_size = max_size
+        self._size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_parse(self, path, parse_key, parse):
+        """
+        Return the key of the cache entry and the fields of ``path``, calling
+        ``parse(size)`` to parse the file if it is not cached.
+        """
+        st = os.stat(path)
+        key = (path, st.st_size, st.st_mtime_ns, parse_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return key, entry[0]
+        size = min(st.st_size, MAX_OPTIONS_FILE_SIZE)
+        fields = parse(st.st_size)
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (fields, size)
+                self._size += size
+            while self._size > self.max_size and len(self._entries) > 1:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+        return key, fields
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+options_file_cache = OptionsFileCache()
+
+
+def _limited_lines(reader, limit):
+    """Yield the lines of ``reader`` until ``limit`` characters have been read, only whole lines."""
+    read = 0
+    for line in reader:
+        read += len(line)
+        if read > limit:
+            return
+        yield line
+
 
 class Filter:
     """
     A filter takes the current options list and modifies it.
     """
+    # True if the options returned by the filter only depend on the options it is given,
+    # the result of such filters is reused as long as the options they filter do not change.
+    memoizable = False
+
     @classmethod
     def from_element(cls, d_option, elem):
         """Loads the proper filter by the type attribute of elem"""
@@ -71,6 +136,11 @@ class StaticValueFilter(Filter):
         self.column = d_option.column_spec_to_index(column)
         self.keep = string_as_bool(elem.get("keep", 'True'))
 
+    @property
+    def memoizable(self):
+        # the value is only expanded with the properties of the user if it has placeholders
+        return '$' not in self.value
+
     def filter_options(self, options, trans, other_values):
         rval = []
         filter_value = self.value
@@ -107,6 +177,10 @@ class RegexpFilter(Filter):
         self.column = d_option.column_spec_to_index(column)
         self.keep = string_as_bool(elem.get("keep", 'True'))
 
+    @property
+    def memoizable(self):
+        return '$' not in self.value
+
     def filter_options(self, options, trans, other_values):
         rval = []
         filter_value = self.value
@@ -292,6 +366,7 @@ class UniqueValueFilter(Filter):
     Required Attributes:
         column: column in options to compare with
     """
+    memoizable = True
 
     def __init__(self, d_option, elem):
         Filter.__init__(self, d_option, elem)
@@ -304,11 +379,11 @@ class UniqueValueFilter(Filter):
 
     def filter_options(self, options, trans, other_values):
         rval = []
-        skip_list = []
+        skip_values = set()
         for fields in options:
-            if fields[self.column] not in skip_list:
+            if fields[self.column] not in skip_values:
                 rval.append(fields)
-                skip_list.append(fields[self.column])
+                skip_values.add(fields[self.column])
         return rval
 
 
@@ -323,6 +398,7 @@ class MultipleSplitterFilter(Filter):
     Optional Attributes:
         separator: Split column by this (,)
     """
+    memoizable = True
 
     def __init__(self, d_option, elem):
         Filter.__init__(self, d_option, elem)
@@ -354,6 +430,7 @@ class AttributeValueSplitterFilter(Filter):
         pair_separator: Split column by this (,)
         name_val_separator: Split name-value pair by this ( whitespace )
     """
+    memoizable = True
 
     def __init__(self, d_option, elem):
         Filter.__init__(self, d_option, elem)
@@ -390,6 +467,7 @@ class AdditionalValueFilter(Filter):
         name: Display name to appear in select list (value)
         index: Index of option list to add value (APPEND)
     """
+    memoizable = True
 
     def __init__(self, d_option, elem):
         Filter.__init__(self, d_option, elem)
@@ -488,6 +566,7 @@ class SortByColumnFilter(Filter):
     Required Attributes:
         column: column to sort by
     """
+    memoizable = True
 
     def __init__(self, d_option, elem):
         Filter.__init__(self, d_option, elem)
@@ -533,6 +612,8 @@ class DynamicOptions:
         self.has_dataset_dependencies = False
         self.validators = []
         self.converter_safe = True
+        # (key of the options, number of filters applied, filtered options) of the last options filtered
+        self._memoized_options = None
 
         # Parse the <options> tag
         self.separator = elem.get('separator', '\t')
@@ -659,17 +740,43 @@ class DynamicOptions:
         return rval
 
     def get_fields(self, trans, other_values):
+        options_key, options = self._get_unfiltered_fields(other_values)
+        filters = self.filters
+        memoizable_count = 0
+        for filter in filters:
+            if not filter.memoizable:
+                break
+            memoizable_count += 1
+        if options_key is not None and memoizable_count:
+            memoized = self._memoized_options
+            if memoized is not None and memoized[0] == options_key and memoized[1] == memoizable_count:
+                options = list(memoized[2])
+            else:
+                for filter in filters[:memoizable_count]:
+                    options = filter.filter_options(options, trans, other_values)
+                self._memoized_options = (options_key, memoizable_count, list(options))
+            filters = filters[memoizable_count:]
+        for filter in filters:
+            options = filter.filter_options(options, trans, other_values)
+        return options
+
+    def _get_unfiltered_fields(self, other_values):
+        """
+        Return the options before filtering and a key identifying them, None if the
+        options cannot be identified.
+        """
         if self.dataset_ref_name:
             try:
                 datasets = _get_ref_data(other_values, self.dataset_ref_name)
             except KeyError:  # no such dataset
                 log.warning(f"could not create dynamic options from_dataset: {self.dataset_ref_name} unknown")
-                return []
+                return None, []
             except ValueError:  # not a valid dataset
                 log.warning(f"could not create dynamic options from_dataset: {self.dataset_ref_name} not a data or collection parameter")
-                return []
+                return None, []
 
             options = []
+            options_key = []
             meta_file_key = self.meta_file_key
             for dataset in datasets:
                 if meta_file_key:
@@ -682,26 +789,30 @@ class DynamicOptions:
                         continue
                 if not hasattr(dataset, 'file_name'):
                     continue
-                # Ensure parsing dynamic options does not consume more than a megabyte worth memory.
-                path = dataset.file_name
-                if os.path.getsize(path) < 1048576:
-                    with open(path) as fh:
-                        options += self.parse_file_fields(fh)
-                else:
-                    # Pass just the first megabyte to parse_file_fields.
-                    log.warning("Attempting to load options from large file, reading just first megabyte")
-                    with open(path) as fh:
-                        contents = fh.read(1048576)
-                    options += self.parse_file_fields(StringIO(contents))
-        elif self.tool_data_table:
-            options = self.tool_data_table.get_fields()
+                key, fields = options_file_cache.get_or_parse(dataset.file_name, (self.separator, self.line_startswith, self.largest_index), self._parse_options_file(dataset.file_name))
+                options_key.append(key)
+                options += fields
+            return tuple(options_key), options
+        tool_data_table = self.tool_data_table
+        if tool_data_table:
+            get_version_fields = getattr(tool_data_table, 'get_version_fields', None)
+            if get_version_fields is None:
+                return None, tool_data_table.get_fields()
+            version, fields = get_version_fields()
+            return (self.tool_data_table_name, version), fields
         elif self.file_fields:
-            options = list(self.file_fields)
-        else:
-            options = []
-        for filter in self.filters:
-            options = filter.filter_options(options, trans, other_values)
-        return options
+            return (), list(self.file_fields)
+        return None, []
+
+    def _parse_options_file(self, path):
+        def parse(size):
+            with open(path) as fh:
+                if size <= MAX_OPTIONS_FILE_SIZE:
+                    return self.parse_file_fields(fh)
+                # Ensure parsing dynamic options does not consume too much memory.
+                log.warning("Only loading options from the first %d bytes of the %d bytes of %s", MAX_OPTIONS_FILE_SIZE, size, path)
+                return self.parse_file_fields(_limited_lines(fh, MAX_OPTIONS_FILE_SIZE))
+        return parse
 
     def get_fields_by_value(self, value, trans, other_values):
         """
@@ -12,6 +12,7 @@ from galaxy.tools.parameters.wrapped_json import (
 )
 from galaxy.util import filesystem_safe_string
 from galaxy.util.object_wrapper import wrap_with_safe_string
+from galaxy.web.framework.base import lazy_property
 
 log = logging.getLogger(__name__)
 
@@ -267,39 +268,50 @@ class DatasetFilenameWrapper(ToolParameterValueWrapper):
                 ext = 'data'
             self.dataset = wrap_with_safe_string(NoneDataset(datatypes_registry=datatypes_registry, ext=ext), no_wrap_classes=ToolParameterValueWrapper)
         else:
-            # Tool wrappers should not normally be accessing .dataset directly,
-            # so we will wrap it and keep the original around for file paths
-            # Should we name this .value to maintain consistency with most other ToolParameterValueWrapper?
             if formats:
                 direct_match, target_ext, converted_dataset = dataset.find_conversion_destination(formats)
                 if not direct_match and target_ext and converted_dataset:
                     dataset = converted_dataset
             self.unsanitized = dataset
-            self.dataset = wrap_with_safe_string(dataset, no_wrap_classes=ToolParameterValueWrapper)
-            self.metadata = self.MetadataWrapper(dataset, compute_environment)
-            if hasattr(dataset, 'tags'):
-                self.groups = {tag.user_value.lower() for tag in dataset.tags if tag.user_tname == 'group'}
-            else:
-                # May be a 'FakeDatasetAssociation'
-                self.groups = set()
         self.compute_environment = compute_environment
-        # TODO: lazy initialize this...
+        self.__dataset = dataset
         self.__io_type = io_type
-        if self.__io_type == "input":
-            path_rewrite = compute_environment and dataset and compute_environment.input_path_rewrite(dataset)
-            if path_rewrite:
-                self.false_path = path_rewrite
-            else:
-                self.false_path = None
-        else:
-            path_rewrite = compute_environment and compute_environment.output_path_rewrite(dataset)
-            if path_rewrite:
-                self.false_path = path_rewrite
-            else:
-                self.false_path = None
         self.datatypes_registry = datatypes_registry
         self._element_identifier = identifier
 
+    # The wrapped dataset, metadata, groups and rewritten path are only built when
+    # the tool's templates access them, wrapping inputs with many datasets is cheap.
+    @lazy_property
+    def dataset(self):
+        # Tool wrappers should not normally be accessing .dataset directly,
+        # so we will wrap it and keep the original around for file paths
+        # Should we name this .value to maintain consistency with most other ToolParameterValueWrapper?
+        return wrap_with_safe_string(self.unsanitized, no_wrap_classes=ToolParameterValueWrapper)
+
+    @lazy_property
+    def metadata(self):
+        if not self.__dataset:
+            return self.dataset.metadata
+        return self.MetadataWrapper(self.unsanitized, self.compute_environment)
+
+    @lazy_property
+    def groups(self):
+        if not self.__dataset:
+            return self.dataset.groups
+        if hasattr(self.unsanitized, 'tags'):
+            return {tag.user_value.lower() for tag in self.unsanitized.tags if tag.user_tname == 'group'}
+        # May be a 'FakeDatasetAssociation'
+        return set()
+
+    @lazy_property
+    def false_path(self):
+        dataset = self.__dataset
+        if self.__io_type == "input":
+            path_rewrite = self.compute_environment and dataset and self.compute_environment.input_path_rewrite(dataset)
+        else:
+            path_rewrite = self.compute_environment and self.compute_environment.output_path_rewrite(dataset)
+        return path_rewrite or None
+
     @property
     def element_identifier(self):
         identifier = self._element_identifier
@@ -434,9 +446,9 @@ class DatasetListWrapper(list, ToolParameterValueWrapper, HasDatasets):
             elif getattr(dataset_instance_source, "history_content_type", None) == "dataset":
                 dataset_instances.append(dataset_instance_source)
             elif hasattr(dataset_instance_source, "child_collection"):
-                dataset_instances.extend(dataset_instance_source.child_collection.dataset_elements)
+                dataset_instances.extend(dataset_instance_source.child_collection.prefetch_dataset_elements())
             else:
-                dataset_instances.extend(dataset_instance_source.collection.dataset_elements)
+                dataset_instances.extend(dataset_instance_source.collection.prefetch_dataset_elements())
         return dataset_instances
 
     def get_datasets_for_group(self, group):
@@ -470,6 +482,7 @@ class DatasetCollectionWrapper(ToolParameterValueWrapper, HasDatasets):
         self._element_identifiers_extensions_paths_and_metadata_files = None
         self.datatypes_registry = datatypes_registry
         self.kwargs = kwargs
+        self._prefetch_elements = True
 
         if has_collection is None:
             self.__input_supplied = False
@@ -489,31 +502,40 @@ class DatasetCollectionWrapper(ToolParameterValueWrapper, HasDatasets):
             collection = has_collection
             self.name = None
         self.collection = collection
-
-        elements = collection.elements
-        element_instances = {}
-
-        element_instance_list = []
-        for dataset_collection_element in elements:
-            element_object = dataset_collection_element.element_object
-            element_identifier = dataset_collection_element.element_identifier
-
-            if dataset_collection_element.is_collection:
-                element_wrapper = DatasetCollectionWrapper(job_working_directory, dataset_collection_element, **kwargs)
-            else:
-                element_wrapper = self._dataset_wrapper(element_object, identifier=element_identifier, **kwargs)
-
-            element_instances[element_identifier] = element_wrapper
-            element_instance_list.append(element_wrapper)
-
-        self.__element_instances = element_instances
-        self.__element_instance_list = element_instance_list
+        self.__element_instances = None
+        self.__element_instance_list = None
+
+    def __element_wrappers(self):
+        # Element wrappers are only built once the tool's templates access the elements.
+        if self.__element_instance_list is None:
+            if self._prefetch_elements:
+                # Load all datasets of the collection at once rather than one element at a time
+                self.collection.prefetch_dataset_elements()
+            element_instances = {}
+            element_instance_list = []
+            for dataset_collection_element in self.collection.elements:
+                element_object = dataset_collection_element.element_object
+                element_identifier = dataset_collection_element.element_identifier
+
+                if dataset_collection_element.is_collection:
+                    element_wrapper = DatasetCollectionWrapper(self.job_working_directory, dataset_collection_element, **self.kwargs)
+                    # already loaded along with this collection
+                    element_wrapper._prefetch_elements = False
+                else:
+                    element_wrapper = self._dataset_wrapper(element_object, identifier=element_identifier, **self.kwargs)
+
+                element_instances[element_identifier] = element_wrapper
+                element_instance_list.append(element_wrapper)
+
+            self.__element_instances = element_instances
+            self.__element_instance_list = element_instance_list
+        return self.__element_instances, self.__element_instance_list
 
     def get_datasets_for_group(self, group):
         group = str(group).lower()
         if not self._dataset_elements_cache.get(group):
             wrappers = []
-            for element in self.collection.dataset_elements:
+            for element in self.collection.prefetch_dataset_elements():
                 if any([t for t in element.dataset_instance.tags if t.user_tname.lower() == 'group' and t.value.lower() == group]):
                     wrappers.append(self._dataset_wrapper(element.element_object, identifier=element.element_identifier, **self.kwargs))
             self._dataset_elements_cache[group] = wrappers
@@ -522,7 +544,7 @@ class DatasetCollectionWrapper(ToolParameterValueWrapper, HasDatasets):
     def keys(self):
         if not self.__input_supplied:
             return []
-        return self.__element_instances.keys()
+        return self.__element_wrappers()[0].keys()
 
     @property
     def is_collection(self):
@@ -572,28 +594,29 @@ class DatasetCollectionWrapper(ToolParameterValueWrapper, HasDatasets):
     def __getitem__(self, key):
         if not self.__input_supplied:
             return None
+        element_instances, element_instance_list = self.__element_wrappers()
         if isinstance(key, int):
-            return self.__element_instance_list[key]
+            return element_instance_list[key]
         else:
-            return self.__element_instances[key]
+            return element_instances[key]
 
     def __getattr__(self, key):
         if not self.__input_supplied:
             return None
         try:
-            return self.__element_instances[key]
+            return self.__element_wrappers()[0][key]
         except KeyError:
             raise AttributeError()
 
     def __iter__(self):
         if not self.__input_supplied:
             return [].__iter__()
-        return self.__element_instance_list.__iter__()
+        return self.__element_wrappers()[1].__iter__()
 
     def __bool__(self):
         # Fail `#if $param` checks in cheetah is optional input
         # not specified or if resulting collection is empty.
-        return self.__input_supplied and bool(self.__element_instance_list)
+        return self.__input_supplied and bool(self.__element_wrappers()[1])
     __nonzero__ = __bool__
 
 
@@ -1,13 +1,227 @@
 """
 Expression evaluation support.
 
-For the moment this depends on python's eval. In the future it should be
-replaced with a "safe" parser.
+:func:`compile_expression` compiles the subset of Python expressions commonly
+used by tools (names, attribute and item access, comparisons, boolean operators,
+conditional expressions and a few builtins and string methods) into an
+evaluator that does not depend on python's eval. Expressions outside of this
+subset raise :class:`UnsupportedExpression` and are evaluated by the caller's
+fallback (python's eval or Cheetah).
 """
 
+import ast
+import operator
+import threading
+from collections import OrderedDict
 from collections.abc import MutableMapping
 from itertools import chain
 
+SAFE_BUILTINS = {
+    "bool": bool,
+    "float": float,
+    "int": int,
+    "len": len,
+    "str": str,
+}
+SAFE_METHODS = frozenset((
+    "endswith",
+    "get",
+    "join",
+    "lower",
+    "split",
+    "startswith",
+    "strip",
+    "upper",
+))
+COMPARISON_OPERATORS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.In: lambda a, b: a in b,
+    ast.NotIn: lambda a, b: a not in b,
+    ast.Is: operator.is_,
+    ast.IsNot: operator.is_not,
+}
+# Python < 3.8 parses literals as Str/Num/NameConstant and subscripts as Index
+LITERAL_NODES = tuple(getattr(ast, name) for name in ("Constant", "Str", "Num", "NameConstant", "Bytes") if hasattr(ast, name))
+INDEX_NODE = getattr(ast, "Index", None)
+MAX_COMPILED_EXPRESSIONS = 1000
+
+
+class UnsupportedExpression(Exception):
+    """Raised for expressions (or names) :func:`compile_expression` cannot evaluate."""
+
+
+class CompiledExpression:
+    """
+    An expression compiled by :func:`compile_expression`, evaluated with a function
+    resolving the names it refers to.
+    """
+
+    def __init__(self, text, tree):
+        self.text = text
+        self._tree = tree
+        self.names = {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)}
+
+    def evaluate(self, resolve_name):
+        """
+        Evaluate the expression, ``resolve_name`` returns the value of a name or raises
+        :class:`UnsupportedExpression` if it cannot be resolved without python's eval.
+        """
+        return self._evaluate(self._tree.body, resolve_name)
+
+    def _evaluate(self, node, resolve_name):
+        evaluate = self._evaluate
+        if isinstance(node, LITERAL_NODES):
+            return _literal_value(node)
+        elif isinstance(node, ast.Name):
+            return resolve_name(node.id)
+        elif isinstance(node, ast.Attribute):
+            return getattr(evaluate(node.value, resolve_name), node.attr)
+        elif isinstance(node, ast.Subscript):
+            index = node.slice.value if INDEX_NODE is not None and isinstance(node.slice, INDEX_NODE) else node.slice
+            return evaluate(node.value, resolve_name)[evaluate(index, resolve_name)]
+        elif isinstance(node, ast.BoolOp):
+            value = None
+            for operand in node.values:
+                value = evaluate(operand, resolve_name)
+                if isinstance(node.op, ast.And) != bool(value):
+                    break
+            return value
+        elif isinstance(node, ast.UnaryOp):
+            operand = evaluate(node.operand, resolve_name)
+            return not operand if isinstance(node.op, ast.Not) else -operand
+        elif isinstance(node, ast.Compare):
+            left = evaluate(node.left, resolve_name)
+            for op, comparator in zip(node.ops, node.comparators):
+                right = evaluate(comparator, resolve_name)
+                if not COMPARISON_OPERATORS[type(op)](left, right):
+                    return False
+                left = right
+            return True
+        elif isinstance(node, ast.IfExp):
+            if evaluate(node.test, resolve_name):
+                return evaluate(node.body, resolve_name)
+            return evaluate(node.orelse, resolve_name)
+        elif isinstance(node, ast.Call):
+            args = [evaluate(arg, resolve_name) for arg in node.args]
+            if isinstance(node.func, ast.Name):
+                function = resolve_name(node.func.id)
+                if function is not SAFE_BUILTINS.get(node.func.id):
+                    raise UnsupportedExpression(f"Cannot call {node.func.id}")
+                return function(*args)
+            return getattr(evaluate(node.func.value, resolve_name), node.func.attr)(*args)
+        elif isinstance(node, ast.Tuple):
+            return tuple(evaluate(element, resolve_name) for element in node.elts)
+        elif isinstance(node, ast.List):
+            return [evaluate(element, resolve_name) for element in node.elts]
+        raise UnsupportedExpression(f"Cannot evaluate {type(node).__name__} nodes")
+
+
+def _literal_value(node):
+    for attribute in ("value", "s", "n"):
+        if hasattr(node, attribute):
+            return getattr(node, attribute)
+
+
+def _check_node(node):
+    if isinstance(node, (ast.Expression, ast.Load, ast.And, ast.Or, ast.Not, ast.USub) + LITERAL_NODES):
+        return
+    if type(node) in COMPARISON_OPERATORS:
+        return
+    if INDEX_NODE is not None and isinstance(node, INDEX_NODE):
+        return
+    if isinstance(node, (ast.Name, ast.Subscript, ast.BoolOp, ast.UnaryOp, ast.IfExp, ast.Tuple, ast.List)):
+        return
+    if isinstance(node, ast.Attribute):
+        if node.attr.startswith("_"):
+            raise UnsupportedExpression(f"Cannot access attribute {node.attr}")
+        return
+    if isinstance(node, ast.Compare):
+        if not all(type(op) in COMPARISON_OPERATORS for op in node.ops):
+            raise UnsupportedExpression("Unsupported comparison")
+        return
+    if isinstance(node, ast.Call):
+        if node.keywords or any(isinstance(arg, ast.Starred) for arg in node.args):
+            raise UnsupportedExpression("Cannot call with keyword or star arguments")
+        if isinstance(node.func, ast.Name) and node.func.id in SAFE_BUILTINS:
+            return
+        if isinstance(node.func, ast.Attribute) and node.func.attr in SAFE_METHODS:
+            return
+        raise UnsupportedExpression("Unsupported function call")
+    raise UnsupportedExpression(f"Unsupported {type(node).__name__} expression")
+
+
+class CompiledExpressionCache:
+    """Compiled expressions (or their :class:`UnsupportedExpression`) by expression text."""
+
+    def __init__(self, max_entries=MAX_COMPILED_EXPRESSIONS):
+        self.max_entries = max_entries
+        self._compiled = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, text):
+        with self._lock:
+            compiled = self._compiled.get(text)
+            if compiled is not None:
+                self._compiled.move_to_end(text)
+        if compiled is None:
+            try:
+                compiled = _compile_expression(text)
+            except UnsupportedExpression as e:
+                compiled = e
+            with self._lock:
+                self._compiled[text] = compiled
+                while len(self._compiled) > self.max_entries:
+                    self._compiled.popitem(last=False)
+        if isinstance(compiled, UnsupportedExpression):
+            raise compiled
+        return compiled
+
+
+compiled_expressions = CompiledExpressionCache()
+
+
+def compile_expression(text):
+    """
+    Return the :class:`CompiledExpression` for the python expression ``text``, compiled
+    once per process, or raise :class:`UnsupportedExpression` if it is outside of the
+    supported subset.
+    """
+    return compiled_expressions.get(text)
+
+
+def _compile_expression(text):
+    try:
+        tree = ast.parse(text.strip(), mode="eval")
+    except SyntaxError as e:
+        raise UnsupportedExpression(str(e))
+    for node in ast.walk(tree):
+        _check_node(node)
+    return CompiledExpression(text, tree)
+
+
+def evaluate_expression(text, names, fallback_globals=None):
+    """
+    Evaluate the python expression ``text`` with the ``names`` mapping, like
+    ``eval(text, fallback_globals, names)``, which is used for expressions outside of
+    the subset supported by :func:`compile_expression`.
+    """
+    def resolve_name(name):
+        if name in names:
+            return names[name]
+        if name in SAFE_BUILTINS and name not in (fallback_globals or {}):
+            return SAFE_BUILTINS[name]
+        raise UnsupportedExpression(f"Cannot resolve name {name}")
+
+    try:
+        return compile_expression(text).evaluate(resolve_name)
+    except UnsupportedExpression:
+        return eval(text, fallback_globals or {}, names)
+
 
 class ExpressionContext(MutableMapping):
     def __init__(self, dict, parent=None):
@@ -1,16 +1,34 @@
 """Entry point for the usage of Cheetah templating within Galaxy."""
 
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
 import traceback
+from collections import OrderedDict
 from lib2to3.refactor import RefactoringTool
 
+import Cheetah
 import packaging.version
 from Cheetah.Compiler import Compiler
-from Cheetah.NameMapper import NotFound
+from Cheetah.NameMapper import (
+    NotFound,
+    valueFromSearchList,
+)
 from Cheetah.Parser import ParseError
 from Cheetah.Template import Template
 from past.translation import myfixes
 
 from . import unicodify
+from .expressions import (
+    compile_expression,
+    SAFE_BUILTINS,
+    UnsupportedExpression,
+)
+
+log = logging.getLogger(__name__)
 
 # Skip libpasteurize fixers, which make sure code is py2 and py3 compatible.
 # This is not needed, we only translate code on py3.
@@ -36,6 +54,337 @@ def create_compiler_class(module_code):
     return CustomCompilerClass
 
 
+class CompiledTemplateCache:
+    """
+    Process-wide cache of compiled Cheetah template classes, keyed by a digest of the
+    template text and the ``python_template_version`` it is filled with.
+
+    The class cached for a template is the one that last filled it successfully, so
+    templates that only work once futurized are not recompiled (twice) for every job.
+    The ``max_entries`` most recently used classes are kept in memory; if ``cache_dir``
+    is set the generated module code is also written there, which saves parsing the
+    template again in other Galaxy processes and after restarts.
+    """
+
+    def __init__(self, max_entries=1000, cache_dir=None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._classes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self, max_entries, cache_dir=None):
+        with self._lock:
+            self.max_entries = max_entries
+            self.cache_dir = cache_dir
+            self._classes.clear()
+
+    @staticmethod
+    def key(template_text, python_template_version):
+        text = template_text if isinstance(template_text, bytes) else str(template_text).encode('utf-8')
+        return f"{hashlib.sha1(text).hexdigest()}-{python_template_version}"
+
+    def get(self, key, template_text):
+        """Return the cached ``(class, futurized)`` for ``key`` or None."""
+        if not self.max_entries:
+            return None
+        with self._lock:
+            cached = self._classes.get(key)
+            if cached is not None:
+                self._classes.move_to_end(key)
+                return cached
+        cached = self._read(key, template_text)
+        if cached is not None:
+            self._remember(key, cached)
+        return cached
+
+    def set(self, key, klass, futurized):
+        if not self.max_entries:
+            return
+        with self._lock:
+            known = self._classes.get(key)
+        if known is not None and known[0] is klass:
+            return
+        self._remember(key, (klass, futurized))
+        self._write(key, klass, futurized)
+
+    def clear(self):
+        with self._lock:
+            self._classes.clear()
+
+    def _remember(self, key, cached):
+        with self._lock:
+            self._classes[key] = cached
+            self._classes.move_to_end(key)
+            while len(self._classes) > self.max_entries:
+                self._classes.popitem(last=False)
+
+    def _path(self, key, futurized):
+        # Generated module code is only valid for the Cheetah version that generated it.
+        name = f"{key}{'-futurized' if futurized else ''}.py"
+        return os.path.join(self.cache_dir, f"cheetah-{Cheetah.Version}", key[:2], name)
+
+    def _read(self, key, template_text):
+        if not self.cache_dir:
+            return None
+        for futurized in (False, True):
+            path = self._path(key, futurized)
+            try:
+                with open(path) as fh:
+                    module_code = fh.read()
+            except FileNotFoundError:
+                continue
+            except OSError:
+                log.warning("Ignoring unreadable compiled template %s", path)
+                continue
+            try:
+                klass = _compile(template_text, create_compiler_class(module_code))
+            except Exception:
+                log.warning("Ignoring invalid compiled template %s", path)
+                continue
+            return klass, futurized
+        return None
+
+    def _write(self, key, klass, futurized):
+        module_code = getattr(klass, '_CHEETAH_generatedModuleCode', None)
+        if not self.cache_dir or not module_code:
+            return
+        path = self._path(key, futurized)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'w') as fh:
+                fh.write(module_code)
+            os.replace(tmp_path, path)
+        except OSError:
+            log.exception("Failed to write compiled template %s", path)
+
+
+compiled_template_cache = CompiledTemplateCache()
+
+
+PLACEHOLDER_NAME = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*")
+JOIN_EXPRESSION = re.compile(r"""^(?P<quote>["'])(?P<separator>[^"'\\$#]*)(?P=quote)\.join\(\$?(?P<name>%s)\)$""" % PLACEHOLDER_NAME.pattern)
+CONDITIONAL_DIRECTIVE = re.compile(r"^[ \t]*#(?P<directive>if|elif|else if|else|end if)\b[ \t]*(?P<expression>.*?)[ \t]*$")
+# names Cheetah resolves before the context: locals of the generated respond() method,
+# attributes of the template and of the (dict) locals and empty #set global variables
+CHEETAH_RESERVED_NAMES = frozenset(dir(Template)) | frozenset(dir(dict)) | {"SL", "_dummyTrans", "_filter", "_v", "self", "trans", "write"}
+MAX_SIMPLE_TEMPLATES = 1000
+
+
+class SimpleTemplateUnsupported(Exception):
+    """Raised for template text outside of the subset :class:`SimpleTemplate` fills."""
+
+
+class SimpleTemplate:
+    """
+    Fill the common subset of Cheetah templates - text, ``$name.attribute`` and
+    ``${name}`` placeholders, ``${"separator".join($name)}`` and whole line
+    ``#if``/``#elif``/``#else``/``#end if`` directives with conditions supported by
+    :func:`galaxy.util.expressions.compile_expression` - without compiling them with
+    Cheetah, with the same result. Placeholders are looked up like Cheetah does,
+    using its NameMapper.
+
+    Any other template raises :class:`SimpleTemplateUnsupported` when compiled and is
+    filled by Cheetah.
+    """
+
+    def __init__(self, template_text):
+        if "\r" in template_text:
+            raise SimpleTemplateUnsupported("Carriage returns")
+        # a block is a list of nodes: text, ("placeholder", name), ("join", separator, name)
+        # or ("if", [(condition, block), ...], else_block)
+        self.nodes = []
+        stack = [(self.nodes, None)]
+        for line in template_text.splitlines(True):
+            match = CONDITIONAL_DIRECTIVE.match(line.rstrip("\n"))
+            if match is None:
+                stack[-1][0].extend(self._parse_text(line))
+                continue
+            directive, expression = match.group("directive"), match.group("expression")
+            conditional = stack[-1][1]
+            if directive == "if":
+                block = []
+                node = ("if", [(self._parse_condition(expression), block)], None)
+                stack[-1][0].append(node)
+                stack.append((block, node))
+            elif conditional is None or expression and directive in ("else", "end if"):
+                raise SimpleTemplateUnsupported(f"Unexpected #{directive} {expression}")
+            elif directive in ("elif", "else if"):
+                block = []
+                conditional[1].append((self._parse_condition(expression), block))
+                stack[-1] = (block, conditional)
+            elif directive == "else":
+                block = []
+                stack.pop()
+                conditional = (conditional[0], conditional[1], block)
+                stack[-1][0][-1] = conditional
+                stack.append((block, conditional))
+            else:
+                stack.pop()
+        if len(stack) > 1:
+            raise SimpleTemplateUnsupported("Missing #end if")
+
+    def fill(self, context):
+        """Fill the template, raises Cheetah's ``NotFound`` for placeholders not in ``context``."""
+        output = []
+        self._fill(self.nodes, [context], output)
+        return "".join(output)
+
+    def _fill(self, nodes, search_list, output):
+        for node in nodes:
+            if isinstance(node, str):
+                output.append(node)
+            elif node[0] == "placeholder":
+                self._write(valueFromSearchList(search_list, node[1], True), output)
+            elif node[0] == "join":
+                self._write(node[1].join(valueFromSearchList(search_list, node[2], True)), output)
+            else:
+                for condition, block in node[1]:
+                    if self._evaluate(condition, search_list):
+                        self._fill(block, search_list, output)
+                        break
+                else:
+                    if node[2]:
+                        self._fill(node[2], search_list, output)
+
+    @staticmethod
+    def _write(value, output):
+        # Cheetah's default filter
+        if value is not None:
+            output.append(value if isinstance(value, str) else str(value))
+
+    @staticmethod
+    def _evaluate(condition, search_list):
+        expression, placeholders = condition
+
+        def resolve_name(name):
+            if name in placeholders:
+                return valueFromSearchList(search_list, placeholders[name], True)
+            return SAFE_BUILTINS[name]
+        return expression.evaluate(resolve_name)
+
+    def _parse_text(self, text):
+        nodes = []
+        literal = []
+        i = 0
+        while i < len(text):
+            char = text[i]
+            following = text[i + 1:i + 2]
+            if char == "\\" and following in ("$", "#"):
+                raise SimpleTemplateUnsupported("Escaped $ or #")
+            elif char == "#" and following and (following.isalpha() or following in "_#*{@"):
+                raise SimpleTemplateUnsupported("Directive or comment")
+            elif char == "$" and following and not following.isspace() and not following.isdigit():
+                if literal:
+                    nodes.append("".join(literal))
+                    literal = []
+                node, i = self._parse_placeholder(text, i)
+                nodes.append(node)
+                continue
+            literal.append(char)
+            i += 1
+        if literal:
+            nodes.append("".join(literal))
+        return nodes
+
+    def _parse_placeholder(self, text, start):
+        if text[start + 1] == "{":
+            end = text.find("}", start)
+            if end == -1:
+                raise SimpleTemplateUnsupported("Unterminated ${")
+            expression = text[start + 2:end].strip()
+            name = expression[1:] if expression.startswith("$") else expression
+            if PLACEHOLDER_NAME.fullmatch(name):
+                return ("placeholder", self._check_name(name)), end + 1
+            match = JOIN_EXPRESSION.match(expression)
+            if match:
+                return ("join", match.group("separator"), self._check_name(match.group("name"))), end + 1
+            raise SimpleTemplateUnsupported(f"Unsupported expression ${{{expression}}}")
+        match = PLACEHOLDER_NAME.match(text, start + 1)
+        if match is None or text[match.end():match.end() + 1] in ("(", "["):
+            raise SimpleTemplateUnsupported("Unsupported placeholder")
+        return ("placeholder", self._check_name(match.group())), match.end()
+
+    def _parse_condition(self, expression):
+        if "#" in expression or expression.endswith(":"):
+            raise SimpleTemplateUnsupported(f"Unsupported condition {expression}")
+        placeholders = {}
+        python_expression = []
+        quote = None
+        i = 0
+        while i < len(expression):
+            char = expression[i]
+            if quote:
+                if char in ("$", "\\"):
+                    raise SimpleTemplateUnsupported("$ or escape in string literal")
+                if char == quote:
+                    quote = None
+            elif char in ("'", '"'):
+                quote = char
+            elif char == "$":
+                node, i = self._parse_placeholder(expression, i)
+                if node[0] != "placeholder":
+                    raise SimpleTemplateUnsupported(f"Unsupported condition {expression}")
+                variable = f"__placeholder_{len(placeholders)}"
+                placeholders[variable] = node[1]
+                python_expression.append(f" {variable} ")
+                continue
+            python_expression.append(char)
+            i += 1
+        try:
+            compiled = compile_expression("".join(python_expression))
+        except UnsupportedExpression as e:
+            raise SimpleTemplateUnsupported(str(e))
+        if not compiled.names <= set(placeholders) | set(SAFE_BUILTINS):
+            raise SimpleTemplateUnsupported(f"Names without $ in condition {expression}")
+        return compiled, placeholders
+
+    @staticmethod
+    def _check_name(name):
+        root = name.split(".", 1)[0]
+        if root.startswith("_") or root in CHEETAH_RESERVED_NAMES:
+            raise SimpleTemplateUnsupported(f"Placeholder {name} resolved by Cheetah before the search list")
+        return name
+
+
+class SimpleTemplateCache:
+    """:class:`SimpleTemplate` (or None if unsupported) of the most recently filled template texts."""
+
+    def __init__(self, max_entries=MAX_SIMPLE_TEMPLATES):
+        self.max_entries = max_entries
+        self._templates = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, template_text):
+        with self._lock:
+            if template_text in self._templates:
+                self._templates.move_to_end(template_text)
+                return self._templates[template_text]
+        try:
+            simple_template = SimpleTemplate(template_text)
+        except SimpleTemplateUnsupported as e:
+            log.debug("Filling template with Cheetah: %s", e)
+            simple_template = None
+        with self._lock:
+            self._templates[template_text] = simple_template
+            while len(self._templates) > self.max_entries:
+                self._templates.popitem(last=False)
+        return simple_template
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+
+
+simple_templates = SimpleTemplateCache()
+
+
+def _compile(template_text, compiler_class, **kwds):
+    # Cheetah's own compile cache is unbounded and misses the compiler classes created
+    # for futurized templates, compiled classes are cached by CompiledTemplateCache instead.
+    return Template.compile(source=template_text, compilerClass=compiler_class, useCache=False, cacheCompilationResults=False, **kwds)
+
+
 def fill_template(template_text,
                   context=None,
                   retry=10,
@@ -54,30 +403,54 @@ def fill_template(template_text,
         raise TypeError("Template text specified as None to fill_template.")
     if not context:
         context = kwargs
+    if compiler_class is Compiler and first_exception is None and isinstance(template_text, str):
+        simple_template = simple_templates.get(template_text)
+        if simple_template is not None:
+            try:
+                return simple_template.fill(context)
+            except Exception:
+                # e.g. a name Cheetah finds outside of the context, let Cheetah fill (or fail on) the template
+                pass
     if isinstance(python_template_version, str):
         python_template_version = packaging.version.parse(python_template_version)
+    klass = cache_key = None
+    if compiler_class is Compiler and first_exception is None:
+        cache_key = compiled_template_cache.key(template_text, python_template_version)
+        cached = compiled_template_cache.get(cache_key, template_text)
+        if cached is not None:
+            klass, futurized = cached
+    return _fill_template(template_text, context, retry, compiler_class, first_exception, futurized, python_template_version, klass, cache_key)
+
+
+def _fill_template(template_text, context, retry, compiler_class, first_exception, futurized, python_template_version, klass=None, cache_key=None):
     try:
-        klass = Template.compile(source=template_text, compilerClass=compiler_class)
+        if klass is None:
+            klass = _compile(template_text, compiler_class)
     except ParseError as e:
         # Might happen on invalid syntax within a cheetah statement, like `#if $smxsize <> 128.0`
         if first_exception is None:
             first_exception = e
         if python_template_version.release[0] < 3 and retry > 0:
-            module_code = Template.compile(source=template_text, compilerClass=compiler_class, returnAClass=False).decode('utf-8')
+            module_code = _compile(template_text, compiler_class, returnAClass=False).decode('utf-8')
             module_code = futurize_preprocessor(module_code)
             compiler_class = create_compiler_class(module_code)
-            return fill_template(
+            return _fill_template(
                 template_text=template_text,
                 context=context,
                 retry=retry - 1,
                 compiler_class=compiler_class,
                 first_exception=first_exception,
+                futurized=False,
                 python_template_version=python_template_version,
+                cache_key=cache_key,
             )
         raise first_exception or e
     t = klass(searchList=[context])
     try:
-        return unicodify(t, log_exception=False)
+        filled = unicodify(t, log_exception=False)
+        if cache_key:
+            compiled_template_cache.set(cache_key, klass, futurized)
+        return filled
     except NotFound as e:
         if first_exception is None:
             first_exception = e
@@ -97,13 +470,15 @@ def fill_template(template_text,
                 module_code[lineno] = module_code[lineno].replace(replace_str, var_not_found)
                 module_code = "\n".join(module_code)
                 compiler_class = create_compiler_class(module_code)
-                return fill_template(template_text=template_text,
-                                     context=context,
-                                     retry=retry - 1,
-                                     compiler_class=compiler_class,
-                                     first_exception=first_exception,
-                                     python_template_version=python_template_version,
-                                     )
+                return _fill_template(template_text=template_text,
+                                      context=context,
+                                      retry=retry - 1,
+                                      compiler_class=compiler_class,
+                                      first_exception=first_exception,
+                                      futurized=False,
+                                      python_template_version=python_template_version,
+                                      cache_key=cache_key,
+                                      )
         raise first_exception or e
     except Exception as e:
         if first_exception is None:
@@ -115,14 +490,15 @@ def fill_template(template_text,
             module_code = t._CHEETAH_generatedModuleCode
             module_code = futurize_preprocessor(module_code)
             compiler_class = create_compiler_class(module_code)
-            return fill_template(template_text=template_text,
-                                 context=context,
-                                 retry=retry,
-                                 compiler_class=compiler_class,
-                                 first_exception=first_exception,
-                                 futurized=True,
-                                 python_template_version=python_template_version,
-                                 )
+            return _fill_template(template_text=template_text,
+                                  context=context,
+                                  retry=retry,
+                                  compiler_class=compiler_class,
+                                  first_exception=first_exception,
+                                  futurized=True,
+                                  python_template_version=python_template_version,
+                                  cache_key=cache_key,
+                                  )
         raise first_exception or e
 
 
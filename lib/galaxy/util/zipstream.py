@@ -1,10 +1,55 @@
+import mmap
 import os
+import stat
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import quote
 
 import zipstream
 
 from .path import safe_walk
 
+# Size of the slices handed to zipstream for local files, zipstream itself reads in 8 KiB chunks.
+CHUNK_SIZE = 1024 * 1024
+
+
+def iter_mmap_chunks(path, chunk_size=CHUNK_SIZE):
+    """Yield the contents of ``path`` in ``chunk_size`` slices of a read-only memory map."""
+    with open(path, 'rb') as fh:
+        if not os.fstat(fh.fileno()).st_size:
+            return
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            for offset in range(0, len(mm), chunk_size):
+                yield mm[offset:offset + chunk_size]
+
+
+def resolve_ahead(resolvers, max_workers=1):
+    """
+    Call each zero-argument callable in ``resolvers`` and yield the results in order.
+
+    With ``max_workers > 1`` up to ``max_workers`` callables are evaluated concurrently
+    ahead of the one being consumed, which hides file system latency (e.g. listing
+    directories on network storage, or fetching files into an object store cache). The
+    callables must then only work with plain paths and values, such as dataset identifiers
+    passed to the object store, never with database objects: ``resolvers`` itself is only
+    advanced from the consuming thread, so that is where database access has to happen.
+    """
+    if max_workers <= 1:
+        for resolver in resolvers:
+            yield resolver()
+        return
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='archive-prefetch') as executor:
+        window = deque()
+        for resolver in resolvers:
+            window.append(executor.submit(resolver))
+            if len(window) > max_workers:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+
 
 class ZipstreamWrapper:
 
@@ -15,12 +60,27 @@ class ZipstreamWrapper:
             self.archive = zipstream.ZipFile(allowZip64=True, compression=zipstream.ZIP_STORED if upstream_gzip else zipstream.ZIP_DEFLATED)
         self.files = []
         self.size = 0
+        self.pending = []
 
     def response(self):
         if self.upstream_mod_zip:
+            for paths_and_archive_names in self._iter_pending():
+                for path, archive_name in paths_and_archive_names:
+                    self.write(path, archive_name)
             yield "\n".join(self.files).encode()
         else:
-            yield iter(self.archive)
+            yield self._stream_archive()
+
+    def _stream_archive(self):
+        for paths_and_archive_names in self._iter_pending():
+            for path, archive_name in paths_and_archive_names:
+                self.write(path, archive_name)
+            yield from self.archive.flush()
+        yield from self.archive
+
+    def _iter_pending(self):
+        for resolvers, max_workers in self.pending:
+            yield from resolve_ahead(resolvers, max_workers=max_workers)
 
     def get_headers(self):
         headers = {}
@@ -33,7 +93,8 @@ class ZipstreamWrapper:
         return headers
 
     def add_path(self, path, archive_name):
-        size = int(os.stat(path).st_size)
+        st = os.stat(path)
+        size = int(st.st_size)
         if self.upstream_mod_zip:
             # calculating crc32 would defeat the point of using mod-zip, but if we ever calculate hashsums we should consider this
             crc32 = "-"
@@ -41,7 +102,15 @@ class ZipstreamWrapper:
             self.files.append(line)
         else:
             self.size += size
-            self.archive.write(path, archive_name)
+            if size and stat.S_ISREG(st.st_mode):
+                self.archive.write_iter(
+                    archive_name,
+                    iter_mmap_chunks(path),
+                    buffer_size=size,
+                    date_time=time.localtime(st.st_mtime),
+                )
+            else:
+                self.archive.write(path, archive_name)
 
     def write(self, path, archive_name=None):
         if os.path.isdir(path):
@@ -55,3 +124,14 @@ class ZipstreamWrapper:
                     self.add_path(file_path, os.path.relpath(file_path, pardir))
         else:
             self.add_path(path, archive_name or os.path.basename(path))
+
+    def write_lazy(self, resolvers, max_workers=1):
+        """
+        Add entries while the archive is being streamed instead of up front.
+
+        ``resolvers`` is an iterable of zero-argument callables, each returning an iterable of
+        ``(path, archive_name)`` pairs. Entries are written as soon as they are resolved, so the
+        first bytes are sent before the last entry is known; see ``resolve_ahead`` for ``max_workers``
+        and what the callables may do.
+        """
+        self.pending.append((resolvers, max_workers))
@@ -0,0 +1,330 @@
+"""
+Caches shared by the genome data providers.
+
+``HandlePool`` keeps open file handles (pysam, BBI and interval index readers) around
+between requests and ``TileCache`` keeps the processed results of data requests, both in
+memory and on disk. Entries are keyed by a fingerprint of the files a provider reads, so
+a rewritten or reconverted dataset never sees stale handles or tiles.
+"""
+import copy
+import hashlib
+import json
+import logging
+import math
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+log = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# Fraction of TileCache.max_cache_dir_size the cache directory is pruned down to once exceeded.
+PRUNE_TARGET = 0.9
+
+
+def file_fingerprint(paths):
+    """
+    Returns a digest of the path, size and modification time of each of ``paths``
+    or None if any of them cannot be stat'ed.
+    """
+    parts = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        parts.append([path, st.st_size, st.st_mtime_ns])
+    return hashlib.sha1(json.dumps(parts).encode()).hexdigest()
+
+
+def paths_digest(paths):
+    """Returns a digest of ``paths``, identifying a dataset independently of its contents."""
+    return hashlib.sha1(json.dumps(list(paths)).encode()).hexdigest()
+
+
+def zoom_level(start, end):
+    """
+    Returns the zoom level of a request for the region start:end. Trackster requests
+    tiles whose width is a fixed number of pixels times the resolution, so tiles of the
+    same zoom level share a level here.
+    """
+    return max(0, int(math.log2(max(end - start, 1))))
+
+
+def _cache_param(value):
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    sequence = getattr(value, 'sequence', None)
+    if isinstance(sequence, str):
+        # Reference sequence (a GenomeRegion) handed to providers of aligned reads.
+        return [str(value), hashlib.sha1(sequence.encode()).hexdigest()]
+    return repr(value)
+
+
+class HandlePool:
+    """
+    Pool of open data file handles. A handle is checked out for the duration of one
+    request, so a handle is never shared by two concurrent requests; at most
+    ``max_idle`` handles are kept open between requests, least recently used first out.
+    """
+
+    def __init__(self, max_idle=32):
+        self.max_idle = max_idle
+        self._idle = OrderedDict()
+        self._idle_count = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def checkout(self, kind, paths, opener, closer):
+        fingerprint = file_fingerprint(paths)
+        if fingerprint is None:
+            handle = opener()
+            try:
+                yield handle
+            finally:
+                closer(handle)
+            return
+        key = (kind, fingerprint)
+        handle = self._acquire(key)
+        if handle is None:
+            handle = opener()
+        try:
+            yield handle
+        except BaseException:
+            # The handle may be left in an unusable state, do not hand it out again.
+            closer(handle)
+            raise
+        self._release(key, handle, closer)
+
+    def clear(self):
+        with self._lock:
+            idle = [entry for entries in self._idle.values() for entry in entries]
+            self._idle.clear()
+            self._idle_count = 0
+        for handle, closer in idle:
+            self._close(handle, closer)
+
+    def _acquire(self, key):
+        with self._lock:
+            entries = self._idle.get(key)
+            if not entries:
+                return None
+            handle, _ = entries.pop()
+            if not entries:
+                del self._idle[key]
+            self._idle_count -= 1
+            return handle
+
+    def _release(self, key, handle, closer):
+        evicted = []
+        with self._lock:
+            self._idle.setdefault(key, []).append((handle, closer))
+            self._idle.move_to_end(key)
+            self._idle_count += 1
+            while self._idle_count > self.max_idle:
+                oldest_key = next(iter(self._idle))
+                entries = self._idle[oldest_key]
+                evicted.append(entries.pop(0))
+                if not entries:
+                    del self._idle[oldest_key]
+                self._idle_count -= 1
+        for evicted_handle, evicted_closer in evicted:
+            self._close(evicted_handle, evicted_closer)
+
+    def _close(self, handle, closer):
+        try:
+            closer(handle)
+        except Exception:
+            log.exception("Failed to close pooled data file handle")
+
+
+class TileCache:
+    """
+    Cache of processed data provider results. The most recently used ``max_entries``
+    tiles are kept in memory; if ``cache_dir`` is set every tile is also written there,
+    laid out as ``<dataset digest>/<dataset fingerprint>/<zoom level>/<tile digest>.json``,
+    so tiles survive restarts and are shared between Galaxy processes.
+
+    Tiles of previous versions of a dataset are removed when the first tile of its new
+    version is written. If ``max_cache_dir_size`` is set and the tiles in ``cache_dir``
+    take more bytes than that, the least recently used ones are removed.
+    """
+
+    def __init__(self, max_entries=128, cache_dir=None, max_cache_dir_size=None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_cache_dir_size = max_cache_dir_size
+        self._tiles = OrderedDict()
+        self._lock = threading.Lock()
+        # size of cache_dir when last pruned plus the tiles written since, None if not measured yet
+        self._cache_dir_size = None
+        self._prune_lock = threading.Lock()
+
+    def get_or_compute(self, paths, chrom, start, end, params, compute):
+        """
+        Returns the tile for chrom:start-end requested with ``params`` from the dataset
+        files ``paths``, calling ``compute`` to produce it if it is not cached.
+        """
+        fingerprint = file_fingerprint(paths)
+        if fingerprint is None:
+            return compute()
+        key = self._key(paths, fingerprint, chrom, start, end, params)
+        value = self._get(key)
+        if value is _MISSING:
+            value = compute()
+            self._set(key, value)
+        return self._copy(value)
+
+    def clear(self):
+        with self._lock:
+            self._tiles.clear()
+
+    def _key(self, paths, fingerprint, chrom, start, end, params):
+        params = {name: _cache_param(value) for name, value in params.items()}
+        digest = hashlib.sha1(json.dumps([chrom, start, end, params], sort_keys=True).encode()).hexdigest()
+        return paths_digest(paths), fingerprint, zoom_level(start, end), digest
+
+    def _get(self, key):
+        with self._lock:
+            value = self._tiles.get(key, _MISSING)
+            if value is not _MISSING:
+                self._tiles.move_to_end(key)
+                return value
+        value = self._read(key)
+        if value is not _MISSING:
+            self._remember(key, value)
+        return value
+
+    def _set(self, key, value):
+        self._remember(key, value)
+        self._write(key, value)
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._tiles[key] = value
+            self._tiles.move_to_end(key)
+            while len(self._tiles) > self.max_entries:
+                self._tiles.popitem(last=False)
+
+    def _path(self, key):
+        dataset, fingerprint, zoom, digest = key
+        return os.path.join(self.cache_dir, dataset[:2], dataset, fingerprint, str(zoom), f"{digest}.json")
+
+    def _read(self, key):
+        if not self.cache_dir:
+            return _MISSING
+        path = self._path(key)
+        try:
+            with open(path) as fh:
+                value = json.load(fh)
+        except FileNotFoundError:
+            return _MISSING
+        except (OSError, ValueError):
+            log.warning("Ignoring unreadable visualization tile %s", path)
+            return _MISSING
+        try:
+            # the modification time orders tiles by last use when pruning
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def _write(self, key, value):
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        try:
+            serialized = json.dumps(value)
+        except (TypeError, ValueError):
+            log.debug("Visualization tile for %s is not serializable, keeping it in memory only", path)
+            return
+        fingerprint_dir = os.path.dirname(os.path.dirname(path))
+        new_fingerprint = not os.path.isdir(fingerprint_dir)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'w') as fh:
+                fh.write(serialized)
+            os.replace(tmp_path, path)
+        except OSError:
+            log.exception("Failed to write visualization tile %s", path)
+            return
+        if new_fingerprint:
+            self._remove_stale_fingerprints(fingerprint_dir)
+        self._add_cache_dir_size(len(serialized))
+
+    def _remove_stale_fingerprints(self, fingerprint_dir):
+        """Remove the tiles of the previous versions of the dataset of ``fingerprint_dir``."""
+        dataset_dir, fingerprint = os.path.split(fingerprint_dir)
+        try:
+            stale = [name for name in os.listdir(dataset_dir) if name != fingerprint]
+        except OSError:
+            return
+        for name in stale:
+            shutil.rmtree(os.path.join(dataset_dir, name), ignore_errors=True)
+
+    def _add_cache_dir_size(self, size):
+        if not self.max_cache_dir_size:
+            return
+        with self._lock:
+            if self._cache_dir_size is not None:
+                self._cache_dir_size += size
+                if self._cache_dir_size <= self.max_cache_dir_size:
+                    return
+        self._prune()
+
+    def _prune(self):
+        """
+        Measure ``cache_dir`` and if it exceeds ``max_cache_dir_size`` remove the least
+        recently used tiles until it is below ``PRUNE_TARGET`` of it, then remove empty
+        directories. Other processes may prune the same directory concurrently.
+        """
+        if not self._prune_lock.acquire(blocking=False):
+            # another thread of this process is pruning already
+            return
+        try:
+            tiles = []
+            total = 0
+            for root, _, files in os.walk(self.cache_dir):
+                for name in files:
+                    if name.endswith('.tmp'):
+                        # being written
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    tiles.append((st.st_mtime, path, st.st_size))
+                    total += st.st_size
+            if total > self.max_cache_dir_size:
+                target = self.max_cache_dir_size * PRUNE_TARGET
+                for _, path, size in sorted(tiles):
+                    if total <= target:
+                        break
+                    try:
+                        os.unlink(path)
+                    except FileNotFoundError:
+                        pass
+                    except OSError:
+                        continue
+                    total -= size
+                for root, _, _ in os.walk(self.cache_dir, topdown=False):
+                    if root != self.cache_dir:
+                        try:
+                            os.rmdir(root)
+                        except OSError:
+                            pass
+            with self._lock:
+                self._cache_dir_size = total
+        finally:
+            self._prune_lock.release()
+
+    @staticmethod
+    def _copy(value):
+        # Callers modify the returned tile (e.g. add keys to it), keep the cached one intact.
+        return copy.deepcopy(value)
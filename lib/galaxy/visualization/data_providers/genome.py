@@ -138,6 +138,10 @@ class GenomeDataProvider(BaseDataProvider):
     """
     col_name_data_attr_mapping: Dict[Union[str, int], Dict] = {}
 
+    # Optional HandlePool and TileCache, set by the DataProviderRegistry.
+    handle_pool = None
+    tile_cache = None
+
     def __init__(self, converted_dataset=None, original_dataset=None, dependencies=None,
                  error_max_vals="Only the first %i %s in this region are displayed."):
         super().__init__(converted_dataset=converted_dataset,
@@ -193,10 +197,47 @@ class GenomeDataProvider(BaseDataProvider):
             dataset_type, data
         """
         start, end = int(low), int(high)
-        with self.open_data_file() as data_file:
-            iterator = self.get_iterator(data_file, chrom, start, end, **kwargs)
-            data = self.process_data(iterator, start_val, max_vals, start=start, end=end, **kwargs)
-        return data
+
+        def compute():
+            with self.open_data_file() as data_file:
+                iterator = self.get_iterator(data_file, chrom, start, end, **kwargs)
+                return self.process_data(iterator, start_val, max_vals, start=start, end=end, **kwargs)
+
+        return self._cached_data(chrom, start, end, compute, start_val=start_val, max_vals=max_vals, **kwargs)
+
+    def data_file_names(self):
+        """
+        Returns the paths of the files data is read from.
+        """
+        datasets = [self.original_dataset, self.converted_dataset]
+        datasets.extend((self.dependencies or {}).values())
+        return [dataset.file_name for dataset in datasets if dataset is not None]
+
+    def _cached_data(self, chrom, start, end, compute, **params):
+        """
+        Returns the result of compute() for the region chrom:start-end requested with
+        params, from the tile cache if one is configured.
+        """
+        if self.tile_cache is None:
+            return compute()
+        return self.tile_cache.get_or_compute(self.data_file_names(), (self.__class__.__name__, chrom),
+                                              start, end, params, compute)
+
+    @contextmanager
+    def _pooled_handle(self, opener, closer):
+        """
+        Yields a handle created by opener(), reusing an idle one from the handle pool
+        if one is configured; closer(handle) releases it.
+        """
+        if self.handle_pool is None:
+            handle = opener()
+            try:
+                yield handle
+            finally:
+                closer(handle)
+        else:
+            with self.handle_pool.checkout(self.dataset_type, self.data_file_names(), opener, closer) as handle:
+                yield handle
 
     def get_genome_data(self, chroms_info, **kwargs):
         """
@@ -326,7 +367,11 @@ class TabixDataProvider(GenomeDataProvider, FilterableMixin):
         # We create a symlink to the index file. This is
         # required until https://github.com/pysam-developers/pysam/pull/586 is merged.
         index_path = self.converted_dataset.file_name
-        with pysam.TabixFile(self.dependencies['bgzip'].file_name, index=index_path) as f:
+
+        def opener():
+            return pysam.TabixFile(self.dependencies['bgzip'].file_name, index=index_path)
+
+        with self._pooled_handle(opener, lambda f: f.close()) as f:
             yield f
 
     def get_iterator(self, data_file, chrom, start, end, **kwargs):
@@ -852,8 +897,11 @@ class BamDataProvider(GenomeDataProvider, FilterableMixin):
     @contextmanager
     def open_data_file(self):
         # Attempt to open the BAM file with index
-        with pysam.AlignmentFile(self.original_dataset.file_name, mode='rb',
-                                 index_filename=self.converted_dataset.file_name) as f:
+        def opener():
+            return pysam.AlignmentFile(self.original_dataset.file_name, mode='rb',
+                                       index_filename=self.converted_dataset.file_name)
+
+        with self._pooled_handle(opener, lambda f: f.close()) as f:
             yield f
 
     def get_iterator(self, data_file, chrom, start, end, **kwargs):
@@ -1114,34 +1162,39 @@ class BBIDataProvider(GenomeDataProvider):
         # No way to return this info as of now
         return None
 
+    @contextmanager
+    def open_data_file(self):
+        with self._pooled_handle(self._get_dataset, lambda handle: handle[0].close()) as (_, bbi):
+            yield bbi
+
     def has_data(self, chrom):
-        f, bbi = self._get_dataset()
-        all_dat = bbi.query(chrom, 0, 2147483647, 1) or \
-            bbi.query(_convert_between_ucsc_and_ensemble_naming(chrom), 0, 2147483647, 1)
-        f.close()
+        with self.open_data_file() as bbi:
+            all_dat = bbi.query(chrom, 0, 2147483647, 1) or \
+                bbi.query(_convert_between_ucsc_and_ensemble_naming(chrom), 0, 2147483647, 1)
         return all_dat is not None
 
     def get_data(self, chrom, start, end, start_val=0, max_vals=None, num_samples=1000, **kwargs):
         start = int(start)
         end = int(end)
 
+        def compute():
+            with self.open_data_file() as bbi:
+                return self._summarize(bbi, chrom, start, end, num_samples, **kwargs)
+
+        return self._cached_data(chrom, start, end, compute, num_samples=num_samples, **kwargs)
+
+    def _summarize(self, bbi, chrom, start, end, num_samples, **kwargs):
         # Helper function for getting summary data regardless of chromosome
         # naming convention.
         def _summarize_bbi(bbi, chrom, start, end, num_points):
             return bbi.summarize(chrom, start, end, num_points) or \
                 bbi.summarize(_convert_between_ucsc_and_ensemble_naming(chrom), start, end, num_points)
 
-        # Bigwig can be a standalone bigwig file, in which case we use
-        # original_dataset, or coming from wig->bigwig conversion in
-        # which we use converted_dataset
-        f, bbi = self._get_dataset()
-
         # If stats requested, compute overall summary data for the range
         # start:endbut no reduced data. This is currently used by client
         # to determine the default range.
         if 'stats' in kwargs:
             summary = _summarize_bbi(bbi, chrom, start, end, 1)
-            f.close()
 
             min_val = 0
             max_val = 0
@@ -1224,9 +1277,6 @@ class BBIDataProvider(GenomeDataProvider):
             num_points += additional_points
 
         result = summarize_region(bbi, chrom, start, end, num_points)
-
-        # Cleanup and return.
-        f.close()
         return {
             'data': result,
             'dataset_type': self.dataset_type
@@ -1247,6 +1297,9 @@ class BigWigDataProvider(BBIDataProvider):
     """
 
     def _get_dataset(self):
+        # Bigwig can be a standalone bigwig file, in which case we use
+        # original_dataset, or coming from wig->bigwig conversion in
+        # which we use converted_dataset
         if self.converted_dataset is not None:
             f = open(self.converted_dataset.file_name, 'rb')
         else:
@@ -1285,8 +1338,9 @@ class IntervalIndexDataProvider(GenomeDataProvider, FilterableMixin):
 
     @contextmanager
     def open_data_file(self):
-        i = Indexes(self.converted_dataset.file_name)
-        yield i
+        # Indexes reads the per chromosome indexes on demand and keeps no file open.
+        with self._pooled_handle(lambda: Indexes(self.converted_dataset.file_name), lambda i: None) as i:
+            yield i
 
     def get_iterator(self, data_file, chrom, start, end, **kwargs):
         """
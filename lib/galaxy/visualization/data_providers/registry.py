@@ -12,6 +12,7 @@ from galaxy.datatypes.xml import Phyloxml
 from galaxy.model import NoConverterException
 from galaxy.visualization.data_providers import genome
 from galaxy.visualization.data_providers.basic import ColumnDataProvider
+from galaxy.visualization.data_providers.cache import HandlePool, TileCache
 from galaxy.visualization.data_providers.phyloviz import PhylovizDataProvider
 
 
@@ -20,7 +21,18 @@ class DataProviderRegistry:
     Registry for data providers that enables listing and lookup.
     """
 
-    def __init__(self):
+    def __init__(self, config=None):
+        # Open file handles and processed tiles shared by the genome data providers.
+        self.handle_pool = None
+        self.tile_cache = None
+        if config is not None:
+            if config.visualization_handle_pool_size > 0:
+                self.handle_pool = HandlePool(max_idle=config.visualization_handle_pool_size)
+            if config.visualization_tile_cache_size > 0:
+                self.tile_cache = TileCache(max_entries=config.visualization_tile_cache_size,
+                                            cache_dir=config.visualization_tile_cache_dir,
+                                            max_cache_dir_size=config.visualization_tile_cache_dir_size * 1024 * 1024 or None)
+
         # Mapping from dataset type name to a class that can fetch data from a file of that
         # type. First key is converted dataset type; if result is another dict, second key
         # is original dataset type.
@@ -115,4 +127,7 @@ class DataProviderRegistry:
                         except NoConverterException:
                             pass
 
+        if isinstance(data_provider, genome.GenomeDataProvider):
+            data_provider.handle_pool = self.handle_pool
+            data_provider.tile_cache = self.tile_cache
         return data_provider
@@ -2,6 +2,8 @@
 API operations on the contents of a history.
 """
 import datetime
+import functools
+import glob
 import json
 import logging
 import os
@@ -73,10 +75,12 @@ from galaxy.schema.schema import (
     Model,
     UpdateDatasetPermissionsPayload,
     UpdateHistoryContentsBatchPayload,
+    UpdateHistoryContentsBulkResult,
     WorkflowInvocationStateSummary,
 )
 from galaxy.schema.types import SerializationParams
 from galaxy.security.idencoding import IdEncodingHelper
+from galaxy.util.bunch import Bunch
 from galaxy.util.json import safe_dumps
 from galaxy.util.zipstream import ZipstreamWrapper
 from galaxy.web import (
@@ -454,7 +458,11 @@ class HistoriesContentsService(ServiceBase):
             return {'error': util.unicodify(e)}
 
     def __stream_dataset_collection(self, trans, dataset_collection_instance):
-        archive = hdcas.stream_dataset_collection(dataset_collection_instance=dataset_collection_instance, upstream_mod_zip=trans.app.config.upstream_mod_zip)
+        archive = hdcas.stream_dataset_collection(
+            dataset_collection_instance=dataset_collection_instance,
+            upstream_mod_zip=trans.app.config.upstream_mod_zip,
+            prefetch_threads=trans.app.config.archive_prefetch_threads,
+        )
         trans.response.headers.update(archive.get_headers())
         return archive.response()
 
@@ -558,7 +566,8 @@ class HistoriesContentsService(ServiceBase):
 
         :rtype:     dict
         :returns:   an error object if an error occurred or a dictionary containing
-                    any values that were different from the original and, therefore, updated
+                    any values that were different from the original and, therefore, updated,
+                    or only the number of updated datasets and collections if ``bulk`` is set
         """
         history = self.history_manager.get_owned(
             self.decode_id(history_id), trans.user, current_history=trans.history
@@ -573,6 +582,8 @@ class HistoriesContentsService(ServiceBase):
                 hda_ids.append(decoded_id)
             else:
                 hdca_ids.append(item.id)
+        if payload.bulk:
+            return self.__update_batch_bulk(trans, history, hda_ids, hdca_ids, payload)
         payload_dict = payload.dict(exclude_unset=True)
         hdas = self.__datasets_for_update(trans, history, hda_ids, payload_dict)
         rval = []
@@ -588,6 +599,28 @@ class HistoriesContentsService(ServiceBase):
             rval.append(self.__collection_dict(trans, dataset_collection_instance, view="summary"))
         return rval
 
+    def __update_batch_bulk(
+        self, trans,
+        history: History,
+        hda_ids: List[int],
+        hdca_ids: List[EncodedDatabaseIdField],
+        payload: UpdateHistoryContentsBatchPayload,
+    ) -> UpdateHistoryContentsBulkResult:
+        changes = payload.dict(include={'visible', 'deleted', 'purged', 'tags'}, exclude_unset=True)
+        anonymous_user = not trans.user_is_admin and trans.user is None
+        if anonymous_user:
+            changes.pop('purged', None)
+            changes.pop('tags', None)
+        dataset_count = self.hda_manager.bulk_update(history, hda_ids, user=trans.user, **changes)
+        changes.pop('purged', None)
+        dataset_collection_count = self.dataset_collection_manager.bulk_update(
+            trans, history, [self.decode_id(hdca_id) for hdca_id in hdca_ids], **changes
+        )
+        return UpdateHistoryContentsBulkResult(
+            dataset_count=dataset_count,
+            dataset_collection_count=dataset_collection_count,
+        )
+
     def validate(
         self, trans,
         history_id: EncodedDatabaseIdField,
@@ -693,15 +726,13 @@ class HistoriesContentsService(ServiceBase):
         history = self.history_manager.get_accessible(trans.security.decode_id(history_id), trans.user)
         archive_base_name = filename or name_to_filename(history.name)
 
-        # this is the fn applied to each dataset contained in the query
-        paths_and_files = []
+        object_store = trans.app.object_store
 
+        # this is the fn applied to each dataset contained in the query, it runs on the request thread and
+        # returns a callable that only works with plain paths and dataset identifiers, so that it may run
+        # on a prefetch thread
         def build_archive_files_and_paths(content, *parents):
             archive_path = archive_base_name
-            if not self.hda_manager.is_accessible(content, trans.user):
-                # if the underlying dataset is not accessible, skip it silently
-                return
-
             content_container_id = content.hid
             content_name = name_to_filename(content.name)
             if parents:
@@ -720,40 +751,73 @@ class HistoriesContentsService(ServiceBase):
             content_id_and_name = id_name_format.format(content_container_id, content_name)
             archive_path = os.path.join(archive_path, content_id_and_name)
 
+            dataset = content.dataset
+            if dataset.purged or dataset.external_filename:
+                # nothing to fetch from the object store
+                file_key, file_name = None, content.file_name
+            else:
+                file_key, file_name = Bunch(id=dataset.id, uuid=dataset.uuid, object_store_id=dataset.object_store_id), None
+
             # ---- for composite files, we use id and name for a directory and, inside that, ...
             if self.hda_manager.is_composite(content):
-                # ...save the 'main' composite file (gen. html)
-                paths_and_files.append((content.file_name, os.path.join(archive_path, f"{content.name}.html")))
-                for extra_file in self.hda_manager.extra_files(content):
-                    extra_file_basename = os.path.basename(extra_file)
-                    archive_extra_file_path = os.path.join(archive_path, extra_file_basename)
-                    # ...and one for each file in the composite
-                    paths_and_files.append((extra_file, archive_extra_file_path))
+                # ...save the 'main' composite file (gen. html) and one for each file in the composite
+                return functools.partial(
+                    composite_archive_files_and_paths,
+                    file_key,
+                    file_name,
+                    os.path.join(archive_path, f"{content.name}.html"),
+                    dataset.extra_files_path,
+                    archive_path,
+                )
 
             # ---- for single files, we add the true extension to id and name and store that single filename
-            else:
-                # some dataset names can contain their original file extensions, don't repeat
-                if not archive_path.endswith(f".{content.extension}"):
-                    archive_path += f".{content.extension}"
-                paths_and_files.append((content.file_name, archive_path))
-
-        # filter the contents that contain datasets using any filters possible from index above and map the datasets
+            # some dataset names can contain their original file extensions, don't repeat
+            if not archive_path.endswith(f".{content.extension}"):
+                archive_path += f".{content.extension}"
+            return functools.partial(single_archive_files_and_paths, file_key, file_name, archive_path)
+
+        def fetch_file_name(file_key, file_name):
+            # fetches the file into the object store cache, if the object store has one
+            if file_key is None:
+                return file_name
+            try:
+                return object_store.get_filename(file_key)
+            except exceptions.ObjectNotFound:
+                return ''
+
+        def single_archive_files_and_paths(file_key, file_name, archive_path):
+            return [(fetch_file_name(file_key, file_name), archive_path)]
+
+        def composite_archive_files_and_paths(file_key, file_name, archive_file_name, extra_files_path, archive_path):
+            paths_and_files = [(fetch_file_name(file_key, file_name), archive_file_name)]
+            for extra_file in glob.glob(os.path.join(extra_files_path, '*')):
+                paths_and_files.append((extra_file, os.path.join(archive_path, os.path.basename(extra_file))))
+            return paths_and_files
+
+        # filter the contents that contain datasets using any filters possible from index above and
+        # lazily walk the datasets, permission checks stay on the request thread
         filters = self.history_contents_filters.parse_query_filters(filter_query_params)
-        self.history_contents_manager.map_datasets(history, build_archive_files_and_paths, filters=filters)
+
+        def archive_resolvers():
+            for content, parents in self.history_contents_manager.iter_datasets(history, filters=filters):
+                if not self.hda_manager.is_accessible(content, trans.user):
+                    # if the underlying dataset is not accessible, skip it silently
+                    continue
+                yield build_archive_files_and_paths(content, *parents)
 
         # if dry_run, return the structure as json for debugging
         if dry_run:
+            paths_and_files = [path_and_file for resolver in archive_resolvers() for path_and_file in resolver()]
             trans.response.headers['Content-Type'] = 'application/json'
             return safe_dumps(paths_and_files)
 
-        # create the archive, add the dataset files, then stream the archive as a download
+        # create the archive, then stream it as a download while the dataset files are resolved
         archive = ZipstreamWrapper(
             archive_name=archive_base_name,
             upstream_mod_zip=trans.app.config.upstream_mod_zip,
             upstream_gzip=trans.app.config.upstream_gzip,
         )
-        for file_path, archive_path in paths_and_files:
-            archive.write(file_path, archive_path)
+        archive.write_lazy(archive_resolvers(), max_workers=trans.app.config.archive_prefetch_threads)
 
         trans.response.headers.update(archive.get_headers())
         return archive.response()
@@ -871,31 +935,9 @@ class HistoriesContentsService(ServiceBase):
         return rval
 
     def _get_filtered_extrema(self, history, filter_params):
-        extrema_params = parse_serialization_params(keys='hid', default_view='summary')
         extrema_filter_params = [f for f in filter_params if f[0] != 'update_time']
         extrema_filters = self.history_contents_filters.parse_filters(extrema_filter_params)
-
-        order_by_dsc = self.build_order_by(self.history_contents_manager, 'hid-dsc')
-        order_by_asc = self.build_order_by(self.history_contents_manager, 'hid-asc')
-
-        max_row_result = self.history_contents_manager.contents(history,
-            limit=1,
-            filters=extrema_filters,
-            order_by=order_by_dsc,
-            serialization_params=extrema_params)
-        max_row = max_row_result.pop() if len(max_row_result) else None
-
-        min_row_result = self.history_contents_manager.contents(history,
-            limit=1,
-            filters=extrema_filters,
-            order_by=order_by_asc,
-            serialization_params=extrema_params)
-        min_row = min_row_result.pop() if len(min_row_result) else None
-
-        max_hid = max_row.hid if max_row else None
-        min_hid = min_row.hid if min_row else None
-
-        return min_hid, max_hid
+        return self.history_contents_manager.contents_extrema(history, 'hid', filters=extrema_filters)
 
     def __delete_dataset(
         self, trans,
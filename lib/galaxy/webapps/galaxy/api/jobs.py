@@ -371,6 +371,42 @@ class JobController(BaseGalaxyAPIController, UsesVisualizationMixin):
         job = self.__get_job(trans, **kwd)
         return summarize_destination_params(trans, job)
 
+    @require_admin
+    @expose_api
+    def resource_usage(self, trans: ProvidesUserContext, tool_id=None, destination_id=None, days=90, percentiles="50,95", **kwd):
+        """
+        * GET /api/jobs/resource_usage
+            Return aggregates of the runtime and resource usage of jobs, e.g. to size destinations.
+
+        :type   tool_id: string
+        :param  tool_id: only aggregate jobs of this tool
+
+        :type   destination_id: string
+        :param  destination_id: only aggregate jobs run on this destination
+
+        :type   days: int
+        :param  days: only aggregate jobs created over the last ``days`` days, defaults to 90
+
+        :type   percentiles: string
+        :param  percentiles: comma separated percentiles to calculate, defaults to ``50,95``
+
+        :rtype:     dict
+        :returns:   the number of jobs (``count``) and for each metric (``metrics``) the number
+                    of jobs reporting it, its minimum, maximum, mean and the percentiles
+                    (``p50``, ``p95``, ...)
+        """
+        try:
+            days = float(days) if days else None
+            percentiles = [float(p) for p in util.listify(percentiles)]
+        except ValueError:
+            raise exceptions.RequestParameterInvalidException("days and percentiles must be numbers.")
+        return self.job_manager.resource_usage(
+            tool_id=tool_id,
+            destination_id=destination_id,
+            days=days,
+            percentiles=percentiles,
+        )
+
     @expose_api_anonymous
     def parameters_display(self, trans: ProvidesUserContext, **kwd):
         """
@@ -1044,6 +1044,7 @@ def populate_api_routes(webapp, app):
                            parent_resources=dict(member_name='folder', collection_name='folders'),
                            conditions=dict(method=["GET"]))
 
+    webapp.mapper.connect('job_resource_usage', '/api/jobs/resource_usage', controller='jobs', action='resource_usage', conditions=dict(method=['GET']))
     webapp.mapper.resource('job',
                            'jobs',
                            path_prefix='/api')
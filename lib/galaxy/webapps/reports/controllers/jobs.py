@@ -296,6 +296,10 @@ class Jobs(BaseUIController, ReportQueryBuilder):
         return self.specified_date_list_grid(trans, **kwd)
 
     def _calculate_trends_for_jobs(self, jobs_query):
+        """
+        Build the per month sparklines from the rows of ``jobs_query``, each holding the
+        number of jobs (``total_jobs``) of a day (``date``).
+        """
         trends = dict()
         for job in jobs_query.execute():
             job_day = int(job.date.strftime("%-d")) - 1
@@ -305,14 +309,35 @@ class Jobs(BaseUIController, ReportQueryBuilder):
             key = str(job_month_name + job_year)
 
             try:
-                trends[key][job_day] += 1
+                trends[key][job_day] += job.total_jobs
             except KeyError:
                 job_year = int(job_year)
                 wday, day_range = calendar.monthrange(job_year, job_month)
                 trends[key] = [0] * day_range
-                trends[key][job_day] += 1
+                trends[key][job_day] += job.total_jobs
         return trends
 
+    def _calculate_spark_trends(self, jobs_query, _time_period, spark_limit):
+        """
+        Build the sparklines of the last ``spark_limit`` periods of ``_time_period`` days
+        from the rows of ``jobs_query``, each holding the number of jobs (``total_jobs``) of
+        a day (``date``) for a sparkline (``name``).
+        """
+        currday = date.today()
+        trends = dict()
+        for job in jobs_query.execute():
+            name = re.sub(r'\W+', '', str(job.name))
+            container = int(floor((currday - job.date).days / _time_period))
+            if name not in trends:
+                trends[name] = [0] * spark_limit
+            if container < spark_limit:
+                trends[name][container] += job.total_jobs
+        return trends
+
+    def _spark_start(self, _time_period, spark_limit):
+        """The first day shown by sparklines of ``spark_limit`` periods of ``_time_period`` days."""
+        return date.today() - timedelta(days=int(_time_period * spark_limit))
+
     def _calculate_job_table(self, jobs_query):
         jobs = []
         for row in jobs_query.execute():
@@ -569,19 +594,22 @@ class Jobs(BaseUIController, ReportQueryBuilder):
         # In case we don't know which is the monitor user we will query for all jobs
         monitor_user_id = get_monitor_id(trans, monitor_email)
 
+        summary = model.JobDailySummary.table
         # Use to make the page table
-        jobs_by_month = sa.select((self.select_month(model.Job.table.c.create_time).label('date'),
-                                   sa.func.count(model.Job.table.c.id).label('total_jobs')),
-                                  whereclause=model.Job.table.c.user_id != monitor_user_id,
-                                  from_obj=[model.Job.table],
-                                  group_by=self.group_by_month(model.Job.table.c.create_time),
+        jobs_by_month = sa.select((self.select_month(summary.c.day).label('date'),
+                                   sa.func.sum(summary.c.job_count).label('total_jobs')),
+                                  whereclause=summary.c.user_id != monitor_user_id,
+                                  from_obj=[summary],
+                                  group_by=self.group_by_month(summary.c.day),
                                   order_by=[_order],
                                   offset=offset,
                                   limit=limit)
 
         # Use to make sparkline
-        all_jobs = sa.select((self.select_day(model.Job.table.c.create_time).label('date'),
-                              model.Job.table.c.id.label('id')))
+        all_jobs = sa.select((summary.c.day.label('date'),
+                              sa.func.sum(summary.c.job_count).label('total_jobs')),
+                             from_obj=[summary],
+                             group_by=[summary.c.day])
 
         trends = self._calculate_trends_for_jobs(all_jobs)
         jobs = self._calculate_job_table(jobs_by_month)
@@ -637,22 +665,25 @@ class Jobs(BaseUIController, ReportQueryBuilder):
         # In case we don't know which is the monitor user we will query for all jobs
         monitor_user_id = get_monitor_id(trans, monitor_email)
 
+        summary = model.JobDailySummary.table
         # Use to make the page table
-        jobs_in_error_by_month = sa.select((self.select_month(model.Job.table.c.create_time).label('date'),
-                                            sa.func.count(model.Job.table.c.id).label('total_jobs')),
-                                           whereclause=sa.and_(model.Job.table.c.state == 'error',
-                                                               model.Job.table.c.user_id != monitor_user_id),
-                                           from_obj=[model.Job.table],
-                                           group_by=self.group_by_month(model.Job.table.c.create_time),
+        jobs_in_error_by_month = sa.select((self.select_month(summary.c.day).label('date'),
+                                            sa.func.sum(summary.c.job_count).label('total_jobs')),
+                                           whereclause=sa.and_(summary.c.state == 'error',
+                                                               summary.c.user_id != monitor_user_id),
+                                           from_obj=[summary],
+                                           group_by=self.group_by_month(summary.c.day),
                                            order_by=[_order],
                                            offset=offset,
                                            limit=limit)
 
         # Use to make trendline
-        all_jobs = sa.select((self.select_day(model.Job.table.c.create_time).label('date'),
-                              model.Job.table.c.id.label('id')),
-                             whereclause=sa.and_(model.Job.table.c.state == 'error',
-                                                 model.Job.table.c.user_id != monitor_user_id))
+        all_jobs = sa.select((summary.c.day.label('date'),
+                              sa.func.sum(summary.c.job_count).label('total_jobs')),
+                             whereclause=sa.and_(summary.c.state == 'error',
+                                                 summary.c.user_id != monitor_user_id),
+                             from_obj=[summary],
+                             group_by=[summary.c.day])
 
         trends = self._calculate_trends_for_jobs(all_jobs)
         jobs = self._calculate_job_table(jobs_in_error_by_month)
@@ -710,10 +741,11 @@ class Jobs(BaseUIController, ReportQueryBuilder):
         else:
             page = 1
 
+        summary = model.JobDailySummary.table
         jobs = []
         jobs_per_user = sa.select((model.User.table.c.email.label('user_email'),
-                                   sa.func.count(model.Job.table.c.id).label('total_jobs')),
-                                  from_obj=[sa.outerjoin(model.Job.table, model.User.table)],
+                                   sa.func.sum(summary.c.job_count).label('total_jobs')),
+                                  from_obj=[sa.outerjoin(summary, model.User.table)],
                                   group_by=['user_email'],
                                   order_by=[_order],
                                   offset=offset,
@@ -732,39 +764,15 @@ class Jobs(BaseUIController, ReportQueryBuilder):
         q_time.stop()
         query1time = q_time.time_elapsed()
 
-        users = sa.select([model.User.table.c.email],
-                          from_obj=[model.User.table])
+        all_jobs_per_user = sa.select((model.User.table.c.email.label('name'),
+                                       summary.c.day.label('date'),
+                                       sa.func.sum(summary.c.job_count).label('total_jobs')),
+                                      from_obj=[sa.join(summary, model.User.table)],
+                                      whereclause=summary.c.day >= self._spark_start(_time_period, spark_limit),
+                                      group_by=[model.User.table.c.email, summary.c.day])
 
-        all_jobs_per_user = sa.select((model.Job.table.c.id.label('id'),
-                                       model.Job.table.c.create_time.label('date'),
-                                       model.User.table.c.email.label('user_email')),
-                                      from_obj=[sa.outerjoin(model.Job.table, model.User.table)],
-                                      whereclause=model.User.table.c.email.in_(users))
-
-        currday = datetime.today()
-        trends = dict()
         q_time.start()
-        for job in all_jobs_per_user.execute():
-            if job.user_email is None:
-                curr_user = 'Anonymous'
-            else:
-                curr_user = re.sub(r'\W+', '', job.user_email)
-
-            try:
-                day = currday - job.date
-            except TypeError:
-                day = currday - datetime.date(job.date)
-
-            day = day.days
-            container = floor(day / _time_period)
-            container = int(container)
-            try:
-                if container < spark_limit:
-                    trends[curr_user][container] += 1
-            except KeyError:
-                trends[curr_user] = [0] * spark_limit
-                if container < spark_limit:
-                    trends[curr_user][container] += 1
+        trends = self._calculate_spark_trends(all_jobs_per_user, _time_period, spark_limit)
         q_time.stop()
         query2time = q_time.time_elapsed()
 
@@ -799,33 +807,21 @@ class Jobs(BaseUIController, ReportQueryBuilder):
         arrow = specs.arrow
         _order = specs.exc_order
 
-        q = sa.select((self.select_month(model.Job.table.c.create_time).label('date'),
-                       sa.func.count(model.Job.table.c.id).label('total_jobs')),
+        summary = model.JobDailySummary.table
+        q = sa.select((self.select_month(summary.c.day).label('date'),
+                       sa.func.sum(summary.c.job_count).label('total_jobs')),
                       whereclause=model.User.table.c.email == email,
-                      from_obj=[sa.join(model.Job.table, model.User.table)],
-                      group_by=self.group_by_month(model.Job.table.c.create_time),
+                      from_obj=[sa.join(summary, model.User.table)],
+                      group_by=self.group_by_month(summary.c.day),
                       order_by=[_order])
 
-        all_jobs_per_user = sa.select((model.Job.table.c.create_time.label('date'),
-                                       model.Job.table.c.id.label('job_id')),
+        all_jobs_per_user = sa.select((summary.c.day.label('date'),
+                                       sa.func.sum(summary.c.job_count).label('total_jobs')),
                                       whereclause=sa.and_(model.User.table.c.email == email),
-                                      from_obj=[sa.join(model.Job.table, model.User.table)])
+                                      from_obj=[sa.join(summary, model.User.table)],
+                                      group_by=[summary.c.day])
 
-        trends = dict()
-        for job in all_jobs_per_user.execute():
-            job_day = int(job.date.strftime("%-d")) - 1
-            job_month = int(job.date.strftime("%-m"))
-            job_month_name = job.date.strftime("%B")
-            job_year = job.date.strftime("%Y")
-            key = str(job_month_name + job_year)
-
-            try:
-                trends[key][job_day] += 1
-            except KeyError:
-                job_year = int(job_year)
-                wday, day_range = calendar.monthrange(job_year, job_month)
-                trends[key] = [0] * day_range
-                trends[key][job_day] += 1
+        trends = self._calculate_trends_for_jobs(all_jobs_per_user)
 
         jobs = []
         for row in q.execute():
@@ -879,41 +875,26 @@ class Jobs(BaseUIController, ReportQueryBuilder):
         # In case we don't know which is the monitor user we will query for all jobs
         monitor_user_id = get_monitor_id(trans, monitor_email)
 
+        summary = model.JobDailySummary.table
         jobs = []
-        q = sa.select((model.Job.table.c.tool_id.label('tool_id'),
-                       sa.func.count(model.Job.table.c.id).label('total_jobs')),
-                      whereclause=model.Job.table.c.user_id != monitor_user_id,
-                      from_obj=[model.Job.table],
+        q = sa.select((summary.c.tool_id.label('tool_id'),
+                       sa.func.sum(summary.c.job_count).label('total_jobs')),
+                      whereclause=summary.c.user_id != monitor_user_id,
+                      from_obj=[summary],
                       group_by=['tool_id'],
                       order_by=[_order],
                       offset=offset,
                       limit=limit)
 
-        all_jobs_per_tool = sa.select((model.Job.table.c.tool_id.label('tool_id'),
-                                       model.Job.table.c.id.label('id'),
-                                       self.select_day(model.Job.table.c.create_time).label('date')),
-                                      whereclause=model.Job.table.c.user_id != monitor_user_id,
-                                      from_obj=[model.Job.table])
-
-        currday = date.today()
-        trends = dict()
-        for job in all_jobs_per_tool.execute():
-            curr_tool = re.sub(r'\W+', '', str(job.tool_id))
-            try:
-                day = currday - job.date
-            except TypeError:
-                day = currday - datetime.date(job.date)
+        all_jobs_per_tool = sa.select((summary.c.tool_id.label('name'),
+                                       summary.c.day.label('date'),
+                                       sa.func.sum(summary.c.job_count).label('total_jobs')),
+                                      whereclause=sa.and_(summary.c.user_id != monitor_user_id,
+                                                          summary.c.day >= self._spark_start(_time_period, spark_limit)),
+                                      from_obj=[summary],
+                                      group_by=[summary.c.tool_id, summary.c.day])
 
-            day = day.days
-            container = floor(day / _time_period)
-            container = int(container)
-            try:
-                if container < spark_limit:
-                    trends[curr_tool][container] += 1
-            except KeyError:
-                trends[curr_tool] = [0] * spark_limit
-                if container < spark_limit:
-                    trends[curr_tool][container] += 1
+        trends = self._calculate_spark_trends(all_jobs_per_tool, _time_period, spark_limit)
 
         for row in q.execute():
             jobs.append((row.tool_id,
@@ -975,43 +956,27 @@ class Jobs(BaseUIController, ReportQueryBuilder):
         # In case we don't know which is the monitor user we will query for all jobs
         monitor_user_id = get_monitor_id(trans, monitor_email)
 
-        jobs_in_error_per_tool = sa.select((model.Job.table.c.tool_id.label('tool_id'),
-                                            sa.func.count(model.Job.table.c.id).label('total_jobs')),
-                                           whereclause=sa.and_(model.Job.table.c.state == 'error',
-                                                               model.Job.table.c.user_id != monitor_user_id),
-                                           from_obj=[model.Job.table],
+        summary = model.JobDailySummary.table
+        jobs_in_error_per_tool = sa.select((summary.c.tool_id.label('tool_id'),
+                                            sa.func.sum(summary.c.job_count).label('total_jobs')),
+                                           whereclause=sa.and_(summary.c.state == 'error',
+                                                               summary.c.user_id != monitor_user_id),
+                                           from_obj=[summary],
                                            group_by=['tool_id'],
                                            order_by=[_order],
                                            offset=offset,
                                            limit=limit)
 
-        all_jobs_per_tool_errors = sa.select((self.select_day(model.Job.table.c.create_time).label('date'),
-                                              model.Job.table.c.id.label('id'),
-                                              model.Job.table.c.tool_id.label('tool_id')),
-                                             whereclause=sa.and_(model.Job.table.c.state == 'error',
-                                                                 model.Job.table.c.user_id != monitor_user_id),
-                                             from_obj=[model.Job.table])
+        all_jobs_per_tool_errors = sa.select((summary.c.tool_id.label('name'),
+                                              summary.c.day.label('date'),
+                                              sa.func.sum(summary.c.job_count).label('total_jobs')),
+                                             whereclause=sa.and_(summary.c.state == 'error',
+                                                                 summary.c.user_id != monitor_user_id,
+                                                                 summary.c.day >= self._spark_start(_time_period, spark_limit)),
+                                             from_obj=[summary],
+                                             group_by=[summary.c.tool_id, summary.c.day])
 
-        currday = date.today()
-        trends = dict()
-        for job in all_jobs_per_tool_errors.execute():
-            curr_tool = re.sub(r'\W+', '', str(job.tool_id))
-            try:
-                day = currday - job.date
-            except TypeError:
-                day = currday - datetime.date(job.date)
-
-            # convert day into days/weeks/months/years
-            day = day.days
-            container = floor(day / _time_period)
-            container = int(container)
-            try:
-                if container < spark_limit:
-                    trends[curr_tool][container] += 1
-            except KeyError:
-                trends[curr_tool] = [0] * spark_limit
-                if day < spark_limit:
-                    trends[curr_tool][container] += 1
+        trends = self._calculate_spark_trends(all_jobs_per_tool_errors, _time_period, spark_limit)
         jobs = []
         for row in jobs_in_error_per_tool.execute():
             jobs.append((row.total_jobs, row.tool_id))
@@ -1047,36 +1012,23 @@ class Jobs(BaseUIController, ReportQueryBuilder):
 
         tool_id = params.get('tool_id', 'Add a column1')
         specified_date = params.get('specified_date', datetime.utcnow().strftime("%Y-%m-%d"))
-        q = sa.select((self.select_month(model.Job.table.c.create_time).label('date'),
-                       sa.func.count(model.Job.table.c.id).label('total_jobs')),
-                      whereclause=sa.and_(model.Job.table.c.tool_id == tool_id,
-                                          model.Job.table.c.user_id != monitor_user_id),
-                      from_obj=[model.Job.table],
-                      group_by=self.group_by_month(model.Job.table.c.create_time),
+        summary = model.JobDailySummary.table
+        q = sa.select((self.select_month(summary.c.day).label('date'),
+                       sa.func.sum(summary.c.job_count).label('total_jobs')),
+                      whereclause=sa.and_(summary.c.tool_id == tool_id,
+                                          summary.c.user_id != monitor_user_id),
+                      from_obj=[summary],
+                      group_by=self.group_by_month(summary.c.day),
                       order_by=[_order])
 
         # Use to make sparkline
-        all_jobs_for_tool = sa.select((self.select_month(model.Job.table.c.create_time).label('month'),
-                                       self.select_day(model.Job.table.c.create_time).label('day'),
-                                       model.Job.table.c.id.label('id')),
-                                      whereclause=sa.and_(model.Job.table.c.tool_id == tool_id,
-                                                          model.Job.table.c.user_id != monitor_user_id),
-                             from_obj=[model.Job.table])
-        trends = dict()
-        for job in all_jobs_for_tool.execute():
-            job_day = int(job.day.strftime("%-d")) - 1
-            job_month = int(job.month.strftime("%-m"))
-            job_month_name = job.month.strftime("%B")
-            job_year = job.month.strftime("%Y")
-            key = str(job_month_name + job_year)
-
-            try:
-                trends[key][job_day] += 1
-            except KeyError:
-                job_year = int(job_year)
-                wday, day_range = calendar.monthrange(job_year, job_month)
-                trends[key] = [0] * day_range
-                trends[key][job_day] += 1
+        all_jobs_for_tool = sa.select((summary.c.day.label('date'),
+                                       sa.func.sum(summary.c.job_count).label('total_jobs')),
+                                      whereclause=sa.and_(summary.c.tool_id == tool_id,
+                                                          summary.c.user_id != monitor_user_id),
+                                      from_obj=[summary],
+                                      group_by=[summary.c.day])
+        trends = self._calculate_trends_for_jobs(all_jobs_for_tool)
 
         jobs = []
         for row in q.execute():
@@ -14,6 +14,7 @@ import string
 import sys
 import time
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 
 import psycopg2
@@ -108,6 +109,8 @@ class Action:
         self._force_retry = app.args.force_retry
         self._epoch_time = str(int(time.time()))
         self._days = app.args.days
+        self._object_store_threads = app.args.object_store_threads
+        self._object_store_batch_size = app.args.object_store_batch_size
         self._config = app.config
         self._update = app._update
         self.__log = None
@@ -260,28 +263,53 @@ class RemovesObjects:
             self.objects_to_remove.add(self.object_class(object_id, row.object_store_id))
 
     def remove_objects(self):
+        removals = []
         for object_to_remove in sorted(self.objects_to_remove):
-            self.remove_object(object_to_remove)
+            for object_store_kwargs, entire_dir, check_exists in self.object_removals(object_to_remove):
+                removals.append((object_to_remove, object_store_kwargs, entire_dir, check_exists))
+        batch_size = self._object_store_batch_size
+        batches = [removals[i:i + batch_size] for i in range(0, len(removals), batch_size)]
+        if self._object_store_threads > 1:
+            with ThreadPoolExecutor(max_workers=self._object_store_threads) as executor:
+                list(executor.map(self.remove_from_object_store, batches))
+        else:
+            for batch in batches:
+                self.remove_from_object_store(batch)
 
-    def remove_from_object_store(self, object_to_remove, object_store_kwargs, entire_dir=False, check_exists=False):
+    def remove_from_object_store(self, removals):
+        """Remove a batch of ``(object, object_store_kwargs, entire_dir, check_exists)`` from the object store.
+        """
         # only remove the "object store path" - if it's at an external_filename, that file will be untouched anyway
         # (which is what we want)
         loggers = (self.log, log)
+        requests = []
+        for object_to_remove, object_store_kwargs, entire_dir, check_exists in removals:
+            try:
+                if not check_exists or self.object_store.exists(object_to_remove, **object_store_kwargs):
+                    identifier = self.object_store.get_object_identifier(object_to_remove, **object_store_kwargs)
+                    self.log.info('removing %s at: %s', object_to_remove, identifier)
+                    requests.append((object_to_remove, dict(object_store_kwargs, entire_dir=entire_dir)))
+            except ObjectNotFound as e:
+                [log_.warning('object store failure: %s: %s', object_to_remove, e) for log_ in loggers]
+            except Exception as e:
+                [log_.error('delete failure: %s: %s', object_to_remove, e) for log_ in loggers]
+        if self._dry_run or not requests:
+            return
         try:
-            # TODO: get_filename() can do stuff like cache locally from S3, but we want the filename for logging
-            # purposes; this isn't ideal, object stores should probably have a noop way to get the "object store native
-            # identifier" which in the case of Disk would be the path
-            if not check_exists or self.object_store.exists(object_to_remove, **object_store_kwargs):
-                filename = self.object_store.get_filename(object_to_remove, **object_store_kwargs)
-                self.log.info('removing %s at: %s', object_to_remove, filename)
-                if not self._dry_run:
-                    self.object_store.delete(object_to_remove, entire_dir=entire_dir, **object_store_kwargs)
-        except ObjectNotFound as e:
-            [log_.warning('object store failure: %s: %s', object_to_remove, e) for log_ in loggers]
+            self.object_store.delete_many(requests)
         except Exception as e:
-            [log_.error('delete failure: %s: %s', object_to_remove, e) for log_ in loggers]
-
-    def remove_object(self, object_to_remove):
+            [log_.warning('batch delete failure, deleting objects one at a time: %s', e) for log_ in loggers]
+            for object_to_remove, delete_kwargs in requests:
+                try:
+                    self.object_store.delete(object_to_remove, **delete_kwargs)
+                except ObjectNotFound as e:
+                    [log_.warning('object store failure: %s: %s', object_to_remove, e) for log_ in loggers]
+                except Exception as e:
+                    [log_.error('delete failure: %s: %s', object_to_remove, e) for log_ in loggers]
+
+    def object_removals(self, object_to_remove):
+        """Return ``(object_store_kwargs, entire_dir, check_exists)`` for each part of the object to remove.
+        """
         raise NotImplementedError()
 
 
@@ -369,34 +397,41 @@ class RequiresDiskUsageRecalculation:
         copies at purge-time, simply maintain a list of users that have had
         HDAs purged, and update their usages once all updates are complete.
 
-        This could probably be done more efficiently.
+        All affected users are updated by a single statement.
         """
+        if not self.__recalculate_disk_usage_user_ids:
+            return
         log.info('Recalculating disk usage for users whose data were purged')
-        for user_id in sorted(self.__recalculate_disk_usage_user_ids):
-            # TODO: h.purged = false should be unnecessary once all hdas in purged histories are purged.
-            sql = """
-                   UPDATE galaxy_user
-                      SET disk_usage = (
-                            SELECT COALESCE(SUM(total_size), 0)
-                              FROM (  SELECT d.total_size
-                                        FROM history_dataset_association hda
-                                             JOIN history h ON h.id = hda.history_id
-                                             JOIN dataset d ON hda.dataset_id = d.id
-                                       WHERE h.user_id = %(user_id)s
-                                             AND h.purged = false
-                                             AND hda.purged = false
-                                             AND d.purged = false
-                                             AND d.id NOT IN (SELECT dataset_id
-                                                                FROM library_dataset_dataset_association)
-                                    GROUP BY d.id) AS sizes)
-                    WHERE id = %(user_id)s
-                RETURNING disk_usage;
-            """
-            args = {'user_id': user_id}
-            cur = self._update(sql, args, add_event=False)
-            for row in cur:
-                # disk_usage might be None (e.g. user has purged all data)
-                self.log.info('recalculate_disk_usage user_id %i to %s bytes' % (user_id, row.disk_usage))
+        # TODO: h.purged = false should be unnecessary once all hdas in purged histories are purged.
+        sql = """
+            WITH user_ids
+              AS (SELECT unnest(%(user_ids)s::integer[]) AS id),
+                 user_datasets
+              AS (SELECT DISTINCT h.user_id, d.id, d.total_size
+                    FROM history_dataset_association hda
+                         JOIN history h ON h.id = hda.history_id
+                         JOIN dataset d ON hda.dataset_id = d.id
+                   WHERE h.user_id IN (SELECT id FROM user_ids)
+                         AND h.purged = false
+                         AND hda.purged = false
+                         AND d.purged = false
+                         AND d.id NOT IN (SELECT dataset_id
+                                            FROM library_dataset_dataset_association)),
+                 sizes
+              AS (  SELECT user_id, SUM(total_size) AS disk_usage
+                      FROM user_datasets
+                  GROUP BY user_id)
+               UPDATE galaxy_user
+                  SET disk_usage = COALESCE(sizes.disk_usage, 0)
+                 FROM user_ids
+                      LEFT JOIN sizes ON sizes.user_id = user_ids.id
+                WHERE galaxy_user.id = user_ids.id
+            RETURNING galaxy_user.id AS user_id, galaxy_user.disk_usage;
+        """
+        args = {'user_ids': sorted(self.__recalculate_disk_usage_user_ids)}
+        cur = self._update(sql, args, add_event=False)
+        for row in sorted(cur):
+            self.log.info('recalculate_disk_usage user_id %i to %s bytes' % (row.user_id, row.disk_usage))
 
 
 class RemovesMetadataFiles(RemovesObjects):
@@ -407,13 +442,13 @@ class RemovesMetadataFiles(RemovesObjects):
     object_class = namedtuple('MetadataFile', ['id', 'object_store_id'])
     id_column = 'deleted_metadata_file_id'
 
-    def remove_object(self, metadata_file):
-        self.remove_from_object_store(
-            metadata_file,
-            dict(
+    def object_removals(self, metadata_file):
+        return [
+            (dict(
                 extra_dir='_metadata_files',
                 extra_dir_at_root=True,
-                alt_name="metadata_%d.dat" % metadata_file.id))
+                alt_name="metadata_%d.dat" % metadata_file.id), False, False),
+        ]
 
 
 class RemovesDatasets(RemovesObjects):
@@ -424,15 +459,13 @@ class RemovesDatasets(RemovesObjects):
     object_class = namedtuple('Dataset', ['id', 'object_store_id'])
     id_column = 'purged_dataset_id'
 
-    def remove_object(self, dataset):
-        self.remove_from_object_store(dataset, dict())
-        self.remove_from_object_store(
-            dataset,
-            dict(
+    def object_removals(self, dataset):
+        return [
+            (dict(), False, False),
+            (dict(
                 dir_only=True,
-                extra_dir="dataset_%d_files" % dataset.id),
-            entire_dir=True,
-            check_exists=True)
+                extra_dir="dataset_%d_files" % dataset.id), True, True),
+        ]
 
 
 #
@@ -1164,6 +1197,17 @@ class Cleanup:
             dest='work_mem',
             default=None,
             help='Set PostgreSQL work_mem for this connection')
+        parser.add_argument(
+            '--object-store-threads',
+            type=int,
+            default=1,
+            help='Number of threads removing objects from the object store')
+        parser.add_argument(
+            '--object-store-batch-size',
+            type=int,
+            default=1000,
+            help='Number of objects removed from the object store per request, for object stores that support batched '
+                 'deletes (e.g. S3)')
         parser.add_argument(
             '-l', '--log-dir',
             default=DEFAULT_LOG_DIR,
@@ -1,3 +1,7 @@
+import glob
+import os
+import tempfile
+
 import pysam
 
 from galaxy.datatypes.binary import Bam
@@ -46,3 +50,19 @@ def test_set_meta_presorted():
         bam_file = pysam.AlignmentFile(dataset.file_name, mode='rb',
                                        index_filename=dataset.metadata.bam_index.file_name)
         assert bam_file.has_index() is True
+
+
+def test_grooming_index_not_left_behind():
+    b = Bam()
+    before = set(glob.glob(os.path.join(tempfile.gettempdir(), 'bam_index_*')))
+    with get_input_files('1.bam', '2.shuffled.unsorted.bam') as input_files:
+        assert b.dataset_content_needs_grooming(input_files[0]) is False
+        assert b.dataset_content_needs_grooming(input_files[1]) is True
+    assert set(glob.glob(os.path.join(tempfile.gettempdir(), 'bam_index_*'))) == before
+
+
+def test_unsorted_detected_without_indexing():
+    b = Bam()
+    with get_input_files('1.bam', '2.shuffled.unsorted.bam') as input_files:
+        assert b._alignments_out_of_order(input_files[0]) is False
+        assert b._alignments_out_of_order(input_files[1]) is True
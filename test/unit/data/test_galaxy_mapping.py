@@ -1,12 +1,17 @@
 import collections
+import datetime
 import os
 import random
 import unittest
 import uuid
 from tempfile import NamedTemporaryFile
+from unittest import mock
 
 import pytest
-from sqlalchemy import inspect
+from sqlalchemy import (
+    event,
+    inspect,
+)
 
 import galaxy.datatypes.registry
 import galaxy.model
@@ -418,6 +423,181 @@ class MappingTests(BaseModelTestCase):
         assert q.all() == [('outer_list', 'inner_list', 'forward'), ('outer_list', 'inner_list', 'reverse')]
         assert c4.dataset_elements == [dce1, dce2]
         assert c4.element_identifiers_extensions_and_paths == [(('outer_list', 'inner_list', 'forward'), 'bam', 'mock_dataset_14.dat'), (('outer_list', 'inner_list', 'reverse'), 'txt', 'mock_dataset_14.dat')]
+        # prefetched elements are loaded in the session, walking them does not issue queries
+        c2_id = c2.id
+        self.expunge()
+        c2 = self.query(model.DatasetCollection).get(c2_id)
+        assert [element.element_identifier for element in c2.prefetch_dataset_elements()] == ['forward', 'reverse']
+        inner_elements = c2.elements[0].child_collection.elements
+        queries = []
+
+        def count_queries(*args):
+            queries.append(args)
+        event.listen(model.engine, "before_cursor_execute", count_queries)
+        try:
+            assert [element.element_object.dataset.state for element in inner_elements] == ['new', 'new']
+        finally:
+            event.remove(model.engine, "before_cursor_execute", count_queries)
+        assert queries == []
+
+    def test_prefetch_dataset_elements_mixed_instances(self):
+        model = self.model
+        u = model.User(email="prefetch@example.com", password="password")
+        h1 = model.History(name="History 1", user=u)
+        d1 = model.HistoryDatasetAssociation(extension="txt", history=h1, create_dataset=True, sa_session=model.session)
+        ld1 = model.LibraryDataset()
+        ldda1 = model.LibraryDatasetDatasetAssociation(extension="txt", library_dataset=ld1, create_dataset=True, sa_session=model.session)
+        c1 = model.DatasetCollection(collection_type='list')
+        dce1 = model.DatasetCollectionElement(collection=c1, element=d1, element_identifier="a", element_index=0)
+        dce2 = model.DatasetCollectionElement(collection=c1, element=ldda1, element_identifier="b", element_index=1)
+        self.persist(u, h1, d1, ld1, ldda1, c1, dce1, dce2)
+        c1_id = c1.id
+        self.expunge()
+        c1 = self.query(model.DatasetCollection).get(c1_id)
+        assert [element.element_identifier for element in c1.dataset_elements] == ['a', 'b']
+        elements = c1.prefetch_dataset_elements()
+        assert [element.element_identifier for element in elements] == ['a', 'b']
+        queries = []
+
+        def count_queries(*args):
+            queries.append(args)
+        event.listen(model.engine, "before_cursor_execute", count_queries)
+        try:
+            assert [element.element_object.dataset.state for element in elements] == ['new', 'new']
+        finally:
+            event.remove(model.engine, "before_cursor_execute", count_queries)
+        assert queries == []
+
+    def test_collection_state_summary(self):
+        model = self.model
+        u = model.User(email="summary@example.com", password="password")
+        h1 = model.History(name="History 1", user=u)
+        d1 = model.HistoryDatasetAssociation(extension="bam", history=h1, create_dataset=True, sa_session=model.session)
+        d2 = model.HistoryDatasetAssociation(extension="txt", history=h1, create_dataset=True, sa_session=model.session)
+        d1.state = d2.state = model.Dataset.states.OK
+        c1 = model.DatasetCollection(collection_type='paired')
+        dce1 = model.DatasetCollectionElement(collection=c1, element=d1, element_identifier="forward", element_index=0)
+        dce2 = model.DatasetCollectionElement(collection=c1, element=d2, element_identifier="reverse", element_index=1)
+        c2 = model.DatasetCollection(collection_type="list:paired")
+        dce3 = model.DatasetCollectionElement(collection=c2, element=c1, element_identifier="inner_list", element_index=0)
+        self.persist(d1, d2, c1, dce1, dce2, c2, dce3)
+
+        def persisted_summary(collection):
+            return self.query(model.DatasetCollectionStateSummary).filter_by(dataset_collection_id=collection.id).first()
+
+        summary = c2.state_summary
+        assert summary.element_states == {'ok': 2}
+        assert summary.element_count == 2
+        assert summary.extensions == ['bam', 'txt']
+        assert summary.populated
+        assert persisted_summary(c2).element_states == {'ok': 2}
+        assert c2.dataset_states_and_extensions_summary == ({'ok'}, {'bam', 'txt'})
+        assert c1.state_summary.final
+
+        # state change of an element invalidates the summary of the collection and all its parents
+        d2.state = model.Dataset.states.RUNNING
+        self.persist(d2)
+        assert persisted_summary(c1) is None
+        assert persisted_summary(c2) is None
+        self.expunge()
+        c2 = self.query(model.DatasetCollection).get(c2.id)
+        assert c2.state_summary.element_states == {'ok': 1, 'running': 1}
+        assert not c2.state_summary.final
+        # not persisted until all elements are in a terminal state
+        assert persisted_summary(c2) is None
+
+        # unpopulated subcollections are reported as such
+        c3 = model.DatasetCollection(collection_type="list:paired")
+        c4 = model.DatasetCollection(collection_type="paired", populated=False)
+        dce4 = model.DatasetCollectionElement(collection=c3, element=c4, element_identifier="inner_list", element_index=0)
+        self.persist(c3, c4, dce4)
+        assert not c3.populated_optimized
+        assert persisted_summary(c3) is None
+
+    def test_history_contents_aggregate(self):
+        model = self.model
+        u = model.User(email="aggregate@example.com", password="password")
+        h1 = model.History(name="History 1", user=u)
+        h2 = model.History(name="History 2", user=u)
+        d1 = model.HistoryDatasetAssociation(history=h1, create_dataset=True, sa_session=model.session)
+        d2 = model.HistoryDatasetAssociation(history=h1, create_dataset=True, sa_session=model.session)
+        d1.state = d2.state = model.Dataset.states.RUNNING
+        d1.dataset.total_size = 10
+        d2.dataset.total_size = 100
+        c1 = model.DatasetCollection(collection_type='paired')
+        hdca = model.HistoryDatasetCollectionAssociation(collection=c1, history=h1, visible=True)
+        self.persist(u, h1, h2, d1, d2, c1, hdca)
+
+        def assert_tracked(history):
+            tracked = model.HistoryContentsAggregate.read(model.session, history.id)
+            assert tracked == model.HistoryContentsAggregate.recalculate(model.session, history.id)
+            return tracked
+
+        counts, disk_size = assert_tracked(h1)
+        assert counts == {('dataset', 'running', False, True): 2, ('dataset_collection', 'ok', False, True): 1}
+        assert disk_size == 110
+        assert h1.disk_size == 110
+        assert_tracked(h2)
+
+        # state, visibility and deletion are maintained on flush
+        d1.state = model.Dataset.states.OK
+        d2.visible = False
+        hdca.deleted = True
+        self.persist(d1, d2, hdca)
+        counts, disk_size = assert_tracked(h1)
+        assert counts == {
+            ('dataset', 'ok', False, True): 1,
+            ('dataset', 'running', False, False): 1,
+            ('dataset_collection', 'ok', True, True): 1,
+        }
+
+        # datasets are only counted once per history in its size
+        d3 = d1.copy()
+        h2.add_dataset(d3)
+        d4 = d1.copy()
+        h1.add_dataset(d4)
+        d2.purged = True
+        self.persist(d3, d4, d2)
+        counts, disk_size = assert_tracked(h1)
+        assert disk_size == 10
+        assert counts[('dataset', 'ok', False, True)] == 2
+        counts, disk_size = assert_tracked(h2)
+        assert counts == {('dataset', 'ok', False, True): 1}
+        assert disk_size == 10
+
+        # untracked after invalidation, recalculated on read
+        model.HistoryContentsAggregate.invalidate(model.session, [h1.id])
+        assert self.query(model.HistoryContentsAggregate).get(h1.id) is None
+        assert h1.disk_size == 10
+        assert self.query(model.HistoryContentsAggregate).get(h1.id) is not None
+        # the row stored by a concurrent recalculation is kept
+        assert not galaxy.model._insert_history_contents_aggregate(model.session, dict(history_id=h1.id, disk_size=0))
+        assert h1.disk_size == 10
+        # the stored rows are replaced in one transaction, a failed recalculation keeps them
+        tracked = model.HistoryContentsAggregate.read(model.session, h1.id)
+        with mock.patch.object(galaxy.model, "_insert_history_contents_aggregate", side_effect=RuntimeError("failed")):
+            with pytest.raises(RuntimeError):
+                model.HistoryContentsAggregate.recalculate(model.session, h1.id)
+        assert self.query(model.HistoryContentsCount).filter_by(history_id=h1.id).count()
+        assert model.HistoryContentsAggregate.read(model.session, h1.id) == tracked
+
+        # flushes only touching untracked histories do not snapshot aggregates
+        h3 = model.History(name="History 3", user=u)
+        d5 = model.HistoryDatasetAssociation(history=h3, create_dataset=True, sa_session=model.session)
+        self.persist(h3, d5)
+        queries = []
+
+        def record_queries(conn, cursor, statement, *args):
+            queries.append(statement)
+        event.listen(model.engine, "before_cursor_execute", record_queries)
+        try:
+            d5.state = model.Dataset.states.OK
+            d5.visible = False
+            self.persist(d5)
+        finally:
+            event.remove(model.engine, "before_cursor_execute", record_queries)
+        assert queries and not [statement for statement in queries if 'GROUP BY' in statement]
+        assert self.query(model.HistoryContentsAggregate).get(h3.id) is None
 
     def test_default_disk_usage(self):
         model = self.model
@@ -529,6 +709,34 @@ class MappingTests(BaseModelTestCase):
         # Ensure big values truncated
         assert len(task.text_metrics[1].metric_value) <= 1023
 
+    def test_job_resource_usage(self):
+        model = self.model
+        u = model.User(email="jobusage@foo.bar.baz", password="password")
+        jobs = []
+        for runtime in range(1, 11):
+            job = model.Job()
+            job.user = u
+            job.tool_id = "usage_tool"
+            job.destination_id = "usage_destination"
+            job.add_metric("core", "runtime_seconds", runtime)
+            job.add_metric("core", "galaxy_slots", 2)
+            job.add_metric("core", "start_epoch", 1000)
+            job.add_metric("env", "HOME", "/home")
+            jobs.append(job)
+        self.persist(u, *jobs)
+        assert jobs[0].resource_usage.runtime_seconds == 1
+        assert jobs[0].resource_usage.memory_max_usage is None
+
+        summary = model.JobResourceUsage.summarize(self.session(), tool_id="usage_tool", percentiles=(50, 95))
+        assert summary["count"] == 10
+        runtime = summary["metrics"]["runtime_seconds"]
+        assert runtime["count"] == 10
+        assert (runtime["min"], runtime["max"], runtime["mean"]) == (1, 10, 5.5)
+        assert runtime["p50"] == 5.5
+        assert abs(runtime["p95"] - 9.55) < 1e-9
+        assert summary["metrics"]["memory_max_usage"] == dict(count=0, min=None, max=None, mean=None, p50=None, p95=None)
+        assert model.JobResourceUsage.summarize(self.session(), tool_id="usage_tool", destination_id="other")["count"] == 0
+
     def test_tasks(self):
         model = self.model
         u = model.User(email="jobtest@foo.bar.baz", password="password")
@@ -540,6 +748,33 @@ class MappingTests(BaseModelTestCase):
         loaded_task = model.session.query(model.Task).filter(model.Task.job == job).first()
         assert loaded_task.prepare_input_files_cmd == "split.sh"
 
+    def test_job_daily_summary(self):
+        model = self.model
+        u = model.User(email="jobsummary@foo.bar.baz", password="password")
+        today = datetime.datetime.utcnow().replace(hour=12)
+        yesterday = today - datetime.timedelta(days=1)
+        jobs = []
+        for create_time, state in [(yesterday, "ok"), (yesterday, "ok"), (today, "error")]:
+            job = model.Job()
+            job.user = u
+            job.tool_id = "summary_tool"
+            job.state = state
+            job.create_time = create_time
+            jobs.append(job)
+        self.persist(u, *jobs)
+
+        def summarized():
+            summary = model.JobDailySummary
+            rows = self.query(summary).filter(summary.tool_id == "summary_tool")
+            return {(row.day, row.state): row.job_count for row in rows}
+
+        assert model.JobDailySummary.compact(self.session(), full=True) is None
+        assert summarized() == {(yesterday.date(), "ok"): 2, (today.date(), "error"): 1}
+        jobs[1].state = "error"
+        self.persist(jobs[1])
+        assert model.JobDailySummary.compact(self.session()) >= 1
+        assert summarized() == {(yesterday.date(), "ok"): 1, (yesterday.date(), "error"): 1, (today.date(), "error"): 1}
+
     def test_history_contents(self):
         model = self.model
         u = model.User(email="contents@foo.bar.baz", password="password")
@@ -0,0 +1,56 @@
+import os
+
+from galaxy.datatypes.data import Text
+from galaxy.model.metadata import set_meta_in_processes
+
+
+class MockDatasetInstance:
+
+    def __init__(self, extension, datatype=None):
+        self.extension = extension
+        self.datatype = datatype
+        self._metadata = {}
+        self.info = None
+        self.blurb = "unchanged"
+
+
+class InfoText(Text):
+
+    def set_meta(self, dataset, **kwd):
+        dataset.info = f"Set in process {os.getpid()}"
+
+
+def _set_meta(dataset_instance):
+    if dataset_instance.extension == "broken":
+        raise Exception("Cannot set metadata")
+    dataset_instance._metadata["pid"] = os.getpid()
+    dataset_instance.extension = f"{dataset_instance.extension}_set"
+
+
+def test_set_meta_in_processes():
+    dataset_instances = [MockDatasetInstance("txt"), MockDatasetInstance("broken"), MockDatasetInstance("tabular")]
+    results = set_meta_in_processes(dataset_instances, _set_meta, processes=2)
+    assert [error is None for error, _ in results] == [True, False, True]
+    assert "Cannot set metadata" in results[1][0]
+    assert all(seconds >= 0 for _, seconds in results)
+    # metadata set in the forked processes is loaded back
+    assert [d.extension for d in dataset_instances] == ["txt_set", "broken", "tabular_set"]
+    assert dataset_instances[0]._metadata["pid"] != os.getpid()
+
+
+def test_set_meta_in_one_process():
+    dataset_instances = [MockDatasetInstance("txt")]
+    results = set_meta_in_processes(dataset_instances, _set_meta, processes=4)
+    assert results[0][0] is None
+    assert dataset_instances[0]._metadata["pid"] == os.getpid()
+
+
+def test_set_meta_in_processes_attributes():
+    dataset_instances = [MockDatasetInstance("txt", InfoText()), MockDatasetInstance("txt", InfoText())]
+    results = set_meta_in_processes(dataset_instances, lambda d: d.datatype.set_meta(d), processes=2)
+    assert all(error is None for error, _ in results)
+    # attributes besides the metadata that set_meta changed are loaded back, others are kept
+    for dataset_instance in dataset_instances:
+        assert dataset_instance.info.startswith("Set in process ")
+        assert dataset_instance.info != f"Set in process {os.getpid()}"
+        assert dataset_instance.blurb == "unchanged"
@@ -1,13 +1,19 @@
 import os
+import threading
 from contextlib import contextmanager
+from functools import partial
 from unittest import TestCase
 
+from sqlalchemy import event
+
+from galaxy import model
 from galaxy.jobs import (
     JobWrapper,
     TaskWrapper
 )
 from galaxy.model import (
     Job,
+    mapping,
     Task,
     User
 )
@@ -91,6 +97,61 @@ class TaskWrapperTestCase(BaseWrapperTestCase, TestCase):
             assert wrapper.write_version_cmd is None
 
 
+def test_prefetch_job_datasets():
+    object_store = MockObjectStore(None)
+    app = Bunch(model=mapping.init("/tmp", "sqlite:///:memory:", create_tables=True, object_store=object_store),
+                config=Bunch(job_preparation_prefetch_threads=4), object_store=object_store)
+    session = app.model.session
+    history = model.History(name="History 1", user=model.User(email="prefetch@example.com", password="password"))
+    job = model.Job()
+    job.history = history
+    for i in range(3):
+        hda = model.HistoryDatasetAssociation(history=history, create_dataset=True, sa_session=session)
+        job.add_input_dataset(f"input{i}", hda)
+        session.add(model.MetadataFile(dataset=hda, name="index"))
+    job.add_output_dataset("output", model.HistoryDatasetAssociation(history=history, create_dataset=True, sa_session=session))
+    session.add(job)
+    session.flush()
+    job_id = job.id
+    session.expunge_all()
+
+    job = session.query(model.Job).get(job_id)
+    job_wrapper = Bunch(app=app, _dataset_file_names={})
+    job_wrapper._dataset_file_name = partial(JobWrapper._dataset_file_name, job_wrapper)
+    prefetched = JobWrapper._prefetch_job_datasets(job_wrapper, job)
+    assert len(prefetched) == 7
+    # files are resolved once, on the job thread, without a cache to fetch them into
+    assert object_store.resolved == [threading.current_thread().name] * 4
+    assert set(job_wrapper._dataset_file_names) == {da.dataset.dataset.id for da in job.input_datasets + job.output_datasets}
+    for da in job.input_datasets + job.output_datasets:
+        job_wrapper._dataset_file_name(da.dataset)
+    assert len(object_store.resolved) == 4
+    queries = []
+
+    def count_queries(*args):
+        queries.append(args)
+    event.listen(app.model.engine, "before_cursor_execute", count_queries)
+    try:
+        for da in job.input_datasets + job.output_datasets:
+            assert da.dataset.dataset.state == model.Dataset.states.NEW
+            da.dataset.metadata.items()
+        assert session.query(model.MetadataFile).get(prefetched[-1].id) is prefetched[-1]
+    finally:
+        event.remove(app.model.engine, "before_cursor_execute", count_queries)
+    assert queries == []
+
+    # caching object stores fetch the files from the prefetch threads, given only identifiers
+    object_store.staging_path = "/tmp/cache"
+    object_store.resolved, object_store.objects = [], []
+    job_wrapper._dataset_file_names = {}
+    JobWrapper._prefetch_job_datasets(job_wrapper, job)
+    thread_name = threading.current_thread().name
+    fetched = [obj for name, obj in zip(object_store.resolved, object_store.objects) if name != thread_name]
+    assert len(fetched) == 4
+    assert all(isinstance(obj, Bunch) for obj in fetched)
+    assert object_store.resolved.count(thread_name) == 4
+
+
 class MockEvaluator:
 
     def __init__(self, app, tool, job, local_working_directory):
@@ -187,7 +248,10 @@ class MockObjectStore:
 
     def __init__(self, working_directory):
         self.working_directory = working_directory
-        os.makedirs(working_directory)
+        self.resolved = []
+        self.objects = []
+        if working_directory:
+            os.makedirs(working_directory)
 
     def create(self, *args, **kwds):
         pass
@@ -198,6 +262,8 @@ class MockObjectStore:
     def get_filename(self, *args, **kwds):
         if kwds.get("base_dir", "") == "job_work":
             return self.working_directory
+        self.resolved.append(threading.current_thread().name)
+        self.objects.append(args[0] if args else None)
         return None
 
 
@@ -0,0 +1,71 @@
+import subprocess
+import sys
+import threading
+import time
+
+from galaxy.jobs.runners.util.local_resources import (
+    ProcessWaiter,
+    ResourcePool,
+    ResourcePoolClosed,
+)
+
+
+def test_resource_pool_limits_and_orders_jobs():
+    pool = ResourcePool(slots=4, memory_mb=1000)
+    assert pool.acquire(3, 100) == (3, 100)
+    # requests larger than the pool are capped to it
+    started = []
+
+    def run(name, slots, memory_mb):
+        with pool.reserve(slots, memory_mb):
+            started.append(name)
+
+    big = threading.Thread(target=run, args=("big", 8, 100))
+    big.start()
+    time.sleep(0.1)
+    small = threading.Thread(target=run, args=("small", 1, 100))
+    small.start()
+    time.sleep(0.1)
+    # the small job would fit, but waits for the big one queued before it
+    assert started == []
+    pool.release(3, 100)
+    big.join(5)
+    small.join(5)
+    assert started == ["big", "small"]
+    assert (pool.used_slots, pool.used_memory_mb) == (0, 0)
+
+
+def test_resource_pool_close_wakes_waiting_jobs():
+    pool = ResourcePool(slots=1)
+    pool.acquire(1, 0)
+    errors = []
+
+    def run():
+        try:
+            pool.acquire(1, 0)
+        except ResourcePoolClosed as e:
+            errors.append(e)
+
+    t = threading.Thread(target=run)
+    t.start()
+    pool.close()
+    t.join(5)
+    assert len(errors) == 1
+
+
+def test_unlimited_resource_pool():
+    pool = ResourcePool()
+    assert not pool.enabled
+    for _ in range(10):
+        pool.acquire(16, 10000)
+
+
+def test_process_waiter():
+    proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(0.5)"])
+    waiter = ProcessWaiter(proc)
+    try:
+        assert not waiter.wait(0.01)
+        assert waiter.wait(10)
+        assert proc.returncode == 0
+    finally:
+        waiter.close()
@@ -1,5 +1,8 @@
+import importlib
 import uuid
 
+import pytest
+
 from galaxy.jobs import (
     HasResourceParameters,
     JobDestination,
@@ -8,6 +11,7 @@ from galaxy.jobs.mapper import (
     ERROR_MESSAGE_NO_RULE_FUNCTION,
     ERROR_MESSAGE_RULE_FUNCTION_NOT_FOUND,
     JobRunnerMapper,
+    memoize_destination,
 )
 from galaxy.util import bunch
 from . import test_rules
@@ -120,6 +124,26 @@ def test_dynamic_mapping_externally_set_job_destination():
     assert mapper.job_config.rule_response == "local_runner"
 
 
+def test_dynamic_mapping_memoized():
+    site_rules = importlib.import_module(f"{test_rules.__name__}.10_site")
+    destination = __dynamic_destination(dict(function="memoized_rule"))
+    mappers = [__mapper(destination) for _ in range(3)]
+    mappers[2].job_wrapper.user_id = 42
+    job_destinations = [mapper.get_job_destination({}) for mapper in mappers]
+    assert site_rules.MEMOIZED_RULE_CALLS == [6789, 42]
+    assert job_destinations[0].params == job_destinations[1].params == {"user": "6789"}
+    # every job gets its own copy of the memoized destination
+    assert job_destinations[0] is not job_destinations[1]
+    assert job_destinations[2].params == {"user": "42"}
+
+
+def test_memoize_destination_validates_attributes():
+    with pytest.raises(ValueError):
+        memoize_destination("history")
+    with pytest.raises(ValueError):
+        memoize_destination("input_size")
+
+
 def __assert_mapper_errors_with_message(mapper, message):
     exception = None
     try:
@@ -166,6 +190,7 @@ class MockJobWrapper(HasResourceParameters):
     def __init__(self, tool_job_destination):
         self.tool = MockTool(tool_job_destination)
         self.job_id = 12345
+        self.user_id = 6789
         self.app = object()
 
     def is_mock_job_wrapper(self):
@@ -188,7 +213,7 @@ class MockJobWrapper(HasResourceParameters):
 
         return bunch.Bunch(
             user=bunch.Bunch(
-                id=6789,
+                id=self.user_id,
                 email="test@example.com"
             ),
             raw_param_dict=lambda: raw_params,
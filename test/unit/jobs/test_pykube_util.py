@@ -0,0 +1,42 @@
+import pytest
+
+from galaxy.jobs.runners.util.pykube_util import (
+    Job,
+    JobWatcher,
+    Pod,
+)
+
+pytestmark = pytest.mark.skipif(Job is None, reason="pykube is not installed")
+
+
+def _obj(name, **labels):
+    return {"metadata": {"name": name, "labels": labels}, "status": {}}
+
+
+def test_job_watcher_cache():
+    watcher = JobWatcher(None, "default", "app.kubernetes.io/managed-by=galaxy")
+    assert not watcher.synced
+    watcher._replace(Job, [_obj("gxy-1"), _obj("gxy-2")])
+    watcher._replace(Pod, [_obj("gxy-1-abcde", **{"job-name": "gxy-1"})])
+    assert watcher.synced
+    assert watcher.job("gxy-1")["metadata"]["name"] == "gxy-1"
+    assert [pod["metadata"]["name"] for pod in watcher.pods("gxy-1")] == ["gxy-1-abcde"]
+    assert watcher.pods("gxy-2") == []
+
+    # pod events bump the version of their job only
+    version_1, version_2 = watcher.version("gxy-1"), watcher.version("gxy-2")
+    watcher._apply(Pod, "MODIFIED", _obj("gxy-1-abcde", **{"job-name": "gxy-1"}))
+    assert watcher.version("gxy-1") == version_1 + 1
+    assert watcher.version("gxy-2") == version_2
+
+    watcher._apply(Job, "DELETED", _obj("gxy-2"))
+    assert watcher.job("gxy-2") is None
+    assert watcher.version("gxy-2") == version_2 + 1
+
+    # relisting bumps the jobs that disappeared in the meantime
+    version_1 = watcher.version("gxy-1")
+    watcher._replace(Pod, [])
+    assert watcher.pods("gxy-1") == []
+    assert watcher.version("gxy-1") == version_1 + 1
+    watcher.forget("gxy-1")
+    assert watcher.version("gxy-1") == 0
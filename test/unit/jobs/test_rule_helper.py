@@ -1,4 +1,5 @@
 import uuid
+from datetime import timedelta
 
 from galaxy import model
 from galaxy.jobs.rule_helper import RuleHelper
@@ -42,6 +43,20 @@ def test_job_count():
     __assert_job_count_is(5, rule_helper, for_destination="cluster1", for_user_email=USER_EMAIL_1, for_job_states=["queued", "running", "error"])
 
 
+def test_resource_usage():
+    rule_helper = __rule_helper()
+    app = rule_helper.app
+    for destination_id, memory in [("cluster1", 1000), ("cluster1", 3000), ("local", 8000)]:
+        job = __new_job(tool_id="cat1", destination_id=destination_id)
+        job.add_metric("cgroup", "memory.max_usage_in_bytes", memory)
+        app.add(job)
+
+    usage = rule_helper.resource_usage(tool_id="cat1", for_destination="cluster1", created_in_last=timedelta(days=1), percentiles=[50])
+    assert usage["count"] == 2
+    assert usage["metrics"]["memory_max_usage"]["p50"] == 2000
+    assert rule_helper.resource_usage(tool_id="cat1")["metrics"]["memory_max_usage"]["max"] == 8000
+
+
 def __assert_job_count_is(expected_count, rule_helper, **kwds):
     acutal_count = rule_helper.job_count(**kwds)
 
@@ -141,6 +156,27 @@ def test_should_burst():
     assert not rule_helper.should_burst(["cluster1"], "6", job_states="queued")
 
 
+def test_should_burst_destination_load_snapshot():
+    rule_helper = __rule_helper()
+    __setup_fixtures(rule_helper.app)
+    assert not rule_helper.should_burst(["cluster1"], "8")
+    user = rule_helper.app.model.context.query(model.User).first()
+    rule_helper.app.add(__new_job(user=user, destination_id="cluster1", state="queued"))
+    # the snapshot is shared by rule helpers of the same app until it expires
+    assert not RuleHelper(rule_helper.app).should_burst(["cluster1"], "8")
+    assert rule_helper.should_burst(["cluster1"], "8", max_age=0)
+    assert rule_helper.destination_load().job_count(["cluster1"], ["queued"]) == 5
+
+
+def test_job_count_max_age():
+    rule_helper = __rule_helper()
+    __setup_fixtures(rule_helper.app)
+    __assert_job_count_is(7, rule_helper, for_destination="cluster1", max_age=60)
+    rule_helper.app.add(__new_job(user=rule_helper.app.model.context.query(model.User).first(), destination_id="cluster1"))
+    __assert_job_count_is(7, rule_helper, for_destination="cluster1", max_age=60)
+    __assert_job_count_is(8, rule_helper, for_destination="cluster1")
+
+
 def __assert_same_hash(rule_helper, job1, job2, hash_by):
     job1_hash = rule_helper.job_hash(job1, hash_by=hash_by)
     job2_hash = rule_helper.job_hash(job2, hash_by=hash_by)
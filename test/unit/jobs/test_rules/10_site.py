@@ -1,4 +1,7 @@
 from galaxy.jobs import JobDestination
+from galaxy.jobs.mapper import memoize_destination
+
+MEMOIZED_RULE_CALLS = []
 
 
 def upload():
@@ -70,3 +73,9 @@ def check_resource_params(resource_params):
 
 def check_workflow_invocation_uuid(workflow_invocation_uuid):
     return workflow_invocation_uuid
+
+
+@memoize_destination("tool_id", "user")
+def memoized_rule(user):
+    MEMOIZED_RULE_CALLS.append(user.id)
+    return JobDestination(id="memoized_dest_id", runner="local", params={"user": str(user.id)})
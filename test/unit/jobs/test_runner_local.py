@@ -53,6 +53,21 @@ class TestLocalJobRunner(TestCase, UsesApp, UsesTools):
         runner.queue_job(self.job_wrapper)
         assert self.job_wrapper.stdout.strip() == "3"
 
+    def test_memory_override(self):
+        self.job_wrapper.job_destination.params["local_memory_mb"] = 2048
+        self.job_wrapper.command_line = '''echo $GALAXY_MEMORY_MB'''
+        runner = local.LocalJobRunner(self.app, 1)
+        runner.queue_job(self.job_wrapper)
+        assert self.job_wrapper.stdout.strip() == "2048"
+
+    def test_runner_resource_params(self):
+        runner = local.LocalJobRunner(self.app, 1, slots="auto", memory_mb="4096")
+        assert runner._resource_pool.slots == os.cpu_count()
+        assert runner._resource_pool.memory_mb == 4096
+        runner.queue_job(self.job_wrapper)
+        assert self.job_wrapper.stdout.strip() == "HelloWorld"
+        assert runner._resource_pool.used_slots == 0
+
     def test_exit_code(self):
         self.job_wrapper.command_line = '''sh -c "exit 4"'''
         runner = local.LocalJobRunner(self.app, 1)
@@ -0,0 +1,62 @@
+import os
+import tempfile
+
+from galaxy import model
+from galaxy.datatypes.registry import example_datatype_registry_for_sample
+from galaxy.jobs.splitters import multi
+from galaxy.util.bunch import Bunch
+
+model.set_datatypes_registry(example_datatype_registry_for_sample())
+
+
+class MockJobWrapper:
+
+    def __init__(self, job, working_directory, parallelism):
+        self.job = job
+        self.working_directory = working_directory
+        self.parallelism = parallelism
+
+    def get_job(self):
+        return self.job
+
+    def get_parallelism(self):
+        return self.parallelism
+
+    def get_input_dataset_fnames(self, dataset):
+        return [dataset.file_name]
+
+
+def _hda(path, extension):
+    hda = model.HistoryDatasetAssociation(extension=extension, create_dataset=True, flush=False)
+    hda.dataset.external_filename = path
+    return hda
+
+
+def test_do_split_streams_tasks():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_path = os.path.join(tmpdir, "input.txt")
+        with open(input_path, "w") as fh:
+            fh.write("".join(f"line {i}\n" for i in range(10)))
+        shared_path = os.path.join(tmpdir, "shared.txt")
+        open(shared_path, "w").close()
+        job = model.Job()
+        job.add_input_dataset("input1", _hda(input_path, "txt"))
+        job.add_input_dataset("genome", _hda(shared_path, "txt"))
+        parallelism = Bunch(attributes={"split_inputs": "input1", "split_mode": "to_size", "split_size": "4"})
+        working_directory = os.path.join(tmpdir, "working")
+        job_wrapper = MockJobWrapper(job, working_directory, parallelism)
+
+        streamed = []
+
+        def task_callback(task):
+            # each task is handed over with its part complete, before the next part is written
+            task_dir = task.working_directory
+            with open(os.path.join(task_dir, "input.txt")) as fh:
+                streamed.append(fh.read().count("\n"))
+            assert os.path.islink(os.path.join(task_dir, "shared.txt"))
+            next_index = int(task_dir.rsplit("_", 1)[-1]) + 1
+            assert not os.path.exists(os.path.join(working_directory, f"task_{next_index}", "input.txt"))
+
+        tasks = multi.do_split(job_wrapper, task_callback=task_callback)
+        assert streamed == [4, 4, 2]
+        assert [task.working_directory for task in tasks] == [os.path.join(working_directory, f"task_{i}") for i in range(3)]
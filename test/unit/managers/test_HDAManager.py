@@ -193,6 +193,58 @@ class HDAManagerTestCase(HDATestCase):
         self.assertFalse(item1.deleted)
         self.assertFalse(item1.purged)
 
+    def test_bulk_update(self):
+        self.trans.app.config.allow_user_dataset_purge = True
+
+        owner = self.user_manager.create(**user2_data)
+        history1 = self.history_manager.create(name='history1', user=owner)
+        history2 = self.history_manager.create(name='history2', user=owner)
+        dataset1 = self.dataset_manager.create()
+        dataset1.total_size = 100
+        dataset2 = self.dataset_manager.create()
+        dataset2.total_size = 200
+        item1 = self.hda_manager.create(history=history1, dataset=dataset1)
+        item2 = self.hda_manager.create(history=history1, dataset=dataset2)
+        # a copy in another history of the owner keeps dataset2 (and its quota amount) alive
+        self.hda_manager.create(history=history2, dataset=dataset2)
+        other_item = self.hda_manager.create(history=history2, dataset=self.dataset_manager.create())
+        ids = [item1.id, item2.id]
+
+        self.log("should not update anything if some hdas are not in the given history")
+        self.assertRaises(exceptions.ObjectNotFound, self.hda_manager.bulk_update, history1, ids + [other_item.id], visible=False)
+        self.assertRaises(exceptions.ObjectNotFound, self.hda_manager.bulk_update, history1, ids + [-1], visible=False)
+        self.assertTrue(item1.visible)
+        self.assertTrue(other_item.visible)
+
+        self.log("should validate tags as when updating a single hda")
+        self.assertRaises(exceptions.RequestParameterInvalidException, self.hda_manager.bulk_update, history1, ids, user=owner, tags='one')
+
+        self.log("should update the hdas in the given history")
+        self.assertEqual(self.hda_manager.bulk_update(history1, ids, user=owner, visible=False, tags=['one', 'name:two', 'one']), 2)
+        self.assertFalse(item1.visible)
+        self.assertFalse(item2.visible)
+        self.assertTrue(other_item.visible)
+        self.assertEqual(self.hda_manager.get_tags(item1), ['name:two', 'one'])
+        self.assertEqual(self.hda_manager.get_tags(other_item), [])
+        self.hda_manager.set_tags(other_item, ['one', 'name:two', 'one'], user=owner)
+        self.assertEqual(self.hda_manager.get_tags(other_item), self.hda_manager.get_tags(item1))
+
+        self.log("should not allow undeleting uploading hdas")
+        dataset1.state = model.Dataset.states.UPLOAD
+        self.assertRaises(exceptions.Conflict, self.hda_manager.bulk_update, history1, ids, deleted=False)
+        dataset1.state = model.Dataset.states.OK
+
+        self.log("should purge and adjust the disk usage once for datasets without other instances")
+        self.trans.sa_session.refresh(owner)
+        disk_usage = owner.disk_usage
+        self.assertEqual(self.hda_manager.bulk_update(history1, ids, user=owner, purged=True), 2)
+        self.assertTrue(item1.deleted and item1.purged)
+        self.assertTrue(item2.deleted and item2.purged)
+        self.assertTrue(dataset1.purged)
+        self.assertFalse(dataset2.purged)
+        self.trans.sa_session.refresh(owner)
+        self.assertEqual(owner.disk_usage, disk_usage - 100)
+
     def test_ownable(self):
         owner = self.user_manager.create(**user2_data)
         non_owner = self.user_manager.create(**user3_data)
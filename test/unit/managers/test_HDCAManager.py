@@ -1,5 +1,9 @@
+import io
+import tempfile
 import unittest
+import zipfile
 
+from galaxy import model
 from galaxy.managers import (
     collections,
     hdas,
@@ -51,6 +55,53 @@ class HDCATestCase(BaseTestCase, CreatesCollectionsMixin):
         return hdca
 
 
+class StreamDatasetCollectionTestCase(HDCATestCase):
+
+    def test_prefetches_cached_files_by_identifier(self):
+        history = self._create_history()
+        hdas = []
+        for i in range(3):
+            hda = self._create_hda(history, name=f"hda-{i}", hid=i)
+            hda.state = hda.states.OK
+            with tempfile.NamedTemporaryFile(mode='w') as fh:
+                fh.write(f"content {i}")
+                fh.flush()
+                self.app.object_store.update_from_file(hda.dataset, file_name=fh.name, create=True)
+            hdas.append(hda)
+        hdca = self.collection_manager.create(self.trans, history, 'test collection', 'list',
+            element_identifiers=self.build_element_identifiers(hdas))
+
+        class CachingObjectStore:
+            staging_path = "cache"
+
+            def __init__(self, object_store):
+                self.object_store = object_store
+                self.fetched = []
+
+            def get_filename(self, obj, **kwd):
+                if not isinstance(obj, model.Dataset):
+                    self.fetched.append(obj)
+                return self.object_store.get_filename(obj, **kwd)
+
+            def __getattr__(self, name):
+                return getattr(self.object_store, name)
+
+        object_store = model.Dataset.object_store
+        caching_object_store = CachingObjectStore(object_store)
+        model.Dataset.object_store = caching_object_store
+        try:
+            archive = hdcas.stream_dataset_collection(hdca, prefetch_threads=2)
+            content = b''.join(chunk for chunks in archive.response() for chunk in chunks)
+        finally:
+            model.Dataset.object_store = object_store
+
+        self.assertEqual(sorted(key.id for key in caching_object_store.fetched), sorted(hda.dataset.id for hda in hdas))
+        with zipfile.ZipFile(io.BytesIO(content)) as zip_file:
+            names = sorted(zip_file.namelist())
+            self.assertEqual(len(names), 3)
+            self.assertEqual(zip_file.read(names[0]), b"content 0")
+
+
 # =============================================================================
 # web.url_for doesn't work well in the framework
 def testable_url_for(*a, **k):
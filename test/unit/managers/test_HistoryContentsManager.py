@@ -118,6 +118,32 @@ class HistoryAsContainerTestCase(HistoryAsContainerBaseTestCase):
         self.assertEqual(self.contents_manager.contents(history, limit=0), [])
         self.assertEqual(self.contents_manager.contents(history, offset=len(contents)), [])
 
+    def test_keyset_pagination(self):
+        parse_filter = self.history_contents_filters.parse_filter
+        user2 = self.user_manager.create(**user2_data)
+        history = self.history_manager.create(name='history', user=user2)
+        contents = []
+        contents.extend([self.add_hda_to_history(history, name=('hda-' + str(x))) for x in range(3)])
+        contents.append(self.add_list_collection_to_history(history, contents[:3]))
+        contents.extend([self.add_hda_to_history(history, name=('hda-' + str(x))) for x in range(4, 6)])
+        contents.append(self.add_list_collection_to_history(history, contents[4:6]))
+
+        self.log("should be able to page through both content types by hid")
+        hid_desc = self.contents_manager.parse_order_by('hid-dsc')
+        page = self.contents_manager.contents(history, limit=3, order_by=hid_desc)
+        self.assertEqual(page, contents[:-4:-1])
+        filters = [parse_filter('hid', 'lt', str(page[-1].hid))]
+        page = self.contents_manager.contents(history, filters=filters, limit=3, order_by=hid_desc)
+        self.assertEqual(page, contents[-4:-7:-1])
+        self.assertEqual(self.contents_manager.contents(history, filters=filters, limit=3, offset=2, order_by=hid_desc),
+            contents[-6:-9:-1])
+
+        self.log("should return the hid extrema of the filtered contents")
+        self.assertEqual(self.contents_manager.contents_extrema(history), (contents[0].hid, contents[-1].hid))
+        filters = [parse_filter('history_content_type', 'eq', 'dataset')]
+        self.assertEqual(self.contents_manager.contents_extrema(history, filters=filters), (contents[0].hid, contents[-2].hid))
+        self.assertEqual(self.contents_manager.contents_extrema(self.history_manager.create(name='empty', user=user2)), (None, None))
+
     def test_orm_filtering(self):
         parse_filter = self.history_contents_filters.parse_filter
         user2 = self.user_manager.create(**user2_data)
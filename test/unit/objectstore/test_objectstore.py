@@ -71,6 +71,13 @@ def test_disk_store():
             assert not object_store.exists(to_delete_dataset)
             assert not os.path.exists(to_delete_real_path)
 
+            # Test object identifiers and batched delete
+            batch_datasets = [MockDataset(6), MockDataset(7)]
+            batch_real_paths = [directory.write("batch", f"files1/000/dataset_{d.id}.dat") for d in batch_datasets]
+            assert object_store.get_object_identifier(batch_datasets[0]) == batch_real_paths[0]
+            assert object_store.delete_many([(d, {}) for d in batch_datasets]) == [True, True]
+            assert not any(os.path.exists(path) for path in batch_real_paths)
+
 
 DISK_TEST_CONFIG_BY_UUID_YAML = """
 type: disk
@@ -353,10 +360,12 @@ def test_distributed_store():
     for config_str in [DISTRIBUTED_TEST_CONFIG, DISTRIBUTED_TEST_CONFIG_YAML]:
         with TestConfig(config_str) as (directory, object_store):
             persisted_ids = []
+            datasets = []
             for i in range(100):
                 dataset = MockDataset(100 + i)
                 object_store.create(dataset)
                 persisted_ids.append(dataset.object_store_id)
+                datasets.append(dataset)
 
             # Test distributes datasets between backends according to weights
             backend_1_count = sum(1 for v in persisted_ids if v == "files1")
@@ -373,6 +382,10 @@ def test_distributed_store():
             extra_dirs = as_dict["extra_dirs"]
             assert len(extra_dirs) == 2
 
+            # Batched deletes are split between the backends holding the datasets
+            assert object_store.delete_many([(dataset, {}) for dataset in datasets]) == [True] * 100
+            assert not any(object_store.exists(dataset) for dataset in datasets)
+
 
 # Unit testing the cloud and advanced infrastructure object stores is difficult, but
 # we can at least stub out initializing and test the configuration of these things from
@@ -1,6 +1,7 @@
 """Unit tests for importing and exporting data from model stores."""
 import json
 import os
+import tarfile
 from tempfile import mkdtemp, NamedTemporaryFile
 
 from galaxy import model
@@ -69,6 +70,84 @@ def test_import_export_datasets():
     assert imported_job.input_datasets[0].dataset == datasets[0]
 
 
+def test_import_export_history_dedupes_hashed_datasets():
+    """Test datasets with the same recorded hash are streamed into the archive once."""
+    app = _mock_app()
+
+    u, h, d1, d2, j = _setup_simple_cat_job(app)
+    sa_session = app.model.context
+    d3 = _create_datasets(sa_session, h, 1)[0]
+    sa_session.add(d3)
+    sa_session.flush()
+    app.object_store.update_from_file(d3, file_name="test-data/1.txt", create=True)
+    for dataset_instance in (d1, d3):
+        dataset_hash = model.DatasetHash()
+        dataset_hash.hash_function = "MD5"
+        dataset_hash.hash_value = "same-content"
+        dataset_instance.dataset.hashes.append(dataset_hash)
+    sa_session.flush()
+
+    dest_export = os.path.join(mkdtemp(), "moo.tgz")
+    with store.TarModelExportStore(dest_export, app=app, export_files="copy", prefetch_threads=2) as export_store:
+        export_store.export_history(h)
+
+    with tarfile.open(dest_export) as archive:
+        dataset_files = [name for name in archive.getnames() if name.startswith("datasets/")]
+        datasets_attrs = json.load(archive.extractfile("datasets_attrs.txt"))
+    assert len(dataset_files) == 2
+    file_names = {attrs["hid"]: attrs["file_name"] for attrs in datasets_attrs}
+    assert file_names[d1.hid] == file_names[d3.hid]
+
+    imported_history = import_archive(dest_export, app, u)
+    contents = []
+    for dataset_instance in imported_history.datasets:
+        with open(dataset_instance.file_name) as f:
+            contents.append(f.read())
+    assert len(contents) == 3
+    assert len([c for c in contents if c.startswith("chr1    4225    19670")]) == 2
+
+
+def test_export_history_prefetches_cached_files_by_identifier():
+    """Test object store caches are filled from threads given dataset identifiers only."""
+    app = _mock_app()
+
+    u, h, d1, d2, j = _setup_simple_cat_job(app)
+
+    class CachingObjectStore:
+        staging_path = "cache"
+
+        def __init__(self, object_store):
+            self.object_store = object_store
+            self.fetched = []
+            self.resolved = []
+
+        def get_filename(self, obj, **kwd):
+            if isinstance(obj, model.Dataset):
+                self.resolved.append(obj.id)
+            else:
+                self.fetched.append(obj)
+            return self.object_store.get_filename(obj, **kwd)
+
+        def __getattr__(self, name):
+            return getattr(self.object_store, name)
+
+    object_store = model.Dataset.object_store
+    caching_object_store = CachingObjectStore(object_store)
+    model.Dataset.object_store = caching_object_store
+    try:
+        dest_export = os.path.join(mkdtemp(), "moo.tgz")
+        with store.TarModelExportStore(dest_export, app=app, export_files="copy", prefetch_threads=2) as export_store:
+            export_store.export_history(h)
+    finally:
+        model.Dataset.object_store = object_store
+
+    dataset_ids = {d1.dataset.id, d2.dataset.id}
+    assert not any(isinstance(key, model.Dataset) for key in caching_object_store.fetched)
+    assert {key.id for key in caching_object_store.fetched} == dataset_ids
+    # the export resolves each file name once more, on the calling thread
+    assert sorted(caching_object_store.resolved) == sorted(dataset_ids)
+
+
 def test_import_library_require_permissions():
     """Verify library creation (import) is off by default."""
     app = _mock_app()
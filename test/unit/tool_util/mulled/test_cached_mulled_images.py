@@ -0,0 +1,41 @@
+import os
+
+from galaxy.tool_util.deps.container_resolvers.mulled import (
+    cached_mulled_images_index_from_path,
+    refresh_cached_mulled_images_index,
+    singularity_cached_container_description,
+)
+from galaxy.tool_util.deps.mulled.util import (
+    build_target,
+    v2_image_name,
+)
+
+
+def _touch(directory, name):
+    open(os.path.join(directory, name), "w").close()
+
+
+def test_singularity_cached_images_index(tmp_path):
+    directory = str(tmp_path)
+    for name in ("samtools:1.9--h8571acd_11", "samtools:1.10--h2e538c0_3", "samtools:1.10--h2e538c0_2"):
+        _touch(directory, name)
+    targets = [build_target("samtools", version="1.10"), build_target("bwa", version="0.7.17")]
+    multi_target_image = f"{v2_image_name(targets)}-0"
+    _touch(directory, multi_target_image)
+
+    description = singularity_cached_container_description([build_target("samtools")], directory)
+    assert description.identifier == os.path.join(directory, "samtools:1.10--h2e538c0_3")
+    description = singularity_cached_container_description([build_target("samtools", version="1.9")], directory)
+    assert description.identifier == os.path.join(directory, "samtools:1.9--h8571acd_11")
+    assert singularity_cached_container_description([build_target("samtools", version="1.11")], directory) is None
+    assert singularity_cached_container_description(targets, directory).identifier == os.path.join(directory, multi_target_image)
+
+    index = cached_mulled_images_index_from_path(directory)
+    # the directory is not listed again until it is modified
+    os.utime(directory, ns=(0, 0))
+    assert cached_mulled_images_index_from_path(directory) is not index
+    assert cached_mulled_images_index_from_path(directory) is cached_mulled_images_index_from_path(directory)
+    _touch(directory, "samtools:1.11--h2e538c0_0")
+    refresh_cached_mulled_images_index(directory)
+    assert singularity_cached_container_description([build_target("samtools", version="1.11")], directory)
+    assert singularity_cached_container_description([build_target("samtools")], str(tmp_path / "missing")) is None
@@ -1,5 +1,6 @@
 import os.path
 import tempfile
+import time
 from contextlib import contextmanager
 from os import (
     chmod,
@@ -452,6 +453,44 @@ def test_shell_commands_built():
         __assert_foo_exported(commands)
 
 
+def test_resolution_plan_cached():
+    with __test_base_path() as base_path:
+        dm = __dependency_manager_for_base_path(default_base_path=base_path)
+        env_path = __setup_galaxy_package_dep(base_path, TEST_REPO_NAME, TEST_VERSION)
+        requirements = ToolRequirements([{'type': 'package', 'version': TEST_VERSION, 'name': TEST_REPO_NAME}])
+        dependency = next(iter(dm.requirements_to_dependencies(requirements).values()))
+        assert dependency.script == env_path
+
+        tool_shed_resolver = dm.dependency_resolvers[0]
+        consulted = []
+
+        def resolve(requirement, **kwds):
+            consulted.append(requirement)
+            return NullDependency(version=requirement.version, name=requirement.name)
+        tool_shed_resolver.resolve = resolve
+        # another manager sharing the cache directory only consults the resolver that resolved the requirement
+        other_dm = __dependency_manager_for_base_path(default_base_path=base_path)
+        other_dm.dependency_resolvers[0].resolve = resolve
+        for manager in (dm, other_dm):
+            dependency = next(iter(manager.requirements_to_dependencies(requirements).values()))
+            assert dependency.script == env_path
+        assert not consulted
+
+        other_dm.invalidate_resolution_cache()
+        dm.requirements_to_dependencies(requirements)
+        assert len(consulted) == 1
+
+        # stale plans are used and refreshed in the background
+        dm.resolution_cache.max_age = -1
+        dependency = next(iter(dm.requirements_to_dependencies(requirements).values()))
+        assert dependency.script == env_path
+        for _ in range(100):
+            if len(consulted) == 2 and not dm._refreshing:
+                break
+            time.sleep(.05)
+        assert len(consulted) == 2
+
+
 def __assert_foo_exported(commands):
     command = ["bash", "-c", "%s; echo \"$FOO\"" % "".join(commands)]
     process = Popen(command, stdout=PIPE)
@@ -1,7 +1,11 @@
+import os
+import tempfile
+
 import pytest
 
 from galaxy import model
 from galaxy.tools.parameters import basic
+from galaxy.tools.parameters.dynamic_options import OptionsFileCache
 from galaxy.util import bunch
 from .util import BaseParameterTestCase
 
@@ -49,6 +53,47 @@ class SelectToolParameterTestCase(BaseParameterTestCase):
         assert ("testname2", "testpath2", False) in self.param.get_options(self.trans, {"input_bam": "testpath2"})
         assert len(self.param.get_options(self.trans, {"input_bam": "testpath3"})) == 0
 
+    def test_memoized_filters(self):
+        self.options_xml = '''<options from_data_table="test_table"><filter type="sort_by" column="1" /><filter type="param_value" ref="input_bam" column="0" /></options>'''
+        table = self.app.tool_data_tables["test_table"]
+        assert self.param.get_options(self.trans, {"input_bam": "testname1"}) == [("testname1", "testpath1", False)]
+        table.fields.append(["testname3", "testpath0"])
+        # the sorted options are reused until the table changes
+        assert self.param.get_options(self.trans, {"input_bam": "testname3"}) == []
+        table.version += 1
+        assert self.param.get_options(self.trans, {"input_bam": "testname3"}) == [("testname3", "testpath0", False)]
+
+    def test_options_file_cache(self):
+        parsed = []
+
+        def parse(size):
+            parsed.append(size)
+            return [["a", "b"]]
+
+        cache = OptionsFileCache(max_size=8)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = [os.path.join(tmpdir, name) for name in ("first", "second")]
+            for path in paths:
+                with open(path, "w") as fh:
+                    fh.write("a\tb\n")
+            key, fields = cache.get_or_parse(paths[0], "\t", parse)
+            assert cache.get_or_parse(paths[0], "\t", parse) == (key, fields)
+            assert parsed == [4]
+            # parsed with different options
+            cache.get_or_parse(paths[0], ",", parse)
+            assert len(parsed) == 2
+            # only 8 bytes worth of files are cached
+            cache.get_or_parse(paths[1], "\t", parse)
+            cache.get_or_parse(paths[0], "\t", parse)
+            assert len(parsed) == 4
+            # modified files are parsed again
+            with open(paths[0], "w") as fh:
+                fh.write("a\tc\n")
+            os.utime(paths[0], ns=(0, 0))
+            new_key, _ = cache.get_or_parse(paths[0], "\t", parse)
+            assert new_key != key
+            assert len(parsed) == 5
+
     # TODO: Good deal of overlap here with DataToolParameterTestCase,
     # refactor.
     def setUp(self):
@@ -99,6 +144,11 @@ class MockToolDataTable:
             value=1,
         )
         self.missing_index_file = None
+        self.fields = [["testname1", "testpath1"], ["testname2", "testpath2"]]
+        self.version = 1
 
     def get_fields(self):
-        return [["testname1", "testpath1"], ["testname2", "testpath2"]]
+        return self.fields
+
+    def get_version_fields(self):
+        return self.version, self.fields
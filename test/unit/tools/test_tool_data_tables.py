@@ -0,0 +1,56 @@
+import os
+import tempfile
+
+from galaxy.tools.data import ToolDataTableManager
+
+TABLES_CONF = """<tables>
+    <table name="all_fasta" comment_char="#" allow_duplicate_entries="False">
+        <columns>value, dbkey, name, path</columns>
+        <file path="{tool_data_path}/all_fasta.loc" />
+        <file path="{tool_data_path}/more_fasta.loc" />
+    </table>
+</tables>
+"""
+
+
+def _write(path, content):
+    with open(path, "w") as fh:
+        fh.write(content)
+
+
+def _manager(tool_data_path):
+    config = os.path.join(tool_data_path, "tool_data_table_conf.xml")
+    _write(config, TABLES_CONF.format(tool_data_path=tool_data_path))
+    return ToolDataTableManager(tool_data_path, config_filename=config)
+
+
+def test_lookups_and_dedupe():
+    with tempfile.TemporaryDirectory() as tool_data_path:
+        _write(os.path.join(tool_data_path, "all_fasta.loc"), "hg19\thg19\tHuman\t/hg19.fa\nhg38\thg38\tHuman\t/hg38.fa\n")
+        _write(os.path.join(tool_data_path, "more_fasta.loc"), "hg19\thg19\tHuman\t/hg19.fa\nmm10\tmm10\tMouse\t/mm10.fa\n")
+        table = _manager(tool_data_path)["all_fasta"]
+        assert [fields[0] for fields in table.get_fields()] == ["hg19", "hg38", "mm10"]
+        assert table.get_entry("dbkey", "hg38", "path") == "/hg38.fa"
+        assert table.get_entries("name", "Human", "value") == ["hg19", "hg38"]
+        assert table.get_entries("name", "Rat", "value") is None
+        assert table.get_field("mm10")["path"] == "/mm10.fa"
+        # entries added after the indexes were built are found
+        table.add_entry({"value": "rn6", "dbkey": "rn6", "name": "Rat", "path": "/rn6.fa"})
+        assert table.get_entry("name", "Rat", "value") == "rn6"
+        table.add_entry(["rn6", "rn6", "Rat", "/rn6.fa"], allow_duplicates=False)
+        assert len(table.get_fields()) == 4
+
+
+def test_reload_reparses_modified_files_only():
+    with tempfile.TemporaryDirectory() as tool_data_path:
+        all_fasta = os.path.join(tool_data_path, "all_fasta.loc")
+        more_fasta = os.path.join(tool_data_path, "more_fasta.loc")
+        _write(all_fasta, "hg19\thg19\tHuman\t/hg19.fa\n")
+        _write(more_fasta, "mm10\tmm10\tMouse\t/mm10.fa\n")
+        manager = _manager(tool_data_path)
+        table = manager["all_fasta"]
+        unmodified_rows = table.get_fields()[1]
+        _write(all_fasta, "hg19\thg19\tHuman\t/hg19.fa\nhg38\thg38\tHuman\t/hg38.fa\n")
+        manager.reload_tables("all_fasta")
+        assert table.get_entry("dbkey", "hg38", "path") == "/hg38.fa"
+        assert table.get_fields()[2] is unmodified_rows
@@ -3,6 +3,7 @@ import tempfile
 
 import pytest
 
+from galaxy import model
 from galaxy.datatypes.metadata import MetadataSpecCollection
 from galaxy.job_execution.datasets import DatasetPath
 from galaxy.tools.parameters.basic import (
@@ -14,6 +15,7 @@ from galaxy.tools.parameters.basic import (
     TextToolParameter,
 )
 from galaxy.tools.wrappers import (
+    DatasetCollectionWrapper,
     DatasetFilenameWrapper,
     InputValueWrapper,
     RawObjectWrapper,
@@ -204,13 +206,42 @@ def test_dataset_wrapper_false_path():
     assert wrapper.file_name == new_path
 
 
+def test_dataset_wrapper_lazy():
+    dataset = MockDataset()
+    compute_environment = MockComputeEnvironment(false_path="/new/path/dataset_123.dat")
+    wrapper = DatasetFilenameWrapper(dataset, compute_environment=compute_environment)
+    # paths are only rewritten once templates use them
+    assert compute_environment.rewrites == 0
+    assert str(wrapper) == str(wrapper) == "/new/path/dataset_123.dat"
+    assert compute_environment.rewrites == 1
+    assert wrapper.groups == set()
+    assert wrapper.metadata is wrapper.metadata
+
+
+def test_dataset_collection_wrapper():
+    inner = model.DatasetCollection(collection_type="paired")
+    for index, identifier in enumerate(("forward", "reverse")):
+        hda = model.HistoryDatasetAssociation(extension="txt")
+        model.DatasetCollectionElement(collection=inner, element=hda, element_identifier=identifier, element_index=index)
+    outer = model.DatasetCollection(collection_type="list:paired")
+    model.DatasetCollectionElement(collection=outer, element=inner, element_identifier="sample1", element_index=0)
+    wrapper = DatasetCollectionWrapper("/tmp", outer)
+    assert wrapper
+    assert list(wrapper.keys()) == ["sample1"]
+    assert wrapper.sample1 is wrapper[0]
+    assert [element.element_identifier for element in wrapper.sample1] == ["forward", "reverse"]
+    assert wrapper.sample1.reverse.ext == "txt"
+
+
 class MockComputeEnvironment:
 
     def __init__(self, false_path, false_extra_files_path=None):
         self.false_path = false_path
         self.false_extra_files_path = false_extra_files_path
+        self.rewrites = 0
 
     def input_path_rewrite(self, dataset):
+        self.rewrites += 1
         return self.false_path
 
     def input_extra_files_rewrite(self, dataset):
@@ -174,6 +174,8 @@ class MockAppConfig(Bunch):
 
         self.umask = 0o77
         self.flush_per_n_datasets = 0
+        self.archive_prefetch_threads = 1
+        self.job_preparation_prefetch_threads = 1
 
         # Compliance related config
         self.redact_email_in_job_name = False
@@ -1,9 +1,15 @@
 import sys
+import time
 
 import pytest
 from Cheetah.NameMapper import NotFound
+from Cheetah.Template import Template
 
-from galaxy.util.template import fill_template
+from galaxy.util import template
+from galaxy.util.template import (
+    CompiledTemplateCache,
+    fill_template,
+)
 
 SIMPLE_TEMPLATE = """#for item in $a_list:
     echo $item
@@ -86,3 +92,99 @@ def test_fix_template_two_to_three():
 def test_fix_template_invalid_cheetah():
     template_str = fill_template(INVALID_CHEETAH_SYNTAX, python_template_version='2', retry=1)
     assert template_str == "1 is 1\n"
+
+
+def test_compiled_template_cache(monkeypatch, tmp_path):
+    cache = CompiledTemplateCache(max_entries=1, cache_dir=str(tmp_path))
+    monkeypatch.setattr(template, 'compiled_template_cache', cache)
+    assert fill_template(TWO_TO_THREE_TEMPLATE, python_template_version='2') == 'a a 1'
+    key = cache.key(TWO_TO_THREE_TEMPLATE, template.packaging.version.parse('2'))
+    klass, futurized = cache.get(key, TWO_TO_THREE_TEMPLATE)
+    # the futurized class is cached and reused without going through the retries again
+    assert futurized
+    compiled = []
+    monkeypatch.setattr(template, '_compile', lambda *args, **kwds: compiled.append(args))
+    assert fill_template(TWO_TO_THREE_TEMPLATE, python_template_version='2', retry=0) == 'a a 1'
+    assert not compiled
+    monkeypatch.undo()
+    # the same text filled as a python 3 template is a different entry, evicting the first one
+    monkeypatch.setattr(template, 'compiled_template_cache', cache)
+    assert fill_template(SIMPLE_TEMPLATE, {'a_list': [1, 2]}) == FILLED_SIMPLE_TEMPLATE
+    assert len(cache._classes) == 1
+    # and read back from disk by other processes
+    other_cache = CompiledTemplateCache(cache_dir=str(tmp_path))
+    klass, futurized = other_cache.get(key, TWO_TO_THREE_TEMPLATE)
+    assert futurized
+    assert str(klass(searchList=[{}])) == 'a a 1'
+
+
+class Dataset:
+    ext = "fastqsanger"
+    name = "reads"
+
+    def __str__(self):
+        return "/data/000/dataset_1.dat"
+
+
+SIMPLE_TEMPLATE_CONTEXT = {
+    "input": Dataset(),
+    "threads": 4,
+    "paired": True,
+    "adapter": None,
+    "options": {"mode": "fast", "files": ["a", "b"]},
+}
+FAST_PATH_TEMPLATES = [
+    "tool --in '$input' --threads ${threads} --ext $input.ext $adapter> out.txt",
+    "a $ b $1 $input.ext. $",
+    "# a comment\n#!/bin/bash\necho 1 # trailing",
+    "tool\n#if $paired and $threads > 2\n  --paired $input.name\n#elif $adapter is None\n  --single\n#else\n  --other\n#end if\nend",
+    "#if $options.mode in ['slow', 'medium']\nA\n  #if not $adapter\n  B\n  #end if\n#else if str($adapter) == 'None'\nC\n#end if\n",
+    '--files ${",".join($options.files)}',
+]
+CHEETAH_TEMPLATES = [
+    "tool \\$GALAXY_SLOTS",
+    "$input.name.upper()",
+    "#set x = 1\n$x",
+    "#if $threads > 2:\nA\n#end if",
+    "#if $input.ext.startswith('fastq')\nA\n#end if",
+    "$items",
+    SIMPLE_TEMPLATE,
+]
+
+
+@pytest.mark.parametrize("template_text", FAST_PATH_TEMPLATES)
+def test_simple_template_matches_cheetah(template_text):
+    simple_template = template.SimpleTemplate(template_text)
+    assert simple_template.fill(SIMPLE_TEMPLATE_CONTEXT) == str(Template(source=template_text, searchList=[SIMPLE_TEMPLATE_CONTEXT]))
+
+
+@pytest.mark.parametrize("template_text", CHEETAH_TEMPLATES)
+def test_simple_template_unsupported(template_text):
+    with pytest.raises(template.SimpleTemplateUnsupported):
+        template.SimpleTemplate(template_text)
+
+
+def test_simple_template_fallback(monkeypatch):
+    monkeypatch.setattr(template, 'simple_templates', template.SimpleTemplateCache())
+    # names missing from the context are looked up by Cheetah
+    assert fill_template("$Template.__name__") == "Template"
+    with pytest.raises(NotFound):
+        fill_template("$missing")
+    assert fill_template("#if $threads > 2:\nA\n#end if", SIMPLE_TEMPLATE_CONTEXT) == "A\n"
+
+
+def test_simple_template_performance():
+    template_text = FAST_PATH_TEMPLATES[3]
+    compiled_cheetah = Template.compile(source=template_text)
+
+    def timed(fill):
+        start = time.perf_counter()
+        for _ in range(200):
+            fill()
+        return time.perf_counter() - start
+
+    cheetah_time = timed(lambda: str(compiled_cheetah(searchList=[SIMPLE_TEMPLATE_CONTEXT])))
+    fill_template(template_text, SIMPLE_TEMPLATE_CONTEXT)
+    simple_time = timed(lambda: fill_template(template_text, SIMPLE_TEMPLATE_CONTEXT))
+    # even against an already compiled Cheetah class
+    assert simple_time < cheetah_time
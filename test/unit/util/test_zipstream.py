@@ -0,0 +1,62 @@
+import io
+import os
+import tempfile
+import zipfile
+from urllib.parse import quote
+
+from galaxy.util.zipstream import (
+    resolve_ahead,
+    ZipstreamWrapper,
+)
+
+
+def _consume(archive):
+    contents = io.BytesIO()
+    for chunks in archive.response():
+        for chunk in chunks:
+            contents.write(chunk)
+    return zipfile.ZipFile(contents)
+
+
+def test_resolve_ahead_preserves_order():
+    resolvers = [lambda i=i: i * 2 for i in range(20)]
+    assert list(resolve_ahead(resolvers)) == list(range(0, 40, 2))
+    assert list(resolve_ahead(resolvers, max_workers=4)) == list(range(0, 40, 2))
+
+
+def test_write_lazy():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = []
+        for i, content in enumerate((b"", b"a" * 10, os.urandom(3 * 1024 * 1024))):
+            path = os.path.join(tmpdir, str(i))
+            with open(path, "wb") as fh:
+                fh.write(content)
+            paths.append((path, content))
+        resolved = []
+
+        def resolvers():
+            for i, (path, _) in enumerate(paths):
+                def resolve(path=path, i=i):
+                    resolved.append(i)
+                    return [(path, f"archive/{i}.txt")]
+                yield resolve
+
+        archive = ZipstreamWrapper(archive_name="archive")
+        archive.write_lazy(resolvers(), max_workers=2)
+        # nothing is resolved until the response is streamed
+        assert not resolved
+        zf = _consume(archive)
+        assert zf.testzip() is None
+        for i, (_, content) in enumerate(paths):
+            assert zf.read(f"archive/{i}.txt") == content
+        assert archive.size == sum(len(content) for _, content in paths)
+
+
+def test_write_lazy_mod_zip():
+    with tempfile.NamedTemporaryFile() as tmp:
+        tmp.write(b"content")
+        tmp.flush()
+        archive = ZipstreamWrapper(archive_name="archive", upstream_mod_zip=True)
+        archive.write_lazy(iter([lambda: [(tmp.name, "archive/file.txt")]]))
+        manifest = b"".join(archive.response()).decode()
+        assert manifest == f"- 7 {quote(tmp.name)} archive/file.txt"
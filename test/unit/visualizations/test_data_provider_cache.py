@@ -0,0 +1,117 @@
+import os
+import tempfile
+
+from galaxy.visualization.data_providers.cache import (
+    file_fingerprint,
+    HandlePool,
+    paths_digest,
+    TileCache,
+)
+
+
+def _touch(path, content):
+    with open(path, "w") as fh:
+        fh.write(content)
+
+
+def test_handle_pool_reuses_and_evicts():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = [os.path.join(tmpdir, str(i)) for i in range(3)]
+        for path in paths:
+            _touch(path, "data")
+        opened, closed = [], []
+
+        def opener(path):
+            def open_():
+                opened.append(path)
+                return object()
+            return open_
+
+        pool = HandlePool(max_idle=2)
+        for _ in range(2):
+            with pool.checkout("test", [paths[0]], opener(paths[0]), closed.append) as handle:
+                first = handle
+        assert opened == [paths[0]]
+        # a handle is never handed out twice at the same time
+        with pool.checkout("test", [paths[0]], opener(paths[0]), closed.append) as handle:
+            assert handle is first
+            with pool.checkout("test", [paths[0]], opener(paths[0]), closed.append) as other:
+                assert other is not first
+        assert len(opened) == 2
+        for path in paths[1:]:
+            with pool.checkout("test", [path], opener(path), closed.append):
+                pass
+        # only max_idle handles are kept open, least recently used first out
+        assert len(closed) == 2
+        pool.clear()
+        assert len(closed) == 4
+
+
+def test_tile_cache():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "dataset")
+        _touch(path, "data")
+        computed = []
+
+        def compute():
+            computed.append(1)
+            return {"data": [[1, 2.0]], "dataset_type": "bigwig"}
+
+        cache = TileCache(max_entries=1, cache_dir=os.path.join(tmpdir, "tiles"))
+        result = cache.get_or_compute([path], "chr1", 0, 1000, {"num_samples": 10}, compute)
+        result["extra_info"] = None
+        assert cache.get_or_compute([path], "chr1", 0, 1000, {"num_samples": 10}, compute) == {"data": [[1, 2.0]], "dataset_type": "bigwig"}
+        assert len(computed) == 1
+        # different parameters or zoom level are different tiles
+        cache.get_or_compute([path], "chr1", 0, 1000, {"num_samples": 20}, compute)
+        cache.get_or_compute([path], "chr1", 0, 2000, {"num_samples": 10}, compute)
+        assert len(computed) == 3
+        # evicted from memory, but read back from disk
+        cache.clear()
+        cache.get_or_compute([path], "chr1", 0, 1000, {"num_samples": 10}, compute)
+        assert len(computed) == 3
+        # rewriting the dataset invalidates its tiles
+        _touch(path, "new data")
+        cache.get_or_compute([path], "chr1", 0, 1000, {"num_samples": 10}, compute)
+        assert len(computed) == 4
+        # and its old tiles are removed from disk
+        digest = paths_digest([path])
+        assert os.listdir(os.path.join(tmpdir, "tiles", digest[:2], digest)) == [file_fingerprint([path])]
+
+
+def test_tile_cache_returns_copies():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "dataset")
+        _touch(path, "data")
+        cache = TileCache(max_entries=1)
+        result = cache.get_or_compute([path], "chr1", 0, 1000, {}, lambda: {"data": [[1, 2.0]]})
+        result["data"][0].append(3)
+        result["data"].append([4, 5.0])
+        assert cache.get_or_compute([path], "chr1", 0, 1000, {}, None) == {"data": [[1, 2.0]]}
+
+
+def test_tile_cache_prunes_cache_dir():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "dataset")
+        _touch(path, "data")
+        cache_dir = os.path.join(tmpdir, "tiles")
+        tile = {"data": "x" * 1000}
+        cache = TileCache(max_entries=1, cache_dir=cache_dir, max_cache_dir_size=5000)
+
+        def tiles():
+            return [os.path.join(root, name) for root, _, files in os.walk(cache_dir) for name in files]
+
+        for start in range(4):
+            cache.get_or_compute([path], "chr1", start, 1000, {}, lambda: tile)
+        assert len(tiles()) == 4
+        # the first tile is read back from disk and becomes the most recently used one
+        cache.clear()
+        first = tiles()
+        for tile_path in first:
+            os.utime(tile_path, (1, 1))
+        cache.get_or_compute([path], "chr1", 0, 1000, {}, None)
+        cache.get_or_compute([path], "chr1", 4, 1000, {}, lambda: tile)
+        cache.get_or_compute([path], "chr1", 5, 1000, {}, lambda: tile)
+        remaining = tiles()
+        assert sum(os.path.getsize(tile_path) for tile_path in remaining) <= 5000 * 0.9
+        assert cache._path(cache._key([path], file_fingerprint([path]), "chr1", 0, 1000, {})) in remaining